@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The tools are run as scripts from the ``tools`` directory, so make their
+# top-level modules (``asset_manager``, ``utils.*``, ...) importable in tests.
+TOOLS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools")
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
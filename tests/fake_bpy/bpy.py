@@ -0,0 +1,73 @@
+"""
+Stand-in for Blender's ``bpy`` module so the exporters can run without Blender.
+
+``ops.wm.open_mainfile`` "opens" a .blend file by reading it as JSON: either a
+list of objects (``name``, ``type``, ``location``, ``rotation``, ``scale``) or
+``{"objects": [...], "sleep": seconds, "crash": true}``. Files that aren't JSON
+load as a single mesh object named after the file.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+
+class Object:
+    def __init__(self, name, type="MESH", location=(0.0, 0.0, 0.0), rotation=(0.0, 0.0, 0.0), scale=(1.0, 1.0, 1.0)):
+        self.name = name
+        self.type = type
+        self.location = tuple(location)
+        self.rotation_euler = tuple(rotation)
+        self.scale = tuple(scale)
+
+
+class _Scene:
+    def __init__(self):
+        self.objects = []
+
+
+class _Context:
+    def __init__(self):
+        self.scene = _Scene()
+
+
+context = _Context()
+
+
+def load_objects(objects):
+    """
+    Replaces the objects of the current scene.
+    """
+    context.scene.objects = [obj if isinstance(obj, Object) else Object(**obj) for obj in objects]
+
+
+def _open_mainfile(filepath):
+    try:
+        with open(filepath) as f:
+            content = json.load(f)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        content = [{"name": Path(filepath).stem}]
+    if isinstance(content, dict):
+        if content.get("sleep"):
+            time.sleep(content["sleep"])
+        if content.get("crash"):
+            os._exit(3)
+        content = content.get("objects", [])
+    load_objects(content)
+
+
+def _export_fbx(filepath):
+    with open(filepath, "w") as f:
+        f.write(f"FBX {len(context.scene.objects)} objects\n")
+
+
+class _Namespace:
+    def __init__(self, **members):
+        self.__dict__.update(members)
+
+
+ops = _Namespace(
+    wm=_Namespace(open_mainfile=_open_mainfile),
+    export_scene=_Namespace(fbx=_export_fbx),
+)
@@ -0,0 +1,117 @@
+import json
+import os
+import socket
+
+import pytest
+
+if not hasattr(socket, "AF_UNIX"):
+    pytest.skip("Unix domain sockets are not available", allow_module_level=True)
+
+import asset_daemon
+import asset_manager
+import version_resolver
+from asset_daemon import AssetDaemon
+from metadata_generator import list_existing_metadata, read_metadata
+from utils import daemon_client
+from utils.scanner import scan_directory
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    root = tmp_path / "assets"
+    for version in ("version_1", "version_2"):
+        (root / "scenes" / "forest" / version).mkdir(parents=True)
+    (root / "scenes" / "forest" / "version_2" / "metadata.json").write_text(json.dumps({"name": "forest"}))
+    manifest = tmp_path / "asset_manifest.json"
+    manifest.write_text(json.dumps({"assets": [{"name": "Forest", "type": "scene", "path": "scenes/forest", "version": "2"}]}))
+    socket_path = tmp_path / "daemon.sock"
+    monkeypatch.setenv(daemon_client.DAEMON_ENV_VAR, str(socket_path))
+    asset_manager.set_manifest_backend(str(manifest))
+    daemon_client.reset_client()
+    yield root, manifest, socket_path
+    asset_manager.set_manifest_backend(None)
+    daemon_client.reset_client()
+
+
+def test_tools_use_running_daemon_and_fall_back(library, capsys):
+    root, manifest, socket_path = library
+    forest = str(root / "scenes" / "forest")
+    with AssetDaemon(str(root), str(manifest), str(socket_path), poll_interval=0.05) as daemon:
+        assert oct(os.stat(socket_path).st_mode & 0o777) == "0o600"
+        assert asset_manager.find_asset_by_name("Forest")["path"] == "scenes/forest"
+        assert asset_manager.list_all_assets() == ["Forest"]
+        assert version_resolver.resolve_latest("scenes", "forest", root=str(root)) == os.path.join(forest, "version_2")
+        with pytest.raises(KeyError, match="Unknown asset: scenes/desert"):
+            version_resolver.resolve_latest("scenes", "desert", root=str(root))
+        assert read_metadata(os.path.join(forest, "version_2", "metadata.json")) == {"name": "forest"}
+        capsys.readouterr()
+        list_existing_metadata(str(root))
+        assert capsys.readouterr().out.splitlines()[1] == os.path.join(str(root), "scenes/forest/version_2/metadata.json")
+        # The connection's ping plus seven lookups.
+        assert daemon.requests == 8
+
+        # Manifest writes go to the file and are visible to the next lookup.
+        asset_manager.add_asset_to_manifest({"name": "Desert", "type": "scene", "path": "scenes/desert", "version": "1"})
+        assert asset_manager.find_asset_by_name("Desert")["version"] == "1"
+        # Version and metadata changes are picked up by the next refresh.
+        (root / "scenes" / "forest" / "version_3").mkdir()
+        (root / "scenes" / "forest" / "version_3" / "metadata.json").write_text(json.dumps({"name": "forest", "version": 3}))
+        daemon.refresh()
+        assert version_resolver.resolve_latest("scenes", "forest", root=str(root)) == os.path.join(forest, "version_3")
+        assert read_metadata(os.path.join(forest, "version_3", "metadata.json"))["version"] == 3
+        requests = daemon.requests
+        # Lookups outside what the daemon serves are answered directly.
+        other_manifest = manifest.parent / "other_manifest.json"
+        other_manifest.write_text(json.dumps({"assets": []}))
+        asset_manager.set_manifest_backend(str(other_manifest))
+        assert asset_manager.find_asset_by_name("Forest") is None
+        assert daemon.requests == requests
+        asset_manager.set_manifest_backend(str(manifest))
+
+    assert not socket_path.exists()
+    assert asset_manager.find_asset_by_name("Desert")["path"] == "scenes/desert"
+    assert version_resolver.resolve_latest("scenes", "forest", root=str(root)) == os.path.join(forest, "version_3")
+
+
+def test_refuses_second_daemon_and_replaces_stale_socket(library):
+    root, manifest, socket_path = library
+    socket_path.write_text("")
+    with AssetDaemon(str(root), str(manifest), str(socket_path), poll_interval=60):
+        with pytest.raises(RuntimeError, match="already running"):
+            AssetDaemon(str(root), str(manifest), str(socket_path)).start()
+        client = daemon_client.DaemonClient(str(socket_path))
+        assert client.request("stats")["metadata_files"] == 1
+        with pytest.raises(daemon_client.DaemonUnavailable, match="LookupError"):
+            client.request("manifest.drop")
+        client.close()
+
+
+def test_metadata_lookups_see_changes_before_the_next_refresh(library, monkeypatch):
+    root, manifest, socket_path = library
+    forest = root / "scenes" / "forest"
+    with AssetDaemon(str(root), str(manifest), str(socket_path), poll_interval=60, listing_ttl=60) as daemon:
+        metadata_path = forest / "version_2" / "metadata.json"
+        assert read_metadata(str(metadata_path)) == {"name": "forest"}
+        metadata_path.write_text(json.dumps({"name": "forest", "author": "ada"}))
+        assert read_metadata(str(metadata_path)) == {"name": "forest", "author": "ada"}
+
+        # Within the TTL the listing comes from the index, without scanning.
+        scans = []
+        monkeypatch.setattr(asset_daemon, "scan_directory", lambda *args, **kwargs: scans.append(args) or scan_directory(*args, **kwargs))
+        (forest / "version_1" / "metadata.json").write_text(json.dumps({"name": "forest"}))
+        assert daemon.index.list_metadata(str(root)) == [str(metadata_path)]
+        assert scans == []
+
+        daemon.index.listing_ttl = 0
+        assert daemon.index.list_metadata(str(root)) == [str(forest / "version_1" / "metadata.json"), str(metadata_path)]
+        metadata_path.unlink()
+        assert daemon.index.list_metadata(str(forest)) == [str(forest / "version_1" / "metadata.json")]
+        assert read_metadata(str(metadata_path)) is None
+        assert daemon.refreshes == 1 and len(scans) == 2
+
+        # A refresh keeps what a listing found while it ran.
+        listed = str(forest / "version_4" / "metadata.json")
+        daemon.index.metadata[listed] = (None, {"name": "forest"})
+        daemon.index.scanned_at[str(forest)] = float("inf")
+        daemon.refresh()
+        assert listed in daemon.index.metadata
@@ -0,0 +1,169 @@
+import json
+import os
+
+import pytest
+
+import asset_manager
+
+
+@pytest.fixture
+def manifest_path(tmp_path, monkeypatch):
+    path = tmp_path / "asset_manifest.json"
+    path.write_text(json.dumps({"assets": [
+        {"name": "CubeModel", "type": "3d_model", "path": "props/cube.blend", "version": "1.0.0"},
+        {"name": "LeafTexture", "type": "texture", "path": "textures/leaf.png", "version": "1.0.0"},
+    ]}))
+    monkeypatch.setattr(asset_manager, "ASSET_MANIFEST_PATH", str(path))
+    return path
+
+
+def test_indexed_lookups(manifest_path):
+    manifest = asset_manager.Manifest(str(manifest_path))
+    assert manifest.get("CubeModel")["path"] == "props/cube.blend"
+    assert [a["name"] for a in manifest.find("type", "texture")] == ["LeafTexture"]
+    assert len(manifest.find("version", "1.0.0")) == 2
+    assert manifest.find("path", "missing.png") == []
+    with pytest.raises(ValueError):
+        manifest.find("author", "chevp")
+
+
+def test_reloads_when_file_changes(manifest_path):
+    manifest = asset_manager.Manifest(str(manifest_path))
+    assert manifest.get("NewAsset") is None
+    data = json.loads(manifest_path.read_text())
+    data["assets"].append({"name": "NewAsset", "type": "texture", "path": "new.png"})
+    manifest_path.write_text(json.dumps(data))
+    stat = os.stat(manifest_path)
+    os.utime(manifest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert manifest.get("NewAsset")["path"] == "new.png"
+    assert not manifest.refresh()
+
+
+def test_module_functions_use_shared_manifest(manifest_path, capsys):
+    asset_manager.update_asset_in_manifest("CubeModel", {"path": "props/cube_v2.blend"})
+    assert asset_manager.find_asset_by_name("CubeModel")["path"] == "props/cube_v2.blend"
+    assert asset_manager.get_manifest().find("path", "props/cube.blend") == []
+
+    asset_manager.remove_asset_from_manifest("LeafTexture")
+    capsys.readouterr()
+    asset_manager.remove_asset_from_manifest("LeafTexture")
+    assert capsys.readouterr().out == "Asset LeafTexture not found in manifest.\n"
+    asset_manager.add_asset_to_manifest({"name": "TreeModel", "type": "3d_model", "path": "props/tree.blend"})
+    assert asset_manager.list_all_assets() == ["CubeModel", "TreeModel"]
+    on_disk = json.loads(manifest_path.read_text())
+    assert [a["name"] for a in on_disk["assets"]] == ["CubeModel", "TreeModel"]
+
+
+def test_transaction_commits_once(manifest_path):
+    manifest = asset_manager.Manifest(str(manifest_path))
+    with manifest.transaction() as transaction:
+        for index in range(100):
+            transaction.add({"name": f"Prop{index}", "type": "3d_model", "path": f"props/{index}.blend"})
+        transaction.update("CubeModel", {"version": "2.0.0"})
+        transaction.remove("LeafTexture")
+        transaction.remove("Unknown")
+        assert manifest.get("Prop0") is None
+
+    on_disk = json.loads(manifest_path.read_text())
+    assert len(on_disk["assets"]) == 101
+    assert manifest.get("CubeModel")["version"] == "2.0.0"
+    assert manifest.get("LeafTexture") is None
+    assert transaction.committed
+    assert not [name for name in os.listdir(manifest_path.parent) if name != manifest_path.name]
+
+
+def test_apply_changes_summary(manifest_path):
+    summary = asset_manager.apply_changes([
+        ("add", {"name": "TreeModel", "type": "3d_model", "path": "props/tree.blend"}),
+        ("update", "Missing", {"version": "2"}),
+        ("remove", "CubeModel"),
+    ], fsync=True)
+    assert summary == {"added": ["TreeModel"], "updated": [], "removed": ["CubeModel"], "missing": ["Missing"]}
+    with pytest.raises(ValueError):
+        asset_manager.apply_changes([("rename", "TreeModel", "Tree")])
+
+
+@pytest.mark.skipif(not hasattr(os, "fchmod"), reason="permission bits are POSIX only")
+def test_commit_keeps_manifest_permissions(manifest_path):
+    os.chmod(manifest_path, 0o644)
+    asset_manager.Manifest(str(manifest_path)).add({"name": "TreeModel", "path": "props/tree.blend"})
+    assert os.stat(manifest_path).st_mode & 0o777 == 0o644
+
+    new_path = manifest_path.parent / "new_manifest.json"
+    asset_manager.Manifest(str(new_path)).add({"name": "TreeModel", "path": "props/tree.blend"})
+    umask = os.umask(0)
+    os.umask(umask)
+    assert os.stat(new_path).st_mode & 0o777 == 0o666 & ~umask
+
+
+def test_concurrent_commit_conflict(manifest_path):
+    first = asset_manager.Manifest(str(manifest_path))
+    second = asset_manager.Manifest(str(manifest_path))
+    transaction = first.transaction()
+    transaction.add({"name": "FromFirst", "path": "a.png"})
+    second.add({"name": "FromSecond", "path": "b.png"})
+
+    with pytest.raises(asset_manager.ManifestConflictError):
+        transaction.commit()
+    assert first.get("FromSecond") is not None
+    assert first.get("FromFirst") is None
+    assert not os.path.exists(str(manifest_path) + ".lock")
+
+
+def test_failed_save_discards_changes_in_memory(manifest_path, monkeypatch):
+    manifest = asset_manager.Manifest(str(manifest_path))
+    assert manifest.get("CubeModel") is not None
+
+    def disk_full(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(asset_manager, "write_json_atomic", disk_full)
+    with pytest.raises(OSError):
+        manifest.apply_changes([("add", {"name": "TreeModel", "path": "props/tree.blend"}), ("remove", "CubeModel")])
+    assert manifest.get("TreeModel") is None
+    assert manifest.get("CubeModel")["path"] == "props/cube.blend"
+    assert manifest.names() == ["CubeModel", "LeafTexture"]
+
+
+def test_verify_asset_integrity(tmp_path, monkeypatch):
+    library = tmp_path / "assets"
+    (library / "props").mkdir(parents=True)
+    (library / "props" / "cube.blend").write_bytes(b"cube")
+    (library / "props" / "tree.blend").write_bytes(b"tree")
+    (library / "props" / "stray.png").write_bytes(b"stray")
+    manifest_path = tmp_path / "asset_manifest.json"
+    manifest_path.write_text(json.dumps({"assets": [
+        {"name": "CubeModel", "path": "props/cube.blend"},
+        {"name": "TreeModel", "path": "props/tree.blend"},
+        {"name": "RockModel", "path": "props/rock.blend"},
+    ]}))
+    monkeypatch.setattr(asset_manager, "ASSET_MANIFEST_PATH", str(manifest_path))
+    cache_path = str(tmp_path / "digests.json")
+
+    assert asset_manager.record_asset_digests(str(library), cache_path=cache_path) == 2
+    (library / "props" / "tree.blend").write_bytes(b"tree, edited")
+
+    report = asset_manager.verify_asset_integrity(str(library), cache_path=cache_path, max_workers=2)
+    assert report["ok"] == ["CubeModel"]
+    assert [entry["name"] for entry in report["changed"]] == ["TreeModel"]
+    assert report["missing"] == [{"name": "RockModel", "path": "props/rock.blend"}]
+    assert report["unrecorded"] == []
+    assert report["unreferenced"] == [os.path.join("props", "stray.png")]
+    assert asset_manager.get_manifest().get("CubeModel")["digest"].startswith("blake2b:")
+
+
+def test_digest_cache_skips_unchanged_files(tmp_path):
+    from utils.digest_cache import DigestCache
+
+    asset = tmp_path / "texture.png"
+    asset.write_bytes(b"pixels")
+    cache_path = str(tmp_path / "digests.json")
+    cache = DigestCache(cache_path)
+    first = cache.digest(str(asset), algorithm="sha256")
+    cache.save()
+
+    reloaded = DigestCache(cache_path)
+    assert reloaded.digest(str(asset), algorithm="sha256") == first
+    assert (reloaded.hits, reloaded.misses) == (1, 0)
+    assert reloaded.digest(str(asset), algorithm="blake2b") != first
+    assert reloaded.misses == 1
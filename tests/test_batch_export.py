@@ -0,0 +1,199 @@
+import io
+import json
+import os
+import sys
+
+import pytest
+
+from export_scheduler import WORKER_SCRIPT, ExportScheduler, scheduled_batch_export
+from utils import instrumentation
+
+FAKE_BPY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_bpy")
+
+
+@pytest.fixture
+def worker_options():
+    env = dict(os.environ, PYTHONPATH=FAKE_BPY_DIR)
+    return {"worker_command": [sys.executable, WORKER_SCRIPT], "env": env}
+
+
+def _write_blend(path, content):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(content))
+    return path
+
+
+def test_scheduler_exports_with_reused_workers(tmp_path, worker_options):
+    blend_files = [
+        _write_blend(tmp_path / "blender_files" / f"scene_{index}.blend",
+                     [{"name": f"Cube{index}", "location": [index, 0, 0]}] * (index + 1))
+        for index in range(6)
+    ]
+    export_path = tmp_path / "export"
+    summary = scheduled_batch_export(str(tmp_path / "blender_files"), str(export_path), workers=2, **worker_options)
+
+    assert summary["total"] == summary["succeeded"] == 6
+    assert all(result["attempts"] == 1 for result in summary["results"])
+    exported = json.loads((export_path / "scene_3.json").read_text())
+    assert len(exported["objects"]) == 4
+    assert exported["objects"][0]["location"] == [3, 0, 0]
+    assert len(blend_files) == 6
+
+
+def test_scheduler_retries_and_reports_failures(tmp_path, worker_options):
+    good = _write_blend(tmp_path / "good.blend", [{"name": "Cube"}])
+    hung = _write_blend(tmp_path / "hung.blend", {"sleep": 30})
+    crashing = _write_blend(tmp_path / "crash.blend", {"crash": True})
+    scheduler = ExportScheduler(workers=2, timeout=2.0, retries=1, **worker_options)
+    summary = scheduler.run([good, hung, crashing], str(tmp_path / "export"), format="fbx")
+
+    statuses = {os.path.basename(r["blend_file"]): (r["status"], r["attempts"]) for r in summary["results"]}
+    assert statuses == {"good.blend": ("ok", 1), "hung.blend": ("timeout", 2), "crash.blend": ("crashed", 2)}
+    assert summary["failed"] == 2
+    assert (tmp_path / "export" / "good.fbx").exists()
+
+
+def test_scheduler_reports_files_when_workers_cannot_start(tmp_path):
+    blend_files = [_write_blend(tmp_path / f"scene_{index}.blend", [{"name": "Cube"}]) for index in range(3)]
+    scheduler = ExportScheduler(worker_command=[str(tmp_path / "missing" / "blender")], workers=2)
+    summary = scheduler.run(blend_files, str(tmp_path / "export"))
+
+    assert summary["total"] == summary["failed"] == 3
+    assert [result["blend_file"] for result in summary["results"]] == [str(path) for path in blend_files]
+    assert all(result["status"] == "error" and "Could not start worker" in result["error"] for result in summary["results"])
+
+
+def test_failures_are_reported_as_log_records(tmp_path, monkeypatch, capsys):
+    _write_blend(tmp_path / "blender_files" / "scene.blend", [{"name": "Cube"}])
+    stream = io.StringIO()
+    monkeypatch.setattr(instrumentation, "LOG_FORMAT", "json")
+    monkeypatch.setattr(instrumentation, "LOG_STREAM", stream)
+    scheduled_batch_export(str(tmp_path / "blender_files"), str(tmp_path / "export"),
+                           worker_command=[str(tmp_path / "missing" / "blender")], workers=1)
+
+    records = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [record["event"] for record in records] == ["export.summary", "export.failed"]
+    assert records[1]["level"] == "error" and records[1]["status"] == "error"
+    assert capsys.readouterr().out == ""
+
+
+def test_scheduler_recycles_workers_after_a_crash(tmp_path, worker_options):
+    # Files run largest first, so the crash comes before the good files.
+    crashing = _write_blend(tmp_path / "crash.blend", {"crash": True, "objects": [{"name": "Padding" * 20}]})
+    good = [_write_blend(tmp_path / f"scene_{index}.blend", [{"name": "Cube"}]) for index in range(3)]
+    scheduler = ExportScheduler(workers=1, retries=0, max_tasks_per_worker=5, **worker_options)
+    summary = scheduler.run([crashing] + good, str(tmp_path / "export"))
+
+    assert [result["status"] for result in summary["results"]] == ["crashed", "ok", "ok", "ok"]
+    assert all((tmp_path / "export" / f"scene_{index}.json").exists() for index in range(3))
+
+
+@pytest.fixture
+def batch_export_module(monkeypatch):
+    monkeypatch.syspath_prepend(FAKE_BPY_DIR)
+    import batch_export
+    return batch_export
+
+
+def test_export_cache_skips_unchanged_files(tmp_path, batch_export_module, capsys):
+    blend_dir = tmp_path / "blender_files"
+    tree = _write_blend(blend_dir / "tree_1.blend", [{"name": "Tree"}])
+    _write_blend(blend_dir / "rock_1.blend", [{"name": "Rock"}])
+    export_path = tmp_path / "export"
+    cache_dir = str(tmp_path / "cache")
+
+    batch_export_module.batch_export(str(blend_dir), str(export_path), cache_dir=cache_dir)
+    assert "0 hits, 2 misses" in capsys.readouterr().out
+
+    _write_blend(tree, [{"name": "Tree"}, {"name": "Leaves"}])
+    batch_export_module.batch_export(str(blend_dir), str(export_path), cache_dir=cache_dir)
+    assert "1 hits, 1 misses" in capsys.readouterr().out
+    assert len(json.loads((export_path / "tree_1.json").read_text())["objects"]) == 2
+
+    batch_export_module.batch_export(str(blend_dir), str(export_path), cache_dir=cache_dir, force=True)
+    assert "0 hits, 0 misses" in capsys.readouterr().out
+
+
+def test_reexport_does_not_write_into_cached_output(tmp_path, batch_export_module):
+    from export_cache import ExportCache, cached_export
+
+    blend = _write_blend(tmp_path / "tree_1.blend", [{"name": "Tree"}])
+    export_path = str(tmp_path / "export")
+    cache = ExportCache(str(tmp_path / "cache"))
+    exporter = batch_export_module.export_scene_to_json
+    old_key = cache.key(str(blend), "json")
+    output_path, hit = cached_export(exporter, str(blend), export_path, "json", cache)
+    assert not hit
+    assert cached_export(exporter, str(blend), export_path, "json", cache) == (output_path, True)
+
+    _write_blend(blend, [{"name": "Tree"}, {"name": "Leaves"}])
+    cached_export(exporter, str(blend), export_path, "json", cache)
+    cached_copy = os.path.join(cache._entry_dir(old_key), "tree_1.json")
+    assert len(json.loads(open(cached_copy).read())["objects"]) == 1
+    assert len(json.loads(open(output_path).read())["objects"]) == 2
+
+
+def test_exporter_options_are_part_of_the_cache_key(tmp_path, batch_export_module):
+    import functools
+    from export_cache import ExportCache, cached_export
+    from scene_exporter import export_scene_to_json
+
+    blend = _write_blend(tmp_path / "tree_1.blend", [{"name": "Tree"}])
+    export_path = str(tmp_path / "export")
+    cache = ExportCache(str(tmp_path / "cache"))
+    assert not cached_export(export_scene_to_json, str(blend), export_path, "json", cache)[1]
+    streamed = functools.partial(export_scene_to_json, stream=True)
+    assert not cached_export(streamed, str(blend), export_path, "json", cache, options={"stream": True})[1]
+    assert cached_export(streamed, str(blend), export_path, "json", cache, options={"stream": True})[1]
+    assert cache.key(str(blend), "json", {}) == cache.key(str(blend), "json")
+
+
+def test_export_cache_prunes_least_recently_used(tmp_path):
+    from export_cache import ExportCache, parse_size
+
+    cache = ExportCache(str(tmp_path / "cache"))
+    outputs = []
+    for index in range(3):
+        output = tmp_path / f"scene_{index}.json"
+        output.write_bytes(b"x" * 100)
+        outputs.append(output)
+        cache.store(f"{index:02d}key", [str(output)])
+        cache.entries[f"{index:02d}key"]["last_used"] = index
+    cache.entries["00key"]["last_used"] = 10
+
+    assert cache.prune(parse_size("200")) == 1
+    assert sorted(cache.entries) == ["00key", "02key"]
+    cache.save()
+    assert sorted(ExportCache(str(tmp_path / "cache")).entries) == ["00key", "02key"]
+    assert parse_size("1.5K") == 1536 and parse_size("20G") == 20 << 30
+
+
+def test_interrupted_runs_keep_saved_entries_and_lose_no_space(tmp_path, monkeypatch):
+    import export_cache
+    from export_cache import ExportCache
+
+    monkeypatch.setattr(export_cache, "SAVE_INTERVAL", 2)
+    cache = ExportCache(str(tmp_path / "cache"))
+    for index in range(3):
+        output = tmp_path / f"scene_{index}.json"
+        output.write_bytes(b"x" * 100)
+        cache.store(f"{index:02d}key", [str(output)])
+
+    # The run dies before save(): the first two entries were saved along the way.
+    reopened = ExportCache(str(tmp_path / "cache"))
+    assert sorted(reopened.entries) == ["00key", "01key"]
+    assert os.path.isdir(cache._entry_dir("02key"))
+    assert reopened.prune() == 0
+    assert not os.path.exists(cache._entry_dir("02key"))
+    assert all(os.path.isdir(cache._entry_dir(key)) for key in reopened.entries)
+
+
+def test_scheduler_restores_cached_files(tmp_path, worker_options):
+    blend_dir = tmp_path / "blender_files"
+    for index in range(3):
+        _write_blend(blend_dir / f"scene_{index}.blend", [{"name": f"Cube{index}"}])
+    options = dict(worker_options, cache_dir=str(tmp_path / "cache"), workers=2)
+    first = scheduled_batch_export(str(blend_dir), str(tmp_path / "export"), **options)
+    second = scheduled_batch_export(str(blend_dir), str(tmp_path / "export"), **options)
+    assert (first["cached"], second["cached"]) == (0, 3)
+    assert second["succeeded"] == 3
@@ -0,0 +1,27 @@
+import copy
+
+import pytest
+
+from benchmarks.harness import compare_results, format_results, run_benchmarks, save_results, load_results
+
+
+def test_run_and_compare(tmp_path):
+    results = run_benchmarks("small", names=["json.read", "manifest.lookup"], repeat=2)
+    assert sorted(results["results"]) == ["json.read", "manifest.lookup"]
+    assert results["results"]["json.read"]["params"] == {"nodes": 10_000}
+    assert 0 < results["results"]["json.read"]["min"] <= results["results"]["json.read"]["max"]
+
+    path = str(tmp_path / "baseline.json")
+    save_results(results, path)
+    baseline = load_results(path)
+    assert not any(entry["regression"] for entry in compare_results(baseline, results))
+
+    slower = copy.deepcopy(results)
+    slower["results"]["json.read"]["min"] *= 1.5
+    comparison = compare_results(baseline, slower, threshold=0.2)
+    assert [entry["name"] for entry in comparison if entry["regression"]] == ["json.read"]
+    assert "+50.0%!" in format_results(slower, comparison)
+
+    slower["scale"] = "large"
+    with pytest.raises(ValueError):
+        compare_results(baseline, slower)
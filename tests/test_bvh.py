@@ -0,0 +1,84 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from scdf import SceneGraph
+from scdf.bvh import BVH, objects_bounds, scene_bvh, transformed_bounds
+
+
+def _random_boxes(count, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(-50, 50, (count, 3))
+    half = rng.uniform(0.1, 2, (count, 3))
+    return centers - half, centers + half
+
+
+def _box_distances(point, mins, maxs):
+    gap = np.maximum(np.maximum(mins - point, point - maxs), 0)
+    return np.sqrt((gap * gap).sum(axis=1))
+
+
+@pytest.mark.parametrize("method", ["sah", "median"])
+def test_queries_match_brute_force(method):
+    mins, maxs = _random_boxes(3000)
+    bvh = BVH(mins, maxs, method=method, leaf_size=4)
+    rng = np.random.default_rng(1)
+
+    centers = rng.uniform(-50, 50, (40, 3))
+    results = bvh.query_boxes(centers - 6, centers + 6)
+    for center, found in zip(centers, results):
+        expected = np.flatnonzero(np.all((mins <= center + 6) & (maxs >= center - 6), axis=1))
+        np.testing.assert_array_equal(found, expected)
+
+    points = rng.uniform(-60, 60, (40, 3))
+    ids, distances = bvh.nearest(points, k=5)
+    for point, point_ids, point_distances in zip(points, ids, distances):
+        all_distances = _box_distances(point, mins, maxs)
+        np.testing.assert_allclose(point_distances, np.sort(all_distances)[:5])
+        np.testing.assert_allclose(all_distances[point_ids], point_distances)
+
+    pairs = bvh.overlapping_pairs()
+    overlap = np.all((mins[:, None] <= maxs[None]) & (maxs[:, None] >= mins[None]), axis=2)
+    np.testing.assert_array_equal(pairs, np.argwhere(np.triu(overlap, 1)))
+
+
+def test_ray_cast_finds_the_first_box():
+    bvh = BVH([[2, -1, -1], [5, -1, -1], [-4, 3, -1]], [[3, 1, 1], [6, 1, 1], [-3, 4, 1]])
+    ids, distances = bvh.ray_cast([[0, 0, 0], [0, 0, 0], [0, 0, 0], [2.5, 0, 0]],
+                                  [[2, 0, 0], [-1, 0, 0], [-1, 0.875, 0], [1, 0, 0]], max_distance=100)
+    np.testing.assert_array_equal(ids, [0, -1, 2, 0])
+    np.testing.assert_allclose(distances[[0, 3]], [2, 0])
+    assert distances[1] == np.inf
+    ids, _ = bvh.ray_cast([[0, 0, 0]], [[1, 0, 0]], max_distance=1.5)
+    assert ids[0] == -1
+
+
+def test_scene_bvh_is_cached_per_version_and_refitted():
+    graph = SceneGraph.from_scdf({"nodes": [
+        {"name": "Root", "children": ["Tree", "Rock"], "position": [10, 0, 0]},
+        {"name": "Tree", "position": [1, 0, 0], "scale": [1, 4, 1]},
+        {"name": "Rock", "position": [-5, 0, 0], "rotation": [0, 0, 45]},
+    ]})
+    bvh = scene_bvh(graph)
+    assert scene_bvh(graph) is bvh
+    np.testing.assert_array_equal(bvh.query_box([10.6, 1.5, 0], [11, 1.9, 0]), [1])
+    np.testing.assert_allclose(bvh.maxs[2] - bvh.mins[2], [np.sqrt(2), np.sqrt(2), 1])
+
+    graph.set_transform("Rock", position=[1, 0, 0])
+    assert scene_bvh(graph) is bvh
+    np.testing.assert_array_equal(bvh.query_box([11, 0, 0], [11, 0, 0]), [1, 2])
+    assert scene_bvh(graph, rebuild=True) is not bvh
+
+    lights = BVH.from_scene_graph(graph, names=["Rock"])
+    ids, distances = lights.nearest(graph.world_positions()[[1]])
+    assert ids[0, 0] == graph.index["Rock"] and distances[0, 0] == 0
+
+
+def test_bounds_of_exported_objects():
+    mins, maxs = objects_bounds([{"location": [1, 2, 3], "rotation": [0, 0, np.pi / 2], "scale": [2, 1, 1]}])
+    np.testing.assert_allclose(mins, [[0.5, 1, 2.5]], atol=1e-12)
+    np.testing.assert_allclose(maxs, [[1.5, 3, 3.5]], atol=1e-12)
+    assert transformed_bounds(np.empty((0, 4, 4)))[0].shape == (0, 3)
+    empty = BVH(np.empty((0, 3)), np.empty((0, 3)))
+    assert len(empty.query_box([0, 0, 0], [1, 1, 1])) == 0
+    assert empty.nearest([[0, 0, 0]])[0].shape == (1, 0)
@@ -0,0 +1,115 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from dependency_graph import DependencyGraph, load_dependency_graph
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_BPY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_bpy")
+
+
+def _scene(materials, nodes):
+    return {
+        "scene": {"root": nodes[0]["name"], "activeCamera": ""},
+        "nodes": nodes,
+        "materials": [{"name": name, "type": "Phong", "color": [1, 1, 1], "texture": texture} for name, texture in materials],
+        "cameras": [], "lights": [], "metadata": {},
+    }
+
+
+@pytest.fixture
+def library(tmp_path):
+    assets = tmp_path / "assets"
+    (assets / "forest").mkdir(parents=True)
+    (assets / "town").mkdir()
+    (assets / "forest" / "forest.scdf.json").write_text(json.dumps(_scene(
+        [("LeafyMaterial", "LeafTexture")], [{"name": "Tree", "mesh": "TreeModel", "material": "LeafyMaterial"}])))
+    (assets / "town" / "town.scdf.json").write_text(json.dumps(_scene(
+        [("BasicMaterial", "CubeTexture")], [{"name": "House", "mesh": "HouseModel", "material": "BasicMaterial"}])))
+    (assets / "town" / "metadata.json").write_text(json.dumps({"name": "HouseModel", "dependencies": ["BrickTexture"]}))
+    (assets / "park.scoe.xml").write_bytes(open(os.path.join(REPO_ROOT, "archiv", "scene_1.scoe.xml"), "rb").read())
+    return tmp_path
+
+
+def test_rebuild_order_follows_dependencies(library):
+    graph, changed = load_dependency_graph([str(library / "assets")], str(library / "graph.json"))
+    assert {"forest", "town", "HouseModel", "park"} <= changed
+
+    assert graph.rebuild_order(["LeafTexture"]) == ["LeafTexture", "LeafyMaterial", "forest", "park"]
+    assert graph.rebuild_order(["BrickTexture"]) == ["BrickTexture", "HouseModel", "town"]
+    assert graph.affected(["HouseModel"]) == {"HouseModel", "town"}
+    assert graph.names_for_files([str(library / "assets" / "town" / "town.scdf.json"), "textures/CubeTexture.png"]) == {"town", "CubeTexture"}
+
+
+def test_incremental_update_and_persistence(library):
+    graph_path = str(library / "graph.json")
+    load_dependency_graph([str(library / "assets")], graph_path)
+
+    reloaded = DependencyGraph(graph_path)
+    assert reloaded.update() == set()
+    assert reloaded.dependents["LeafyMaterial"] == {"forest", "park"}
+
+    forest = library / "assets" / "forest" / "forest.scdf.json"
+    forest.write_text(json.dumps(_scene([("LeafyMaterial", "PineTexture")], [{"name": "Tree", "mesh": "TreeModel", "material": "LeafyMaterial"}])))
+    os.utime(forest, ns=(1, 1))
+    (library / "assets" / "park.scoe.xml").unlink()
+    assert reloaded.update() == {"forest", "park"}
+    assert reloaded.affected(["LeafTexture"]) == {"LeafTexture"}
+    assert reloaded.rebuild_order(["PineTexture"])[-1] == "forest"
+    assert "park" not in reloaded.dependencies
+
+
+def test_cycles_are_reported(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "metadata.json").write_text(json.dumps({"name": "A", "dependencies": ["B"]}))
+    (tmp_path / "b" / "metadata.json").write_text(json.dumps({"name": "B", "dependencies": ["A"]}))
+    graph, _ = load_dependency_graph([str(tmp_path)], str(tmp_path / "graph.json"))
+    with pytest.raises(ValueError, match="A, B"):
+        graph.rebuild_order(["A"])
+
+
+def test_batch_export_only_affected_scenes(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(FAKE_BPY_DIR)
+    import batch_export
+
+    for name in ("forest", "town", "desert"):
+        (tmp_path / "blender_files").mkdir(exist_ok=True)
+        (tmp_path / "blender_files" / f"{name}.blend").write_text(json.dumps([{"name": name}]))
+    batch_export.batch_export(str(tmp_path / "blender_files"), str(tmp_path / "export"), only=["LeafTexture", "forest"])
+    assert sorted(os.listdir(tmp_path / "export")) == ["forest.json"]
+
+
+def test_affected_export_falls_back_when_scenes_have_no_blend_file(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(FAKE_BPY_DIR)
+    import batch_export
+
+    # Named as in the repository: the scenes share no stems with the .blend files.
+    (tmp_path / "assets" / "scenes").mkdir(parents=True)
+    (tmp_path / "assets" / "scenes" / "scene_1.scdf.json").write_bytes(open(os.path.join(REPO_ROOT, "archiv", "scene_1.scdf.json"), "rb").read())
+    blender_files = tmp_path / "blender_files"
+    for relative in ("props/tree_1.blend", "environments/envrionment_name_1.blend", "characters/character_name_1.blend"):
+        (blender_files / relative).parent.mkdir(parents=True, exist_ok=True)
+        (blender_files / relative).write_text(json.dumps([{"name": "Cube"}]))
+    graph, _ = load_dependency_graph([str(tmp_path / "assets")], str(tmp_path / "graph.json"))
+
+    assert batch_export.select_affected(graph, ["CubeTexture"], str(blender_files)) is None
+    batch_export.batch_export(str(blender_files), str(tmp_path / "export"), only=None)
+    assert len(os.listdir(tmp_path / "export")) == 3
+
+    (blender_files / "scene_1.blend").write_text(json.dumps([{"name": "Cube"}]))
+    assert batch_export.select_affected(graph, ["CubeTexture"], str(blender_files))[-1] == "scene_1"
+
+
+def test_unreadable_and_generated_files_are_skipped(library, capsys):
+    (library / "assets" / "broken.scdf.json").write_text("{not json")
+    (library / "assets" / "town" / "generated").mkdir()
+    (library / "assets" / "town" / "generated" / "metadata.json").write_text(json.dumps({"name": "Thumbnail", "dependencies": ["Town"]}))
+    graph, _ = load_dependency_graph([str(library / "assets")], str(library / "graph.json"))
+
+    assert "Skipping" in capsys.readouterr().out
+    assert graph.files[str(library / "assets" / "broken.scdf.json")]["name"] is None
+    assert "Thumbnail" not in graph.dependencies
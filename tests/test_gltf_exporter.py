@@ -0,0 +1,82 @@
+import json
+import os
+import struct
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from gltf_exporter import INSTANCING_EXTENSION, euler_to_quaternions, export_scene_to_gltf, read_glb
+from scdf.convert import read_scene
+from scdf.scene_graph import euler_to_matrices
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_BPY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_bpy")
+
+
+def _quaternion_matrix(q):
+    x, y, z, w = q
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+        [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+        [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+    ])
+
+
+def test_quaternions_match_scene_graph_rotations():
+    angles = np.random.default_rng(1).uniform(-180, 180, size=(20, 3))
+    for q, matrix in zip(euler_to_quaternions(angles), euler_to_matrices(angles)):
+        np.testing.assert_allclose(_quaternion_matrix(q), matrix, atol=1e-12)
+
+
+def test_scdf_scene_to_glb(tmp_path):
+    scene = read_scene(os.path.join(REPO_ROOT, "archiv", "scene_1.scdf.json"))
+    path = export_scene_to_gltf(scene, str(tmp_path / "scene_1.glb"))
+    gltf, buffer = read_glb(path)
+
+    assert [node["name"] for node in gltf["nodes"]] == ["RootNode", "CubeNode", "TreeNode", "LightNode", "MainCamera"]
+    assert gltf["nodes"][0]["children"] == [1, 2, 3] and gltf["scenes"][0]["nodes"] == [0, 4]
+    assert [material["name"] for material in gltf["materials"]] == ["BasicMaterial", "LeafyMaterial"]
+    # Both placeholder meshes share one set of accessors.
+    assert gltf["meshes"][0]["primitives"][0]["attributes"] == gltf["meshes"][1]["primitives"][0]["attributes"]
+    assert all(view["byteOffset"] % 4 == 0 for view in gltf["bufferViews"])
+    assert len(buffer) >= gltf["buffers"][0]["byteLength"]
+    with open(path, "rb") as f:
+        assert struct.unpack("<4sII", f.read(12))[2] == os.path.getsize(path)
+
+
+def test_repeated_props_are_shared_and_instanced(tmp_path):
+    objects = [{"name": "Tree" if i == 0 else f"Tree.{i:03d}", "type": "MESH", "location": [i, 2.0, 0.5], "rotation": [0, 0, 0.1 * i], "scale": [1, 1, 2]}
+               for i in range(40)]
+    objects.append({"name": "Sun", "type": "LIGHT", "location": [0, 0, 10], "rotation": [0, 0, 0], "scale": [1, 1, 1]})
+
+    plain, _ = read_glb(export_scene_to_gltf({"objects": objects}, str(tmp_path / "plain.glb")))
+    assert len(plain["meshes"]) == 1 and len(plain["nodes"]) == 41
+    # Blender's Z-up location (1, 2, 0.5) becomes (1, 0.5, -2) in glTF's Y-up axes.
+    assert plain["nodes"][1]["translation"] == [1.0, 0.5, -2.0] and plain["nodes"][1]["scale"] == [1.0, 2.0, 1.0]
+
+    gltf, buffer = read_glb(export_scene_to_gltf({"objects": objects}, str(tmp_path / "instanced.glb"), instancing=True))
+    assert INSTANCING_EXTENSION in gltf["extensionsUsed"]
+    assert [node["name"] for node in gltf["nodes"]] == ["Sun", "Tree_instances"]
+    attributes = gltf["nodes"][1]["extensions"][INSTANCING_EXTENSION]["attributes"]
+    translation = gltf["accessors"][attributes["TRANSLATION"]]
+    view = gltf["bufferViews"][translation["bufferView"]]
+    values = np.frombuffer(buffer, dtype="<f4", count=translation["count"] * 3, offset=view["byteOffset"]).reshape(-1, 3)
+    np.testing.assert_allclose(values[:, 0], np.arange(40))
+    assert gltf["accessors"][attributes["ROTATION"]]["type"] == "VEC4"
+
+
+def test_gltf_with_external_buffer_and_blender_export(tmp_path, monkeypatch):
+    scene = read_scene(os.path.join(REPO_ROOT, "archiv", "scene_1.scdf.xml"))
+    path = export_scene_to_gltf(scene, str(tmp_path / "scene_1.gltf"), placeholders=False)
+    gltf = json.loads(open(path).read())
+    assert "meshes" not in gltf and "buffers" not in gltf
+    assert gltf["nodes"][1]["extras"] == {"mesh": "CubeModel"}
+
+    monkeypatch.syspath_prepend(FAKE_BPY_DIR)
+    import scene_exporter
+
+    blend_file = tmp_path / "props.blend"
+    blend_file.write_text(json.dumps([{"name": "Rock", "type": "MESH", "location": [0, 0, 0], "rotation": [0, 0, 0], "scale": [1, 1, 1]}]))
+    output = scene_exporter.export_scene_to_glb(str(blend_file), str(tmp_path / "out"))
+    assert output.endswith("props.glb") and read_glb(output)[0]["meshes"][0]["name"] == "Rock"
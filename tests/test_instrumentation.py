@@ -0,0 +1,100 @@
+import argparse
+import io
+import json
+import pstats
+
+import pytest
+
+from utils import instrumentation
+from utils.file_utils import list_files_in_directory
+from utils.json_utils import read_json, write_json
+
+
+@pytest.fixture(autouse=True)
+def restore_instrumentation():
+    instrumentation.reset()
+    yield
+    instrumentation.disable()
+    instrumentation.reset()
+    instrumentation.set_log_format("text")
+    instrumentation.LOG_STREAM = None
+
+
+def test_disabled_spans_record_nothing():
+    assert instrumentation.span("scan", path="x") is instrumentation.span("other")
+    with instrumentation.span("scan"):
+        instrumentation.count("files.scanned", 3)
+    assert instrumentation.summary() == []
+    assert instrumentation.counters() == {}
+
+
+def test_records_spans_counters_and_codec_stats(tmp_path):
+    (tmp_path / "a.json").write_text("{}")
+    (tmp_path / "b.txt").write_text("")
+    instrumentation.enable()
+
+    assert len(list_files_in_directory(str(tmp_path), ".json")) == 1
+    write_json({"name": "crate"}, str(tmp_path / "c.json"))
+    assert read_json(str(tmp_path / "c.json")) == {"name": "crate"}
+    instrumentation.disable()
+
+    rows = {row["name"]: row for row in instrumentation.summary()}
+    assert rows["scan"]["calls"] == 1 and rows["scan"]["total"] >= rows["scan"]["max"] > 0
+    values = instrumentation.counters()
+    assert values["files.scanned"] == 1
+    assert values["log.json.written"] == 1
+    assert values["json.encode.calls"] == 1 and values["json.decode.calls"] == 1
+    assert "scan" in instrumentation.format_summary()
+
+
+def test_writes_chrome_trace(tmp_path):
+    instrumentation.enable(trace=True)
+
+    @instrumentation.traced("export.test")
+    def export(value):
+        return value * 2
+
+    assert export(21) == 42
+    with instrumentation.span("manifest.load", path="manifest.json"):
+        instrumentation.count("bytes.written", 10)
+    instrumentation.disable()
+    trace_path = tmp_path / "trace.json"
+    instrumentation.write_chrome_trace(str(trace_path))
+
+    events = json.loads(trace_path.read_text())["traceEvents"]
+    spans = {event["name"]: event for event in events if event["ph"] == "X"}
+    assert set(spans) == {"export.test", "manifest.load"}
+    assert spans["manifest.load"]["cat"] == "manifest" and spans["manifest.load"]["args"] == {"path": "manifest.json"}
+    assert any(event["ph"] == "C" and event["args"] == {"value": 10} for event in events)
+    assert any(event["ph"] == "M" and event["name"] == "thread_name" for event in events)
+
+
+def test_log_formats(capsys):
+    stream = io.StringIO()
+    instrumentation.LOG_STREAM = stream
+    instrumentation.set_log_format("json")
+    instrumentation.log("Saved crate", event="metadata.saved", path="crate.json")
+    record = json.loads(stream.getvalue())
+    assert record["event"] == "metadata.saved" and record["path"] == "crate.json" and record["level"] == "info"
+
+    instrumentation.set_log_format("quiet")
+    instrumentation.log("Saved crate", event="metadata.saved")
+    instrumentation.log("Could not save crate", event="metadata.error", level="error")
+    assert capsys.readouterr().out == "Could not save crate\n"
+    with pytest.raises(ValueError):
+        instrumentation.set_log_format("xml")
+
+
+def test_profiling_flags(tmp_path, capsys):
+    parser = instrumentation.add_profiling_arguments(argparse.ArgumentParser())
+    cprofile_path = tmp_path / "run.prof"
+    args = parser.parse_args(["--profile", "--cprofile", str(cprofile_path), "--log-format", "quiet"])
+
+    with instrumentation.profiling_from_arguments(args):
+        instrumentation.log("hidden", event="test.message")
+        instrumentation.count("items", 2)
+
+    assert not instrumentation.ENABLED
+    assert pstats.Stats(str(cprofile_path)).total_calls > 0
+    err = capsys.readouterr().err
+    assert "run" in err and "items" in err and "log.test.message" in err
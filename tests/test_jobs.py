@@ -0,0 +1,86 @@
+import csv
+import os
+import shutil
+import threading
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from jobs import CANCELLED, DONE, FAILED, SKIPPED, JobEngine, format_progress, plan_conversions
+from scdf import convert
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIV = os.path.join(REPO_ROOT, "archiv")
+
+
+def test_converts_folders_and_files_headless(tmp_path):
+    shutil.copytree(ARCHIV, tmp_path / "scenes" / "nested")
+    (tmp_path / "broken.scdf.json").write_text("{not json")
+    output = tmp_path / "out"
+
+    with JobEngine(max_workers=2, use_processes=False) as engine:
+        engine.submit_conversions([str(tmp_path / "scenes"), str(tmp_path / "broken.scdf.json"), str(tmp_path / "missing")],
+                                  str(output), "scene_to_scdf.yaml")
+        updates = []
+        engine.wait(callback=updates.append, interval=0.01)
+
+    statuses = {os.path.relpath(job.label, str(tmp_path)): job.status for job in engine.jobs}
+    assert statuses[os.path.join("scenes", "nested", "scene_1.scdf.json")] == DONE
+    assert statuses["broken.scdf.json"] == FAILED
+    assert statuses["missing"] == SKIPPED
+    # The other formats of scene_1 are the same scene and skipped.
+    assert sum(status == SKIPPED for status in statuses.values()) == 4
+    converted = output / "scenes" / "nested" / "scene_1.scdf.yaml"
+    assert convert.read_scene(str(converted)) == convert.read_scene(os.path.join(ARCHIV, "scene_1.scdf.json"))
+
+    progress = updates[-1]
+    assert progress["total"] == 6 and progress["finished"] == 1.0 and progress[DONE] == 1
+    assert format_progress(progress).startswith("6/6 jobs finished (1 failed, 4 skipped)")
+
+
+def test_single_file_output_and_json_to_csv(tmp_path):
+    source = tmp_path / "manifest.json"
+    source.write_text('{"assets": [{"name": "Tree", "version": "1.0"}, {"name": "Rock", "tags": ["stone"]}]}')
+    tasks, skipped = plan_conversions([str(source)], str(tmp_path / "assets.csv"), "json_to_csv")
+    assert [args for _, args, _ in tasks] == [(str(source), str(tmp_path / "assets.csv"))] and not skipped
+
+    with JobEngine(use_processes=False) as engine:
+        job, = engine.submit_conversions([str(source)], str(tmp_path / "assets.csv"), "json_to_csv")
+        engine.wait()
+    assert job.status == DONE and job.duration is not None
+    with open(tmp_path / "assets.csv", newline="") as f:
+        assert list(csv.reader(f)) == [["name", "version", "tags"], ["Tree", "1.0", ""], ["Rock", "", '["stone"]']]
+    with pytest.raises(ValueError):
+        plan_conversions([str(source)], str(tmp_path), "csv_to_json")
+
+
+def _blocking_task(event):
+    event.wait(5)
+    return "released"
+
+
+def test_cancel_withdraws_pending_jobs():
+    event = threading.Event()
+    engine = JobEngine(max_workers=1, use_processes=False)
+    running = engine.submit(_blocking_task, event, label="first")
+    while not running.future.running():
+        pass
+    pending = [engine.submit(_blocking_task, event, label=f"job{index}") for index in range(3)]
+    assert engine.cancel() == 3
+    assert all(job.status == CANCELLED for job in pending)
+    event.set()
+    engine.wait()
+    engine.shutdown()
+    assert running.status == DONE and running.result == "released"
+    assert engine.progress()[CANCELLED] == 3
+
+
+def test_process_workers(tmp_path):
+    with JobEngine(max_workers=2) as engine:
+        engine.submit_conversions([os.path.join(ARCHIV, "scene_1.scdf.json"), os.path.join(ARCHIV, "scene_1.scoe.xml")],
+                                  str(tmp_path), "scene_to_scdf.xml")
+        engine.wait()
+    assert [job.status for job in engine.jobs] == [DONE, SKIPPED]
+    assert engine.jobs[0].result == str(tmp_path / "scene_1.scdf.xml")
+    assert "same output file" in engine.jobs[1].error
@@ -0,0 +1,65 @@
+import json
+import mmap
+
+import pytest
+
+from utils import json_codec
+from utils.json_utils import read_json, write_json_atomic
+
+DATA = {"name": "Tree", "position": [1.5, -2, 0], "tags": ["bäume", None, True], "nested": {"a": {"b": []}}}
+
+
+@pytest.fixture(params=json_codec.available_backends())
+def backend(request):
+    previous = json_codec.BACKEND
+    yield json_codec.set_backend(request.param)
+    json_codec.set_backend(previous)
+
+
+def test_backends_round_trip(backend, tmp_path):
+    compact = json_codec.encode(DATA)
+    assert b" " not in compact.replace(b"b\xc3\xa4ume", b"")
+    assert json_codec.decode(compact) == DATA
+    assert json_codec.loads(json_codec.dumps(DATA)) == DATA
+    # Pretty output is identical whichever backend is active.
+    assert json_codec.encode(DATA, pretty=True) == json.dumps(DATA, indent=4, ensure_ascii=False).encode()
+
+    path = tmp_path / "data.json"
+    path.write_bytes(compact)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert json_codec.decode(mapped) == DATA
+    assert json_codec.decode(memoryview(compact)) == DATA
+
+    write_json_atomic(DATA, str(path), indent=None)
+    assert read_json(str(path)) == DATA
+    path.write_text("{broken")
+    assert read_json(str(path)) is None
+    with pytest.raises(json_codec.JSONDecodeError):
+        json_codec.load(str(path))
+
+
+def test_stats_and_backend_selection():
+    json_codec.reset_stats()
+    json_codec.decode(json_codec.encode(DATA))
+    assert json_codec.stats["encode"][0] == json_codec.stats["decode"][0] == 1
+    assert json_codec.stats["encode"][1] > 0
+    with pytest.raises(ValueError):
+        json_codec.set_backend("simdjson-not-installed")
+
+
+def test_new_files_follow_the_current_umask_without_setting_it(tmp_path, monkeypatch):
+    umask = json_codec._process_umask()
+    if umask is None:
+        pytest.skip("umask is only readable from /proc")
+    monkeypatch.setattr(json_codec.os, "umask", lambda mask: pytest.fail("umask changed"))
+    json_codec.dump(DATA, str(tmp_path / "new.json"))
+    write_json_atomic(DATA, str(tmp_path / "atomic.json"))
+    assert (tmp_path / "new.json").stat().st_mode & 0o777 == 0o666 & ~umask
+    assert (tmp_path / "atomic.json").stat().st_mode & 0o777 == 0o666 & ~umask
+
+    monkeypatch.setattr(json_codec, "_process_umask", lambda: None)
+    json_codec.dump(DATA, str(tmp_path / "private.json"))
+    assert (tmp_path / "private.json").stat().st_mode & 0o777 == 0o600
+    (tmp_path / "private.json").chmod(0o640)
+    json_codec.dump(DATA, str(tmp_path / "private.json"))
+    assert (tmp_path / "private.json").stat().st_mode & 0o777 == 0o640
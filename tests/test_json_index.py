@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from utils.json_index import JsonIndex
+from utils.json_utils import iter_json_key, search_key_in_json
+
+SCENE = {
+    "nodes": [
+        {"name": "Tree", "material": "Bark", "children": [{"name": "Leaf", "material": "Leafy"}]},
+        {"name": "Rock", "material": "Stone"},
+        {"name": "Lamp", "light": "Sun"},
+    ],
+    "materials": [{"name": "Bark", "texture": "bark.png"}, {"name": "a/b", "texture": None}],
+    "material": "Default",
+}
+
+
+def test_queries():
+    index = JsonIndex(json.loads(json.dumps(SCENE)))
+    assert index.query("nodes/*/material") == [("/nodes/0/material", "Bark"), ("/nodes/1/material", "Stone")]
+    assert [value for _, value in index.query("**/material")] == ["Bark", "Leafy", "Stone", "Default"]
+    assert index.query("**/children/*/name") == [("/nodes/0/children/0/name", "Leaf")]
+    assert index.query("materials/1/name") == [("/materials/1/name", "a/b")]
+    assert index.query("nodes/7/name") == []
+    assert index.get("/materials/0/texture") == "bark.png"
+    assert [value for _, value in index.find("texture")] == ["bark.png", None]
+
+
+def test_incremental_updates_match_a_rebuild():
+    index = JsonIndex(json.loads(json.dumps(SCENE)))
+    index.set("/nodes/0/children", [{"name": "Branch", "material": "Bark"}])
+    index.set("/nodes/3", {"name": "Bush", "material": "Leafy"})
+    index.delete("/nodes/1")
+    index.delete("/material")
+    index.data["nodes"][0]["material"] = "Oak"
+    index.refresh("/nodes/0")
+
+    rebuilt = JsonIndex(json.loads(json.dumps(index.data)))
+    assert index.values == rebuilt.values
+    assert {key: sorted(pointers) for key, pointers in index.keys.items()} == {key: sorted(pointers) for key, pointers in rebuilt.keys.items()}
+    assert [value for _, value in index.query("nodes/*/material")] == ["Oak", "Leafy"]
+    with pytest.raises(KeyError):
+        index.set("/missing/name", 1)
+
+
+def test_deep_documents_and_streaming_search(tmp_path):
+    deep = leaf = {}
+    for _ in range(5000):
+        leaf["child"] = {}
+        leaf = leaf["child"]
+    leaf["material"] = "Deep"
+    assert search_key_in_json(deep, "material") == ["Deep"]
+    assert JsonIndex(deep).find("material")[0][1] == "Deep"
+
+    path = tmp_path / "scene.json"
+    path.write_text(json.dumps(SCENE))
+    for chunk_size in (1, 5, 1 << 16):
+        assert list(iter_json_key(str(path), "material", chunk_size=chunk_size)) == [
+            ("/nodes/0/material", "Bark"), ("/nodes/0/children/0/material", "Leafy"), ("/nodes/1/material", "Stone"), ("/material", "Default")]
+    assert [value for _, value in iter_json_key(str(path), "nodes")] == [SCENE["nodes"]]
+
+    # Numbers cut by a chunk boundary after the '.' or 'e' are read whole.
+    path.write_text(json.dumps({"nodes": [{"x": 1.5, "y": {"x": 123.456}}, {"x": 2.5e-08}]}))
+    for chunk_size in range(1, len(path.read_text()) + 2):
+        assert list(iter_json_key(str(path), "x", chunk_size=chunk_size)) == [
+            ("/nodes/0/x", 1.5), ("/nodes/0/y/x", 123.456), ("/nodes/1/x", 2.5e-08)]
+    assert search_key_in_json(SCENE, "name") == ["Tree", "Leaf", "Rock", "Lamp", "Bark", "a/b"]
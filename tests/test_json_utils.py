@@ -0,0 +1,87 @@
+import json
+
+import pytest
+
+from utils import json_utils
+from utils.json_utils import JsonStreamWriter, iter_json_array, iter_json_lines, iter_scene_objects, write_json_stream
+
+
+def _objects(count):
+    for index in range(count):
+        yield {"name": f"Node{index}", "type": "MESH", "location": [index, 0.5, -index], "tags": ["a", "ü"]}
+
+
+def test_stream_round_trip_with_small_chunks(tmp_path):
+    path = str(tmp_path / "scene.json")
+    count = write_json_stream(_objects(500), path, header={"name": "scene_1", "meta": {"objects": [1, 2]}})
+    assert count == 500
+
+    document = json.loads(open(path, encoding="utf-8").read())
+    assert document["name"] == "scene_1" and len(document["objects"]) == 500
+    for chunk_size in (1, 7, 1 << 16):
+        assert list(iter_json_array(path, chunk_size=chunk_size)) == list(_objects(500))
+
+
+def test_stream_reader_edge_cases(tmp_path):
+    path = tmp_path / "scene.json"
+    with JsonStreamWriter(str(path)) as writer:
+        pass
+    assert json.loads(path.read_text()) == {"objects": []}
+    assert list(iter_json_array(str(path))) == []
+
+    path.write_text('[1, 22.5, 333, "x", null]')
+    assert list(iter_json_array(str(path), key=None, chunk_size=2)) == [1, 22.5, 333, "x", None]
+
+    path.write_text('{"other": [1, 2]}')
+    with pytest.raises(KeyError):
+        list(iter_json_array(str(path)))
+
+    path.write_text('{"objects": [1, 2')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(str(path)))
+
+
+def test_numbers_split_across_chunks(tmp_path):
+    path = tmp_path / "numbers.json"
+    values = [1.5, 2.25, 1e-10, 12345.678, -0.5, 7, 3E+2, True]
+    path.write_text(json.dumps(values).replace("1e-10", "1E-10").replace("300.0", "3E+2"))
+    for chunk_size in range(1, len(path.read_text()) + 2):
+        assert list(iter_json_array(str(path), key=None, chunk_size=chunk_size)) == values
+
+
+def test_large_values_are_not_decoded_once_per_chunk(tmp_path, monkeypatch):
+    path = tmp_path / "scene.json"
+    objects = [{"name": "Big", "data": "x" * 100000}, {"name": "Small"}]
+    path.write_text(json.dumps({"objects": objects}))
+    fills = []
+    original_fill = json_utils._ChunkReader.fill
+    monkeypatch.setattr(json_utils._ChunkReader, "fill", lambda self, *args: fills.append(args) or original_fill(self, *args))
+
+    assert list(iter_json_array(str(path), chunk_size=16)) == objects
+    assert len(fills) < 40
+
+
+def test_fields_before_the_array_are_skipped_without_decoding_them(tmp_path, monkeypatch):
+    path = tmp_path / "scene.json"
+    metadata = {"nodes": [{"name": "a]}b", "children": [[1.5, {"x": None}]]}] * 50, "empty": {}, "list": []}
+    path.write_text(json.dumps({"metadata": metadata, "count": 2, "objects": [{"name": "Cube"}, {"name": "Lamp"}]}))
+    decoded = []
+    original_decode = json_utils._ChunkReader.decode
+    monkeypatch.setattr(json_utils._ChunkReader, "decode", lambda self, decoder: decoded.append(original_decode(self, decoder)) or decoded[-1])
+
+    for chunk_size in (1, 7, 1 << 16):
+        assert list(iter_json_array(str(path), chunk_size=chunk_size)) == [{"name": "Cube"}, {"name": "Lamp"}]
+    assert not any(isinstance(value, dict) and value not in ({"name": "Cube"}, {"name": "Lamp"}) for value in decoded)
+    assert not any(isinstance(value, list) for value in decoded)
+
+    path.write_text('{"metadata": {"nodes": [1}, "objects": []}')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(str(path)))
+
+
+def test_json_lines(tmp_path):
+    path = str(tmp_path / "scene.jsonl")
+    write_json_stream(_objects(3), path, json_lines=True)
+    assert len(open(path).read().splitlines()) == 3
+    assert list(iter_json_lines(path)) == list(_objects(3))
+    assert list(iter_scene_objects(path)) == list(_objects(3))
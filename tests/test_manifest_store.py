@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import asset_manager
+from manifest_store import SqliteManifestStore, export_sqlite_to_json, migrate_json_to_sqlite
+
+MANIFEST = {
+    "version": 2,
+    "assets": [
+        {"name": "CubeModel", "type": "3d_model", "path": "props/cube.blend", "version": "1.0.0",
+         "author": "chevp", "dependencies": ["BasicMaterial", "CubeTexture"], "extra": {"lod": [0, 1]}},
+        {"name": "BasicMaterial", "type": "material", "path": "materials/basic.json", "version": "1.0.0",
+         "author": "chevp", "dependencies": [{"name": "CubeTexture"}]},
+        {"name": "CubeTexture", "type": "texture", "path": "textures/cube.png", "author": "someone"},
+    ],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    json_path = tmp_path / "asset_manifest.json"
+    json_path.write_text(json.dumps(MANIFEST))
+    db_path = str(tmp_path / "asset_manifest.db")
+    assert migrate_json_to_sqlite(str(json_path), db_path) == 3
+    store = SqliteManifestStore(db_path)
+    yield store
+    store.close()
+
+
+def test_round_trip_is_lossless(store, tmp_path):
+    out_path = tmp_path / "exported.json"
+    export_sqlite_to_json(store.db_path, str(out_path))
+    exported = json.loads(out_path.read_text())
+    assert exported == MANIFEST
+    assert list(exported) == list(MANIFEST)
+
+
+def test_filtered_queries_and_dependencies(store):
+    assert [a["name"] for a in store.query(author="chevp", type="material")] == ["BasicMaterial"]
+    assert store.get("CubeTexture")["path"] == "textures/cube.png"
+    assert store.dependencies_of("CubeModel") == ["BasicMaterial", "CubeTexture"]
+    assert store.dependents_of("CubeTexture") == ["CubeModel", "BasicMaterial"]
+    with pytest.raises(ValueError):
+        store.query(extra="x")
+
+
+def test_changes_keep_indexes_in_sync(store):
+    summary = store.apply_changes([
+        ("update", "CubeModel", {"dependencies": ["CubeTexture"]}),
+        ("remove", "BasicMaterial"),
+        ("add", {"name": "TreeModel", "type": "3d_model", "path": "props/tree.blend", "dependencies": ["LeafTexture"]}),
+    ])
+    assert summary == {"added": ["TreeModel"], "updated": ["CubeModel"], "removed": ["BasicMaterial"], "missing": []}
+    assert store.names() == ["CubeModel", "CubeTexture", "TreeModel"]
+    assert store.dependents_of("CubeTexture") == ["CubeModel"]
+    assert store.dependents_of("LeafTexture") == ["TreeModel"]
+
+
+def test_asset_manager_uses_configured_backend(store):
+    asset_manager.set_manifest_backend(store)
+    try:
+        assert asset_manager.list_all_assets() == ["CubeModel", "BasicMaterial", "CubeTexture"]
+        asset_manager.update_asset_in_manifest("CubeTexture", {"version": "2.0.0"})
+        assert asset_manager.find_asset_by_name("CubeTexture")["version"] == "2.0.0"
+        assert asset_manager.load_asset_manifest()["version"] == 2
+    finally:
+        asset_manager.set_manifest_backend(None)
@@ -0,0 +1,38 @@
+import json
+import os
+
+from metadata_generator import generate_metadata_incremental
+
+
+def _touch(path, content=b"data"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(content)
+
+
+def test_incremental_run_only_touches_changed_directories(tmp_path):
+    library = tmp_path / "assets"
+    _touch(library / "props" / "tree" / "tree_1.blend")
+    _touch(library / "props" / "tree" / "bark.png")
+    _touch(library / "textures" / "stone" / "stone.jpg")
+
+    first = generate_metadata_incremental(str(library), "chevp", "3d_model")
+    assert len(first["added"]) == 3
+    assert len(first["written"]) == 2
+    tree_metadata = json.loads((library / "props" / "tree" / "metadata.json").read_text())
+    assert tree_metadata["name"] == "bark"
+    assert "last_updated" not in tree_metadata
+
+    second = generate_metadata_incremental(str(library), "chevp", "3d_model")
+    assert second == {"added": [], "changed": [], "removed": [], "written": []}
+
+    stone = library / "textures" / "stone" / "stone.jpg"
+    stat = os.stat(stone)
+    os.utime(stone, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert generate_metadata_incremental(str(library), "chevp", "texture")["written"] == []
+
+    _touch(stone, b"new pixels")
+    os.remove(library / "props" / "tree" / "bark.png")
+    third = generate_metadata_incremental(str(library), "chevp", "texture")
+    assert len(third["changed"]) == 1 and len(third["removed"]) == 1
+    assert sorted(os.path.basename(os.path.dirname(path)) for path in third["written"]) == ["stone", "tree"]
+    assert "last_updated" in json.loads((library / "props" / "tree" / "metadata.json").read_text())
@@ -0,0 +1,72 @@
+import json
+import os
+
+import pytest
+
+from metadata_generator import update_metadata_file
+from object_store import ObjectStore
+from utils.file_utils import copy_file
+
+
+@pytest.fixture
+def library(tmp_path):
+    for version in ("version_1", "version_2", "version_3"):
+        (tmp_path / "assets" / "tree" / version).mkdir(parents=True)
+        (tmp_path / "assets" / "tree" / version / "bark.png").write_bytes(b"bark pixels" * 100)
+    (tmp_path / "assets" / "tree" / "version_3" / "tree.blend").write_bytes(b"new model")
+    return tmp_path / "assets"
+
+
+@pytest.mark.parametrize("link_mode", ["hardlink", "copy"])
+def test_dedupe_gc_and_report(library, tmp_path, link_mode):
+    store = ObjectStore(str(tmp_path / "store"), link_mode=link_mode)
+    summary = store.dedupe_tree(str(library))
+    assert summary == {"files": 4, "linked": 4, "bytes_copied": 1100 + 9}
+    assert store.dedupe_tree(str(library))["linked"] == 0
+
+    report = store.report()
+    assert (report["objects"], report["refs"], report["stored_bytes"], report["saved_bytes"]) == (2, 4, 1109, 2200)
+    bark = library / "tree" / "version_1" / "bark.png"
+    assert bark.read_bytes() == b"bark pixels" * 100
+    if link_mode == "hardlink":
+        assert os.stat(bark).st_nlink == 4
+
+    os.remove(library / "tree" / "version_3" / "tree.blend")
+    assert store.gc(dry_run=True)["freed_bytes"] == 9
+    summary = store.gc()
+    assert (summary["stale_refs"], len(summary["removed"])) == (1, 1)
+    store.save()
+    assert ObjectStore(str(tmp_path / "store")).report()["objects"] == 1
+
+
+def test_copy_skips_stored_content(library, tmp_path):
+    store = ObjectStore(str(tmp_path / "store"))
+    source = library / "tree" / "version_1" / "bark.png"
+    copy_file(str(source), str(tmp_path / "out" / "a.png"), store=store)
+    copy_file(str(source), str(tmp_path / "out" / "b.png"), store=store)
+    assert store.bytes_copied == 1100 and store.bytes_skipped == 1100
+    assert (tmp_path / "out" / "b.png").read_bytes() == source.read_bytes()
+
+    copy_file(str(source), str(tmp_path / "plain" / "c.png"))
+    assert (tmp_path / "plain" / "c.png").read_bytes() == source.read_bytes()
+
+
+def test_editing_a_deduplicated_file_leaves_other_versions_alone(library, tmp_path):
+    for version in ("version_1", "version_2"):
+        (library / "tree" / version / "metadata.json").write_text('{"name": "tree"}')
+    store = ObjectStore(str(tmp_path / "store"), link_mode="hardlink")
+    # JSON files are left out by default.
+    assert store.dedupe_tree(str(library))["files"] == 4
+    assert os.stat(library / "tree" / "version_1" / "metadata.json").st_nlink == 1
+
+    store.dedupe_tree(str(library), include=["metadata.json"])
+    first = library / "tree" / "version_1" / "metadata.json"
+    digest = store.refs[str(first)]
+    assert os.stat(first).st_nlink == 3
+    update_metadata_file(str(first), {"version": "2.0.0"})
+
+    assert json.loads(first.read_text()) == {"name": "tree", "version": "2.0.0"}
+    assert (library / "tree" / "version_2" / "metadata.json").read_text() == '{"name": "tree"}'
+    with open(store.object_path(digest)) as f:
+        assert f.read() == '{"name": "tree"}'
+    assert store.gc()["stale_refs"] == 1
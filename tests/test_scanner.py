@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from utils.file_utils import list_files_in_directory
+from utils.scanner import Snapshot, rescan, scan_directory
+
+
+@pytest.fixture
+def tree(tmp_path):
+    for relative in ("a/scene.blend", "a/b/tex.png", "a/b/c/deep.blend", "cache/old.blend", "notes.txt"):
+        path = tmp_path / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(relative.encode())
+    return tmp_path
+
+
+@pytest.mark.parametrize("max_workers", [1, 4])
+def test_scan_with_globs(tree, max_workers):
+    snapshot = scan_directory(str(tree), include=["*.blend"], exclude=["cache"], max_workers=max_workers)
+    assert snapshot.paths() == [str(tree / "a" / "b" / "c" / "deep.blend"), str(tree / "a" / "scene.blend")]
+    entry = snapshot.entries["a/scene.blend"]
+    assert (entry.size, entry.inode) == (len(b"a/scene.blend"), os.stat(tree / "a" / "scene.blend").st_ino)
+
+    everything = scan_directory(str(tree), exclude=["a/b/*"], max_workers=max_workers)
+    assert sorted(everything.entries) == ["a/scene.blend", "cache/old.blend", "notes.txt"]
+    assert everything.paths(include=["*.txt"]) == [str(tree / "notes.txt")]
+    assert list_files_in_directory(str(tree), ".png") == [str(tree / "a" / "b" / "tex.png")]
+
+
+def test_snapshot_persistence_and_diff(tree, tmp_path):
+    snapshot_path = str(tmp_path / "snapshot.json")
+    snapshot, changes = rescan(str(tree), snapshot_path, exclude=["snapshot.json"])
+    assert len(changes["added"]) == 5 and changes["removed"] == changes["changed"] == []
+    assert Snapshot.load(snapshot_path).entries == snapshot.entries
+
+    (tree / "a" / "scene.blend").write_bytes(b"changed contents")
+    os.remove(tree / "notes.txt")
+    (tree / "a" / "new.png").write_bytes(b"")
+    _, changes = rescan(str(tree), snapshot_path, exclude=["snapshot.json"])
+    assert changes == {
+        "added": [str(tree / "a" / "new.png")],
+        "removed": [str(tree / "notes.txt")],
+        "changed": [str(tree / "a" / "scene.blend")],
+    }
@@ -0,0 +1,72 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from scdf import SceneGraph, load_scene_graph, read_scdf
+from scdf.scene_graph import compose_matrices
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCDF_JSON = os.path.join(REPO_ROOT, "archiv", "scene_1.scdf.json")
+SCDF_YAML = os.path.join(REPO_ROOT, "assets", "scenes", "scene_name", "version_1", "scene_1.scdf.yaml")
+
+
+def _random_tree(count, seed=0):
+    rng = np.random.default_rng(seed)
+    parent = np.array([-1] + [int(rng.integers(0, i)) for i in range(1, count)])
+    return SceneGraph(
+        [f"Node{i}" for i in range(count)],
+        parent,
+        rng.uniform(-10, 10, (count, 3)),
+        rng.uniform(-180, 180, (count, 3)),
+        rng.uniform(0.5, 2, (count, 3)),
+    )
+
+
+def test_loads_repository_scenes():
+    graph = load_scene_graph(SCDF_JSON)
+    assert graph.root == "RootNode"
+    assert graph.children("RootNode") == ["CubeNode", "TreeNode", "LightNode"]
+    np.testing.assert_allclose(graph.world_matrix("TreeNode")[:3, 3], [-2, 0, 3])
+    np.testing.assert_allclose(graph.world_matrix("TreeNode")[1, 1], 1.5)
+
+    yaml_graph = load_scene_graph(SCDF_YAML)
+    assert yaml_graph.names == ["RootNode", "CubeNode", "Mesh", "TreeNode", "LightNode"]
+    assert read_scdf(SCDF_YAML)["metadata"]["version"] == "1.0"
+
+
+def test_world_matrices_match_recursive_composition():
+    graph = _random_tree(300)
+    local = graph.local_matrices()
+
+    def world(i):
+        return local[i] if graph.parent[i] < 0 else world(graph.parent[i]) @ local[i]
+
+    expected = np.stack([world(i) for i in range(len(graph))])
+    np.testing.assert_allclose(graph.world_matrices(), expected, atol=1e-9)
+
+
+def test_edits_invalidate_cached_world_matrices():
+    graph = SceneGraph.from_scdf({"nodes": [
+        {"name": "Root", "children": ["Child"], "position": [1, 0, 0], "rotation": [0, 0, 90]},
+        {"name": "Child", "position": [1, 0, 0]},
+    ]})
+    first = graph.world_matrices()
+    assert graph.world_matrices() is first
+    np.testing.assert_allclose(graph.world_positions()[1], [1, 1, 0], atol=1e-12)
+
+    graph.set_transform("Root", rotation=[0, 0, 0], scale=[2, 2, 2])
+    assert graph.world_matrices() is not first
+    np.testing.assert_allclose(graph.world_positions()[1], [3, 0, 0])
+    assert graph.version == 1
+
+
+def test_rejects_invalid_hierarchies():
+    with pytest.raises(ValueError, match="unknown child"):
+        SceneGraph.from_scdf({"nodes": [{"name": "A", "children": ["B"]}]})
+    with pytest.raises(ValueError, match="more than one parent"):
+        SceneGraph.from_scdf({"nodes": [{"name": "A", "children": ["C"]}, {"name": "B", "children": ["C"]}, {"name": "C"}]})
+    with pytest.raises(ValueError, match="cycle"):
+        SceneGraph.from_scdf({"nodes": [{"name": "R"}, {"name": "A", "children": ["B"]}, {"name": "B", "children": ["A"]}]})
+    assert compose_matrices(np.zeros((0, 3)), np.zeros((0, 3)), np.ones((0, 3))).shape == (0, 4, 4)
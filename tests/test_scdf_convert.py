@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from scdf import convert
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARCHIV = os.path.join(REPO_ROOT, "archiv")
+
+
+def test_archived_formats_parse_to_the_same_scene():
+    scene = convert.read_scene(os.path.join(ARCHIV, "scene_1.scdf.json"))
+    assert convert.read_scene(os.path.join(ARCHIV, "scene_1.scdf.xml")) == scene
+
+    scoe = convert.read_scene(os.path.join(ARCHIV, "scene_1.scoe.xml"))
+    assert scoe["nodes"] == scene["nodes"] and scoe["lights"] == scene["lights"]
+    assert scoe["cameras"][0]["nearPlane"] == 0.1 and scoe["cameras"][0]["rotation"] == [0, -30, 0]
+
+
+def test_component_scene_names_are_unique_and_match_their_comp():
+    components = convert.read_scene(os.path.join(ARCHIV, "scene_1.scene.yml"))
+
+    assert [node["name"] for node in components["nodes"]] == ["pointLight", "Mesh", "Mesh.001"]
+    assert [light["name"] for light in components["lights"]] == ["pointLight"]
+    assert components["nodes"][0]["light"] == "pointLight"
+    assert components["scene"]["activeCamera"] == components["cameras"][0]["name"] == "PerspectiveCamera"
+
+
+@pytest.mark.parametrize("format", list(convert.WRITERS))
+def test_round_trip_through_every_format(tmp_path, format):
+    scene = convert.read_scene(os.path.join(ARCHIV, "scene_1.scdf.json"))
+    output = convert.convert_file(os.path.join(ARCHIV, "scene_1.scdf.json"), str(tmp_path / ("scene_1" + convert.FORMAT_SUFFIXES[format][0])))
+    round_tripped = convert.read_scene(output)
+    if format == "scene.yml":
+        assert [light["name"] for light in round_tripped["lights"]] == ["SceneLight"]
+        assert {node["name"] for node in round_tripped["nodes"]} >= {"CubeNode", "TreeNode"}
+    else:
+        assert round_tripped == scene
+
+    components = convert.read_scene(os.path.join(ARCHIV, "scene_1.scene.yml"))
+    output = convert.convert_file(os.path.join(ARCHIV, "scene_1.scene.yml"), str(tmp_path / ("comps" + convert.FORMAT_SUFFIXES[format][0])))
+    round_tripped = convert.read_scene(output)
+    assert round_tripped["nodes"] == components["nodes"] and round_tripped["lights"] == components["lights"]
+
+
+def test_convert_directory_parses_each_source_once(tmp_path, monkeypatch):
+    source_dir = tmp_path / "src" / "nested"
+    source_dir.mkdir(parents=True)
+    for name, target in (("scene_1.scdf.json", "scene_1.scdf.json"), ("scene_1.scdf.xml", "scene_1.scdf.xml"), ("scene_1.scene.yml", "scene_2.scene.yml")):
+        (source_dir / target).write_bytes(open(os.path.join(ARCHIV, name), "rb").read())
+    (source_dir / "notes.txt").write_text("not a scene")
+
+    parsed = []
+    reader = convert.READERS["scdf.json"]
+    monkeypatch.setitem(convert.READERS, "scdf.json", lambda path: parsed.append(path) or reader(path))
+    monkeypatch.setattr(convert, "_ir_cache", convert.OrderedDict())
+    results = convert.convert_directory(str(tmp_path / "src"), str(tmp_path / "out"), ["scdf.xml", "scoe.xml", "scdf.yaml"], max_workers=1)
+
+    assert len(parsed) == 1
+    assert sorted(os.listdir(tmp_path / "out" / "nested")) == sorted(
+        f"scene_{index}.{format}" for index in (1, 2) for format in ("scdf.xml", "scdf.yaml", "scoe.xml"))
+    assert results[str(source_dir / "scene_1.scdf.xml")].startswith("Skipped")
+    assert len(results[str(source_dir / "scene_2.scene.yml")]) == 3
+    (source_dir / "scene_3.scdf.json").write_text("{not json")
+    summary = convert.summarize_results(convert.convert_directory(str(tmp_path / "src"), str(tmp_path / "out"), ["scdf.yaml"], max_workers=1))
+    assert len(summary["converted"]) == 2 and len(summary["skipped"]) == 1
+    assert list(summary["failed"]) == [str(source_dir / "scene_3.scdf.json")]
+    (source_dir / "scene_3.scdf.json").unlink()
+
+    parallel = convert.convert_directory(str(tmp_path / "src"), str(tmp_path / "parallel"), ["scdf.json"], max_workers=2)
+    assert len(parallel[str(source_dir / "scene_1.scdf.json")]) == 1 and len(parallel[str(source_dir / "scene_2.scene.yml")]) == 1
@@ -0,0 +1,81 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+FAKE_BPY_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_bpy")
+
+OBJECTS = [
+    {"name": "Cube", "type": "MESH", "location": [1.0, 0.0, 0.0], "rotation": [0.0, 0.785, 0.0], "scale": [1.0, 1.0, 1.0]},
+    {"name": "Tree", "type": "MESH", "location": [-2.0, 0.0, 3.0], "rotation": [0.0, 0.26, 0.0], "scale": [1.5, 1.5, 1.5]},
+    {"name": "Lämpchen", "type": "LIGHT", "location": [5.0, 10.0, 5.0], "rotation": [0.0, 0.0, 0.0], "scale": [1.0, 1.0, 1.0]},
+]
+
+
+@pytest.fixture
+def scene_exporter(monkeypatch):
+    monkeypatch.syspath_prepend(FAKE_BPY_DIR)
+    import scene_exporter
+    return scene_exporter
+
+
+@pytest.fixture
+def blend_file(tmp_path):
+    path = tmp_path / "scene_1.blend"
+    path.write_text(json.dumps(OBJECTS))
+    return str(path)
+
+
+def test_binary_export_matches_json_export(tmp_path, scene_exporter, blend_file):
+    from utils.scene_binary import read_binary_scene
+
+    json_path = scene_exporter.export_scene_to_json(blend_file, str(tmp_path / "out"))
+    binary_path = scene_exporter.export_scene_to_binary(blend_file, str(tmp_path / "out"))
+    assert binary_path.endswith("scene_1.bin")
+
+    with read_binary_scene(binary_path) as scene:
+        assert len(scene) == 3
+        assert scene.names == ["Cube", "Tree", "Lämpchen"]
+        assert scene.strings.count("MESH") == 1
+        assert scene.location.dtype == np.float32 and scene.location.shape == (3, 3)
+        assert not scene.location.flags.owndata
+        np.testing.assert_allclose(scene.scale[1], [1.5, 1.5, 1.5])
+        exported = json.loads(open(json_path).read())["objects"]
+        for expected, actual in zip(exported, scene.objects()):
+            assert actual["name"] == expected["name"] and actual["type"] == expected["type"]
+            np.testing.assert_allclose(actual["rotation"], expected["rotation"], rtol=1e-6)
+
+
+def test_binary_column_views_outlive_scene(tmp_path, scene_exporter, blend_file):
+    from utils.scene_binary import read_binary_scene
+
+    binary_path = scene_exporter.export_scene_to_binary(blend_file, str(tmp_path / "out"))
+    with read_binary_scene(binary_path) as scene:
+        xs = scene.location[:, 0]
+    assert scene.location is None
+    np.testing.assert_allclose(xs, [1.0, -2.0, 5.0])
+
+
+def test_binary_reader_rejects_other_files(tmp_path):
+    from utils.scene_binary import read_binary_scene, write_binary_scene
+
+    path = tmp_path / "empty.bin"
+    write_binary_scene([], str(path))
+    scene = read_binary_scene(str(path), use_mmap=False)
+    assert len(scene) == 0 and scene.location.shape == (0, 3)
+
+    path.write_bytes(b"{}" + b"\0" * 100)
+    with pytest.raises(ValueError):
+        read_binary_scene(str(path))
+
+
+def test_streamed_exports_match_regular_export(tmp_path, scene_exporter, blend_file):
+    from utils.json_utils import iter_scene_objects
+
+    regular = json.loads(open(scene_exporter.export_scene_to_json(blend_file, str(tmp_path / "a"))).read())
+    streamed_path = scene_exporter.export_scene_to_json(blend_file, str(tmp_path / "b"), stream=True)
+    assert json.loads(open(streamed_path, encoding="utf-8").read()) == regular
+    jsonl_path = scene_exporter.export_scene_to_jsonl(blend_file, str(tmp_path / "c"))
+    assert list(iter_scene_objects(jsonl_path)) == regular["objects"]
@@ -0,0 +1,76 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+from utils.schema_validator import DEFAULT_SCHEMA_MAP, compile_schema, load_schema, validate_tree
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCDF_JSON_SCHEMA = DEFAULT_SCHEMA_MAP["*.scdf.json"]
+
+
+def test_reports_all_errors_with_pointers():
+    with open(os.path.join(REPO_ROOT, "archiv", "scene_1.scdf.json")) as f:
+        scene = json.load(f)
+    schema = load_schema(SCDF_JSON_SCHEMA)
+    assert schema.validate(scene) == []
+    assert load_schema(SCDF_JSON_SCHEMA) is schema
+
+    scene["nodes"][0]["position"] = [0, 0]
+    scene["nodes"][1]["mesh"] = 5
+    scene["unexpected"] = True
+    pointers = {error["pointer"] for error in schema.validate(scene)}
+    assert pointers == {"/nodes/0/position", "/nodes/1/mesh", "/unexpected"}
+
+
+def test_keywords_and_refs():
+    schema = compile_schema({
+        "definitions": {"tree": {"type": "object", "properties": {"children": {"type": "array", "items": {"$ref": "#/definitions/tree"}}}, "required": ["name"]}},
+        "$ref": "#/definitions/tree",
+    })
+    assert schema.is_valid({"name": "a", "children": [{"name": "b", "children": []}]})
+    assert schema.validate({"name": "a", "children": [{"children": [{}]}]}) == [
+        {"pointer": "/children/0", "message": "Missing required property 'name'."},
+        {"pointer": "/children/0/children/0", "message": "Missing required property 'name'."},
+    ]
+
+    numbers = compile_schema({"type": "array", "items": {"type": "integer", "minimum": 0}, "uniqueItems": True})
+    assert numbers.is_valid([0, 1, 2.0])
+    assert not numbers.is_valid([True]) and not numbers.is_valid([-1]) and not numbers.is_valid([1, 1])
+    assert not compile_schema({"enum": [1]}).is_valid(True)
+
+    tenths = compile_schema({"multipleOf": 0.1})
+    assert tenths.is_valid(0.3) and tenths.is_valid(7) and tenths.is_valid(-1.2)
+    assert not tenths.is_valid(0.35)
+    assert compile_schema({"multipleOf": 0.1}) is tenths
+
+
+def test_validate_tree_in_parallel(tmp_path):
+    with open(os.path.join(REPO_ROOT, "archiv", "scene_1.scdf.json")) as f:
+        scene = json.load(f)
+    for index in range(6):
+        folder = tmp_path / f"scene_{index}"
+        folder.mkdir()
+        document = dict(scene, nodes="none") if index == 3 else scene
+        (folder / f"scene_{index}.scdf.json").write_text(json.dumps(document))
+        (folder / "metadata.json").write_text("{}")
+    shutil.copy(os.path.join(REPO_ROOT, "assets", "scenes", "scene_name", "version_1", "scene_1.scdf.yaml"), tmp_path)
+    (tmp_path / "broken.scdf.json").write_text("{")
+
+    results = validate_tree(str(tmp_path), max_workers=2, batch_size=2)
+    assert len(results) == 8
+    invalid = {os.path.basename(path) for path, errors in results.items() if errors}
+    assert invalid == {"scene_3.scdf.json", "broken.scdf.json"}
+
+
+def test_command_line_exits_non_zero_on_errors(tmp_path):
+    shutil.copy(os.path.join(REPO_ROOT, "archiv", "scene_1.scdf.json"), tmp_path)
+    command = [sys.executable, "-m", "utils.schema_validator", str(tmp_path), "--workers", "1"]
+    tools_dir = os.path.join(REPO_ROOT, "tools")
+    valid = subprocess.run(command, cwd=tools_dir, capture_output=True, text=True)
+    assert valid.returncode == 0 and "Validated 1 files, 0 invalid." in valid.stdout
+
+    (tmp_path / "broken.scdf.json").write_text(json.dumps({"nodes": "none"}))
+    invalid = subprocess.run(command, cwd=tools_dir, capture_output=True, text=True)
+    assert invalid.returncode == 1 and "broken.scdf.json: /nodes:" in invalid.stdout
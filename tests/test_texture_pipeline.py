@@ -0,0 +1,83 @@
+import json
+import os
+import zipfile
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from metadata_generator import generate_metadata_incremental
+from texture_pipeline import run_texture_pipeline
+
+
+@pytest.fixture
+def textures(tmp_path):
+    root = tmp_path / "textures"
+    (root / "bark" / "version_1").mkdir(parents=True)
+    Image.new("RGB", (64, 32), (120, 80, 40)).save(root / "bark" / "version_1" / "bark.png")
+    Image.new("RGB", (40, 40), (10, 200, 10)).save(root / "bark" / "version_1" / "moss.jpg")
+    (root / "bark" / "version_1" / "broken.png").write_bytes(b"")
+    return root
+
+
+def test_generates_thumbnails_mips_and_previews(textures, tmp_path):
+    version_dir = textures / "bark" / "version_1"
+    summary = run_texture_pipeline(str(textures), thumbnail_sizes=(16,), max_workers=1, cache_dir=str(tmp_path / "cache"))
+
+    assert sorted(os.path.basename(path) for path in summary["processed"]) == ["bark.png", "moss.jpg"]
+    assert list(summary["failed"]) == [str(version_dir / "broken.png")]
+    with Image.open(version_dir / "generated" / "bark_thumb16.png") as thumb:
+        assert thumb.size == (16, 8)
+    mips = sorted(path for path in os.listdir(version_dir / "generated") if path.startswith("bark_mip"))
+    assert len(mips) == 6  # 32x16 down to 1x1
+    with Image.open(version_dir / "generated" / "bark_mip6.png") as last:
+        assert last.size == (1, 1)
+    assert summary["previews"] == [str(version_dir / "preview.png")]
+
+    metadata = json.loads((version_dir / "metadata.json").read_text())
+    kinds = [artifact["kind"] for artifact in metadata["generated"]["bark.png"]]
+    assert kinds == ["thumbnail"] + ["mip"] * 6 + ["preview"]
+    assert metadata["generated"]["bark.png"][0]["path"] == "generated/bark_thumb16.png"
+    assert metadata["generated"]["bark.png"][0]["bytes"] == os.path.getsize(version_dir / "generated" / "bark_thumb16.png")
+
+
+def test_unchanged_textures_are_cached(textures, tmp_path):
+    cache_dir = str(tmp_path / "cache")
+    run_texture_pipeline(str(textures), thumbnail_sizes=(16,), max_workers=1, cache_dir=cache_dir)
+    summary = run_texture_pipeline(str(textures), thumbnail_sizes=(16,), max_workers=1, cache_dir=cache_dir)
+    assert summary["processed"] == [] and len(summary["cached"]) == 2 and summary["previews"] == []
+
+    Image.new("RGB", (64, 32), (0, 0, 0)).save(textures / "bark" / "version_1" / "bark.png")
+    summary = run_texture_pipeline(str(textures), thumbnail_sizes=(16,), max_workers=1, cache_dir=cache_dir)
+    assert [os.path.basename(path) for path in summary["processed"]] == ["bark.png"]
+
+    # Changing the settings invalidates every entry.
+    summary = run_texture_pipeline(str(textures), thumbnail_sizes=(32,), max_workers=1, cache_dir=cache_dir)
+    assert len(summary["processed"]) == 2
+
+
+def test_mip_container_in_process_pool(textures, tmp_path):
+    summary = run_texture_pipeline(str(textures), thumbnail_sizes=(), container=True, previews=False,
+                                   max_workers=2, cache_dir=str(tmp_path / "cache"), record_metadata=False)
+    container = textures / "bark" / "version_1" / "generated" / "bark.mips.zip"
+    assert str(container) in [artifact["path"] for artifact in summary["artifacts"][str(textures / "bark" / "version_1" / "bark.png")]]
+    with zipfile.ZipFile(container) as archive:
+        levels = json.loads(archive.read("levels.json"))["levels"]
+        assert [(level["width"], level["height"]) for level in levels][:3] == [(64, 32), (32, 16), (16, 8)]
+        assert len(archive.read("level_1.rgba")) == 32 * 16 * 4
+    assert not (textures / "bark" / "version_1" / "metadata.json").exists()
+
+
+def test_generated_artifacts_are_not_assets(textures, tmp_path):
+    version_dir = textures / "bark" / "version_1"
+    # The cache lives inside the scanned directory by default.
+    run_texture_pipeline(str(textures), thumbnail_sizes=(16,), max_workers=1, author="ada")
+    metadata = json.loads((version_dir / "metadata.json").read_text())
+    assert (metadata["name"], metadata["type"], metadata["author"]) == ("bark", "texture", "ada")
+    assert "bark.png" in metadata["generated"]
+
+    summary = generate_metadata_incremental(str(textures), "ada", "texture", journal_path=str(tmp_path / "journal.json"))
+    assert sorted(os.path.basename(path) for path in summary["added"]) == ["bark.png", "broken.png", "moss.jpg"]
+    assert summary["written"] == [str(version_dir / "metadata.json")]
+    assert not (version_dir / "generated" / "metadata.json").exists()
+    assert json.loads((version_dir / "metadata.json").read_text())["generated"] == metadata["generated"]
@@ -0,0 +1,80 @@
+import json
+import os
+
+import pytest
+
+import version_resolver
+from version_resolver import VersionResolver, resolve_link, version_key
+
+
+@pytest.fixture
+def library(tmp_path):
+    root = tmp_path / "assets"
+    for version in ("version_1", "version_2", "version_10"):
+        (root / "scenes" / "forest" / version).mkdir(parents=True)
+    (root / "scenes" / "forest" / "latest").mkdir()
+    (root / "scenes" / "forest" / "latest" / "link_to_latest_scene.json").write_text("")
+    (root / "textures" / "bark").mkdir(parents=True)
+    for name in ("version_1.png", "version_9.png", "version_12.png", "latest.png"):
+        (root / "textures" / "bark" / name).write_bytes(b"")
+    (root / "environments" / "valley" / "scenes" / "version_3").mkdir(parents=True)
+    (root / "environments" / "valley" / "scenes" / "references").mkdir()
+    (root / "environments" / "valley" / "scenes" / "references" / "ref_to_forest.json").write_text(
+        json.dumps({"ref": "../../../../scenes/forest/latest/link_to_latest_scene.json"}))
+    return root
+
+
+def test_numeric_versions_and_links(library):
+    assert sorted(["version_10", "version_9", "1.2.10", "1.2.9"], key=version_key) == ["1.2.9", "1.2.10", "version_9", "version_10"]
+    resolver = VersionResolver(str(library), ttl=None)
+
+    assert resolver.latest("scenes", "forest") == str(library / "scenes" / "forest" / "version_10")
+    assert resolver.latest("texture", "bark") == str(library / "textures" / "bark" / "version_12.png")
+    assert resolver.resolve("environments", "valley", 3) == str(library / "environments" / "valley" / "scenes" / "version_3")
+    # The empty link file resolves to nothing, so the reference is broken until the link is filled in.
+    assert resolver.references("environments", "valley") == {"ref_to_forest.json": None}
+
+    (library / "scenes" / "forest" / "latest" / "link_to_latest_scene.json").write_text(json.dumps({"version": 2}))
+    resolver.refresh()
+    assert resolver.latest("scenes", "forest") == str(library / "scenes" / "forest" / "version_2")
+    assert resolver.references("environments", "valley") == {"ref_to_forest.json": str(library / "scenes" / "forest" / "version_2")}
+    with pytest.raises(KeyError):
+        resolver.latest("scenes", "desert")
+
+
+def test_lookups_stay_in_memory_until_refresh(library, monkeypatch):
+    resolver = VersionResolver(str(library), ttl=None)
+    assert resolver.latest("scenes", "forest").endswith("version_10")
+    resolver.save()
+
+    (library / "scenes" / "forest" / "version_11").mkdir()
+    (library / "props" / "rock" / "version_1").mkdir(parents=True)
+
+    def no_filesystem(*args, **kwargs):
+        raise AssertionError("lookup touched the filesystem")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(version_resolver.os, "stat", no_filesystem)
+        patched.setattr(version_resolver.os, "scandir", no_filesystem)
+        for _ in range(1000):
+            assert resolver.latest("scenes", "forest").endswith("version_10")
+
+    reloaded = VersionResolver(str(library), ttl=None)
+    assert reloaded.refresh() == {"scenes/forest", "props/rock"}
+    assert reloaded.latest("scenes", "forest").endswith("version_11")
+    assert reloaded.refresh() == set()
+
+
+def test_link_cycles_are_detected(library):
+    links = library / "scenes" / "loop" / "latest"
+    links.mkdir(parents=True)
+    (links / "link_a.json").write_text(json.dumps("link_b.json"))
+    (links / "link_b.json").write_text(json.dumps({"target": "link_a.json"}))
+    with pytest.raises(ValueError, match="cycle"):
+        resolve_link(str(links / "link_a.json"))
+
+    os.symlink("version_1", library / "scenes" / "forest" / "current")
+    assert resolve_link(str(library / "scenes" / "forest" / "current")) == str(library / "scenes" / "forest" / "version_1")
+    (library / "scenes" / "loop" / "version_1").mkdir()
+    with pytest.raises(ValueError, match="cycle"):
+        VersionResolver(str(library), ttl=None).latest("scenes", "loop")
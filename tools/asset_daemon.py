@@ -0,0 +1,389 @@
+# Copyright 2024 chevp. All rights reserved.
+
+# Long-running process that keeps the asset manifest, the version index and the
+# metadata files of an asset library in memory and answers lookups over a Unix
+# domain socket, so tools don't re-parse them on every start.
+#
+# The tools use it on their own: the manifest, version and metadata lookups
+# (``find_asset_by_name``, ``list_all_assets``, ``resolve_latest``,
+# ``list_existing_metadata``, ...) ask the daemon when one is running for the
+# same manifest or library and read the files directly otherwise. See
+# utils/daemon_client.py for the protocol.
+
+import argparse
+import os
+import socketserver
+import threading
+import time
+from asset_manager import ASSET_MANIFEST_PATH, Manifest
+from metadata_generator import EXCLUDE_PATTERNS
+from utils import json_codec
+from utils.daemon_client import PROTOCOL_VERSION, DaemonClient, DaemonUnavailable, default_socket_path
+from utils.instrumentation import add_profiling_arguments, count, log, profiling_from_arguments, span
+from utils.scanner import scan_directory
+from version_resolver import ASSET_ROOT, DEFAULT_TTL, VersionResolver
+
+METADATA_FILENAME = "metadata.json"
+DEFAULT_POLL_INTERVAL = DEFAULT_TTL
+# Seconds a metadata listing is answered from the index before its directory is scanned again.
+DEFAULT_LISTING_TTL = 1.0
+
+class AssetIndex:
+    """
+    In-memory manifest, version index and metadata of one asset library.
+
+    Manifest lookups check the manifest file's signature (one ``os.stat``) and
+    are always current. The version index is brought up to date by ``refresh``,
+    which the daemon calls every poll interval, and re-scans only assets whose
+    tracked directory or link mtimes changed. A metadata file is parsed again
+    on lookup when its size, mtime or inode changed; a listing scans its
+    directory again when neither it nor a directory above it was scanned in
+    the last ``listing_ttl`` seconds, so new files show up within that time.
+
+    Args:
+        root (str): Root of the asset library.
+        manifest_path (str): Asset manifest file.
+        listing_ttl (float): Seconds a metadata listing is answered without scanning.
+    """
+
+    def __init__(self, root=ASSET_ROOT, manifest_path=ASSET_MANIFEST_PATH, listing_ttl=DEFAULT_LISTING_TTL):
+        self.root = os.path.abspath(root)
+        self.manifest_path = os.path.abspath(manifest_path)
+        self.manifest = Manifest(self.manifest_path)
+        self.resolver = VersionResolver(self.root, ttl=None)
+        # Absolute path -> ((size, mtime_ns, inode), parsed metadata).
+        self.metadata = {}
+        self.listing_ttl = listing_ttl
+        # Absolute path -> time.monotonic() of the last scan of the directories searched for metadata files.
+        self.scanned_at = {}
+        self.lock = threading.RLock()
+
+    def refresh(self):
+        """
+        Brings the index up to date with the files on disk.
+
+        Returns:
+            dict: Numbers of ``versions`` changed, ``metadata`` files (re)loaded and ``removed``.
+        """
+        with span("daemon.refresh"):
+            with self.lock:
+                self.manifest.refresh()
+                changed_versions = self.resolver.refresh()
+            # The tree walk and parsing run without the lock, so lookups aren't held up by them.
+            started = time.monotonic()
+            current, loaded = self._scan_metadata(self.root) if os.path.isdir(self.root) else ({}, 0)
+            with self.lock:
+                # Directories listed while the scan ran were scanned again after it started; keep their entries.
+                rescanned = [base for base, scanned_at in self.scanned_at.items() if scanned_at > started]
+                for base in rescanned:
+                    current = {**_outside(current, base), **_inside(self.metadata, base)}
+                removed = len(self.metadata.keys() - current.keys())
+                self.metadata = current
+                self.scanned_at = {self.root: started, **{base: self.scanned_at[base] for base in rescanned}}
+        return {"versions": len(changed_versions), "metadata": loaded, "removed": removed}
+
+    def _scan_metadata(self, directory):
+        """
+        Finds the metadata files below a directory, parsing those that are new or changed.
+
+        Returns:
+            tuple: ``(metadata, loaded)``: entries as in ``self.metadata`` and the number of files parsed.
+        """
+        snapshot = scan_directory(directory, include=[METADATA_FILENAME], exclude=EXCLUDE_PATTERNS)
+        current = {}
+        loaded = 0
+        for entry in snapshot.entries.values():
+            signature = (entry.size, entry.mtime_ns, entry.inode)
+            path = os.path.abspath(entry.path)
+            previous = self.metadata.get(path)
+            if previous is not None and previous[0] == signature:
+                current[path] = previous
+                continue
+            try:
+                current[path] = (signature, json_codec.load(path))
+                loaded += 1
+            except (OSError, ValueError) as e:
+                log(f"Error reading metadata file {path}: {e}", "daemon.metadata_error", level="error", path=path)
+        count("daemon.metadata_loaded", loaded)
+        return current, loaded
+
+    def _last_scanned(self, base):
+        # A scan of a directory covers everything below it.
+        return max((scanned_at for path, scanned_at in self.scanned_at.items()
+                    if base == path or base.startswith(path.rstrip(os.sep) + os.sep)), default=None)
+
+    def list_metadata(self, directory):
+        """
+        Lists the metadata files below a directory, as ``list_existing_metadata`` finds them.
+
+        The directory is scanned again first if it wasn't in the last ``listing_ttl``
+        seconds, so files added or removed since the last ``refresh`` are listed.
+
+        Args:
+            directory (str): Directory at or below the root; returned paths start with it as given.
+
+        Returns:
+            list: Metadata file paths, sorted by their path relative to ``directory``.
+        """
+        base = os.path.abspath(directory)
+        prefix = base.rstrip(os.sep) + os.sep
+        last_scanned = self._last_scanned(base)
+        if last_scanned is None or time.monotonic() - last_scanned > self.listing_ttl:
+            scanned_at = time.monotonic()
+            metadata, _ = self._scan_metadata(base)
+            self.metadata = {**_outside(self.metadata, base), **metadata}
+            self.scanned_at[base] = scanned_at
+        relatives = sorted(os.path.relpath(path, base).replace(os.sep, "/")
+                           for path in self.metadata if path.startswith(prefix))
+        return [os.path.join(directory, relative) for relative in relatives]
+
+    def read_metadata(self, metadata_path):
+        """
+        Returns a metadata file, parsing it again if it changed since it was indexed.
+
+        Returns:
+            dict: Parsed metadata file, or None if it doesn't exist or can't be parsed.
+        """
+        path = os.path.abspath(metadata_path)
+        indexed = self.metadata.get(path)
+        try:
+            stat = os.stat(path)
+            signature = (stat.st_size, stat.st_mtime_ns, stat.st_ino)
+            if indexed is not None and indexed[0] == signature:
+                return indexed[1]
+            parsed = json_codec.load(path)
+        except (OSError, ValueError):
+            return None
+        # Files not picked up by a refresh yet are answered as a direct read would, without indexing them.
+        if indexed is not None:
+            self.metadata[path] = (signature, parsed)
+        return parsed
+
+def _inside(metadata, base):
+    prefix = base.rstrip(os.sep) + os.sep
+    return {path: indexed for path, indexed in metadata.items() if path.startswith(prefix)}
+
+def _outside(metadata, base):
+    prefix = base.rstrip(os.sep) + os.sep
+    return {path: indexed for path, indexed in metadata.items() if not path.startswith(prefix)}
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            self.wfile.write(self.server.daemon.handle(line) + b"\n")
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+class AssetDaemon:
+    """
+    Serves an ``AssetIndex`` on a Unix domain socket.
+
+    Every connection is handled on its own thread and may send any number of
+    requests; requests are answered one at a time under the index lock.
+
+    Args:
+        root (str): Root of the asset library.
+        manifest_path (str): Asset manifest file.
+        socket_path (str, optional): Socket to listen on (see ``default_socket_path``).
+        poll_interval (float): Seconds between refreshes of the version index and metadata.
+        listing_ttl (float): Seconds a metadata listing is answered without scanning.
+    """
+
+    def __init__(self, root=ASSET_ROOT, manifest_path=ASSET_MANIFEST_PATH, socket_path=None, poll_interval=DEFAULT_POLL_INTERVAL,
+                 listing_ttl=DEFAULT_LISTING_TTL):
+        self.socket_path = socket_path or default_socket_path()
+        if self.socket_path is None:
+            raise ValueError("No socket path: the asset daemon is turned off by the SCENE_ASSETS_DAEMON environment variable")
+        self.index = AssetIndex(root, manifest_path, listing_ttl)
+        self.poll_interval = poll_interval
+        self.started_at = time.time()
+        self.requests = 0
+        self.refreshes = 0
+        self._server = None
+        self._threads = []
+        self._stopping = threading.Event()
+        self._stop_lock = threading.Lock()
+        index = self.index
+        self.operations = {
+            "ping": self.ping,
+            "stats": self.stats,
+            "shutdown": self._request_shutdown,
+            "manifest.exists": index.manifest.exists,
+            "manifest.get": index.manifest.get,
+            "manifest.find": index.manifest.find,
+            "manifest.query": lambda filters: index.manifest.query(**filters),
+            "manifest.names": index.manifest.names,
+            "versions.latest": index.resolver.latest,
+            "versions.resolve": index.resolver.resolve,
+            "versions.list": index.resolver.versions,
+            "versions.references": index.resolver.references,
+            "metadata.list": index.list_metadata,
+            "metadata.get": index.read_metadata,
+        }
+
+    def ping(self):
+        return {"protocol": PROTOCOL_VERSION, "pid": os.getpid(), "manifest": self.index.manifest_path,
+                "versions": self.index.root, "metadata": self.index.root}
+
+    def stats(self):
+        return {"uptime": time.time() - self.started_at, "requests": self.requests, "refreshes": self.refreshes,
+                "assets": len(self.index.manifest.assets), "versioned_assets": len(self.index.resolver.assets),
+                "metadata_files": len(self.index.metadata)}
+
+    def handle(self, line):
+        """
+        Answers one request line.
+
+        Args:
+            line (bytes): A JSON request ``{"op": ..., <arguments>}``.
+
+        Returns:
+            bytes: The JSON response, without the trailing newline.
+        """
+        try:
+            request = json_codec.decode(line)
+            operation = self.operations.get(request.pop("op", None))
+            if operation is None:
+                raise LookupError("Unknown operation")
+            with self.index.lock:
+                self.requests += 1
+                result = operation(**request)
+            response = {"ok": True, "result": result}
+        except Exception as e:
+            message = e.args[0] if isinstance(e, KeyError) and e.args else str(e)
+            response = {"ok": False, "type": type(e).__name__, "error": message}
+        return json_codec.encode(response, default=str)
+
+    def _poll(self):
+        while not self._stopping.wait(self.poll_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                log(f"Asset daemon refresh failed: {e}", "daemon.error", level="error")
+
+    def refresh(self):
+        """
+        Refreshes the index now instead of waiting for the next poll.
+
+        Returns:
+            dict: See ``AssetIndex.refresh``.
+        """
+        summary = self.index.refresh()
+        self.refreshes += 1
+        return summary
+
+    def start(self):
+        """
+        Loads the index and starts serving and polling on background threads.
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the socket.
+        """
+        if os.path.exists(self.socket_path):
+            try:
+                DaemonClient(self.socket_path).close()
+            except DaemonUnavailable:
+                # Left behind by a daemon that didn't shut down cleanly.
+                os.remove(self.socket_path)
+            else:
+                raise RuntimeError(f"An asset daemon is already running on {self.socket_path}")
+        summary = self.refresh()
+        self._server = _UnixServer(self.socket_path, _RequestHandler)
+        self._server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        self._threads = [threading.Thread(target=self._server.serve_forever, name="asset-daemon-server", daemon=True),
+                         threading.Thread(target=self._poll, name="asset-daemon-poll", daemon=True)]
+        for thread in self._threads:
+            thread.start()
+        log(f"Asset daemon serving {self.index.root} ({len(self.index.resolver.assets)} versioned assets, "
+            f"{summary['metadata']} metadata files) and {self.index.manifest_path} on {self.socket_path}",
+            "daemon.started", socket=self.socket_path)
+
+    def wait(self):
+        """
+        Blocks until the daemon is stopped (by ``stop`` or a 'shutdown' request).
+        """
+        while not self._stopping.wait(1.0):
+            pass
+
+    def stop(self):
+        """
+        Stops serving, saves the version index and removes the socket.
+
+        Returns once the daemon is stopped, also when another thread is stopping it.
+        """
+        with self._stop_lock:
+            self._stopping.set()
+            if self._server is None:
+                return
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            for thread in self._threads:
+                thread.join()
+            with self.index.lock:
+                self.index.resolver.save()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+        log(f"Asset daemon stopped after {self.requests} requests.", "daemon.stopped", requests=self.requests)
+
+    def _request_shutdown(self):
+        # Stopping joins the server thread, so it runs on a thread of its own. Threads inherit
+        # the daemon flag of request threads, and a daemon thread would be killed at exit.
+        threading.Thread(target=self.stop, name="asset-daemon-stop", daemon=False).start()
+        return True
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+        return False
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Keep the asset manifest, version index and metadata in memory and serve lookups.")
+    parser.add_argument("--socket", type=str, help="Unix socket path (default: $SCENE_ASSETS_DAEMON or a per-user socket in the temp directory).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Run the daemon in the foreground.")
+    serve.add_argument("--root", type=str, default=ASSET_ROOT, help=f"Asset library root (default: {ASSET_ROOT}).")
+    serve.add_argument("--manifest", type=str, default=ASSET_MANIFEST_PATH, help=f"Asset manifest (default: {ASSET_MANIFEST_PATH}).")
+    serve.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL,
+                       help=f"Seconds between checks for changed files (default: {DEFAULT_POLL_INTERVAL}).")
+    serve.add_argument("--listing-ttl", type=float, default=DEFAULT_LISTING_TTL,
+                       help=f"Seconds a metadata listing is answered without scanning for new files (default: {DEFAULT_LISTING_TTL}).")
+
+    subparsers.add_parser("status", help="Show what a running daemon serves.")
+    subparsers.add_parser("stop", help="Stop a running daemon.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        socket_path = args.socket or default_socket_path()
+        if args.command == "serve":
+            daemon = AssetDaemon(args.root, args.manifest, socket_path, args.poll_interval, args.listing_ttl)
+            daemon.start()
+            try:
+                daemon.wait()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                daemon.stop()
+        else:
+            try:
+                client = DaemonClient(socket_path)
+            except DaemonUnavailable as e:
+                print(e)
+            else:
+                if args.command == "status":
+                    for key, value in {**client.info, **client.request("stats")}.items():
+                        print(f"{key}: {value}")
+                else:
+                    client.request("shutdown")
+                    print(f"Stopping the asset daemon on {socket_path}.")
+                client.close()
@@ -1,10 +1,422 @@
 # Copyright 2024 chevp. All rights reserved.
 
 import os
+import time
+from collections.abc import Hashable
+from concurrent.futures import ThreadPoolExecutor
+from manifest_store import ManifestBatch, ManifestConflictError, ManifestStore, SqliteManifestStore, SQLITE_EXTENSIONS
+from utils.daemon_client import call as daemon_call
+from utils.digest_cache import DigestCache
 from utils.file_utils import create_directory, list_files_in_directory, file_exists
-from utils.json_utils import read_json, write_json, update_json, validate_json_schema, pretty_print_json
+from utils.instrumentation import count, log, span
+from utils.json_utils import read_json, write_json, write_json_atomic, update_json, validate_json_schema, pretty_print_json
+from utils.schema_validator import CompiledSchema, compile_schema, load_schema
 
 ASSET_MANIFEST_PATH = "asset_manifest.json"
+DEFAULT_DIGEST_ALGORITHM = "blake2b"
+
+class Manifest(ManifestStore):
+    """
+    In-memory view of an asset manifest with hash indexes for fast lookups.
+
+    The manifest file is parsed once and kept in memory. Every access checks the
+    file's inode, modification time and size and re-parses it only when any changed,
+    so repeated lookups cost a single ``os.stat`` instead of a full JSON parse.
+
+    Args:
+        manifest_path (str): Path to the asset manifest JSON file.
+    """
+
+    INDEXED_FIELDS = ("name", "path", "type", "version")
+
+    def __init__(self, manifest_path=ASSET_MANIFEST_PATH):
+        self.manifest_path = manifest_path
+        self._data = None
+        self._signature = None
+        self._loaded = False
+        self._indexes = {field: {} for field in self.INDEXED_FIELDS}
+
+    def _stat_signature(self):
+        try:
+            stat = os.stat(self.manifest_path)
+        except OSError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    def refresh(self):
+        """
+        Re-parses the manifest file if it changed on disk since the last load.
+
+        Returns:
+            bool: True if the manifest was (re)loaded, False if the cached copy is current.
+        """
+        signature = self._stat_signature()
+        if self._loaded and signature == self._signature:
+            return False
+        with span("manifest.load", path=self.manifest_path):
+            self._data = read_json(self.manifest_path) if signature is not None else None
+            self._signature = signature
+            self._loaded = True
+            self._rebuild_indexes()
+        return True
+
+    def invalidate(self):
+        """
+        Drops the cached manifest so the next access re-parses the file.
+        """
+        self._loaded = False
+
+    def exists(self):
+        return self.data is not None
+
+    def load(self):
+        return self.data
+
+    @property
+    def data(self):
+        """
+        dict: Parsed manifest content, or None if the manifest file doesn't exist.
+        """
+        self.refresh()
+        return self._data
+
+    @property
+    def assets(self):
+        """
+        list: Asset entries of the manifest (empty if there is no manifest).
+        """
+        data = self.data
+        return data["assets"] if data else []
+
+    def _rebuild_indexes(self):
+        self._indexes = {field: {} for field in self.INDEXED_FIELDS}
+        for asset in (self._data or {}).get("assets", []):
+            self._index_asset(asset)
+
+    def _index_asset(self, asset):
+        for field, index in self._indexes.items():
+            value = asset.get(field)
+            if value is not None and isinstance(value, Hashable):
+                index.setdefault(value, []).append(asset)
+
+    def _unindex_asset(self, asset):
+        for field, index in self._indexes.items():
+            value = asset.get(field)
+            if value is None or not isinstance(value, Hashable):
+                continue
+            bucket = index.get(value, [])
+            for position, candidate in enumerate(bucket):
+                if candidate is asset:
+                    del bucket[position]
+                    break
+            if not bucket:
+                index.pop(value, None)
+
+    def find(self, field, value):
+        """
+        Returns all assets whose ``field`` equals ``value``.
+
+        Args:
+            field (str): One of ``INDEXED_FIELDS``.
+            value: Value to look up.
+
+        Returns:
+            list: Matching asset entries, in manifest order.
+        """
+        if field not in self._indexes:
+            raise ValueError(f"Field '{field}' is not indexed. Indexed fields: {', '.join(self.INDEXED_FIELDS)}")
+        self.refresh()
+        return list(self._indexes[field].get(value, ()))
+
+    def query(self, **filters):
+        """
+        Returns the assets matching every ``field=value`` filter.
+
+        Indexed fields are resolved through the hash indexes, starting with the
+        most selective one; other fields are checked on the remaining candidates.
+
+        Returns:
+            list: Matching asset entries, in manifest order.
+        """
+        self.refresh()
+        indexed = [field for field in filters if field in self._indexes]
+        if not indexed:
+            return super().query(**filters)
+        buckets = sorted((self._indexes[field].get(filters[field], ()) for field in indexed), key=len)
+        return [asset for asset in buckets[0] if all(asset.get(field) == value for field, value in filters.items())]
+
+    def get(self, asset_name):
+        """
+        Returns the first asset with the given name.
+
+        Args:
+            asset_name (str): Name of the asset.
+
+        Returns:
+            dict: Asset data if found, otherwise None.
+        """
+        self.refresh()
+        matches = self._indexes["name"].get(asset_name)
+        return matches[0] if matches else None
+
+    def names(self):
+        """
+        Returns the names of all assets in manifest order.
+
+        Returns:
+            list: List of asset names.
+        """
+        return [asset["name"] for asset in self.assets]
+
+    def transaction(self, fsync=False):
+        """
+        Starts a batch of changes that is committed with a single atomic write.
+
+        Use it as a context manager; the changes are committed when the block
+        exits normally and discarded if it raises::
+
+            with manifest.transaction() as transaction:
+                transaction.add({"name": "TreeModel", "path": "props/tree.blend"})
+                transaction.remove("OldTree")
+
+        Args:
+            fsync (bool): Flush the manifest to stable storage on commit.
+
+        Returns:
+            ManifestTransaction: The pending transaction.
+        """
+        return ManifestTransaction(self, fsync=fsync)
+
+    def apply_changes(self, changes, fsync=False):
+        """
+        Applies a list of changes with a single atomic write.
+
+        Args:
+            changes (list): Tuples of ``("add", asset_data)``, ``("update", asset_name, updated_data)``
+                or ``("remove", asset_name)``.
+            fsync (bool): Flush the manifest to stable storage on commit.
+
+        Returns:
+            dict: Commit summary (see ``ManifestTransaction.commit``).
+        """
+        transaction = self.transaction(fsync=fsync)
+        transaction.extend(changes)
+        return transaction.commit()
+
+    def _apply(self, changes):
+        if self._data is None:
+            self._data = {"assets": []}
+        summary = {"added": [], "updated": [], "removed": [], "missing": []}
+        removed_names = set()
+        for operation, *arguments in changes:
+            if operation == "add":
+                asset_data = arguments[0]
+                self._data["assets"].append(asset_data)
+                self._index_asset(asset_data)
+                summary["added"].append(asset_data["name"])
+            elif operation == "update":
+                asset_name, updated_data = arguments
+                matches = self._indexes["name"].get(asset_name)
+                if not matches:
+                    summary["missing"].append(asset_name)
+                    continue
+                asset = matches[0]
+                self._unindex_asset(asset)
+                asset.update(updated_data)
+                self._index_asset(asset)
+                summary["updated"].append(asset_name)
+            elif operation == "remove":
+                asset_name = arguments[0]
+                matches = self._indexes["name"].get(asset_name)
+                if not matches:
+                    summary["missing"].append(asset_name)
+                    continue
+                for asset in list(matches):
+                    self._unindex_asset(asset)
+                removed_names.add(asset_name)
+                summary["removed"].append(asset_name)
+        if removed_names:
+            # Assets are only dropped from the list once, after all changes are applied,
+            # so removing many assets stays linear in the manifest size.
+            self._data["assets"] = [asset for asset in self._data["assets"] if asset["name"] not in removed_names or self._is_indexed(asset)]
+        return summary
+
+    def _is_indexed(self, asset):
+        return any(candidate is asset for candidate in self._indexes["name"].get(asset.get("name"), ()))
+
+    def save(self, fsync=False):
+        """
+        Writes the in-memory manifest to disk atomically and records the new file signature.
+
+        Args:
+            fsync (bool): Flush the manifest to stable storage before returning.
+        """
+        with span("manifest.save", path=self.manifest_path):
+            write_json_atomic(self._data, self.manifest_path, fsync=fsync)
+        self._signature = self._stat_signature()
+
+class ManifestTransaction(ManifestBatch):
+    """
+    Collects manifest changes and commits them with one atomic write.
+
+    The manifest's on-disk signature is recorded when the transaction starts. On
+    commit an exclusive lock file is taken next to the manifest; if the manifest
+    changed in the meantime, or another process holds the lock for longer than
+    ``lock_timeout`` seconds, ``ManifestConflictError`` is raised and nothing is
+    written.
+
+    Args:
+        manifest (Manifest): Manifest the changes apply to.
+        fsync (bool): Flush the manifest to stable storage on commit.
+        lock_timeout (float): Seconds to wait for another process's commit to finish.
+    """
+
+    STALE_LOCK_SECONDS = 60
+
+    def __init__(self, manifest, fsync=False, lock_timeout=5.0):
+        super().__init__(manifest, fsync=fsync)
+        self.manifest = manifest
+        self.lock_timeout = lock_timeout
+        manifest.refresh()
+        self._base_signature = manifest._signature
+
+    def commit(self):
+        """
+        Applies the queued changes and writes the manifest once.
+
+        Returns:
+            dict: Names of the ``added``, ``updated`` and ``removed`` assets, plus
+                ``missing`` names that an update or remove did not find.
+
+        Raises:
+            ManifestConflictError: If the manifest changed on disk since the transaction started.
+        """
+        if self.committed:
+            raise RuntimeError("Transaction has already been committed.")
+        lock_path = self.manifest.manifest_path + ".lock"
+        lock_fd = self._acquire_lock(lock_path)
+        try:
+            if self.manifest._stat_signature() != self._base_signature:
+                self.manifest.invalidate()
+                raise ManifestConflictError(
+                    f"{self.manifest.manifest_path} was modified by another process; "
+                    f"{len(self.changes)} pending change(s) were not applied."
+                )
+            with span("manifest.commit", changes=len(self.changes)):
+                try:
+                    summary = self.manifest._apply(self.changes)
+                    self.manifest.save(fsync=self.fsync)
+                except BaseException:
+                    # The changes are applied in memory first; reload what is on disk.
+                    self.manifest.invalidate()
+                    raise
+        finally:
+            os.close(lock_fd)
+            os.remove(lock_path)
+        self.committed = True
+        return summary
+
+    def _acquire_lock(self, lock_path):
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                lock_fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(lock_fd, str(os.getpid()).encode())
+                return lock_fd
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(lock_path) > self.STALE_LOCK_SECONDS:
+                        os.remove(lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() >= deadline:
+                    raise ManifestConflictError(f"Timed out waiting for another commit to {self.manifest.manifest_path}.")
+                time.sleep(0.01)
+
+_manifests = {}
+
+def get_manifest(manifest_path=None):
+    """
+    Returns the shared ``Manifest`` instance for a manifest path.
+
+    Args:
+        manifest_path (str, optional): Path to the manifest (defaults to ASSET_MANIFEST_PATH).
+
+    Returns:
+        Manifest: Cached manifest view for that path.
+    """
+    manifest_path = manifest_path or ASSET_MANIFEST_PATH
+    key = os.path.abspath(manifest_path)
+    manifest = _manifests.get(key)
+    if manifest is None:
+        manifest = _manifests[key] = Manifest(manifest_path)
+    return manifest
+
+_manifest_backend = None
+
+def set_manifest_backend(backend):
+    """
+    Routes the module-level manifest functions through a storage backend.
+
+    Args:
+        backend (ManifestStore or str): A store instance, a path to a JSON manifest or
+            an SQLite database (``.db``, ``.sqlite``, ``.sqlite3``), or None to go back
+            to the JSON manifest at ASSET_MANIFEST_PATH.
+
+    Returns:
+        ManifestStore: The active backend.
+    """
+    global _manifest_backend
+    if isinstance(backend, str):
+        backend = SqliteManifestStore(backend) if backend.endswith(SQLITE_EXTENSIONS) else get_manifest(backend)
+    _manifest_backend = backend
+    return get_manifest_backend()
+
+def get_manifest_backend():
+    """
+    Returns the storage backend used by the module-level manifest functions.
+
+    Returns:
+        ManifestStore: The configured backend, or the JSON manifest at ASSET_MANIFEST_PATH.
+    """
+    return _manifest_backend if _manifest_backend is not None else get_manifest()
+
+def _lookup(backend, op, fallback, **args):
+    # Read-only lookups on the JSON manifest are answered by the asset daemon when it serves that file.
+    if not isinstance(backend, Manifest):
+        return fallback()
+    return daemon_call("manifest", backend.manifest_path, op, fallback, **args)
+
+def manifest_transaction(fsync=False):
+    """
+    Starts a batch of manifest changes that is committed with a single atomic write.
+
+    Args:
+        fsync (bool): Flush the manifest to stable storage on commit.
+
+    Returns:
+        ManifestBatch: Transaction to use as a context manager.
+    """
+    return get_manifest_backend().transaction(fsync=fsync)
+
+def apply_changes(changes, fsync=False):
+    """
+    Applies many adds, updates and removes to the manifest with one atomic write.
+
+    Args:
+        changes (list): Tuples of ``("add", asset_data)``, ``("update", asset_name, updated_data)``
+            or ``("remove", asset_name)``.
+        fsync (bool): Flush the manifest to stable storage on commit.
+
+    Returns:
+        dict: Names of the added, updated, removed and missing assets.
+    """
+    summary = get_manifest_backend().apply_changes(changes, fsync=fsync)
+    log(f"Committed manifest changes: {len(summary['added'])} added, {len(summary['updated'])} updated, "
+        f"{len(summary['removed'])} removed, {len(summary['missing'])} not found", "manifest.committed",
+        **{key: len(names) for key, names in summary.items()})
+    return summary
 
 def load_asset_manifest():
     """
@@ -13,7 +425,7 @@ def load_asset_manifest():
     Returns:
         dict: Parsed JSON content of the asset manifest, or None if it doesn't exist.
     """
-    return read_json(ASSET_MANIFEST_PATH)
+    return get_manifest_backend().load()
 
 def add_asset_to_manifest(asset_data):
     """
@@ -22,10 +434,8 @@ def add_asset_to_manifest(asset_data):
     Args:
         asset_data (dict): Data about the asset to add to the manifest.
     """
-    asset_manifest = load_asset_manifest() or {"assets": []}
-    asset_manifest["assets"].append(asset_data)
-    write_json(asset_manifest, ASSET_MANIFEST_PATH)
-    print(f"Added new asset: {asset_data['name']}")
+    get_manifest_backend().add(asset_data)
+    log(f"Added new asset: {asset_data['name']}", "asset.added", name=asset_data["name"])
 
 def update_asset_in_manifest(asset_name, updated_data):
     """
@@ -35,14 +445,10 @@ def update_asset_in_manifest(asset_name, updated_data):
         asset_name (str): The name of the asset to update.
         updated_data (dict): New data to update the asset with.
     """
-    asset_manifest = load_asset_manifest() or {"assets": []}
-    for asset in asset_manifest["assets"]:
-        if asset["name"] == asset_name:
-            asset.update(updated_data)
-            write_json(asset_manifest, ASSET_MANIFEST_PATH)
-            print(f"Updated asset: {asset_name}")
-            return
-    print(f"Asset {asset_name} not found in manifest.")
+    if get_manifest_backend().update(asset_name, updated_data):
+        log(f"Updated asset: {asset_name}", "asset.updated", name=asset_name)
+        return
+    log(f"Asset {asset_name} not found in manifest.", "asset.not_found", level="warning", name=asset_name)
 
 def check_asset_integrity(asset_directory):
     """
@@ -55,31 +461,151 @@ def check_asset_integrity(asset_directory):
         dict: Dictionary with asset paths as keys and a boolean indicating existence.
     """
     integrity_report = {}
-    manifest = load_asset_manifest()
+    manifest = get_manifest_backend().load()
     if not manifest:
-        print("No manifest found.")
+        log("No manifest found.", "manifest.missing", level="warning")
         return integrity_report
 
     for asset in manifest["assets"]:
         asset_path = os.path.join(asset_directory, asset["path"])
         integrity_report[asset_path] = file_exists(asset_path)
         status = "exists" if integrity_report[asset_path] else "missing"
-        print(f"Asset {asset['name']} ({asset_path}): {status}")
+        log(f"Asset {asset['name']} ({asset_path}): {status}", "asset.checked", name=asset["name"], path=asset_path, status=status)
 
     return integrity_report
 
+def _digest_manifest_assets(asset_directory, assets, algorithm, cache, max_workers):
+    def digest_asset(asset):
+        expected = asset.get("digest")
+        asset_algorithm = expected.split(":", 1)[0] if expected else algorithm
+        try:
+            return cache.digest(os.path.join(asset_directory, asset["path"]), algorithm=asset_algorithm)
+        except OSError:
+            return None
+
+    with span("assets.digest", assets=len(assets)), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        digests = list(executor.map(digest_asset, assets))
+    count("assets.digested", len(assets))
+    return digests
+
+def verify_asset_integrity(asset_directory, algorithm=DEFAULT_DIGEST_ALGORITHM, max_workers=8, cache_path=None, find_unreferenced=True):
+    """
+    Verifies asset contents against the digests recorded in the manifest.
+
+    Files are hashed in chunks across a thread pool. With ``cache_path``, the size
+    and mtime of every hashed file are persisted, and files that are unchanged
+    since the previous run are not hashed again. Nothing is printed per asset.
+
+    Args:
+        asset_directory (str): Directory where assets are stored.
+        algorithm (str): ``hashlib`` algorithm for assets without a recorded digest.
+        max_workers (int): Number of hashing threads.
+        cache_path (str, optional): JSON file for the size/mtime digest cache.
+        find_unreferenced (bool): Also list files under ``asset_directory`` that no asset references.
+
+    Returns:
+        dict: Report with the lists ``ok`` (asset names), ``missing``, ``changed`` and
+            ``unrecorded`` (dicts with ``name``, ``path`` and digests) and
+            ``unreferenced`` (paths relative to ``asset_directory``).
+    """
+    report = {"ok": [], "missing": [], "changed": [], "unrecorded": [], "unreferenced": []}
+    manifest = get_manifest_backend().load()
+    if not manifest:
+        log("No manifest found.", "manifest.missing", level="warning")
+        return report
+
+    assets = manifest["assets"]
+    cache = DigestCache(cache_path)
+    digests = _digest_manifest_assets(asset_directory, assets, algorithm, cache, max_workers)
+    cache.save()
+
+    for asset, actual in zip(assets, digests):
+        expected = asset.get("digest")
+        if actual is None:
+            report["missing"].append({"name": asset["name"], "path": asset["path"]})
+        elif expected is None:
+            report["unrecorded"].append({"name": asset["name"], "path": asset["path"], "actual": actual})
+        elif actual != expected:
+            report["changed"].append({"name": asset["name"], "path": asset["path"], "expected": expected, "actual": actual})
+        else:
+            report["ok"].append(asset["name"])
+
+    if find_unreferenced:
+        referenced = {os.path.normpath(asset["path"]) for asset in assets}
+        ignored = {os.path.abspath(path) for path in (cache_path, ASSET_MANIFEST_PATH) if path}
+        for file_path in list_files_in_directory(asset_directory):
+            relative_path = os.path.normpath(os.path.relpath(file_path, asset_directory))
+            if relative_path not in referenced and os.path.abspath(file_path) not in ignored:
+                report["unreferenced"].append(relative_path)
+        report["unreferenced"].sort()
+
+    return report
+
+def record_asset_digests(asset_directory, algorithm=DEFAULT_DIGEST_ALGORITHM, max_workers=8, cache_path=None, fsync=False):
+    """
+    Records the current content digest of every existing asset in the manifest.
+
+    All changed digests are written with a single manifest commit.
+
+    Args:
+        asset_directory (str): Directory where assets are stored.
+        algorithm (str): ``hashlib`` algorithm to use.
+        max_workers (int): Number of hashing threads.
+        cache_path (str, optional): JSON file for the size/mtime digest cache.
+        fsync (bool): Flush the manifest to stable storage on commit.
+
+    Returns:
+        int: Number of assets whose recorded digest changed.
+    """
+    backend = get_manifest_backend()
+    manifest = backend.load()
+    if not manifest:
+        log("No manifest found.", "manifest.missing", level="warning")
+        return 0
+
+    # Digests are recomputed with ``algorithm``, not with the one already recorded.
+    assets = [{key: value for key, value in asset.items() if key != "digest"} for asset in manifest["assets"]]
+    cache = DigestCache(cache_path)
+    digests = _digest_manifest_assets(asset_directory, assets, algorithm, cache, max_workers)
+    cache.save()
+
+    changes = [
+        ("update", asset["name"], {"digest": digest})
+        for asset, recorded, digest in zip(assets, manifest["assets"], digests)
+        if digest is not None and recorded.get("digest") != digest
+    ]
+    if changes:
+        backend.apply_changes(changes, fsync=fsync)
+    log(f"Recorded digests for {len(changes)} assets.", "digests.recorded", changed=len(changes))
+    return len(changes)
+
 def validate_asset_schema(asset_data, schema):
     """
     Validates an asset's data against a given schema.
     
+    JSON Schema documents (a dict, the path of a schema file or a compiled schema)
+    are checked with the compiled validator, which reports every error; a plain
+    mapping of keys to Python types is checked the legacy way.
+    
     Args:
         asset_data (dict): Asset data to validate.
-        schema (dict): Schema to validate against.
+        schema (dict | str | CompiledSchema): Schema to validate against.
     
     Returns:
         bool: True if the asset data matches the schema, False otherwise.
     """
-    return validate_json_schema(asset_data, schema)
+    if isinstance(schema, str):
+        schema = load_schema(schema)
+    elif isinstance(schema, dict) and not all(isinstance(value, type) for value in schema.values()):
+        schema = compile_schema(schema)
+    if not isinstance(schema, CompiledSchema):
+        return validate_json_schema(asset_data, schema)
+
+    errors = schema.validate(asset_data)
+    for error in errors:
+        log(f"Validation failed at '{error['pointer'] or '/'}': {error['message']}", "schema.error", level="error",
+            pointer=error["pointer"], error=error["message"])
+    return not errors
 
 def list_all_assets():
     """
@@ -88,13 +614,13 @@ def list_all_assets():
     Returns:
         list: List of asset names.
     """
-    manifest = load_asset_manifest()
-    if not manifest:
-        print("No manifest found.")
+    backend = get_manifest_backend()
+    if not _lookup(backend, "manifest.exists", backend.exists):
+        log("No manifest found.", "manifest.missing", level="warning")
         return []
     
-    asset_names = [asset["name"] for asset in manifest["assets"]]
-    print("Assets in manifest:", asset_names)
+    asset_names = _lookup(backend, "manifest.names", backend.names)
+    log(f"Assets in manifest: {asset_names}", "manifest.list", assets=asset_names)
     return asset_names
 
 def pretty_print_manifest():
@@ -105,7 +631,7 @@ def pretty_print_manifest():
     if manifest:
         pretty_print_json(manifest)
     else:
-        print("No manifest found.")
+        log("No manifest found.", "manifest.missing", level="warning")
 
 def remove_asset_from_manifest(asset_name):
     """
@@ -114,14 +640,13 @@ def remove_asset_from_manifest(asset_name):
     Args:
         asset_name (str): Name of the asset to remove.
     """
-    manifest = load_asset_manifest()
-    if manifest:
-        updated_assets = [asset for asset in manifest["assets"] if asset["name"] != asset_name]
-        manifest["assets"] = updated_assets
-        write_json(manifest, ASSET_MANIFEST_PATH)
-        print(f"Removed asset: {asset_name}")
+    removed = get_manifest_backend().remove(asset_name)
+    if removed:
+        log(f"Removed asset: {asset_name}", "asset.removed", name=asset_name)
+    elif removed is None:
+        log("No manifest found to update.", "manifest.missing", level="warning")
     else:
-        print("No manifest found to update.")
+        log(f"Asset {asset_name} not found in manifest.", "asset.not_found", level="warning", name=asset_name)
 
 def find_asset_by_name(asset_name):
     """
@@ -133,11 +658,10 @@ def find_asset_by_name(asset_name):
     Returns:
         dict: Asset data if found, otherwise None.
     """
-    manifest = load_asset_manifest()
-    if manifest:
-        for asset in manifest["assets"]:
-            if asset["name"] == asset_name:
-                print(f"Asset found: {asset}")
-                return asset
-    print(f"Asset {asset_name} not found.")
+    backend = get_manifest_backend()
+    asset = _lookup(backend, "manifest.get", lambda: backend.get(asset_name), asset_name=asset_name)
+    if asset is not None:
+        log(f"Asset found: {asset}", "asset.found", name=asset_name)
+        return asset
+    log(f"Asset {asset_name} not found.", "asset.not_found", level="warning", name=asset_name)
     return None
\ No newline at end of file
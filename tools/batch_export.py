@@ -1,64 +1,128 @@
 import bpy
 import os
 import argparse
-import json
+import functools
 from pathlib import Path
+from dependency_graph import DEPENDENCY_GRAPH_PATH, load_dependency_graph
+from export_cache import ExportCache, cached_export, parse_size
+from scene_exporter import export_scene_to_binary, export_scene_to_glb, export_scene_to_jsonl, iter_scene_objects, open_blend_file
+from utils import json_codec
+from utils.json_utils import write_json_stream
+from utils.scanner import scan_directory
+from utils.instrumentation import add_profiling_arguments, log, profiling_from_arguments, span, traced
 
-def export_scene_to_json(blend_file_path, export_path):
+@traced("export.json")
+def export_scene_to_json(blend_file_path, export_path, stream=False):
     """
     Exports a Blender scene to JSON format.
     
     Args:
         blend_file_path (str): Path to the .blend file.
         export_path (str): Directory where the JSON file will be saved.
+        stream (bool): Write objects to disk one by one instead of building the whole
+            document in memory first.
+    
+    Returns:
+        str: Path of the written JSON file.
     """
     # Open the blend file
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
-
-    # Gather scene data
-    scene_data = {"objects": []}
-    for obj in bpy.context.scene.objects:
-        obj_data = {
-            "name": obj.name,
-            "type": obj.type,
-            "location": list(obj.location),
-            "rotation": list(obj.rotation_euler),
-            "scale": list(obj.scale),
-        }
-        scene_data["objects"].append(obj_data)
-
-    # Define output path and save JSON
+    open_blend_file(blend_file_path)
+
+    # Define output path
     scene_name = Path(blend_file_path).stem
     json_path = os.path.join(export_path, f"{scene_name}.json")
     os.makedirs(export_path, exist_ok=True)
-    with open(json_path, 'w') as json_file:
-        json.dump(scene_data, json_file, indent=4)
-    print(f"Exported scene to JSON: {json_path}")
 
-def batch_export(directory, export_path, format="json"):
+    if stream:
+        count = write_json_stream(iter_scene_objects(), json_path, key="objects")
+        log(f"Exported scene to JSON ({count} objects streamed): {json_path}", "export.written", path=json_path, objects=count)
+        return json_path
+
+    # Gather scene data and save JSON
+    scene_data = {"objects": list(iter_scene_objects())}
+    json_codec.dump(scene_data, json_path)
+    log(f"Exported scene to JSON: {json_path}", "export.written", path=json_path, objects=len(scene_data["objects"]))
+    return json_path
+
+def select_affected(graph, changed, directory):
+    """
+    Narrows an export down to the .blend files affected by changed assets.
+
+    The dependency graph knows scenes and assets by name, not which .blend file
+    produces them, so a .blend file is taken to produce the scene or asset named
+    like its stem. If an affected scene has no such .blend file, or no affected
+    name has one, the affected files can't be told apart and all of them are exported.
+
+    Args:
+        graph (DependencyGraph): Up-to-date dependency graph.
+        changed (iterable): Changed asset names.
+        directory (str): Directory containing .blend files.
+
+    Returns:
+        list: Names to pass as ``only`` to ``batch_export``, or None to export every file.
+    """
+    affected = graph.rebuild_order(changed)
+    stems = {Path(path).stem for path in scan_directory(directory, include=["*.blend"]).paths()}
+    scenes = graph.scene_names()
+    unmapped = [name for name in affected if name in scenes and name not in stems]
+    if unmapped or not stems.intersection(affected):
+        unmapped = unmapped or affected
+        log(f"No .blend file is named after {', '.join(unmapped)}; exporting all files.", "export.affected_unmapped",
+            level="warning", assets=unmapped)
+        return None
+    log(f"Assets affected by the change: {', '.join(affected)}", "export.affected", assets=affected)
+    return affected
+
+def batch_export(directory, export_path, format="json", cache_dir=None, force=False, cache_max_size=None, stream=False, only=None):
     """
     Batch exports all Blender files in a directory to a specified format.
     
     Args:
         directory (str): Directory containing .blend files.
         export_path (str): Directory where exported files will be saved.
-        format (str): Export format ("json" or "fbx").
+        format (str): Export format ("json", "jsonl", "fbx", "bin" or "glb").
+        cache_dir (str, optional): Export cache directory; unchanged files are restored from it instead of re-exported.
+        force (bool): Re-export files even if the cache has their output.
+        cache_max_size (int, optional): Size cap in bytes for the export cache (least recently used entries are evicted).
+        stream (bool): Stream JSON exports object by object instead of building them in memory.
+        only (iterable, optional): Scene names to export; other .blend files (matched by file stem) are skipped.
     """
-    blend_files = [f for f in Path(directory).glob("**/*.blend")]
+    blend_files = [Path(f) for f in scan_directory(directory, include=["*.blend"]).paths()]
+    if only is not None:
+        only = set(only)
+        blend_files = [f for f in blend_files if f.stem in only]
 
     if not blend_files:
-        print("No .blend files found in the specified directory.")
+        log("No .blend files found in the specified directory.", "export.no_files", level="warning", directory=directory)
         return
 
+    exporters = {
+        "json": functools.partial(export_scene_to_json, stream=stream),
+        "jsonl": export_scene_to_jsonl,
+        "fbx": export_scene_to_fbx,
+        "bin": export_scene_to_binary,
+        "glb": export_scene_to_glb,
+    }
+    options = {"stream": True} if format == "json" and stream else {}
+    cache = ExportCache(cache_dir, max_size=cache_max_size) if cache_dir else None
     for blend_file in blend_files:
-        print(f"Processing file: {blend_file}")
-        if format == "json":
-            export_scene_to_json(str(blend_file), export_path)
-        elif format == "fbx":
-            export_scene_to_fbx(str(blend_file), export_path)
-        else:
-            print(f"Unsupported format: {format}. Only 'json' and 'fbx' are supported.")
+        log(f"Processing file: {blend_file}", "export.processing", file=str(blend_file))
+        if format not in exporters:
+            log(f"Unsupported format: {format}. Supported formats: {', '.join(exporters)}.", "export.unsupported_format",
+                level="error", format=format)
+            continue
+        with span("export.file", file=str(blend_file), format=format):
+            output_path, cache_hit = cached_export(exporters[format], str(blend_file), export_path, format, cache, force=force,
+                                                   options=options)
+        if cache_hit:
+            log(f"Restored from export cache: {output_path}", "export.cache_hit", path=output_path)
+
+    if cache is not None:
+        cache.prune()
+        cache.save()
+        log(f"Export cache: {cache.hits} hits, {cache.misses} misses.", "export.cache", hits=cache.hits, misses=cache.misses)
 
+@traced("export.fbx")
 def export_scene_to_fbx(blend_file_path, export_path):
     """
     Exports a Blender scene to FBX format.
@@ -66,9 +130,12 @@ def export_scene_to_fbx(blend_file_path, export_path):
     Args:
         blend_file_path (str): Path to the .blend file.
         export_path (str): Directory where the FBX file will be saved.
+    
+    Returns:
+        str: Path of the written FBX file.
     """
     # Open the blend file
-    bpy.ops.wm.open_mainfile(filepath=blend_file_path)
+    open_blend_file(blend_file_path)
     
     # Define output path
     scene_name = Path(blend_file_path).stem
@@ -77,15 +144,32 @@ def export_scene_to_fbx(blend_file_path, export_path):
     
     # Export scene to FBX
     bpy.ops.export_scene.fbx(filepath=fbx_path)
-    print(f"Exported scene to FBX: {fbx_path}")
+    log(f"Exported scene to FBX: {fbx_path}", "export.written", path=fbx_path)
+    return fbx_path
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description="Batch export Blender scenes to JSON or FBX.")
+    parser = argparse.ArgumentParser(description="Batch export Blender scenes to JSON, FBX, GLB or the binary scene format.")
     parser.add_argument("directory", type=str, help="Directory containing .blend files.")
     parser.add_argument("export_path", type=str, help="Directory to save exported files.")
-    parser.add_argument("--format", type=str, choices=["json", "fbx"], default="json", help="Export format (default: json).")
+    parser.add_argument("--format", type=str, choices=["json", "jsonl", "fbx", "bin", "glb"], default="json", help="Export format (default: json).")
+    parser.add_argument("--stream", action="store_true", help="Stream JSON exports object by object instead of building them in memory.")
+    parser.add_argument("--cache-dir", type=str, help="Reuse outputs of unchanged .blend files from this export cache.")
+    parser.add_argument("--force", action="store_true", help="Re-export every file even if it is cached.")
+    parser.add_argument("--cache-max-size", type=str, help="Size cap for the export cache, e.g. 20G (least recently used entries are evicted).")
+    parser.add_argument("--affected-by", nargs="+", help="Only export scenes that depend on these changed assets or files.")
+    parser.add_argument("--graph", type=str, default=DEPENDENCY_GRAPH_PATH, help=f"Dependency graph used by --affected-by (default: {DEPENDENCY_GRAPH_PATH}).")
 
+    add_profiling_arguments(parser)
     args = parser.parse_args()
 
-    # Run the batch export
-    batch_export(args.directory, args.export_path, args.format)
\ No newline at end of file
+    with profiling_from_arguments(args):
+        only = None
+        if args.affected_by:
+            graph, _ = load_dependency_graph(graph_path=args.graph)
+            changed = graph.names_for_files([item for item in args.affected_by if os.path.exists(item)])
+            changed.update(item for item in args.affected_by if not os.path.exists(item))
+            only = select_affected(graph, changed, args.directory)
+
+        # Run the batch export
+        cache_max_size = parse_size(args.cache_max_size) if args.cache_max_size else None
+        batch_export(args.directory, args.export_path, args.format, cache_dir=args.cache_dir, force=args.force, cache_max_size=cache_max_size, stream=args.stream, only=only)
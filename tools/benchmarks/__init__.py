@@ -0,0 +1,9 @@
+# Copyright 2024 chevp. All rights reserved.
+#
+# Benchmarks of the asset tooling hot paths, run from the ``tools`` directory:
+#
+#     python -m benchmarks --scale small --output bench_small.json
+#     python -m benchmarks --scale small --baseline bench_small.json --threshold 0.2
+#
+# ``synthetic`` generates asset libraries and scenes, ``cases`` registers the
+# timed cases and ``harness`` runs them, stores results and compares runs.
@@ -0,0 +1,43 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import (DEFAULT_THRESHOLD, METRICS, SCALES, compare_results, format_results, load_results,
+                                run_benchmarks, save_results)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark the asset tooling on synthetic libraries and scenes.")
+    parser.add_argument("--scale", choices=SCALES, default="small", help="Size of the generated data (default: small).")
+    parser.add_argument("--only", nargs="*", help="Only run benchmarks whose names start with these prefixes (e.g. manifest json.read).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per benchmark (default: 5).")
+    parser.add_argument("--workdir", type=str, help="Directory for the generated data (default: a temporary directory).")
+    parser.add_argument("--output", type=str, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=str, help="Compare against results of an earlier run.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help=f"Tolerated slowdown against the baseline (default: {DEFAULT_THRESHOLD}).")
+    parser.add_argument("--metric", choices=METRICS, default="min", help="Timing compared against the baseline (default: min).")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    results = run_benchmarks(args.scale, names=args.only, repeat=args.repeat, workdir=args.workdir)
+    if args.output:
+        save_results(results, args.output)
+        print(f"Results saved to {args.output}")
+
+    comparison = None
+    if args.baseline:
+        baseline = load_results(args.baseline)
+        if baseline is None:
+            sys.exit(f"Cannot read baseline {args.baseline}")
+        comparison = compare_results(baseline, results, threshold=args.threshold, metric=args.metric)
+    print(format_results(results, comparison))
+
+    regressions = [entry for entry in comparison or [] if entry["regression"]]
+    if regressions:
+        print(f"{len(regressions)} benchmarks regressed by more than {args.threshold:.0%}: {', '.join(entry['name'] for entry in regressions)}")
+        sys.exit(1)
@@ -0,0 +1,206 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import os
+import random
+import sys
+from benchmarks.harness import BenchmarkSkipped, benchmark
+from benchmarks.synthetic import make_asset_tree, make_manifest, make_scdf_scene, make_scene_objects
+from utils.json_utils import read_json, write_json_atomic
+
+FAKE_BPY_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "tests", "fake_bpy")
+
+SMALL_TREE = {"depth": 3, "fanout": 4, "files_per_directory": 5}
+MEDIUM_TREE = {"depth": 4, "fanout": 6, "files_per_directory": 5}
+LARGE_TREE = {"depth": 5, "fanout": 8, "files_per_directory": 4}
+
+def _manifest_file(workdir, entries):
+    path = os.path.join(workdir, "asset_manifest.json")
+    write_json_atomic(make_manifest(entries), path, indent=None)
+    return path
+
+@benchmark("manifest.load", small={"entries": 1_000}, medium={"entries": 100_000}, large={"entries": 1_000_000})
+def manifest_load(workdir, entries):
+    from asset_manager import Manifest
+    path = _manifest_file(workdir, entries)
+    return lambda: Manifest(path).refresh()
+
+@benchmark("manifest.lookup", small={"entries": 1_000, "lookups": 1_000}, medium={"entries": 100_000, "lookups": 10_000},
+           large={"entries": 1_000_000, "lookups": 100_000})
+def manifest_lookup(workdir, entries, lookups):
+    import asset_manager
+    asset_manager.set_manifest_backend(_manifest_file(workdir, entries))
+    names = [f"Asset{random.Random(index).randrange(entries):07d}" for index in range(lookups)]
+    asset_manager.find_asset_by_name(names[0])
+
+    def run():
+        for name in names:
+            asset_manager.find_asset_by_name(name)
+    return run, lambda: asset_manager.set_manifest_backend(None)
+
+@benchmark("manifest.update", small={"entries": 1_000, "updates": 100}, medium={"entries": 100_000, "updates": 1_000},
+           large={"entries": 1_000_000, "updates": 10_000})
+def manifest_update(workdir, entries, updates):
+    import asset_manager
+    asset_manager.set_manifest_backend(_manifest_file(workdir, entries))
+    counter = iter(range(1 << 30))
+
+    def run():
+        run_id = next(counter)
+        asset_manager.apply_changes([("update", f"Asset{index * (entries // updates):07d}", {"version": f"2.{run_id}.0"})
+                                     for index in range(updates)])
+    return run, lambda: asset_manager.set_manifest_backend(None)
+
+@benchmark("daemon.lookup", small={"entries": 1_000, "lookups": 1_000}, medium={"entries": 100_000, "lookups": 10_000},
+           large={"entries": 1_000_000, "lookups": 100_000})
+def daemon_lookup(workdir, entries, lookups):
+    import socket
+    if not hasattr(socket, "AF_UNIX"):
+        raise BenchmarkSkipped("Unix domain sockets are not available")
+    from asset_daemon import AssetDaemon
+    from utils.daemon_client import DaemonClient
+    daemon = AssetDaemon(workdir, _manifest_file(workdir, entries), os.path.join(workdir, "daemon.sock"), poll_interval=60)
+    daemon.start()
+    client = DaemonClient(daemon.socket_path)
+    names = [f"Asset{random.Random(index).randrange(entries):07d}" for index in range(lookups)]
+
+    def run():
+        for name in names:
+            client.request("manifest.get", asset_name=name)
+
+    def cleanup():
+        client.close()
+        daemon.stop()
+    return run, cleanup
+
+@benchmark("metadata.sweep", small=SMALL_TREE, medium=MEDIUM_TREE, large=LARGE_TREE)
+def metadata_sweep(workdir, depth, fanout, files_per_directory):
+    from metadata_generator import generate_metadata_for_directory
+    library = os.path.join(workdir, "assets")
+    make_asset_tree(library, depth, fanout, files_per_directory)
+    return lambda: generate_metadata_for_directory(library, "chevp", "texture")
+
+@benchmark("metadata.incremental_noop", small=SMALL_TREE, medium=MEDIUM_TREE, large=LARGE_TREE)
+def metadata_incremental_noop(workdir, depth, fanout, files_per_directory):
+    from metadata_generator import generate_metadata_incremental
+    library = os.path.join(workdir, "assets")
+    journal = os.path.join(workdir, "journal.json")
+    make_asset_tree(library, depth, fanout, files_per_directory)
+    generate_metadata_incremental(library, "chevp", "texture", journal_path=journal)
+    return lambda: generate_metadata_incremental(library, "chevp", "texture", journal_path=journal)
+
+@benchmark("scan.directory", small=SMALL_TREE, medium=MEDIUM_TREE, large=LARGE_TREE)
+def scan_directory_tree(workdir, depth, fanout, files_per_directory):
+    from utils.scanner import scan_directory
+    library = os.path.join(workdir, "assets")
+    make_asset_tree(library, depth, fanout, files_per_directory)
+    return lambda: scan_directory(library, include=["*.png", "*.blend"])
+
+@benchmark("json.write", small={"nodes": 10_000}, medium={"nodes": 100_000}, large={"nodes": 1_000_000})
+def json_write(workdir, nodes):
+    scene = make_scdf_scene(nodes)
+    path = os.path.join(workdir, "scene.scdf.json")
+    return lambda: write_json_atomic(scene, path, indent=None)
+
+@benchmark("json.write_pretty", small={"nodes": 10_000}, medium={"nodes": 100_000}, large={"nodes": 1_000_000})
+def json_write_pretty(workdir, nodes):
+    scene = make_scdf_scene(nodes)
+    path = os.path.join(workdir, "scene.scdf.json")
+    return lambda: write_json_atomic(scene, path)
+
+@benchmark("json.read", small={"nodes": 10_000}, medium={"nodes": 100_000}, large={"nodes": 1_000_000})
+def json_read(workdir, nodes):
+    path = os.path.join(workdir, "scene.scdf.json")
+    write_json_atomic(make_scdf_scene(nodes), path, indent=None)
+    return lambda: read_json(path)
+
+@benchmark("schema.validate", small={"nodes": 10_000}, medium={"nodes": 100_000}, large={"nodes": 1_000_000})
+def schema_validate(workdir, nodes):
+    from utils.schema_validator import DEFAULT_SCHEMA_MAP, load_schema
+    schema = load_schema(DEFAULT_SCHEMA_MAP["*.scdf.json"])
+    scene = make_scdf_scene(nodes)
+    errors = schema.validate(scene)
+    if errors:
+        raise RuntimeError(f"Synthetic scene is not valid SCDF: {errors[:3]}")
+    return lambda: schema.validate(scene)
+
+def _scene_graph(nodes):
+    from scdf import SceneGraph
+    return SceneGraph.from_scdf(make_scdf_scene(nodes))
+
+@benchmark("bvh.build", small={"nodes": 10_000}, medium={"nodes": 100_000}, large={"nodes": 1_000_000})
+def bvh_build(workdir, nodes):
+    from scdf.bvh import BVH
+    graph = _scene_graph(nodes)
+    graph.world_matrices()
+    return lambda: BVH.from_scene_graph(graph)
+
+@benchmark("bvh.refit", small={"nodes": 10_000}, medium={"nodes": 100_000}, large={"nodes": 1_000_000})
+def bvh_refit(workdir, nodes):
+    import numpy as np
+    from scdf.bvh import scene_bvh
+    graph = _scene_graph(nodes)
+    scene_bvh(graph)
+    moved = np.arange(1, nodes, 10)
+    offsets = iter(range(1 << 30))
+
+    def run():
+        graph.set_transforms(moved, position=np.full((len(moved), 3), next(offsets) % 7))
+        scene_bvh(graph)
+    return run
+
+@benchmark("bvh.query", small={"nodes": 10_000, "queries": 1_000}, medium={"nodes": 100_000, "queries": 10_000},
+           large={"nodes": 1_000_000, "queries": 100_000})
+def bvh_query(workdir, nodes, queries):
+    import numpy as np
+    from scdf.bvh import scene_bvh
+    bvh = scene_bvh(_scene_graph(nodes))
+    points = np.random.default_rng(0).uniform(-100, 100, (queries, 3))
+
+    def run():
+        bvh.query_boxes(points - 2, points + 2)
+        bvh.nearest(points, k=4)
+        bvh.ray_cast(points, np.tile([0.0, -1.0, 0.2], (queries, 1)))
+    return run
+
+def _exporter_setup(workdir, objects, export):
+    # The exporters need Blender's bpy; outside Blender they run against the stand-in used by the tests.
+    try:
+        import bpy
+    except ImportError:
+        if not os.path.isdir(FAKE_BPY_DIR):
+            raise BenchmarkSkipped("bpy is not available")
+        sys.path.insert(0, FAKE_BPY_DIR)
+        import bpy
+    try:
+        import scene_exporter
+    except ImportError as e:
+        raise BenchmarkSkipped(f"scene_exporter can't be imported: {e}")
+    if not hasattr(bpy, "load_objects"):
+        raise BenchmarkSkipped("exporter benchmarks need the fake bpy, not a real Blender")
+
+    # Load the objects once and make "opening" the .blend free, so only serialization is timed.
+    bpy.load_objects(make_scene_objects(objects))
+    open_mainfile = bpy.ops.wm.open_mainfile
+    bpy.ops.wm.open_mainfile = lambda filepath: None
+    blend_file = os.path.join(workdir, "scene_1.blend")
+    output_dir = os.path.join(workdir, "out")
+
+    def cleanup():
+        bpy.ops.wm.open_mainfile = open_mainfile
+    return lambda: getattr(scene_exporter, export)(blend_file, output_dir), cleanup
+
+@benchmark("export.json", small={"objects": 10_000}, medium={"objects": 100_000}, large={"objects": 1_000_000})
+def export_json(workdir, objects):
+    return _exporter_setup(workdir, objects, "export_scene_to_json")
+
+@benchmark("export.jsonl", small={"objects": 10_000}, medium={"objects": 100_000}, large={"objects": 1_000_000})
+def export_jsonl(workdir, objects):
+    return _exporter_setup(workdir, objects, "export_scene_to_jsonl")
+
+@benchmark("export.binary", small={"objects": 10_000}, medium={"objects": 100_000}, large={"objects": 1_000_000})
+def export_binary(workdir, objects):
+    return _exporter_setup(workdir, objects, "export_scene_to_binary")
+
+@benchmark("export.glb", small={"objects": 10_000}, medium={"objects": 100_000}, large={"objects": 1_000_000})
+def export_glb(workdir, objects):
+    return _exporter_setup(workdir, objects, "export_scene_to_glb")
@@ -0,0 +1,228 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import contextlib
+import gc
+import os
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+from datetime import datetime
+from utils import json_codec
+from utils.json_utils import read_json, write_json_atomic
+
+RESULTS_FORMAT_VERSION = 1
+SCALES = ("small", "medium", "large")
+DEFAULT_THRESHOLD = 0.2
+METRICS = ("min", "median", "mean")
+
+# Benchmark name -> Benchmark, filled by the ``benchmark`` decorator in ``cases``.
+BENCHMARKS = {}
+
+class BenchmarkSkipped(Exception):
+    """
+    Raised by a benchmark's setup when it can't run here (e.g. a missing optional dependency).
+    """
+
+class Benchmark:
+    """
+    A registered benchmark.
+
+    Args:
+        name (str): Dotted name, e.g. 'manifest.lookup'.
+        setup (callable): Called as ``setup(workdir, **params)``; prepares the data and returns
+            the function to time, or a ``(run, cleanup)`` tuple.
+        scales (dict): Scale name -> keyword parameters of ``setup``.
+    """
+
+    def __init__(self, name, setup, scales):
+        self.name = name
+        self.setup = setup
+        self.scales = scales
+
+def benchmark(name, **scales):
+    """
+    Registers a benchmark setup function with its parameters per scale.
+
+    Args:
+        name (str): Dotted benchmark name.
+        **scales: Scale name ('small', 'medium', 'large') -> dict of setup parameters.
+
+    Returns:
+        callable: The decorator.
+    """
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, scales)
+        return setup
+    return register
+
+def time_function(run, repeat=5):
+    """
+    Times a function several times with garbage collection disabled.
+
+    Args:
+        run (callable): Function without arguments.
+        repeat (int): Number of timed calls.
+
+    Returns:
+        list: Seconds per call.
+    """
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return timings
+
+def environment():
+    """
+    Returns:
+        dict: Facts about the machine and interpreter that affect timings.
+    """
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "json_backend": json_codec.BACKEND,
+    }
+
+def run_benchmarks(scale="small", names=None, repeat=5, workdir=None, quiet=True):
+    """
+    Runs the registered benchmarks at one scale.
+
+    Each benchmark prepares its data in a fresh directory below ``workdir``
+    (outside the timing), then its function is timed ``repeat`` times. The
+    tools' progress messages are discarded while timing unless ``quiet`` is False.
+
+    Args:
+        scale (str): One of SCALES.
+        names (iterable, optional): Only run benchmarks whose name starts with one of these prefixes.
+        repeat (int): Number of timed runs per benchmark.
+        workdir (str, optional): Directory for generated data (a temporary directory by default).
+        quiet (bool): Discard what the benchmarked functions print.
+
+    Returns:
+        dict: Results as written by ``save_results``.
+    """
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale: {scale}. Supported scales: {', '.join(SCALES)}.")
+    # Importing the cases registers them.
+    from benchmarks import cases
+
+    selected = [bench for name, bench in sorted(BENCHMARKS.items())
+                if scale in bench.scales and (not names or any(name.startswith(prefix) for prefix in names))]
+    results = {}
+    root = workdir or tempfile.mkdtemp(prefix="asset_benchmarks_")
+    try:
+        for bench in selected:
+            params = bench.scales[scale]
+            bench_dir = os.path.join(root, bench.name)
+            os.makedirs(bench_dir, exist_ok=True)
+            print(f"Running {bench.name} ({', '.join(f'{key}={value}' for key, value in params.items())})...")
+            with open(os.devnull, "w") as devnull, contextlib.ExitStack() as stack:
+                if quiet:
+                    stack.enter_context(contextlib.redirect_stdout(devnull))
+                try:
+                    prepared = bench.setup(bench_dir, **params)
+                except BenchmarkSkipped as e:
+                    results[bench.name] = {"params": params, "skipped": str(e)}
+                    continue
+                run, cleanup = prepared if isinstance(prepared, tuple) else (prepared, None)
+                try:
+                    timings = time_function(run, repeat)
+                finally:
+                    if cleanup is not None:
+                        cleanup()
+            results[bench.name] = {
+                "params": params,
+                "repeat": repeat,
+                "min": min(timings),
+                "median": statistics.median(timings),
+                "mean": statistics.fmean(timings),
+                "max": max(timings),
+            }
+            shutil.rmtree(bench_dir, ignore_errors=True)
+    finally:
+        if workdir is None:
+            shutil.rmtree(root, ignore_errors=True)
+    return {
+        "version": RESULTS_FORMAT_VERSION,
+        "scale": scale,
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "results": results,
+    }
+
+def save_results(results, path):
+    """
+    Writes benchmark results to a JSON file.
+    """
+    write_json_atomic(results, path)
+
+def load_results(path):
+    """
+    Returns:
+        dict: Results written by ``save_results``, or None if the file can't be read.
+    """
+    return read_json(path)
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD, metric="min"):
+    """
+    Compares two runs benchmark by benchmark.
+
+    Only benchmarks present (and not skipped) in both runs are compared. The
+    minimum is the default metric, as it is the least sensitive to noise from
+    other processes.
+
+    Args:
+        baseline (dict): Earlier results.
+        current (dict): New results.
+        threshold (float): Relative slowdown tolerated, e.g. 0.2 for 20%.
+        metric (str): One of METRICS.
+
+    Returns:
+        list: One dict per compared benchmark with ``name``, ``baseline``, ``current``,
+            ``change`` (relative) and ``regression`` (bool), sorted by name.
+
+    Raises:
+        ValueError: If the runs used different scales.
+    """
+    if baseline.get("scale") != current.get("scale"):
+        raise ValueError(f"Cannot compare a {current.get('scale')} run with a {baseline.get('scale')} baseline")
+    comparison = []
+    for name, result in sorted(current["results"].items()):
+        previous = baseline["results"].get(name)
+        if previous is None or metric not in previous or metric not in result:
+            continue
+        change = result[metric] / previous[metric] - 1 if previous[metric] else 0.0
+        comparison.append({"name": name, "baseline": previous[metric], "current": result[metric],
+                           "change": change, "regression": change > threshold})
+    return comparison
+
+def format_results(results, comparison=None):
+    """
+    Formats results (and optionally a comparison) as a text table.
+
+    Returns:
+        str: The table.
+    """
+    changes = {entry["name"]: entry for entry in comparison or []}
+    lines = [f"{'benchmark':<32} {'min':>10} {'median':>10} {'change':>9}"]
+    for name, result in sorted(results["results"].items()):
+        if "skipped" in result:
+            lines.append(f"{name:<32} skipped: {result['skipped']}")
+            continue
+        change = changes.get(name)
+        marker = "" if change is None else f"{change['change']:+8.1%}{'!' if change['regression'] else ' '}"
+        lines.append(f"{name:<32} {result['min'] * 1000:>8.2f}ms {result['median'] * 1000:>8.2f}ms {marker:>9}")
+    return "\n".join(lines)
@@ -0,0 +1,136 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import os
+import random
+
+ASSET_TYPES = ("texture", "3d_model", "material", "scene")
+ASSET_EXTENSIONS = {"texture": ".png", "3d_model": ".blend", "material": ".json", "scene": ".json"}
+MESH_NAMES = ("CubeModel", "TreeModel", "RockModel", "LampModel", "BushModel")
+
+def make_manifest(count, seed=0):
+    """
+    Generates an asset manifest.
+
+    Every asset depends on up to three earlier assets, so dependency queries
+    have realistic fan-in.
+
+    Args:
+        count (int): Number of assets.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        dict: Manifest in the JSON format (``{"assets": [...]}``).
+    """
+    rng = random.Random(seed)
+    assets = []
+    for index in range(count):
+        asset_type = ASSET_TYPES[index % len(ASSET_TYPES)]
+        name = f"Asset{index:07d}"
+        assets.append({
+            "name": name,
+            "type": asset_type,
+            "path": f"{asset_type}s/{name.lower()}/version_1/{name}{ASSET_EXTENSIONS[asset_type]}",
+            "version": f"1.{rng.randrange(10)}.0",
+            "author": "chevp",
+            "dependencies": [f"Asset{rng.randrange(index):07d}" for _ in range(min(index, rng.randrange(4)))],
+        })
+    return {"assets": assets}
+
+def make_scdf_scene(node_count, material_count=64, fanout=8, seed=0):
+    """
+    Generates an SCDF scene that is valid against the SCDF schema.
+
+    Nodes form a tree with ``fanout`` children per inner node below 'RootNode'.
+
+    Args:
+        node_count (int): Number of nodes, including the root.
+        material_count (int): Number of materials.
+        fanout (int): Children per inner node.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        dict: The SCDF document.
+    """
+    rng = random.Random(seed)
+    names = ["RootNode"] + [f"Node{index:07d}" for index in range(1, node_count)]
+    nodes = []
+    for index, name in enumerate(names):
+        node = {
+            "name": name,
+            "position": [round(rng.uniform(-100, 100), 3), 0, round(rng.uniform(-100, 100), 3)],
+            "rotation": [0, round(rng.uniform(0, 360), 2), 0],
+            "scale": [1, 1, 1],
+        }
+        children = names[index * fanout + 1:index * fanout + 1 + fanout]
+        if children:
+            node["children"] = children
+        else:
+            node["mesh"] = MESH_NAMES[index % len(MESH_NAMES)]
+            node["material"] = f"Material{index % material_count}"
+        nodes.append(node)
+    return {
+        "scene": {"root": "RootNode", "activeCamera": "MainCamera"},
+        "nodes": nodes,
+        "materials": [{"name": f"Material{index}", "type": "Phong", "color": [1, 0.5, 0.5], "texture": f"Texture{index}"}
+                      for index in range(material_count)],
+        "cameras": [{"name": "MainCamera", "position": [0, 5, 10], "rotation": [0, -30, 0], "fov": 45}],
+        "lights": [{"name": "SceneLight", "type": "point", "intensity": 1.0, "color": [1, 1, 1]}],
+        "metadata": {"author": "chevp", "version": "1.0", "description": f"Synthetic scene with {node_count} nodes"},
+    }
+
+def make_scene_objects(count, seed=0):
+    """
+    Generates the objects of a Blender scene, as loaded by the fake ``bpy``.
+
+    Args:
+        count (int): Number of objects.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        list: Object dicts with ``name``, ``type``, ``location``, ``rotation`` and ``scale``.
+    """
+    rng = random.Random(seed)
+    objects = []
+    for index in range(count):
+        mesh = MESH_NAMES[index % len(MESH_NAMES)]
+        objects.append({
+            "name": f"{mesh[:-5]}.{index:03d}" if index >= len(MESH_NAMES) else mesh[:-5],
+            "type": "LIGHT" if index % 97 == 0 else "MESH",
+            "location": [rng.uniform(-100, 100), rng.uniform(-100, 100), 0.0],
+            "rotation": [0.0, 0.0, rng.uniform(0, 6.283)],
+            "scale": [1.0, 1.0, 1.0],
+        })
+    return objects
+
+def make_asset_tree(root, depth, fanout, files_per_directory, file_size=256, seed=0):
+    """
+    Creates a directory tree of small asset files.
+
+    Every directory has ``fanout`` subdirectories down to ``depth`` levels and
+    ``files_per_directory`` files alternating between .png, .blend and .jpg.
+
+    Args:
+        root (str): Directory to create the tree in.
+        depth (int): Number of directory levels below ``root``.
+        fanout (int): Subdirectories per directory.
+        files_per_directory (int): Files per directory.
+        file_size (int): Size of each file in bytes.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        int: Number of files created.
+    """
+    rng = random.Random(seed)
+    extensions = (".png", ".blend", ".jpg")
+    created = 0
+    pending = [(root, 0)]
+    while pending:
+        directory, level = pending.pop()
+        os.makedirs(directory, exist_ok=True)
+        for index in range(files_per_directory):
+            with open(os.path.join(directory, f"asset_{index}{extensions[index % len(extensions)]}"), "wb") as f:
+                f.write(rng.randbytes(file_size))
+            created += 1
+        if level < depth:
+            pending.extend((os.path.join(directory, f"version_{index + 1}"), level + 1) for index in range(fanout))
+    return created
@@ -0,0 +1,75 @@
+# Copyright 2024 chevp. All rights reserved.
+#
+# Long-lived export worker, started by export_scheduler.py inside a headless Blender:
+#
+#     blender --background --factory-startup --python blender_worker.py
+#
+# Reads one JSON export request per line from stdin and answers each with a
+# single result line on stdout, so one Blender process can export many files.
+
+import os
+import sys
+import time
+import traceback
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from batch_export import export_scene_to_fbx, export_scene_to_json
+from export_scheduler import RESULT_PREFIX
+from scene_exporter import export_scene_to_binary, export_scene_to_glb, export_scene_to_jsonl
+from utils import json_codec
+
+EXPORTERS = {
+    "json": export_scene_to_json,
+    "jsonl": export_scene_to_jsonl,
+    "fbx": export_scene_to_fbx,
+    "bin": export_scene_to_binary,
+    "glb": export_scene_to_glb,
+}
+
+def handle_request(request):
+    """
+    Runs one export request.
+
+    Args:
+        request (dict): Request with ``id``, ``blend_file``, ``export_path`` and ``format``.
+
+    Returns:
+        dict: Result with ``id``, ``status`` ("ok" or "error"), ``output``, ``error`` and ``duration``.
+    """
+    start = time.perf_counter()
+    result = {"id": request.get("id"), "status": "ok", "output": None, "error": None}
+    try:
+        exporter = EXPORTERS.get(request["format"])
+        if exporter is None:
+            raise ValueError(f"Unsupported format: {request['format']}. Supported formats: {', '.join(EXPORTERS)}")
+        result["output"] = exporter(request["blend_file"], request["export_path"])
+    except Exception:
+        result["status"] = "error"
+        result["error"] = traceback.format_exc()
+    result["duration"] = time.perf_counter() - start
+    return result
+
+def serve(input_stream=None, output_stream=None):
+    """
+    Answers export requests until stdin is closed or a shutdown request arrives.
+
+    Args:
+        input_stream (file, optional): Stream to read requests from (defaults to stdin).
+        output_stream (file, optional): Stream to write results to (defaults to stdout).
+    """
+    input_stream = input_stream or sys.stdin
+    output_stream = output_stream or sys.stdout
+    for line in input_stream:
+        line = line.strip()
+        if not line:
+            continue
+        request = json_codec.loads(line)
+        if request.get("command") == "shutdown":
+            break
+        result = handle_request(request)
+        output_stream.write(RESULT_PREFIX + json_codec.dumps(result) + "\n")
+        output_stream.flush()
+
+if __name__ == "__main__":
+    serve()
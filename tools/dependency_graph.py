@@ -0,0 +1,329 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import os
+from collections import deque
+from pathlib import Path
+from metadata_generator import EXCLUDE_PATTERNS
+from utils.json_utils import read_json, write_json_atomic
+from utils.scanner import scan_directory
+from utils.instrumentation import add_profiling_arguments, log, profiling_from_arguments
+
+DEPENDENCY_GRAPH_PATH = "dependency_graph.json"
+METADATA_FILENAME = "metadata.json"
+GRAPH_FORMAT_VERSION = 1
+
+def _scene_formats():
+    # Imported lazily: the scene readers are only needed when a scene file changed.
+    from scdf import convert
+    return convert
+
+def is_scene_file(file_path):
+    """
+    Returns:
+        bool: True if the file is a scene in one of the formats of scdf.convert.
+    """
+    try:
+        _scene_formats().detect_format(file_path)
+    except ValueError:
+        return False
+    return True
+
+def scene_dependencies(scene_path):
+    """
+    Extracts the dependency edges of a scene file.
+
+    A scene depends on the meshes, materials and lights its nodes reference, on
+    the materials it defines and on its linked scenes; each material depends on
+    its texture.
+
+    Args:
+        scene_path (str): Path to a scene file in any format supported by scdf.convert.
+
+    Returns:
+        tuple: ``(scene_name, edges)`` where ``edges`` is a list of ``(dependent, dependency)`` names.
+    """
+    convert = _scene_formats()
+    scene = convert.read_scene(scene_path)
+    name = convert.scene_basename(scene_path)
+    edges = []
+    for node in scene.get("nodes") or []:
+        for key in ("mesh", "geometry", "material", "light"):
+            if isinstance(node.get(key), str):
+                edges.append((name, node[key]))
+    for material in scene.get("materials") or []:
+        edges.append((name, material["name"]))
+        if material.get("texture"):
+            edges.append((material["name"], material["texture"]))
+    for linked in scene.get("linkedScenes") or []:
+        edges.append((name, linked.get("name") or convert.scene_basename(linked["path"])))
+    return name, edges
+
+def metadata_dependencies(metadata_path):
+    """
+    Extracts the dependency edges recorded in a metadata.json file.
+
+    Args:
+        metadata_path (str): Path to the metadata file.
+
+    Returns:
+        tuple: ``(asset_name, edges)``; the name is None if the file has no usable metadata.
+    """
+    metadata = read_json(metadata_path)
+    if not isinstance(metadata, dict) or not metadata.get("name"):
+        return None, []
+    edges = []
+    for dependency in metadata.get("dependencies") or []:
+        dependency = dependency.get("name") if isinstance(dependency, dict) else dependency
+        if dependency:
+            edges.append((metadata["name"], dependency))
+    return metadata["name"], edges
+
+class DependencyGraph:
+    """
+    Graph of which assets depend on which, built from scene and metadata files.
+
+    Every source file contributes a set of ``(dependent, dependency)`` edges. The
+    graph keeps forward (``dependencies``) and reverse (``dependents``) indexes
+    and, per source file, its size/mtime signature and edges, so ``update`` only
+    re-reads files that changed and patches the indexes with their difference.
+    An edge contributed by several files is counted and only disappears when the
+    last of them drops it.
+
+    Args:
+        graph_path (str, optional): JSON file the graph is loaded from and saved to
+            (defaults to DEPENDENCY_GRAPH_PATH).
+        roots (list, optional): Directories scanned for scene and metadata files; defaults
+            to the roots stored in the graph file.
+    """
+
+    def __init__(self, graph_path=None, roots=None):
+        self.graph_path = graph_path or DEPENDENCY_GRAPH_PATH
+        data = read_json(self.graph_path) if os.path.exists(self.graph_path) else None
+        if not isinstance(data, dict) or data.get("version") != GRAPH_FORMAT_VERSION:
+            data = {}
+        self.roots = [os.path.abspath(root) for root in roots] if roots else data.get("roots", [])
+        self.files = data.get("files", {})
+        self.dependencies = {name: dict(counts) for name, counts in data.get("dependencies", {}).items()}
+        self.dependents = {name: set(names) for name, names in data.get("dependents", {}).items()}
+        self.provided = {name: set(paths) for name, paths in data.get("provided", {}).items()}
+
+    def _add_edge(self, dependent, dependency):
+        counts = self.dependencies.setdefault(dependent, {})
+        counts[dependency] = counts.get(dependency, 0) + 1
+        self.dependents.setdefault(dependency, set()).add(dependent)
+
+    def _remove_edge(self, dependent, dependency):
+        counts = self.dependencies.get(dependent, {})
+        if dependency not in counts:
+            return
+        counts[dependency] -= 1
+        if counts[dependency] <= 0:
+            del counts[dependency]
+            if not counts:
+                del self.dependencies[dependent]
+            self.dependents[dependency].discard(dependent)
+            if not self.dependents[dependency]:
+                del self.dependents[dependency]
+
+    def _set_file(self, file_path, name, edges, signature):
+        self._drop_file(file_path)
+        self.files[file_path] = {"signature": signature, "name": name, "edges": [list(edge) for edge in edges]}
+        for dependent, dependency in edges:
+            self._add_edge(dependent, dependency)
+        if name:
+            self.provided.setdefault(name, set()).add(file_path)
+
+    def _drop_file(self, file_path):
+        entry = self.files.pop(file_path, None)
+        if entry is None:
+            return None
+        for dependent, dependency in entry["edges"]:
+            self._remove_edge(dependent, dependency)
+        paths = self.provided.get(entry["name"])
+        if paths is not None:
+            paths.discard(file_path)
+            if not paths:
+                del self.provided[entry["name"]]
+        return entry
+
+    def _source_files(self):
+        # The same walk as the metadata scans: generated texture artifacts are left out.
+        include = [METADATA_FILENAME] + _scene_formats().SCENE_PATTERNS
+        for root in self.roots:
+            yield from scan_directory(root, include=include, exclude=EXCLUDE_PATTERNS)
+
+    def update(self):
+        """
+        Brings the graph up to date with the scene and metadata files under the roots.
+
+        Only files whose size or mtime changed are parsed again.
+
+        Returns:
+            set: Names of the assets whose own dependencies changed (including removed files).
+        """
+        changed = set()
+        seen = set()
+        for file_entry in self._source_files():
+            file_path = file_entry.path
+            seen.add(file_path)
+            signature = [file_entry.mtime_ns, file_entry.size]
+            entry = self.files.get(file_path)
+            if entry is not None and entry["signature"] == signature:
+                continue
+            try:
+                if os.path.basename(file_path) == METADATA_FILENAME:
+                    name, edges = metadata_dependencies(file_path)
+                else:
+                    name, edges = scene_dependencies(file_path)
+            except _scene_formats().SCENE_ERRORS as e:
+                log(f"Skipping {file_path}: {e}", "graph.skipped", level="warning", path=file_path)
+                name, edges = None, []
+            if entry is None or entry["name"] != name or sorted(entry["edges"]) != sorted(list(edge) for edge in edges):
+                changed.update(filter(None, (name, entry and entry["name"])))
+            self._set_file(file_path, name, edges, signature)
+        for file_path in [path for path in self.files if path not in seen]:
+            entry = self._drop_file(file_path)
+            if entry["name"]:
+                changed.add(entry["name"])
+        return changed
+
+    def scene_names(self):
+        """
+        Returns:
+            set: Names of the scenes read from scene files (as opposed to assets described by metadata).
+        """
+        return {entry["name"] for path, entry in self.files.items()
+                if entry["name"] and os.path.basename(path) != METADATA_FILENAME}
+
+    def names_for_files(self, file_paths):
+        """
+        Maps changed files to the asset names they stand for.
+
+        Scene and metadata files map to the asset they describe; any other file
+        (a texture, a model, a .blend) maps to its stem, e.g. 'CubeTexture.png' -> 'CubeTexture'.
+
+        Args:
+            file_paths (iterable): Paths of changed files.
+
+        Returns:
+            set: Asset names.
+        """
+        names = set()
+        for file_path in file_paths:
+            entry = self.files.get(os.path.abspath(file_path)) or self.files.get(file_path)
+            if entry is not None and entry["name"]:
+                names.add(entry["name"])
+            elif is_scene_file(file_path):
+                names.add(_scene_formats().scene_basename(file_path))
+            else:
+                names.add(Path(file_path).stem)
+        return names
+
+    def affected(self, names):
+        """
+        Returns every asset that transitively depends on one of ``names``, including them.
+
+        Args:
+            names (iterable): Changed asset names.
+
+        Returns:
+            set: Asset names.
+        """
+        affected = set(names)
+        queue = deque(affected)
+        while queue:
+            for dependent in self.dependents.get(queue.popleft(), ()):
+                if dependent not in affected:
+                    affected.add(dependent)
+                    queue.append(dependent)
+        return affected
+
+    def rebuild_order(self, names):
+        """
+        Computes the minimal set of assets to rebuild after ``names`` changed, in build order.
+
+        Every asset comes after all of its (affected) dependencies; assets that
+        don't depend on a changed asset are left out.
+
+        Args:
+            names (iterable): Changed asset names.
+
+        Returns:
+            list: Asset names in topological order.
+
+        Raises:
+            ValueError: If the affected assets depend on each other in a cycle.
+        """
+        affected = self.affected(names)
+        pending = {name: sum(1 for dependency in self.dependencies.get(name, {}) if dependency in affected) for name in affected}
+        ready = deque(sorted(name for name, count in pending.items() if count == 0))
+        order = []
+        while ready:
+            name = ready.popleft()
+            order.append(name)
+            for dependent in sorted(self.dependents.get(name, ())):
+                if dependent in pending:
+                    pending[dependent] -= 1
+                    if pending[dependent] == 0:
+                        ready.append(dependent)
+        if len(order) != len(affected):
+            cyclic = sorted(name for name in affected if name not in order)
+            raise ValueError(f"Dependency cycle between: {', '.join(cyclic)}")
+        return order
+
+    def save(self):
+        """
+        Persists the graph, its indexes and the file signatures.
+        """
+        write_json_atomic({
+            "version": GRAPH_FORMAT_VERSION,
+            "roots": self.roots,
+            "files": self.files,
+            "dependencies": self.dependencies,
+            "dependents": {name: sorted(names) for name, names in self.dependents.items()},
+            "provided": {name: sorted(paths) for name, paths in self.provided.items()},
+        }, self.graph_path, indent=None)
+
+def load_dependency_graph(roots=None, graph_path=None):
+    """
+    Loads the persisted dependency graph, updates it from the files on disk and saves it.
+
+    Args:
+        roots (list, optional): Directories to scan (defaults to the roots stored in the graph).
+        graph_path (str, optional): Graph file (defaults to DEPENDENCY_GRAPH_PATH).
+
+    Returns:
+        tuple: ``(graph, changed)`` with the updated graph and the names whose dependencies changed.
+    """
+    graph = DependencyGraph(graph_path, roots)
+    changed = graph.update()
+    graph.save()
+    return graph, changed
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Build the asset dependency graph and compute rebuild sets.")
+    parser.add_argument("--graph", type=str, default=DEPENDENCY_GRAPH_PATH, help=f"Dependency graph file (default: {DEPENDENCY_GRAPH_PATH}).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build = subparsers.add_parser("update", help="Scan scene and metadata files and update the graph.")
+    build.add_argument("roots", nargs="*", help="Directories to scan (default: the directories of the previous run).")
+
+    affected = subparsers.add_parser("affected", help="List what must be rebuilt when assets or files change, in build order.")
+    affected.add_argument("changed", nargs="+", help="Changed asset names or file paths.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        if args.command == "update":
+            graph, changed = load_dependency_graph(args.roots or None, args.graph)
+            print(f"Dependency graph updated: {len(graph.files)} source files, {len(changed)} assets changed.")
+        else:
+            graph, _ = load_dependency_graph(graph_path=args.graph)
+            names = graph.names_for_files([item for item in args.changed if os.path.exists(item)])
+            names.update(item for item in args.changed if not os.path.exists(item))
+            for name in graph.rebuild_order(names):
+                print(name)
@@ -0,0 +1,248 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import hashlib
+import os
+import shutil
+import time
+from pathlib import Path
+from utils.digest_cache import DigestCache
+from utils.json_utils import read_json, write_json_atomic
+from utils.instrumentation import add_profiling_arguments, profiling_from_arguments
+
+# Bump whenever batch_export.py or scene_exporter.py change what they write, so
+# outputs cached by an older exporter are no longer reused.
+EXPORTER_VERSION = "2"
+
+# The index is written after this many stores, so an interrupted run loses at most
+# this many entries (whose objects ``prune`` then removes).
+SAVE_INTERVAL = 16
+
+SIZE_SUFFIXES = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30, "T": 1 << 40}
+
+def parse_size(value):
+    """
+    Parses a size such as '512M' or '20G' into bytes.
+
+    Args:
+        value (str): Number of bytes, optionally with a K, M, G or T suffix.
+
+    Returns:
+        int: Size in bytes.
+    """
+    value = str(value).strip().upper().rstrip("B")
+    if value and value[-1] in SIZE_SUFFIXES:
+        return int(float(value[:-1]) * SIZE_SUFFIXES[value[-1]])
+    return int(value)
+
+def _link_or_copy(src, dest):
+    if os.path.lexists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copy2(src, dest)
+
+class ExportCache:
+    """
+    Content-addressed cache of exporter outputs.
+
+    Entries are keyed by the digest of the .blend file, the export format and the
+    exporter version, so an unchanged file exported by an unchanged exporter is
+    restored from the cache instead of being opened in Blender. Outputs are
+    hard-linked into and out of the cache where the filesystem allows it, and
+    copied otherwise. ``prune`` evicts the least recently used entries once the
+    cache grows beyond ``max_size`` bytes, and removes stored outputs the index
+    doesn't know about (left by a run that was interrupted before saving it).
+
+    Args:
+        cache_dir (str): Directory holding the cache.
+        max_size (int, optional): Size cap in bytes applied by ``prune``.
+        exporter_version (str): Version string mixed into every key.
+    """
+
+    def __init__(self, cache_dir, max_size=None, exporter_version=EXPORTER_VERSION):
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.exporter_version = exporter_version
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.entries = (read_json(self.index_path) or {}).get("entries", {}) if os.path.exists(self.index_path) else {}
+        self.digests = DigestCache(os.path.join(cache_dir, "digests.json"))
+        self.hits = 0
+        self.misses = 0
+        self.unsaved = 0
+
+    def key(self, blend_file, format, options=None):
+        """
+        Computes the cache key of an export.
+
+        Args:
+            blend_file (str): Path to the .blend file.
+            format (str): Export format.
+            options (dict, optional): Exporter options that change the output (e.g. ``{"instancing": True}``).
+
+        Returns:
+            str: Hex digest identifying the export.
+        """
+        content_digest = self.digests.digest(blend_file)
+        key = f"{content_digest}|{format}|{self.exporter_version}"
+        if options:
+            key += "|" + ",".join(f"{name}={value!r}" for name, value in sorted(options.items()))
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, "objects", key[:2], key)
+
+    def restore(self, key, export_path):
+        """
+        Places the cached outputs of an export into ``export_path``.
+
+        Args:
+            key (str): Cache key from ``key``.
+            export_path (str): Directory the outputs are restored to.
+
+        Returns:
+            list: Restored output paths, or None on a cache miss.
+        """
+        entry = self.entries.get(key)
+        entry_dir = self._entry_dir(key)
+        if entry is None or not all(os.path.exists(os.path.join(entry_dir, name)) for name in entry["files"]):
+            self.misses += 1
+            return None
+        os.makedirs(export_path, exist_ok=True)
+        restored = []
+        for name in entry["files"]:
+            dest = os.path.join(export_path, name)
+            _link_or_copy(os.path.join(entry_dir, name), dest)
+            restored.append(dest)
+        entry["last_used"] = time.time()
+        self.hits += 1
+        return restored
+
+    def store(self, key, output_paths):
+        """
+        Adds the outputs of an export to the cache.
+
+        The index is saved every ``SAVE_INTERVAL`` stores.
+
+        Args:
+            key (str): Cache key from ``key``.
+            output_paths (list): Files written by the exporter.
+        """
+        entry_dir = self._entry_dir(key)
+        os.makedirs(entry_dir, exist_ok=True)
+        files = []
+        size = 0
+        for output_path in output_paths:
+            name = os.path.basename(output_path)
+            _link_or_copy(output_path, os.path.join(entry_dir, name))
+            files.append(name)
+            size += os.path.getsize(output_path)
+        self.entries[key] = {"files": files, "size": size, "last_used": time.time()}
+        self.unsaved += 1
+        if self.unsaved >= SAVE_INTERVAL:
+            self.save()
+
+    def total_size(self):
+        """
+        Returns:
+            int: Combined size in bytes of all cached outputs.
+        """
+        return sum(entry["size"] for entry in self.entries.values())
+
+    def _remove_unindexed(self):
+        objects_dir = os.path.join(self.cache_dir, "objects")
+        if not os.path.isdir(objects_dir):
+            return
+        for prefix in os.scandir(objects_dir):
+            if not prefix.is_dir():
+                continue
+            for entry_dir in os.scandir(prefix.path):
+                if entry_dir.name not in self.entries:
+                    shutil.rmtree(entry_dir.path, ignore_errors=True)
+
+    def prune(self, max_size=None):
+        """
+        Removes stored outputs without an index entry, then evicts least recently
+        used entries until the cache fits in ``max_size`` bytes.
+
+        Must not run while another process is storing into the same cache, whose
+        new outputs aren't in this index yet.
+
+        Args:
+            max_size (int, optional): Size cap in bytes (defaults to the cache's ``max_size``).
+
+        Returns:
+            int: Number of evicted entries.
+        """
+        self._remove_unindexed()
+        max_size = self.max_size if max_size is None else max_size
+        if max_size is None:
+            return 0
+        total = self.total_size()
+        evicted = 0
+        for key, entry in sorted(self.entries.items(), key=lambda item: item[1]["last_used"]):
+            if total <= max_size:
+                break
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            del self.entries[key]
+            total -= entry["size"]
+            evicted += 1
+        return evicted
+
+    def save(self):
+        """
+        Persists the cache index and the digest cache.
+        """
+        write_json_atomic({"entries": self.entries}, self.index_path, indent=None)
+        self.digests.save()
+        self.unsaved = 0
+
+def cached_export(exporter, blend_file, export_path, format, cache, force=False, options=None):
+    """
+    Runs an exporter unless its output for this file is already cached.
+
+    Args:
+        exporter (callable): Exporter taking ``(blend_file, export_path)`` and returning the written path.
+        blend_file (str): Path to the .blend file.
+        export_path (str): Directory where exported files will be saved.
+        format (str): Export format, part of the cache key.
+        cache (ExportCache): Cache to consult and fill, or None to always export.
+        force (bool): Export even on a cache hit (the cache is refreshed with the new output).
+        options (dict, optional): Options the exporter was bound with, part of the cache key.
+
+    Returns:
+        tuple: ``(output_path, cache_hit)``.
+    """
+    if cache is None:
+        return exporter(blend_file, export_path), False
+    key = cache.key(blend_file, format, options)
+    if not force:
+        restored = cache.restore(key, export_path)
+        if restored:
+            return restored[0], True
+    # Outputs are hard-linked with the cache, so the exporter must not write into a shared inode.
+    previous_output = os.path.join(export_path, f"{Path(blend_file).stem}.{format}")
+    if os.path.exists(previous_output) and os.stat(previous_output).st_nlink > 1:
+        os.remove(previous_output)
+    output_path = exporter(blend_file, export_path)
+    cache.store(key, [output_path])
+    return output_path, False
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Inspect and prune the export cache.")
+    parser.add_argument("cache_dir", type=str, help="Directory holding the export cache.")
+    parser.add_argument("--max-size", type=str, help="Evict least recently used entries until the cache fits (e.g. 20G).")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        cache = ExportCache(args.cache_dir)
+        if args.max_size:
+            evicted = cache.prune(parse_size(args.max_size))
+            cache.save()
+            print(f"Evicted {evicted} cache entries.")
+        print(f"Export cache at {args.cache_dir}: {len(cache.entries)} entries, {cache.total_size()} bytes.")
@@ -0,0 +1,383 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import collections
+import itertools
+import os
+import queue
+import subprocess
+import threading
+import time
+from pathlib import Path
+from export_cache import ExportCache, parse_size
+from utils import json_codec
+from utils.scanner import scan_directory
+from utils.instrumentation import add_profiling_arguments, log, profiling_from_arguments
+
+RESULT_PREFIX = "@@EXPORT_RESULT "
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "blender_worker.py")
+DEFAULT_BLENDER = "blender"
+
+def blender_worker_command(blender=DEFAULT_BLENDER):
+    """
+    Builds the command line that starts a headless Blender export worker.
+
+    Args:
+        blender (str): Path to the Blender executable.
+
+    Returns:
+        list: Command line arguments.
+    """
+    return [blender, "--background", "--factory-startup", "--python", WORKER_SCRIPT]
+
+class WorkerError(Exception):
+    """
+    Raised when a worker process dies or stops answering.
+    """
+
+class WorkerTimeout(WorkerError):
+    """
+    Raised when a worker doesn't finish a request within the timeout.
+    """
+
+class BlenderWorker:
+    """
+    A long-lived worker process that exports one file per request.
+
+    Requests are written to the worker's stdin as JSON lines; result lines are
+    picked out of its stdout by ``RESULT_PREFIX``, so anything else Blender prints
+    is ignored (the last lines are kept for error messages).
+
+    Args:
+        command (list): Command line that starts the worker.
+        env (dict, optional): Environment for the worker process.
+    """
+
+    def __init__(self, command, env=None):
+        self.command = command
+        self.tasks_done = 0
+        self.output_tail = collections.deque(maxlen=20)
+        self._results = queue.Queue()
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+            env=env,
+        )
+        self._reader = threading.Thread(target=self._read_output, daemon=True)
+        self._reader.start()
+
+    def _read_output(self):
+        for line in self.process.stdout:
+            index = line.find(RESULT_PREFIX)
+            if index < 0:
+                self.output_tail.append(line.rstrip())
+                continue
+            try:
+                self._results.put(json_codec.loads(line[index + len(RESULT_PREFIX):]))
+            except json_codec.JSONDecodeError:
+                self.output_tail.append(line.rstrip())
+        self._results.put(None)
+
+    @property
+    def alive(self):
+        """
+        bool: True while the worker process is running.
+        """
+        return self.process.poll() is None
+
+    def run(self, request, timeout=None):
+        """
+        Sends a request to the worker and waits for its result.
+
+        Args:
+            request (dict): Export request (see ``blender_worker.handle_request``).
+            timeout (float, optional): Seconds to wait for the result.
+
+        Returns:
+            dict: The worker's result.
+
+        Raises:
+            WorkerTimeout: If no result arrives within ``timeout``.
+            WorkerError: If the worker process exits or can't be written to.
+        """
+        try:
+            self.process.stdin.write(json_codec.dumps(request) + "\n")
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as e:
+            raise WorkerError(f"Worker is not accepting requests: {e}") from e
+        while True:
+            try:
+                result = self._results.get(timeout=timeout)
+            except queue.Empty:
+                raise WorkerTimeout(f"No result after {timeout} seconds.") from None
+            if result is None:
+                tail = "\n".join(self.output_tail)
+                raise WorkerError(f"Worker exited with code {self.process.wait()}.\n{tail}".rstrip())
+            if result.get("id") == request.get("id"):
+                self.tasks_done += 1
+                return result
+
+    def stop(self, grace_period=5.0):
+        """
+        Asks the worker to shut down, killing it if it doesn't exit in time.
+
+        Args:
+            grace_period (float): Seconds to wait for a clean exit.
+        """
+        if self.alive:
+            try:
+                self.process.stdin.write(json_codec.dumps({"command": "shutdown"}) + "\n")
+                self.process.stdin.close()
+            except (BrokenPipeError, OSError):
+                pass
+            try:
+                self.process.wait(timeout=grace_period)
+            except subprocess.TimeoutExpired:
+                self.kill()
+        self._reader.join(timeout=grace_period)
+
+    def kill(self):
+        """
+        Kills the worker process immediately.
+        """
+        if self.alive:
+            self.process.kill()
+        self.process.wait()
+
+def _result(blend_file, status, output=None, error=None, duration=None, attempts=1):
+    return {
+        "blend_file": blend_file,
+        "status": status,
+        "output": output,
+        "error": error,
+        "duration": duration,
+        "attempts": attempts,
+    }
+
+class ExportScheduler:
+    """
+    Fans export jobs out to a pool of long-lived worker processes.
+
+    Files are handed out largest first, so the biggest scenes don't end up last
+    on a single worker. A worker that times out or dies is killed and replaced,
+    and its file is retried up to ``retries`` times. Workers are recycled after
+    ``max_tasks_per_worker`` files to bound memory growth inside Blender.
+
+    Args:
+        worker_command (list, optional): Command that starts a worker (defaults to headless Blender).
+        workers (int, optional): Number of worker processes (defaults to the CPU count).
+        timeout (float, optional): Seconds a single export may take before its worker is killed.
+        retries (int): How often a file is retried after a worker timeout or crash.
+        max_tasks_per_worker (int, optional): Files exported before a worker is restarted.
+        env (dict, optional): Environment for the worker processes.
+    """
+
+    def __init__(self, worker_command=None, workers=None, timeout=600.0, retries=1, max_tasks_per_worker=None, env=None):
+        self.worker_command = worker_command or blender_worker_command()
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.retries = retries
+        self.max_tasks_per_worker = max_tasks_per_worker
+        self.env = env
+        self._ids = itertools.count()
+
+    def run(self, blend_files, export_path, format="json"):
+        """
+        Exports the given files and waits until all of them are done.
+
+        Args:
+            blend_files (list): Paths of the .blend files to export.
+            export_path (str): Directory where exported files will be saved.
+            format (str): Export format ("json", "jsonl", "fbx", "bin" or "glb").
+
+        Returns:
+            dict: Summary with ``total``, ``succeeded``, ``failed``, ``duration`` and the
+                per-file ``results`` (in the order the files were passed in).
+        """
+        start = time.perf_counter()
+        ordered = sorted((str(path) for path in blend_files), key=_file_size, reverse=True)
+        tasks = collections.deque({"blend_file": path, "attempts": 0} for path in ordered)
+        results = {}
+        lock = threading.Lock()
+
+        threads = [
+            threading.Thread(target=self._work, args=(tasks, results, lock, export_path, format), daemon=True)
+            for _ in range(min(self.workers, len(tasks)))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        # A file is only missing if its worker thread died unexpectedly; report it rather than fail the run.
+        ordered_results = [results.get(str(path)) or _result(str(path), "error", error="Export did not run", attempts=0)
+                           for path in blend_files]
+        succeeded = sum(1 for result in ordered_results if result["status"] == "ok")
+        return {
+            "total": len(ordered_results),
+            "succeeded": succeeded,
+            "failed": len(ordered_results) - succeeded,
+            "duration": time.perf_counter() - start,
+            "results": ordered_results,
+        }
+
+    def _work(self, tasks, results, lock, export_path, format):
+        worker = None
+        try:
+            while True:
+                with lock:
+                    if not tasks:
+                        return
+                    task = tasks.popleft()
+                task["attempts"] += 1
+                if worker is None or not worker.alive:
+                    try:
+                        worker = BlenderWorker(self.worker_command, env=self.env)
+                    except OSError as e:
+                        # Blender is missing or can't be started; every file this thread takes fails the same way.
+                        worker = None
+                        with lock:
+                            results[task["blend_file"]] = _result(task["blend_file"], "error", attempts=task["attempts"],
+                                                                  error=f"Could not start worker {self.worker_command[0]}: {e}")
+                        continue
+
+                request = {
+                    "id": next(self._ids),
+                    "blend_file": task["blend_file"],
+                    "export_path": export_path,
+                    "format": format,
+                }
+                try:
+                    result = worker.run(request, timeout=self.timeout)
+                except WorkerError as e:
+                    worker.kill()
+                    worker = None
+                    if task["attempts"] <= self.retries:
+                        with lock:
+                            tasks.append(task)
+                        continue
+                    status = "timeout" if isinstance(e, WorkerTimeout) else "crashed"
+                    result = {"status": status, "output": None, "error": str(e), "duration": None}
+
+                with lock:
+                    results[task["blend_file"]] = _result(task["blend_file"], result["status"], result["output"], result["error"],
+                                                          result["duration"], task["attempts"])
+                if worker is not None and self.max_tasks_per_worker and worker.tasks_done >= self.max_tasks_per_worker:
+                    worker.stop()
+                    worker = None
+        finally:
+            if worker is not None:
+                worker.stop()
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def scheduled_batch_export(directory, export_path, format="json", cache_dir=None, force=False, cache_max_size=None, **scheduler_options):
+    """
+    Exports every .blend file under a directory through a pool of Blender workers.
+
+    Args:
+        directory (str): Directory containing .blend files.
+        export_path (str): Directory where exported files will be saved.
+        format (str): Export format ("json", "jsonl", "fbx", "bin" or "glb").
+        cache_dir (str, optional): Export cache directory; cached files are restored without starting a worker.
+        force (bool): Re-export files even if the cache has their output.
+        cache_max_size (int, optional): Size cap in bytes for the export cache.
+        **scheduler_options: Options passed on to ``ExportScheduler``.
+
+    Returns:
+        dict: Summary as returned by ``ExportScheduler.run``, plus the number of ``cached`` files.
+    """
+    blend_files = scan_directory(directory, include=["*.blend"]).paths()
+    if not blend_files:
+        log("No .blend files found in the specified directory.", "export.no_files", level="warning", directory=directory)
+        return {"total": 0, "succeeded": 0, "failed": 0, "cached": 0, "duration": 0.0, "results": []}
+
+    start = time.perf_counter()
+    cache = ExportCache(cache_dir, max_size=cache_max_size) if cache_dir else None
+    keys = {}
+    cached_results = {}
+    if cache is not None:
+        for blend_file in blend_files:
+            keys[blend_file] = cache.key(blend_file, format)
+            restored = None if force else cache.restore(keys[blend_file], export_path)
+            if restored:
+                cached_results[blend_file] = {"blend_file": blend_file, "status": "cached", "output": restored[0],
+                                              "error": None, "duration": 0.0, "attempts": 0}
+            else:
+                # Outputs are hard-linked with the cache, so workers must not write into a shared inode.
+                previous_output = os.path.join(export_path, f"{Path(blend_file).stem}.{format}")
+                if os.path.exists(previous_output) and os.stat(previous_output).st_nlink > 1:
+                    os.remove(previous_output)
+
+    pending = [blend_file for blend_file in blend_files if blend_file not in cached_results]
+    summary = ExportScheduler(**scheduler_options).run(pending, export_path, format) if pending else {"results": []}
+    exported = {result["blend_file"]: result for result in summary["results"]}
+    if cache is not None:
+        for blend_file, result in exported.items():
+            if result["status"] == "ok":
+                cache.store(keys[blend_file], [result["output"]])
+        cache.prune()
+        cache.save()
+
+    results = [cached_results.get(blend_file) or exported[blend_file] for blend_file in blend_files]
+    succeeded = sum(1 for result in results if result["status"] in ("ok", "cached"))
+    summary = {
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "cached": len(cached_results),
+        "duration": time.perf_counter() - start,
+        "results": results,
+    }
+    log(f"Exported {summary['succeeded']}/{summary['total']} files ({summary['cached']} from cache) in {summary['duration']:.1f}s.",
+        "export.summary", **{key: summary[key] for key in ("total", "succeeded", "failed", "cached")})
+    for result in results:
+        if result["status"] not in ("ok", "cached"):
+            log(f"Failed ({result['status']}, {result['attempts']} attempts): {result['blend_file']}", "export.failed",
+                level="error", file=result["blend_file"], status=result["status"], attempts=result["attempts"], error=result["error"])
+    return summary
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Batch export Blender scenes with a pool of headless Blender workers.")
+    parser.add_argument("directory", type=str, help="Directory containing .blend files.")
+    parser.add_argument("export_path", type=str, help="Directory to save exported files.")
+    parser.add_argument("--format", type=str, choices=["json", "jsonl", "fbx", "bin", "glb"], default="json", help="Export format (default: json).")
+    parser.add_argument("--workers", type=int, default=None, help="Number of Blender processes (default: CPU count).")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Seconds before a hung export is killed (default: 600).")
+    parser.add_argument("--retries", type=int, default=1, help="Retries after a worker timeout or crash (default: 1).")
+    parser.add_argument("--max-tasks-per-worker", type=int, default=None, help="Restart each worker after this many files.")
+    parser.add_argument("--blender", type=str, default=DEFAULT_BLENDER, help="Path to the Blender executable.")
+    parser.add_argument("--cache-dir", type=str, help="Reuse outputs of unchanged .blend files from this export cache.")
+    parser.add_argument("--force", action="store_true", help="Re-export every file even if it is cached.")
+    parser.add_argument("--cache-max-size", type=str, help="Size cap for the export cache, e.g. 20G (least recently used entries are evicted).")
+    parser.add_argument("--summary", type=str, help="Write the JSON summary to this file.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        summary = scheduled_batch_export(
+            args.directory,
+            args.export_path,
+            args.format,
+            worker_command=blender_worker_command(args.blender),
+            workers=args.workers,
+            timeout=args.timeout,
+            retries=args.retries,
+            max_tasks_per_worker=args.max_tasks_per_worker,
+            cache_dir=args.cache_dir,
+            force=args.force,
+            cache_max_size=parse_size(args.cache_max_size) if args.cache_max_size else None,
+        )
+        if args.summary:
+            json_codec.dump(summary, args.summary, pretty=True)
@@ -0,0 +1,611 @@
+# Copyright 2024 chevp. All rights reserved.
+#
+# glTF 2.0 / GLB export of scene data.
+#
+# Scenes are taken either from an SCDF document (any format readable by
+# scdf.convert) or from the ``{"objects": [...]}`` JSON written by
+# export_scene_to_json. All binary data (mesh geometry and per-instance
+# transforms) goes into a single buffer whose bufferViews start on 4-byte
+# boundaries, as glTF requires for float and index data.
+
+import argparse
+import os
+import re
+import struct
+import numpy as np
+from utils import json_codec
+from utils.instrumentation import add_profiling_arguments, count, log, profiling_from_arguments
+
+GLB_MAGIC = b"glTF"
+GLB_VERSION = 2
+GLB_JSON_CHUNK = 0x4E4F534A
+GLB_BIN_CHUNK = 0x004E4942
+ALIGNMENT = 4
+
+UNSIGNED_SHORT = 5123
+UNSIGNED_INT = 5125
+FLOAT = 5126
+ARRAY_BUFFER = 34962
+ELEMENT_ARRAY_BUFFER = 34963
+COMPONENT_COUNTS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+
+INSTANCING_EXTENSION = "EXT_mesh_gpu_instancing"
+LIGHTS_EXTENSION = "KHR_lights_punctual"
+DEFAULT_INSTANCING_THRESHOLD = 16
+
+# Roughness given to the SCDF shading models, which glTF expresses through PBR parameters.
+MATERIAL_ROUGHNESS = {"Phong": 0.4, "Lambert": 1.0}
+LIGHT_TYPES = ("point", "directional", "spot")
+
+# Blender appends '.001', '.002', ... to copies of an object; copies share the mesh name.
+BLENDER_COPY_SUFFIX = re.compile(r"\.\d{3}$")
+
+def euler_to_quaternions(angles, degrees=True):
+    """
+    Converts Euler angles to quaternions, for many rotations at once.
+
+    Rotations are applied about the X, then Y, then Z axis (``R = Rz @ Ry @ Rx``),
+    the same convention as ``scdf.scene_graph.euler_to_matrices``.
+
+    Args:
+        angles (array-like): ``(N, 3)`` X, Y and Z angles.
+        degrees (bool): Whether the angles are in degrees (otherwise radians).
+
+    Returns:
+        np.ndarray: ``(N, 4)`` quaternions in glTF's ``(x, y, z, w)`` order.
+    """
+    angles = np.asarray(angles, dtype=np.float64).reshape(-1, 3)
+    half = (np.radians(angles) if degrees else angles) / 2
+    cx, cy, cz = np.cos(half).T
+    sx, sy, sz = np.sin(half).T
+    return np.stack([
+        sx * cy * cz - cx * sy * sz,
+        cx * sy * cz + sx * cy * sz,
+        cx * cy * sz - sx * sy * cz,
+        cx * cy * cz + sx * sy * sz,
+    ], axis=1)
+
+def _unit_cube():
+    axes = np.eye(3)
+    positions, normals, indices = [], [], []
+    for axis in range(3):
+        for sign in (-1.0, 1.0):
+            normal = axes[axis] * sign
+            # u x v points along the normal, so the faces wind counter-clockwise seen from outside.
+            u, v = axes[(axis + 1) % 3], axes[(axis + 2) % 3]
+            if sign < 0:
+                u, v = v, u
+            base = len(positions)
+            for du, dv in ((-1, -1), (1, -1), (1, 1), (-1, 1)):
+                positions.append(0.5 * (normal + du * u + dv * v))
+                normals.append(normal)
+            indices.extend([base, base + 1, base + 2, base, base + 2, base + 3])
+    return {"positions": np.array(positions), "normals": np.array(normals), "indices": np.array(indices)}
+
+class GltfBuilder:
+    """
+    Assembles a glTF document and its binary buffer.
+
+    Meshes and materials are registered by name and shared: asking for a mesh or
+    material a second time returns the index of the existing one, so a prop that
+    is placed a thousand times is stored once.
+
+    Args:
+        placeholders (bool): Give meshes without geometry a shared unit-cube primitive
+            (otherwise such nodes only carry the mesh name in ``extras``).
+    """
+
+    def __init__(self, placeholders=True):
+        self.placeholders = placeholders
+        self.gltf = {"asset": {"version": "2.0", "generator": "scene-assets-library gltf_exporter"}}
+        self.buffer = bytearray()
+        self._materials = {}
+        self._meshes = {}
+        self._lights = {}
+        self._placeholder_primitive = None
+
+    def _list(self, key):
+        return self.gltf.setdefault(key, [])
+
+    def _use_extension(self, name):
+        used = self._list("extensionsUsed")
+        if name not in used:
+            used.append(name)
+
+    def add_buffer_view(self, data, target=None):
+        """
+        Appends bytes to the binary buffer as a new bufferView.
+
+        Args:
+            data (bytes): The data.
+            target (int, optional): ARRAY_BUFFER or ELEMENT_ARRAY_BUFFER.
+
+        Returns:
+            int: Index of the bufferView.
+        """
+        self.buffer.extend(b"\0" * (-len(self.buffer) % ALIGNMENT))
+        view = {"buffer": 0, "byteOffset": len(self.buffer), "byteLength": len(data)}
+        if target is not None:
+            view["target"] = target
+        self.buffer.extend(data)
+        views = self._list("bufferViews")
+        views.append(view)
+        return len(views) - 1
+
+    def add_accessor(self, values, type, target=None):
+        """
+        Stores an array in the buffer and describes it with an accessor.
+
+        Index data (``ELEMENT_ARRAY_BUFFER``) is stored as uint16 or uint32,
+        whichever fits; everything else as float32 with min/max bounds.
+
+        Args:
+            values (array-like): ``(N, components)`` or ``(N,)`` values.
+            type (str): Accessor type ("SCALAR", "VEC2", "VEC3" or "VEC4").
+            target (int, optional): bufferView target.
+
+        Returns:
+            int: Index of the accessor.
+        """
+        values = np.asarray(values)
+        if target == ELEMENT_ARRAY_BUFFER:
+            component_type = UNSIGNED_SHORT if len(values) and values.max() < 0xFFFF else UNSIGNED_INT
+            values = values.astype("<u2" if component_type == UNSIGNED_SHORT else "<u4").reshape(-1)
+        else:
+            component_type = FLOAT
+            values = values.astype("<f4").reshape(-1, COMPONENT_COUNTS[type])
+        accessor = {
+            "bufferView": self.add_buffer_view(values.tobytes(), target),
+            "componentType": component_type,
+            "count": len(values),
+            "type": type,
+        }
+        if component_type == FLOAT and len(values):
+            accessor["min"] = values.min(axis=0).tolist()
+            accessor["max"] = values.max(axis=0).tolist()
+        accessors = self._list("accessors")
+        accessors.append(accessor)
+        return len(accessors) - 1
+
+    def material(self, name, definition=None):
+        """
+        Returns the index of a material, creating it on first use.
+
+        Args:
+            name (str): Material name.
+            definition (dict, optional): SCDF material (``type``, ``color``, ``texture``).
+
+        Returns:
+            int: Index of the material.
+        """
+        if name in self._materials:
+            return self._materials[name]
+        definition = definition or {}
+        color = list(definition.get("color") or (0.8, 0.8, 0.8))[:3]
+        material = {
+            "name": name,
+            "pbrMetallicRoughness": {
+                "baseColorFactor": [float(channel) for channel in color] + [1.0],
+                "metallicFactor": 0.0,
+                "roughnessFactor": MATERIAL_ROUGHNESS.get(definition.get("type"), 1.0),
+            },
+        }
+        if definition.get("texture"):
+            material["extras"] = {"texture": definition["texture"]}
+        materials = self._list("materials")
+        materials.append(material)
+        index = self._materials[name] = len(materials) - 1
+        return index
+
+    def _primitive_attributes(self, data):
+        attributes = {"POSITION": self.add_accessor(data["positions"], "VEC3", ARRAY_BUFFER)}
+        if data.get("normals") is not None:
+            attributes["NORMAL"] = self.add_accessor(data["normals"], "VEC3", ARRAY_BUFFER)
+        if data.get("texcoords") is not None:
+            attributes["TEXCOORD_0"] = self.add_accessor(data["texcoords"], "VEC2", ARRAY_BUFFER)
+        primitive = {"attributes": attributes}
+        if data.get("indices") is not None:
+            primitive["indices"] = self.add_accessor(data["indices"], "SCALAR", ELEMENT_ARRAY_BUFFER)
+        return primitive
+
+    def mesh(self, name, data=None, material=None):
+        """
+        Returns the index of a mesh, creating it on first use.
+
+        Args:
+            name (str): Mesh name.
+            data (dict, optional): Geometry with ``positions`` and optional ``normals``, ``texcoords``
+                and ``indices``.
+            material (int, optional): Material index used by the mesh's primitive.
+
+        Returns:
+            int: Index of the mesh, or None if it has no geometry and placeholders are disabled.
+        """
+        key = (name, material)
+        if key in self._meshes:
+            return self._meshes[key]
+        if data is not None:
+            primitive = self._primitive_attributes(data)
+        elif self.placeholders:
+            if self._placeholder_primitive is None:
+                self._placeholder_primitive = self._primitive_attributes(_unit_cube())
+            primitive = {"attributes": dict(self._placeholder_primitive["attributes"]), "indices": self._placeholder_primitive["indices"]}
+        else:
+            self._meshes[key] = None
+            return None
+        if material is not None:
+            primitive["material"] = material
+        mesh = {"name": name, "primitives": [primitive]}
+        if data is None:
+            mesh["extras"] = {"placeholder": True}
+        meshes = self._list("meshes")
+        meshes.append(mesh)
+        index = self._meshes[key] = len(meshes) - 1
+        return index
+
+    def light(self, definition):
+        """
+        Returns the index of a punctual light, creating it on first use.
+
+        Args:
+            definition (dict): SCDF light (``name``, ``type``, ``intensity``, ``color``).
+
+        Returns:
+            int: Index into the ``KHR_lights_punctual`` lights.
+        """
+        name = definition.get("name")
+        if name in self._lights:
+            return self._lights[name]
+        self._use_extension(LIGHTS_EXTENSION)
+        light_type = definition.get("type") if definition.get("type") in LIGHT_TYPES else "point"
+        light = {"name": name, "type": light_type, "intensity": float(definition.get("intensity", 1.0))}
+        if isinstance(definition.get("color"), list):
+            light["color"] = [float(channel) for channel in definition["color"][:3]]
+        if light_type == "spot":
+            light["spot"] = {}
+        lights = self.gltf.setdefault("extensions", {}).setdefault(LIGHTS_EXTENSION, {"lights": []})["lights"]
+        lights.append(light)
+        index = self._lights[name] = len(lights) - 1
+        return index
+
+    def add_node(self, node):
+        nodes = self._list("nodes")
+        nodes.append(node)
+        return len(nodes) - 1
+
+    def add_instanced_node(self, name, mesh, translations, rotations, scales, instance_names):
+        """
+        Adds one node drawing ``mesh`` at many transforms with ``EXT_mesh_gpu_instancing``.
+
+        Returns:
+            int: Index of the node.
+        """
+        self._use_extension(INSTANCING_EXTENSION)
+        attributes = {
+            "TRANSLATION": self.add_accessor(translations, "VEC3"),
+            "ROTATION": self.add_accessor(rotations, "VEC4"),
+            "SCALE": self.add_accessor(scales, "VEC3"),
+        }
+        return self.add_node({"name": name, "mesh": mesh, "extensions": {INSTANCING_EXTENSION: {"attributes": attributes}},
+                              "extras": {"instances": instance_names}})
+
+    def to_json(self, buffer_uri=None):
+        """
+        Returns:
+            dict: The glTF document, referencing the buffer by ``buffer_uri`` (GLB-internal if None).
+        """
+        gltf = dict(self.gltf)
+        if self.buffer:
+            buffer = {"byteLength": len(self.buffer)}
+            if buffer_uri is not None:
+                buffer["uri"] = buffer_uri
+            gltf["buffers"] = [buffer]
+        return gltf
+
+    def to_glb(self):
+        """
+        Returns:
+            bytes: The document as a binary GLB container.
+        """
+        json_chunk = json_codec.encode(self.to_json())
+        json_chunk += b" " * (-len(json_chunk) % 4)
+        chunks = struct.pack("<II", len(json_chunk), GLB_JSON_CHUNK) + json_chunk
+        if self.buffer:
+            binary_chunk = bytes(self.buffer) + b"\0" * (-len(self.buffer) % 4)
+            chunks += struct.pack("<II", len(binary_chunk), GLB_BIN_CHUNK) + binary_chunk
+        return struct.pack("<4sII", GLB_MAGIC, GLB_VERSION, 12 + len(chunks)) + chunks
+
+def scene_nodes_from_scdf(scdf):
+    """
+    Flattens an SCDF document into the exporter's node list.
+
+    Returns:
+        list: Node dicts with ``name``, ``parent`` (index or -1), ``translation``, ``rotation``
+            (quaternion), ``scale`` and optional ``mesh``, ``material``, ``light`` and ``camera``.
+    """
+    nodes = scdf.get("nodes") or []
+    index = {node["name"]: i for i, node in enumerate(nodes)}
+    parents = [-1] * len(nodes)
+    for i, node in enumerate(nodes):
+        for child in node.get("children") or []:
+            if child in index:
+                parents[index[child]] = i
+    rotations = euler_to_quaternions([node.get("rotation") or (0, 0, 0) for node in nodes]) if nodes else []
+    result = []
+    for i, node in enumerate(nodes):
+        result.append({
+            "name": node["name"],
+            "parent": parents[i],
+            "translation": list(node.get("position") or (0, 0, 0)),
+            "rotation": list(rotations[i]),
+            "scale": list(node.get("scale") or (1, 1, 1)),
+            "mesh": node.get("mesh") or node.get("geometry"),
+            "material": node.get("material"),
+            "light": node.get("light"),
+        })
+    for camera in scdf.get("cameras") or []:
+        result.append({
+            "name": camera["name"],
+            "parent": -1,
+            "translation": list(camera.get("position") or (0, 0, 0)),
+            "rotation": list(euler_to_quaternions([camera.get("rotation") or (0, 0, 0)])[0]),
+            "scale": [1, 1, 1],
+            "camera": camera,
+        })
+    return result
+
+def scene_nodes_from_objects(objects, z_up=True):
+    """
+    Converts objects from export_scene_to_json into the exporter's node list.
+
+    Blender rotations are in radians. Blender is Z-up while glTF is Y-up, so with
+    ``z_up`` every transform is rotated into glTF's axes. Copies of an object
+    ('Tree', 'Tree.001', ...) share one mesh.
+
+    Returns:
+        list: Node dicts (see ``scene_nodes_from_scdf``).
+    """
+    objects = list(objects)
+    if not objects:
+        return []
+    location = np.array([obj["location"] for obj in objects], dtype=np.float64)
+    rotation = euler_to_quaternions([obj["rotation"] for obj in objects], degrees=False)
+    scale = np.array([obj["scale"] for obj in objects], dtype=np.float64)
+    if z_up:
+        location = location[:, [0, 2, 1]] * (1, 1, -1)
+        rotation = rotation[:, [0, 2, 1, 3]] * (1, 1, -1, 1)
+        scale = scale[:, [0, 2, 1]]
+    result = []
+    for i, obj in enumerate(objects):
+        node = {"name": obj["name"], "parent": -1, "translation": location[i].tolist(), "rotation": rotation[i].tolist(), "scale": scale[i].tolist()}
+        if obj.get("type") == "MESH":
+            node["mesh"] = obj.get("mesh") or BLENDER_COPY_SUFFIX.sub("", obj["name"])
+            node["material"] = obj.get("material")
+        elif obj.get("type") == "LIGHT":
+            node["light"] = obj["name"]
+        elif obj.get("type") == "CAMERA":
+            node["camera"] = {"name": obj["name"]}
+        result.append(node)
+    return result
+
+def _trs(node):
+    trs = {}
+    if any(value != 0 for value in node["translation"]):
+        trs["translation"] = [float(value) for value in node["translation"]]
+    if any(abs(value) > 1e-12 for value in node["rotation"][:3]):
+        trs["rotation"] = [float(value) for value in node["rotation"]]
+    if any(value != 1 for value in node["scale"]):
+        trs["scale"] = [float(value) for value in node["scale"]]
+    return trs
+
+def build_gltf(nodes, materials=None, lights=None, meshes=None, instancing=False,
+               instancing_threshold=DEFAULT_INSTANCING_THRESHOLD, placeholders=True, active_camera=None):
+    """
+    Builds a glTF document from an exporter node list.
+
+    Args:
+        nodes (list): Nodes from ``scene_nodes_from_scdf`` or ``scene_nodes_from_objects``.
+        materials (list, optional): SCDF material definitions, by name.
+        lights (list, optional): SCDF light definitions, by name.
+        meshes (dict, optional): Mesh names mapped to geometry (``positions``, ``normals``,
+            ``texcoords``, ``indices``).
+        instancing (bool): Replace sibling leaf nodes that place the same mesh at least
+            ``instancing_threshold`` times by one ``EXT_mesh_gpu_instancing`` node.
+        instancing_threshold (int): Minimum number of copies to instance.
+        placeholders (bool): Give meshes without geometry a shared unit-cube primitive.
+        active_camera (str, optional): Name of the active camera, recorded in the scene's extras.
+
+    Returns:
+        GltfBuilder: The builder holding the document and its buffer.
+    """
+    builder = GltfBuilder(placeholders=placeholders)
+    material_definitions = {material["name"]: material for material in materials or []}
+    light_definitions = {light["name"]: light for light in lights or []}
+    meshes = meshes or {}
+
+    has_children = {node["parent"] for node in nodes}
+    mesh_indices = [None] * len(nodes)
+    for i, node in enumerate(nodes):
+        if node.get("mesh"):
+            material = builder.material(node["material"], material_definitions.get(node["material"])) if node.get("material") else None
+            mesh_indices[i] = builder.mesh(node["mesh"], meshes.get(node["mesh"]), material)
+
+    instance_groups = []
+    instanced = set()
+    if instancing:
+        groups = {}
+        for i, node in enumerate(nodes):
+            if mesh_indices[i] is not None and i not in has_children and not node.get("light") and not node.get("camera"):
+                groups.setdefault((node["parent"], mesh_indices[i]), []).append(i)
+        for (parent, mesh), members in groups.items():
+            if len(members) >= instancing_threshold:
+                instance_groups.append((parent, mesh, members))
+                instanced.update(members)
+
+    gltf_index = {}
+    for i, node in enumerate(nodes):
+        if i in instanced:
+            continue
+        gltf_node = {"name": node["name"]}
+        gltf_node.update(_trs(node))
+        if mesh_indices[i] is not None:
+            gltf_node["mesh"] = mesh_indices[i]
+        elif node.get("mesh"):
+            gltf_node["extras"] = {"mesh": node["mesh"]}
+        if node.get("light"):
+            definition = light_definitions.get(node["light"], {"name": node["light"]})
+            gltf_node["extensions"] = {LIGHTS_EXTENSION: {"light": builder.light(definition)}}
+        if node.get("camera") is not None:
+            gltf_node["camera"] = _camera(builder, node["camera"])
+        gltf_index[i] = builder.add_node(gltf_node)
+
+    instance_nodes = []
+    for parent, mesh, members in instance_groups:
+        instance_nodes.append((parent, builder.add_instanced_node(
+            f"{builder.gltf['meshes'][mesh]['name']}_instances", mesh,
+            [nodes[i]["translation"] for i in members],
+            [nodes[i]["rotation"] for i in members],
+            [nodes[i]["scale"] for i in members],
+            [nodes[i]["name"] for i in members])))
+
+    roots = []
+    gltf_nodes = builder.gltf.get("nodes", [])
+    children = [(node["parent"], gltf_index[i]) for i, node in enumerate(nodes) if i in gltf_index] + instance_nodes
+    for parent, child in children:
+        if parent < 0:
+            roots.append(child)
+        else:
+            gltf_nodes[gltf_index[parent]].setdefault("children", []).append(child)
+
+    scene = {"nodes": roots}
+    if active_camera:
+        scene["extras"] = {"activeCamera": active_camera}
+    builder.gltf["scenes"] = [scene]
+    builder.gltf["scene"] = 0
+    return builder
+
+def _camera(builder, definition):
+    camera = {
+        "name": definition.get("name"),
+        "type": "perspective",
+        "perspective": {
+            "yfov": float(np.radians(definition.get("fov", 50))),
+            "znear": float(definition.get("nearPlane", 0.1)),
+        },
+    }
+    if definition.get("farPlane"):
+        camera["perspective"]["zfar"] = float(definition["farPlane"])
+    if definition.get("aspect"):
+        camera["perspective"]["aspectRatio"] = float(definition["aspect"])
+    cameras = builder._list("cameras")
+    cameras.append(camera)
+    return len(cameras) - 1
+
+def export_scene_to_gltf(scene, output_path, meshes=None, instancing=False,
+                         instancing_threshold=DEFAULT_INSTANCING_THRESHOLD, placeholders=True):
+    """
+    Exports scene data to glTF.
+
+    Writes a binary ``.glb`` container, or for a ``.gltf`` path a JSON document
+    next to a ``<name>.gltf.bin`` buffer file.
+
+    Args:
+        scene (dict): An SCDF document, or the ``{"objects": [...]}`` JSON of export_scene_to_json.
+        output_path (str): Path of the ``.glb`` or ``.gltf`` file.
+        meshes (dict, optional): Mesh names mapped to geometry (see ``build_gltf``).
+        instancing (bool): Emit ``EXT_mesh_gpu_instancing`` for massively repeated meshes.
+        instancing_threshold (int): Minimum number of copies to instance.
+        placeholders (bool): Give meshes without geometry a shared unit-cube primitive.
+
+    Returns:
+        str: The output path.
+    """
+    if "objects" in scene:
+        nodes = scene_nodes_from_objects(scene["objects"])
+        builder = build_gltf(nodes, meshes=meshes, instancing=instancing, instancing_threshold=instancing_threshold,
+                             placeholders=placeholders)
+    else:
+        builder = build_gltf(scene_nodes_from_scdf(scene), scene.get("materials"), scene.get("lights"), meshes,
+                             instancing=instancing, instancing_threshold=instancing_threshold, placeholders=placeholders,
+                             active_camera=(scene.get("scene") or {}).get("activeCamera"))
+
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    if output_path.lower().endswith(".glb"):
+        with open(output_path, "wb") as f:
+            f.write(builder.to_glb())
+    else:
+        buffer_uri = None
+        if builder.buffer:
+            buffer_uri = os.path.basename(output_path) + ".bin"
+            with open(os.path.join(os.path.dirname(output_path), buffer_uri), "wb") as f:
+                f.write(builder.buffer)
+        # .gltf is the variant people open in an editor; GLB is the compact machine format.
+        json_codec.dump(builder.to_json(buffer_uri), output_path, pretty=2)
+    count("bytes.written", os.path.getsize(output_path))
+    log(f"Scene exported to glTF: {output_path}", event="export.written", path=output_path)
+    return output_path
+
+def read_glb(file_path):
+    """
+    Reads a GLB container.
+
+    Args:
+        file_path (str): Path to the ``.glb`` file.
+
+    Returns:
+        tuple: ``(gltf, buffer)`` with the parsed JSON document and the binary chunk (or b"").
+    """
+    with open(file_path, "rb") as f:
+        data = f.read()
+    magic, version, length = struct.unpack_from("<4sII", data, 0)
+    if magic != GLB_MAGIC or version != GLB_VERSION:
+        raise ValueError("Not a glTF 2.0 binary file.")
+    offset = 12
+    gltf, buffer = None, b""
+    while offset < length:
+        chunk_length, chunk_type = struct.unpack_from("<II", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == GLB_JSON_CHUNK:
+            gltf = json_codec.decode(chunk)
+        elif chunk_type == GLB_BIN_CHUNK:
+            buffer = chunk
+        offset += 8 + chunk_length
+    return gltf, buffer
+
+def load_scene_data(file_path):
+    """
+    Loads the scene data to export: an SCDF scene in any supported format, or a JSON scene export.
+
+    Args:
+        file_path (str): Path to the scene file.
+
+    Returns:
+        dict: An SCDF document or a ``{"objects": [...]}`` export.
+    """
+    from scdf.convert import detect_format, read_scene
+    try:
+        detect_format(file_path)
+    except ValueError:
+        return json_codec.load(file_path)
+    return read_scene(file_path)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Export an SCDF scene or a JSON scene export to glTF/GLB.")
+    parser.add_argument("scene_file", type=str, help="SCDF scene (any format) or JSON written by scene_exporter.py.")
+    parser.add_argument("output", type=str, help="Output .glb or .gltf file.")
+    parser.add_argument("--meshes", type=str, help="JSON file mapping mesh names to geometry (positions, normals, texcoords, indices).")
+    parser.add_argument("--instancing", action="store_true", help=f"Use {INSTANCING_EXTENSION} for massively repeated meshes.")
+    parser.add_argument("--instancing-threshold", type=int, default=DEFAULT_INSTANCING_THRESHOLD, help="Minimum number of copies to instance.")
+    parser.add_argument("--no-placeholders", action="store_true", help="Don't give meshes without geometry a placeholder cube.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        meshes = None
+        if args.meshes:
+            meshes = json_codec.load(args.meshes)
+        export_scene_to_gltf(load_scene_data(args.scene_file), args.output, meshes=meshes, instancing=args.instancing,
+                             instancing_threshold=args.instancing_threshold, placeholders=not args.no_placeholders)
@@ -1,55 +1,157 @@
+import os
+import sys
 import tkinter as tk
 from tkinter import filedialog
 from tkinter import messagebox
+from tkinter import ttk
 
-def convert_file(input_file, output_file, conversion_type):
-    # Dummy conversion logic
-    print(f"Converting {input_file} to {output_file} as {conversion_type}")
-    messagebox.showinfo("Success", f"File converted and saved as {output_file}")
-
-def open_file_dialog(entry):
-    file_path = filedialog.askopenfilename()
-    entry.delete(0, tk.END)
-    entry.insert(0, file_path)
-
-def save_file_dialog(entry):
-    file_path = filedialog.asksaveasfilename(defaultextension=".csv")
-    entry.delete(0, tk.END)
-    entry.insert(0, file_path)
-
-def start_conversion():
-    input_file = input_entry.get()
-    output_file = output_entry.get()
-    conversion_type = conversion_type_var.get()
-    if not input_file or not output_file or not conversion_type:
-        messagebox.showerror("Error", "Please complete all fields.")
-        return
-    convert_file(input_file, output_file, conversion_type)
-
-# Setting up the tkinter window
-root = tk.Tk()
-root.title("File Conversion Tool")
-
-# Input file selection
-tk.Label(root, text="Input File:").grid(row=0, column=0)
-input_entry = tk.Entry(root, width=50)
-input_entry.grid(row=0, column=1)
-tk.Button(root, text="Browse", command=lambda: open_file_dialog(input_entry)).grid(row=0, column=2)
-
-# Output file selection
-tk.Label(root, text="Output File:").grid(row=1, column=0)
-output_entry = tk.Entry(root, width=50)
-output_entry.grid(row=1, column=1)
-tk.Button(root, text="Save As", command=lambda: save_file_dialog(output_entry)).grid(row=1, column=2)
-
-# Conversion type dropdown
-tk.Label(root, text="Conversion Type:").grid(row=2, column=0)
-conversion_type_var = tk.StringVar()
-conversion_options = ["json_to_csv", "jpeg_to_png"]
-conversion_type_menu = tk.OptionMenu(root, conversion_type_var, *conversion_options)
-conversion_type_menu.grid(row=2, column=1)
-
-# Start conversion button
-tk.Button(root, text="Convert", command=start_conversion).grid(row=3, column=1, pady=10)
-
-root.mainloop()
\ No newline at end of file
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jobs import DONE, FAILED, FINISHED_STATUSES, SKIPPED, JobEngine, conversion_types, format_progress
+
+POLL_INTERVAL_MS = 200
+
+class ConversionApp:
+    """
+    Conversion window backed by a ``JobEngine``.
+
+    Conversions run in worker processes; the window only queues jobs and polls
+    their state with ``root.after``, so it stays responsive while they run.
+    """
+
+    def __init__(self, root, engine):
+        self.root = root
+        self.engine = engine
+        self.shown_jobs = 0
+        self.active_jobs = set()
+        root.title("File Conversion Tool")
+
+        # Input files and folders
+        tk.Label(root, text="Inputs:").grid(row=0, column=0, sticky="nw")
+        self.input_list = tk.Listbox(root, width=60, height=6, selectmode=tk.EXTENDED)
+        self.input_list.grid(row=0, column=1, sticky="nsew")
+        input_buttons = tk.Frame(root)
+        input_buttons.grid(row=0, column=2, sticky="n")
+        tk.Button(input_buttons, text="Add Files", command=self.add_files).pack(fill=tk.X)
+        tk.Button(input_buttons, text="Add Folder", command=self.add_folder).pack(fill=tk.X)
+        tk.Button(input_buttons, text="Remove", command=self.remove_inputs).pack(fill=tk.X)
+
+        # Output folder (or file, for a single input file)
+        tk.Label(root, text="Output:").grid(row=1, column=0)
+        self.output_entry = tk.Entry(root, width=60)
+        self.output_entry.grid(row=1, column=1, sticky="ew")
+        output_buttons = tk.Frame(root)
+        output_buttons.grid(row=1, column=2)
+        tk.Button(output_buttons, text="Folder", command=self.choose_output_folder).pack(side=tk.LEFT)
+        tk.Button(output_buttons, text="Save As", command=self.choose_output_file).pack(side=tk.LEFT)
+
+        # Conversion type dropdown
+        tk.Label(root, text="Conversion Type:").grid(row=2, column=0)
+        self.conversion_type_var = tk.StringVar()
+        tk.OptionMenu(root, self.conversion_type_var, *conversion_types()).grid(row=2, column=1, sticky="w")
+
+        # Start and cancel buttons
+        actions = tk.Frame(root)
+        actions.grid(row=3, column=1, pady=10)
+        tk.Button(actions, text="Convert", command=self.start_conversion).pack(side=tk.LEFT, padx=5)
+        tk.Button(actions, text="Cancel Pending", command=self.cancel_pending).pack(side=tk.LEFT, padx=5)
+
+        # Job list and progress
+        self.job_list = tk.Listbox(root, width=90, height=12)
+        self.job_list.grid(row=4, column=0, columnspan=3, sticky="nsew", padx=5)
+        self.progress_bar = ttk.Progressbar(root, maximum=1.0)
+        self.progress_bar.grid(row=5, column=0, columnspan=3, sticky="ew", padx=5)
+        self.progress_label = tk.Label(root, text="No jobs yet.", anchor="w")
+        self.progress_label.grid(row=6, column=0, columnspan=3, sticky="ew", padx=5)
+        root.grid_columnconfigure(1, weight=1)
+        root.grid_rowconfigure(4, weight=1)
+
+        root.protocol("WM_DELETE_WINDOW", self.close)
+        root.after(POLL_INTERVAL_MS, self.poll)
+
+    def add_files(self):
+        for file_path in filedialog.askopenfilenames():
+            self.input_list.insert(tk.END, file_path)
+
+    def add_folder(self):
+        directory = filedialog.askdirectory()
+        if directory:
+            self.input_list.insert(tk.END, directory)
+
+    def remove_inputs(self):
+        for index in reversed(self.input_list.curselection()):
+            self.input_list.delete(index)
+
+    def choose_output_folder(self):
+        directory = filedialog.askdirectory()
+        if directory:
+            self.output_entry.delete(0, tk.END)
+            self.output_entry.insert(0, directory)
+
+    def choose_output_file(self):
+        file_path = filedialog.asksaveasfilename()
+        if file_path:
+            self.output_entry.delete(0, tk.END)
+            self.output_entry.insert(0, file_path)
+
+    def start_conversion(self):
+        sources = list(self.input_list.get(0, tk.END))
+        output = self.output_entry.get()
+        conversion_type = self.conversion_type_var.get()
+        if not sources or not output or not conversion_type:
+            messagebox.showerror("Error", "Please complete all fields.")
+            return
+        try:
+            jobs = self.engine.submit_conversions(sources, output, conversion_type)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Error", f"Could not queue the conversion: {e}")
+            return
+        if not jobs:
+            messagebox.showinfo("Nothing to do", "No matching files were found.")
+            return
+        self.input_list.delete(0, tk.END)
+
+    def cancel_pending(self):
+        cancelled = self.engine.cancel()
+        self.progress_label.config(text=f"Cancelled {cancelled} pending jobs.")
+
+    def describe(self, job):
+        status = self.engine.status(job)
+        line = f"[{status}] {job.label}"
+        if status == DONE:
+            line += f" -> {job.result} ({job.duration:.2f}s)"
+        elif status in (FAILED, SKIPPED):
+            line += f": {job.error}"
+        return line
+
+    def poll(self):
+        jobs = self.engine.jobs
+        for job in jobs[self.shown_jobs:]:
+            self.job_list.insert(tk.END, self.describe(job))
+            self.active_jobs.add(job.id)
+        self.shown_jobs = len(jobs)
+        # Only rows of unfinished jobs can change.
+        for job_id in sorted(self.active_jobs):
+            job = jobs[job_id]
+            text = self.describe(job)
+            if self.job_list.get(job_id) != text:
+                self.job_list.delete(job_id)
+                self.job_list.insert(job_id, text)
+            if job.status in FINISHED_STATUSES:
+                self.active_jobs.discard(job_id)
+        if jobs:
+            progress = self.engine.progress()
+            self.progress_bar["value"] = progress["finished"]
+            self.progress_label.config(text=format_progress(progress))
+        self.root.after(POLL_INTERVAL_MS, self.poll)
+
+    def close(self):
+        self.engine.shutdown(wait=False, cancel_pending=True)
+        self.root.destroy()
+
+def main():
+    root = tk.Tk()
+    ConversionApp(root, JobEngine())
+    root.mainloop()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,462 @@
+# Copyright 2024 chevp. All rights reserved.
+
+# Background job engine for file conversions, shared by the command line and the GUI.
+
+import argparse
+import csv
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from scdf.convert import FORMAT_SUFFIXES, WRITERS, convert_file, find_scene_sources, scene_basename
+from utils import json_codec
+from utils.instrumentation import add_profiling_arguments, profiling_from_arguments
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+SKIPPED = "skipped"
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED, SKIPPED)
+
+SCENE_CONVERSION_PREFIX = "scene_to_"
+
+def _csv_value(value):
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list)):
+        return json_codec.dumps(value)
+    return value
+
+def json_to_csv(input_path, output_path):
+    """
+    Converts a JSON list of objects to CSV, one row per object.
+
+    A document holding a single list (like the manifest's ``{"assets": [...]}``) is
+    converted as that list, and a single object becomes one row. Columns are the
+    keys in order of first appearance; nested values are written as JSON.
+
+    Args:
+        input_path (str): Path to the JSON file.
+        output_path (str): Path of the CSV file.
+
+    Returns:
+        str: The output path.
+    """
+    data = json_codec.load(input_path)
+    if isinstance(data, dict):
+        lists = [value for value in data.values() if isinstance(value, list)]
+        data = lists[0] if len(data) == 1 and lists else [data]
+    rows = [row if isinstance(row, dict) else {"value": row} for row in data]
+    columns = list(dict.fromkeys(key for row in rows for key in row))
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([_csv_value(row.get(column)) for column in columns])
+    return output_path
+
+def jpeg_to_png(input_path, output_path):
+    """
+    Converts a JPEG image to PNG.
+
+    Args:
+        input_path (str): Path to the JPEG file.
+        output_path (str): Path of the PNG file.
+
+    Returns:
+        str: The output path.
+    """
+    if Image is None:
+        raise RuntimeError("jpeg_to_png requires Pillow (pip install Pillow).")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    with Image.open(input_path) as image:
+        image.save(output_path, "PNG")
+    return output_path
+
+def convert_scene(input_path, output_path, target_format):
+    """
+    Converts a scene file into another format (see ``scdf.convert.convert_file``).
+
+    Returns:
+        str: The output path.
+    """
+    return convert_file(input_path, output_path, target_format)
+
+def conversion_types():
+    """
+    Returns:
+        list: Names of the conversions ``plan_conversions`` accepts, e.g. 'scene_to_scdf.xml'.
+    """
+    return ["json_to_csv", "jpeg_to_png"] + [SCENE_CONVERSION_PREFIX + format for format in WRITERS]
+
+def _conversion(conversion):
+    # (function, matches(file name), output suffix, extra arguments) of a conversion type.
+    if conversion == "json_to_csv":
+        return json_to_csv, lambda name: name.lower().endswith(".json"), ".csv", ()
+    if conversion == "jpeg_to_png":
+        return jpeg_to_png, lambda name: name.lower().endswith((".jpg", ".jpeg")), ".png", ()
+    if conversion.startswith(SCENE_CONVERSION_PREFIX) and conversion[len(SCENE_CONVERSION_PREFIX):] in WRITERS:
+        format = conversion[len(SCENE_CONVERSION_PREFIX):]
+        return convert_scene, None, FORMAT_SUFFIXES[format][0], (format,)
+    raise ValueError(f"Unknown conversion type: {conversion}. Supported types: {', '.join(conversion_types())}.")
+
+def _output_name(source, suffix, conversion):
+    if conversion.startswith(SCENE_CONVERSION_PREFIX):
+        return scene_basename(source) + suffix
+    return os.path.splitext(os.path.basename(source))[0] + suffix
+
+def plan_conversions(sources, output, conversion):
+    """
+    Expands files and folders into one conversion task per file.
+
+    Folders are searched recursively and their layout is mirrored below
+    ``output``. ``output`` is taken as the output file only for a single
+    input file when it isn't an existing directory; otherwise it is the output
+    directory. For scene conversions, a scene present in several formats in a
+    folder is converted once (see ``scdf.convert.find_scene_sources``), and
+    inputs that would be written to the same output file are only converted once.
+
+    Args:
+        sources (list): Input files and folders.
+        output (str): Output file or directory.
+        conversion (str): One of ``conversion_types()``.
+
+    Returns:
+        tuple: ``(tasks, skipped)``: ``(function, args, source)`` tuples, and the
+            files that were left out mapped to the reason.
+    """
+    function, matches, suffix, extra = _conversion(conversion)
+    single_file = len(sources) == 1 and os.path.isfile(sources[0]) and not os.path.isdir(output)
+    tasks = []
+    skipped = {}
+    for source in sources:
+        if os.path.isdir(source):
+            if matches is None:
+                files, duplicates = find_scene_sources(source)
+                skipped.update(duplicates)
+            else:
+                files = []
+                for root, dirs, names in os.walk(source):
+                    dirs.sort()
+                    files.extend(os.path.join(root, name) for name in sorted(names) if matches(name))
+            target_root = os.path.join(output, os.path.basename(os.path.normpath(source)))
+            for path in files:
+                target_dir = os.path.join(target_root, os.path.relpath(os.path.dirname(path), source))
+                target = os.path.normpath(os.path.join(target_dir, _output_name(path, suffix, conversion)))
+                tasks.append((function, (path, target) + extra, path))
+        elif os.path.isfile(source):
+            target = output if single_file else os.path.join(output, _output_name(source, suffix, conversion))
+            tasks.append((function, (source, target) + extra, source))
+        else:
+            skipped[source] = "Skipped: no such file or directory"
+
+    # Two inputs converting to the same file would race; the first one wins.
+    targets = {}
+    planned = []
+    for task in tasks:
+        _, (source, target, *_), _ = task
+        key = os.path.abspath(target)
+        if key in targets:
+            skipped[source] = f"Skipped: {targets[key]} converts to the same output file"
+        else:
+            targets[key] = source
+            planned.append(task)
+    return planned, skipped
+
+def _call(function, args):
+    # Runs in the worker; errors are returned as text so they always survive pickling.
+    started_at = time.time()
+    try:
+        result = function(*args)
+        return started_at, time.time(), result, None
+    except Exception as e:
+        return started_at, time.time(), None, f"{type(e).__name__}: {e}"
+
+class Job:
+    """
+    One unit of work submitted to a ``JobEngine``.
+
+    Attributes:
+        id (int): Sequence number within the engine.
+        label (str): What the job works on, usually the input file.
+        size (int): Input size in bytes, for throughput reporting.
+        status (str): PENDING, RUNNING, DONE, FAILED, CANCELLED or SKIPPED.
+        result: What the job's function returned (DONE only).
+        error (str): Error message (FAILED), or the reason for SKIPPED.
+        started_at (float): Wall-clock start time in the worker, or None.
+        finished_at (float): Wall-clock end time, or None.
+    """
+
+    def __init__(self, job_id, label, size=0):
+        self.id = job_id
+        self.label = label
+        self.size = size
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+        self.future = None
+
+    @property
+    def duration(self):
+        """
+        Returns:
+            float: Seconds the job ran for, or None if it didn't finish.
+        """
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def to_dict(self):
+        """
+        Returns:
+            dict: The job's state, as written by the CLI's ``--report``.
+        """
+        return {"id": self.id, "label": self.label, "status": self.status, "result": self.result,
+                "error": self.error, "size": self.size, "duration": self.duration}
+
+class JobEngine:
+    """
+    Runs jobs on a pool of workers, off the calling thread.
+
+    ``submit`` returns immediately; jobs run in worker processes (or threads)
+    and their ``Job`` objects are updated as they finish, so a GUI can poll
+    ``progress`` and ``jobs`` from its event loop (e.g. with ``root.after``)
+    while the headless CLI simply calls ``wait``. Both use this engine, so batch
+    and interactive conversions are scheduled the same way.
+
+    ``cancel`` withdraws jobs that haven't started. A job already running in a
+    worker can't be interrupted safely and is left to finish.
+
+    Args:
+        max_workers (int, optional): Number of workers (CPU count by default).
+        use_processes (bool): Run jobs in worker processes, so CPU-bound
+            conversions run in parallel; threads share the interpreter and suit
+            I/O-bound jobs. Functions and arguments must be picklable for processes.
+    """
+
+    def __init__(self, max_workers=None, use_processes=True):
+        self.max_workers = max_workers
+        self.use_processes = use_processes
+        self.jobs = []
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown(cancel_pending=exc_info[0] is not None)
+
+    def _get_executor(self):
+        # Created on first use, so an idle GUI doesn't keep worker processes around.
+        if self._executor is None:
+            executor_class = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = executor_class(max_workers=self.max_workers)
+        return self._executor
+
+    def _add_job(self, label, size):
+        with self._lock:
+            job = Job(len(self.jobs), label, size)
+            self.jobs.append(job)
+        return job
+
+    def submit(self, function, *args, label=None, size=0):
+        """
+        Queues a function call.
+
+        Args:
+            function (callable): Module-level function (it is pickled for worker processes).
+            *args: Its arguments.
+            label (str, optional): Description of the job (the first argument by default).
+            size (int): Input size in bytes, for the throughput figures.
+
+        Returns:
+            Job: The queued job.
+        """
+        job = self._add_job(label if label is not None else str(args[0]) if args else function.__name__, size)
+        job.future = self._get_executor().submit(_call, function, args)
+        job.future.add_done_callback(lambda future: self._finish(job, future))
+        return job
+
+    def _finish(self, job, future):
+        if future.cancelled():
+            job.status = CANCELLED
+            return
+        try:
+            job.started_at, job.finished_at, job.result, job.error = future.result()
+        except Exception as e:
+            # The worker itself failed (e.g. a worker process was killed).
+            job.finished_at = time.time()
+            job.error = f"{type(e).__name__}: {e}"
+        job.status = FAILED if job.error is not None else DONE
+
+    def submit_conversions(self, sources, output, conversion):
+        """
+        Queues one conversion job per input file (see ``plan_conversions``).
+
+        Files left out (duplicate scene formats, missing paths) are recorded as SKIPPED jobs.
+
+        Args:
+            sources (list): Input files and folders.
+            output (str): Output file or directory.
+            conversion (str): One of ``conversion_types()``.
+
+        Returns:
+            list: The new jobs.
+        """
+        tasks, skipped = plan_conversions(sources, output, conversion)
+        jobs = []
+        for function, args, source in tasks:
+            jobs.append(self.submit(function, *args, label=source, size=os.path.getsize(source)))
+        for source, reason in skipped.items():
+            job = self._add_job(source, 0)
+            job.status, job.error = SKIPPED, reason
+            jobs.append(job)
+        return jobs
+
+    def status(self, job):
+        """
+        Returns:
+            str: The job's current status, RUNNING once a worker has picked it up.
+        """
+        if job.status == PENDING and job.future is not None and job.future.running():
+            return RUNNING
+        return job.status
+
+    def cancel(self, jobs=None):
+        """
+        Cancels jobs that haven't started yet.
+
+        Args:
+            jobs (list, optional): Jobs to cancel (all pending jobs by default).
+
+        Returns:
+            int: Number of jobs cancelled.
+        """
+        cancelled = 0
+        for job in list(self.jobs) if jobs is None else jobs:
+            if job.status == PENDING and job.future is not None and job.future.cancel():
+                cancelled += 1
+        return cancelled
+
+    def progress(self):
+        """
+        Summarizes the state of all jobs.
+
+        Returns:
+            dict: ``total`` and one count per status, ``finished`` (fraction of
+                jobs in a final state), ``elapsed`` seconds since the first job
+                started (until the last one finished, once all are done), ``jobs_per_second``, ``bytes_per_second`` and ``eta``
+                (seconds, None until the throughput is known).
+        """
+        jobs = list(self.jobs)
+        counts = dict.fromkeys((PENDING, RUNNING) + FINISHED_STATUSES, 0)
+        for job in jobs:
+            counts[self.status(job)] += 1
+        finished = sum(counts[status] for status in FINISHED_STATUSES)
+        ran = [job for job in jobs if job.status in (DONE, FAILED) and job.started_at is not None]
+        # Up to now while jobs remain, or up to the last finished job once all are done.
+        end = time.time() if counts[PENDING] + counts[RUNNING] or not ran else max(job.finished_at for job in ran)
+        elapsed = end - min(job.started_at for job in ran) if ran else 0.0
+        jobs_per_second = len(ran) / elapsed if elapsed > 0 else 0.0
+        remaining = counts[PENDING] + counts[RUNNING]
+        return dict(counts, total=len(jobs), finished=finished / len(jobs) if jobs else 1.0, elapsed=elapsed,
+                    jobs_per_second=jobs_per_second,
+                    bytes_per_second=sum(job.size for job in ran) / elapsed if elapsed > 0 else 0.0,
+                    eta=remaining / jobs_per_second if jobs_per_second else None)
+
+    def idle(self):
+        """
+        Returns:
+            bool: True if no job is pending or running.
+        """
+        return all(job.status in FINISHED_STATUSES for job in list(self.jobs))
+
+    def wait(self, callback=None, interval=0.5):
+        """
+        Blocks until all submitted jobs have finished.
+
+        Args:
+            callback (callable, optional): Called with ``progress()`` every ``interval`` seconds.
+            interval (float): Seconds between callbacks.
+        """
+        while not self.idle():
+            if callback is not None:
+                callback(self.progress())
+            time.sleep(interval if callback is not None else 0.05)
+        if callback is not None:
+            callback(self.progress())
+
+    def shutdown(self, wait=True, cancel_pending=False):
+        """
+        Stops the workers.
+
+        Args:
+            wait (bool): Wait for running (and, unless cancelled, pending) jobs to finish.
+            cancel_pending (bool): Cancel jobs that haven't started.
+        """
+        if cancel_pending:
+            self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+def format_progress(progress):
+    """
+    Formats ``JobEngine.progress`` as one status line.
+
+    Returns:
+        str: e.g. '12/40 jobs finished (1 failed), 3.2 jobs/s, 1.5 MB/s, ETA 9s'.
+    """
+    finished = progress["total"] - progress[PENDING] - progress[RUNNING]
+    line = f"{finished}/{progress['total']} jobs finished"
+    problems = [f"{progress[status]} {status}" for status in (FAILED, CANCELLED, SKIPPED) if progress[status]]
+    if problems:
+        line += f" ({', '.join(problems)})"
+    if progress["jobs_per_second"]:
+        line += f", {progress['jobs_per_second']:.1f} jobs/s, {progress['bytes_per_second'] / 1e6:.1f} MB/s"
+    if progress["eta"] is not None and progress[PENDING] + progress[RUNNING]:
+        line += f", ETA {progress['eta']:.0f}s"
+    return line
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Run file conversions on a pool of background workers.")
+    parser.add_argument("sources", nargs="+", help="Input files and folders.")
+    parser.add_argument("--output", required=True, help="Output directory (or output file for a single input file).")
+    parser.add_argument("--conversion", required=True, choices=conversion_types(), help="Conversion to run.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count).")
+    parser.add_argument("--threads", action="store_true", help="Use worker threads instead of processes.")
+    parser.add_argument("--report", type=str, default=None, help="Write per-job results to this JSON file.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        with JobEngine(max_workers=args.workers, use_processes=not args.threads) as engine:
+            engine.submit_conversions(args.sources, args.output, args.conversion)
+            try:
+                engine.wait(callback=lambda progress: print(format_progress(progress)), interval=1.0)
+            except KeyboardInterrupt:
+                print(f"Cancelled {engine.cancel()} pending jobs; waiting for running jobs to finish...")
+                engine.wait()
+
+        for job in engine.jobs:
+            if job.status in (FAILED, SKIPPED):
+                print(f"{job.label}: {job.error}")
+        if args.report:
+            json_codec.dump([job.to_dict() for job in engine.jobs], args.report, pretty=True)
+            print(f"Job report written to {args.report}")
+        if any(job.status == FAILED for job in engine.jobs):
+            raise SystemExit(1)
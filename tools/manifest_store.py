@@ -0,0 +1,548 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import os
+import sqlite3
+from utils import json_codec
+from utils.json_utils import read_json, write_json_atomic
+from utils.instrumentation import add_profiling_arguments, profiling_from_arguments
+
+SQLITE_EXTENSIONS = (".db", ".sqlite", ".sqlite3")
+INDEXED_COLUMNS = ("name", "type", "path", "version", "author")
+
+class ManifestConflictError(Exception):
+    """
+    Raised when manifest changes cannot be committed because the manifest was
+    changed (or is being committed) by another process.
+    """
+
+class ManifestStore:
+    """
+    Storage backend interface for the asset manifest.
+
+    Backends expose the manifest as ``{"assets": [...]}`` through ``load`` and
+    answer lookups and mutations without callers knowing how the data is stored.
+    Subclasses implement ``exists``, ``load``, ``find`` and ``apply_changes``; the
+    remaining methods are derived from those and may be overridden with faster
+    backend-specific versions.
+    """
+
+    def exists(self):
+        """
+        Returns:
+            bool: True if the backing manifest exists.
+        """
+        raise NotImplementedError
+
+    def load(self):
+        """
+        Returns:
+            dict: The whole manifest, or None if it doesn't exist.
+        """
+        raise NotImplementedError
+
+    def find(self, field, value):
+        """
+        Returns all assets whose ``field`` equals ``value``.
+
+        Args:
+            field (str): Asset field to match.
+            value: Value to look up.
+
+        Returns:
+            list: Matching asset entries, in manifest order.
+        """
+        raise NotImplementedError
+
+    def apply_changes(self, changes, fsync=False):
+        """
+        Applies a list of changes in one commit.
+
+        Args:
+            changes (list): Tuples of ``("add", asset_data)``, ``("update", asset_name, updated_data)``
+                or ``("remove", asset_name)``.
+            fsync (bool): Flush the changes to stable storage on commit.
+
+        Returns:
+            dict: Names of the ``added``, ``updated`` and ``removed`` assets, plus
+                ``missing`` names that an update or remove did not find.
+        """
+        raise NotImplementedError
+
+    def names(self):
+        """
+        Returns:
+            list: Names of all assets in manifest order.
+        """
+        return [asset["name"] for asset in (self.load() or {}).get("assets", [])]
+
+    def get(self, asset_name):
+        """
+        Returns the first asset with the given name, or None.
+        """
+        matches = self.find("name", asset_name)
+        return matches[0] if matches else None
+
+    def query(self, **filters):
+        """
+        Returns the assets matching every ``field=value`` filter.
+
+        Returns:
+            list: Matching asset entries, in manifest order.
+        """
+        assets = (self.load() or {}).get("assets", [])
+        return [asset for asset in assets if all(asset.get(field) == value for field, value in filters.items())]
+
+    def transaction(self, fsync=False):
+        """
+        Starts a batch of changes that is committed in one go when used as a context manager.
+
+        Args:
+            fsync (bool): Flush the changes to stable storage on commit.
+
+        Returns:
+            ManifestBatch: The pending batch.
+        """
+        return ManifestBatch(self, fsync=fsync)
+
+    def add(self, asset_data, fsync=False):
+        """
+        Adds an asset to the manifest.
+        """
+        self.apply_changes([("add", asset_data)], fsync=fsync)
+
+    def update(self, asset_name, updated_data, fsync=False):
+        """
+        Updates the first asset with the given name.
+
+        Returns:
+            bool: True if the asset was found and updated, False otherwise.
+        """
+        return bool(self.apply_changes([("update", asset_name, updated_data)], fsync=fsync)["updated"])
+
+    def remove(self, asset_name, fsync=False):
+        """
+        Removes every asset with the given name.
+
+        Returns:
+            bool: True if the asset was found and removed, False if no asset has the name;
+                None if there is no manifest.
+        """
+        if not self.exists():
+            return None
+        return bool(self.apply_changes([("remove", asset_name)], fsync=fsync)["removed"])
+
+    def close(self):
+        """
+        Releases any resources held by the backend.
+        """
+
+class ManifestBatch:
+    """
+    Collects manifest changes and commits them to a store in one call.
+
+    Args:
+        store (ManifestStore): Store the changes apply to.
+        fsync (bool): Flush the changes to stable storage on commit.
+    """
+
+    OPERATIONS = ("add", "update", "remove")
+
+    def __init__(self, store, fsync=False):
+        self.store = store
+        self.fsync = fsync
+        self.changes = []
+        self.committed = False
+
+    def add(self, asset_data):
+        """
+        Queues a new asset to be added.
+
+        Args:
+            asset_data (dict): Data about the asset to add.
+        """
+        self.changes.append(("add", asset_data))
+
+    def update(self, asset_name, updated_data):
+        """
+        Queues an update of the first asset with the given name.
+
+        Args:
+            asset_name (str): Name of the asset to update.
+            updated_data (dict): New data to update the asset with.
+        """
+        self.changes.append(("update", asset_name, updated_data))
+
+    def remove(self, asset_name):
+        """
+        Queues removal of every asset with the given name.
+
+        Args:
+            asset_name (str): Name of the asset to remove.
+        """
+        self.changes.append(("remove", asset_name))
+
+    def extend(self, changes):
+        """
+        Queues a list of ``(operation, *arguments)`` changes.
+
+        Args:
+            changes (list): Changes as accepted by ``ManifestStore.apply_changes``.
+        """
+        for change in changes:
+            operation, *arguments = change
+            if operation not in self.OPERATIONS:
+                raise ValueError(f"Unsupported manifest change: {operation}")
+            getattr(self, operation)(*arguments)
+
+    def commit(self):
+        """
+        Commits the queued changes.
+
+        Returns:
+            dict: Commit summary as returned by ``ManifestStore.apply_changes``.
+        """
+        if self.committed:
+            raise RuntimeError("Transaction has already been committed.")
+        summary = self.store.apply_changes(self.changes, fsync=self.fsync)
+        self.committed = True
+        return summary
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and not self.committed:
+            self.commit()
+        return False
+
+def _dependency_name(dependency):
+    if isinstance(dependency, dict):
+        dependency = dependency.get("name") or dependency.get("path")
+    return None if dependency is None else str(dependency)
+
+class SqliteManifestStore(ManifestStore):
+    """
+    Asset manifest stored in an SQLite database (WAL mode).
+
+    Each asset keeps its full JSON in the ``data`` column, so conversions to and
+    from the JSON manifest are lossless, while ``name``, ``type``, ``path``,
+    ``version`` and ``author`` are mirrored into indexed columns for filtered
+    queries. Entries of an asset's ``dependencies`` list (as written by
+    ``metadata_generator.generate_metadata``) are stored as edges in the
+    ``dependencies`` table. Top-level manifest keys other than ``assets`` are kept
+    in ``manifest_meta``.
+
+    Args:
+        db_path (str): Path to the SQLite database file.
+        timeout (float): Seconds to wait for another writer before giving up.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS manifest_meta (
+            key TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            value TEXT
+        );
+        CREATE TABLE IF NOT EXISTS assets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT,
+            type TEXT,
+            path TEXT,
+            version TEXT,
+            author TEXT,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_assets_name ON assets(name);
+        CREATE INDEX IF NOT EXISTS idx_assets_type ON assets(type);
+        CREATE INDEX IF NOT EXISTS idx_assets_path ON assets(path);
+        CREATE INDEX IF NOT EXISTS idx_assets_version ON assets(version);
+        CREATE INDEX IF NOT EXISTS idx_assets_author ON assets(author);
+        CREATE TABLE IF NOT EXISTS dependencies (
+            asset_id INTEGER NOT NULL REFERENCES assets(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            dependency TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_dependencies_asset ON dependencies(asset_id);
+        CREATE INDEX IF NOT EXISTS idx_dependencies_dependency ON dependencies(dependency);
+    """
+
+    def __init__(self, db_path, timeout=5.0):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._connection = None
+
+    @property
+    def connection(self):
+        """
+        sqlite3.Connection: Lazily opened connection with the schema in place.
+        """
+        if self._connection is None:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.db_path, timeout=self.timeout, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA foreign_keys=ON")
+            connection.executescript(self.SCHEMA)
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def exists(self):
+        return os.path.exists(self.db_path)
+
+    def load(self):
+        if not self.exists():
+            return None
+        connection = self.connection
+        manifest = {}
+        for key, value in connection.execute("SELECT key, value FROM manifest_meta ORDER BY position"):
+            manifest[key] = None if key == "assets" else json_codec.loads(value)
+        manifest["assets"] = [json_codec.loads(data) for (data,) in connection.execute("SELECT data FROM assets ORDER BY id")]
+        return manifest
+
+    def names(self):
+        if not self.exists():
+            return []
+        return [name for (name,) in self.connection.execute("SELECT name FROM assets ORDER BY id")]
+
+    def find(self, field, value):
+        return self.query(**{field: value})
+
+    def query(self, depends_on=None, **filters):
+        """
+        Returns the assets matching every ``column=value`` filter.
+
+        Only the indexed columns can be filtered on, so the query never has to
+        decode assets that don't match.
+
+        Args:
+            depends_on (str, optional): Only return assets that list this dependency.
+            **filters: Values for any of ``name``, ``type``, ``path``, ``version`` or ``author``.
+
+        Returns:
+            list: Matching asset entries, in manifest order.
+        """
+        unknown = set(filters) - set(INDEXED_COLUMNS)
+        if unknown:
+            raise ValueError(f"Cannot filter on {', '.join(sorted(unknown))}. Indexed columns: {', '.join(INDEXED_COLUMNS)}")
+        if not self.exists():
+            return []
+        clauses = [f"{column} = ?" for column in filters]
+        parameters = list(filters.values())
+        if depends_on is not None:
+            clauses.append("id IN (SELECT asset_id FROM dependencies WHERE dependency = ?)")
+            parameters.append(depends_on)
+        sql = "SELECT data FROM assets"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        return [json_codec.loads(data) for (data,) in self.connection.execute(sql, parameters)]
+
+    def dependencies_of(self, asset_name):
+        """
+        Returns the dependencies recorded for an asset.
+
+        Args:
+            asset_name (str): Name of the asset.
+
+        Returns:
+            list: Dependency names in their original order.
+        """
+        rows = self.connection.execute(
+            "SELECT d.dependency FROM dependencies d JOIN assets a ON a.id = d.asset_id "
+            "WHERE a.name = ? ORDER BY a.id, d.position",
+            (asset_name,),
+        )
+        return [dependency for (dependency,) in rows]
+
+    def dependents_of(self, dependency):
+        """
+        Returns the names of the assets that depend on ``dependency``.
+
+        Args:
+            dependency (str): Name of the dependency.
+
+        Returns:
+            list: Asset names in manifest order.
+        """
+        return [asset["name"] for asset in self.query(depends_on=dependency)]
+
+    def apply_changes(self, changes, fsync=False):
+        connection = self.connection
+        summary = {"added": [], "updated": [], "removed": [], "missing": []}
+        connection.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        try:
+            connection.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError as e:
+            raise ManifestConflictError(f"Could not lock {self.db_path} for writing: {e}") from e
+        try:
+            for change in changes:
+                operation, *arguments = change
+                if operation == "add":
+                    self._insert_asset(arguments[0])
+                    summary["added"].append(arguments[0]["name"])
+                elif operation == "update":
+                    asset_name, updated_data = arguments
+                    row = connection.execute("SELECT id, data FROM assets WHERE name = ? ORDER BY id LIMIT 1", (asset_name,)).fetchone()
+                    if row is None:
+                        summary["missing"].append(asset_name)
+                        continue
+                    asset = json_codec.loads(row[1])
+                    asset.update(updated_data)
+                    self._update_asset(row[0], asset)
+                    summary["updated"].append(asset_name)
+                elif operation == "remove":
+                    cursor = connection.execute("DELETE FROM assets WHERE name = ?", (arguments[0],))
+                    summary["removed" if cursor.rowcount else "missing"].append(arguments[0])
+                else:
+                    raise ValueError(f"Unsupported manifest change: {operation}")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        return summary
+
+    def replace_manifest(self, manifest):
+        """
+        Replaces the whole stored manifest in one transaction.
+
+        Args:
+            manifest (dict): Manifest in the JSON format (``{"assets": [...], ...}``).
+        """
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute("DELETE FROM dependencies")
+            connection.execute("DELETE FROM assets")
+            connection.execute("DELETE FROM manifest_meta")
+            connection.execute("DELETE FROM sqlite_sequence WHERE name = 'assets'")
+            for position, (key, value) in enumerate(manifest.items()):
+                stored = None if key == "assets" else json_codec.dumps(value)
+                connection.execute("INSERT INTO manifest_meta (key, position, value) VALUES (?, ?, ?)", (key, position, stored))
+            for asset in manifest.get("assets", []):
+                self._insert_asset(asset)
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _columns(self, asset):
+        values = []
+        for column in INDEXED_COLUMNS:
+            value = asset.get(column)
+            values.append(value if value is None or isinstance(value, (str, int, float)) else json_codec.dumps(value))
+        return values
+
+    def _insert_asset(self, asset):
+        cursor = self.connection.execute(
+            f"INSERT INTO assets ({', '.join(INDEXED_COLUMNS)}, data) VALUES (?, ?, ?, ?, ?, ?)",
+            self._columns(asset) + [json_codec.dumps(asset)],
+        )
+        self._write_dependencies(cursor.lastrowid, asset)
+
+    def _update_asset(self, asset_id, asset):
+        assignments = ", ".join(f"{column} = ?" for column in INDEXED_COLUMNS)
+        self.connection.execute(
+            f"UPDATE assets SET {assignments}, data = ? WHERE id = ?",
+            self._columns(asset) + [json_codec.dumps(asset), asset_id],
+        )
+        self.connection.execute("DELETE FROM dependencies WHERE asset_id = ?", (asset_id,))
+        self._write_dependencies(asset_id, asset)
+
+    def _write_dependencies(self, asset_id, asset):
+        dependencies = asset.get("dependencies") or []
+        rows = []
+        for position, dependency in enumerate(dependencies):
+            name = _dependency_name(dependency)
+            if name is not None:
+                rows.append((asset_id, position, name))
+        if rows:
+            self.connection.executemany("INSERT INTO dependencies (asset_id, position, dependency) VALUES (?, ?, ?)", rows)
+
+def migrate_json_to_sqlite(json_path, db_path):
+    """
+    Imports a JSON asset manifest into an SQLite manifest store.
+
+    Args:
+        json_path (str): Path to the JSON manifest.
+        db_path (str): Path to the SQLite database to (re)create.
+
+    Returns:
+        int: Number of migrated assets.
+    """
+    manifest = read_json(json_path)
+    if manifest is None:
+        raise FileNotFoundError(f"No manifest found at {json_path}")
+    store = SqliteManifestStore(db_path)
+    try:
+        store.replace_manifest(manifest)
+    finally:
+        store.close()
+    count = len(manifest.get("assets", []))
+    print(f"Migrated {count} assets from {json_path} to {db_path}")
+    return count
+
+def export_sqlite_to_json(db_path, json_path, fsync=False):
+    """
+    Exports an SQLite manifest store back to the JSON manifest format.
+
+    Args:
+        db_path (str): Path to the SQLite database.
+        json_path (str): Path of the JSON manifest to write.
+        fsync (bool): Flush the JSON file to stable storage before returning.
+
+    Returns:
+        int: Number of exported assets.
+    """
+    if not os.path.exists(db_path):
+        raise FileNotFoundError(f"No manifest database found at {db_path}")
+    store = SqliteManifestStore(db_path)
+    try:
+        manifest = store.load()
+    finally:
+        store.close()
+    write_json_atomic(manifest, json_path, fsync=fsync)
+    count = len(manifest["assets"])
+    print(f"Exported {count} assets from {db_path} to {json_path}")
+    return count
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Manage the SQLite asset manifest store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    migrate_parser = subparsers.add_parser("migrate", help="Import a JSON manifest into an SQLite store.")
+    migrate_parser.add_argument("json_path", type=str, help="Path to the JSON manifest.")
+    migrate_parser.add_argument("db_path", type=str, help="Path to the SQLite database.")
+
+    export_parser = subparsers.add_parser("export", help="Export an SQLite store to a JSON manifest.")
+    export_parser.add_argument("db_path", type=str, help="Path to the SQLite database.")
+    export_parser.add_argument("json_path", type=str, help="Path of the JSON manifest to write.")
+    export_parser.add_argument("--fsync", action="store_true", help="Flush the JSON file to disk before exiting.")
+
+    query_parser = subparsers.add_parser("query", help="Print the assets matching the given filters as JSON.")
+    query_parser.add_argument("db_path", type=str, help="Path to the SQLite database.")
+    for column in INDEXED_COLUMNS:
+        query_parser.add_argument(f"--{column}", type=str, help=f"Only assets with this {column}.")
+    query_parser.add_argument("--depends-on", type=str, help="Only assets that depend on this asset.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        if args.command == "migrate":
+            migrate_json_to_sqlite(args.json_path, args.db_path)
+        elif args.command == "export":
+            export_sqlite_to_json(args.db_path, args.json_path, fsync=args.fsync)
+        else:
+            filters = {column: getattr(args, column) for column in INDEXED_COLUMNS if getattr(args, column) is not None}
+            store = SqliteManifestStore(args.db_path)
+            print(json_codec.dumps(store.query(depends_on=args.depends_on, **filters), pretty=True))
+            store.close()
@@ -1,8 +1,23 @@
 import os
-import json
 import argparse
+import getpass
 from datetime import datetime
 from pathlib import Path
+from utils import json_codec
+from utils.daemon_client import call as daemon_call
+from utils.digest_cache import DigestCache
+from utils.scanner import scan_directory
+from utils.instrumentation import add_profiling_arguments, count, log, profiling_from_arguments, traced
+
+ASSET_EXTENSIONS = (".png", ".jpg", ".fbx", ".obj", ".blend")
+JOURNAL_FILENAME = ".metadata_journal.json"
+ASSET_PATTERNS = ["*" + extension for extension in ASSET_EXTENSIONS]
+# Written by the texture pipeline next to the textures. They are derived from the assets,
+# not assets of their own, so the metadata scans leave them out.
+GENERATED_DIRNAME = "generated"
+CACHE_DIRNAME = ".texture_cache"
+PREVIEW_FILENAME = "preview.png"
+EXCLUDE_PATTERNS = [GENERATED_DIRNAME, CACHE_DIRNAME, PREVIEW_FILENAME]
 
 def generate_metadata(asset_name, asset_type, author, version="1.0.0", dependencies=None):
     """
@@ -37,9 +52,27 @@ def save_metadata(metadata, metadata_path):
         metadata_path (str): Path to save the metadata JSON file.
     """
     os.makedirs(os.path.dirname(metadata_path), exist_ok=True)
-    with open(metadata_path, "w") as f:
-        json.dump(metadata, f, indent=4)
-    print(f"Metadata saved at {metadata_path}")
+    # Metadata is edited by hand, so it's written in pretty mode.
+    json_codec.dump(metadata, metadata_path, pretty=True)
+    count("metadata.written")
+    log(f"Metadata saved at {metadata_path}", "metadata.saved", path=metadata_path)
+
+def read_metadata(metadata_path):
+    """
+    Reads a metadata file, from the asset daemon's memory when it is running for the library.
+
+    Args:
+        metadata_path (str): Path to the metadata JSON file.
+
+    Returns:
+        dict: The metadata, or None if the file doesn't exist or can't be parsed.
+    """
+    def read():
+        try:
+            return json_codec.load(metadata_path)
+        except (OSError, ValueError):
+            return None
+    return daemon_call("metadata", os.path.dirname(os.path.abspath(metadata_path)), "metadata.get", read, metadata_path=metadata_path)
 
 def update_metadata_file(metadata_path, new_data):
     """
@@ -50,15 +83,42 @@ def update_metadata_file(metadata_path, new_data):
         new_data (dict): New data to update the metadata with.
     """
     if os.path.exists(metadata_path):
-        with open(metadata_path, "r") as f:
-            existing_metadata = json.load(f)
+        existing_metadata = json_codec.load(metadata_path)
     else:
         existing_metadata = {}
 
     existing_metadata.update(new_data)
     save_metadata(existing_metadata, metadata_path)
 
-def generate_metadata_for_directory(directory, author, asset_type):
+def record_generated_artifacts(directory, artifacts, author=None, asset_type="texture"):
+    """
+    Records the artifacts generated from a directory's assets in its metadata.json.
+
+    The ``generated`` key maps each source file name to its artifacts, with paths
+    relative to ``directory``; entries of other source files are kept. A directory
+    without metadata.json gets full metadata named after its first source file,
+    since the metadata sweeps only refresh ``last_updated`` of existing files.
+
+    Args:
+        directory (str): Directory containing the source assets and their metadata.json.
+        artifacts (dict): Source file name -> list of artifact dicts with ``path``, ``kind``,
+            ``width``, ``height`` and ``bytes``.
+        author (str, optional): Author of newly created metadata (defaults to the current user).
+        asset_type (str): Asset type of newly created metadata.
+    """
+    metadata_path = os.path.join(directory, "metadata.json")
+    if os.path.exists(metadata_path):
+        metadata = json_codec.load(metadata_path)
+        metadata["last_updated"] = datetime.now().isoformat()
+    else:
+        metadata = generate_metadata(Path(min(artifacts)).stem, asset_type, author or getpass.getuser())
+    generated = metadata.setdefault("generated", {})
+    for source_name, entries in artifacts.items():
+        generated[source_name] = [dict(entry, path=Path(os.path.relpath(entry["path"], directory)).as_posix()) for entry in entries]
+    save_metadata(metadata, metadata_path)
+
+@traced("metadata.sweep")
+def generate_metadata_for_directory(directory, author, asset_type, snapshot=None):
     """
     Generates metadata.json files for each asset in a specified directory.
     
@@ -66,30 +126,105 @@ def generate_metadata_for_directory(directory, author, asset_type):
         directory (str): Directory containing assets.
         author (str): Name of the author to include in the metadata.
         asset_type (str): Type of the assets (e.g., "texture", "3d_model").
+        snapshot (Snapshot, optional): Scan of ``directory`` to reuse instead of scanning it again.
     """
-    for root, dirs, files in os.walk(directory):
-        for asset_file in files:
-            # Skip metadata.json files to avoid overwriting existing metadata files
-            if asset_file == "metadata.json":
-                continue
-            
-            # Filter for asset files, assuming they are images or 3D files
-            if asset_file.endswith((".png", ".jpg", ".fbx", ".obj", ".blend")):
-                asset_name = Path(asset_file).stem
-                metadata_path = os.path.join(root, "metadata.json")
-
-                # Generate new metadata if file doesn't exist, or update if it does
-                if not os.path.exists(metadata_path):
-                    metadata = generate_metadata(
-                        asset_name=asset_name,
-                        asset_type=asset_type,
-                        author=author,
-                        version="1.0.0",
-                        dependencies=[]
-                    )
-                    save_metadata(metadata, metadata_path)
-                else:
-                    update_metadata_file(metadata_path, {"last_updated": datetime.now().isoformat()})
+    if snapshot is None:
+        snapshot = scan_directory(directory, include=ASSET_PATTERNS, exclude=EXCLUDE_PATTERNS)
+    # Filter for asset files, assuming they are images or 3D files
+    for root, asset_files in snapshot.by_directory(ASSET_PATTERNS).items():
+        for asset_file in asset_files:
+            asset_name = Path(asset_file).stem
+            metadata_path = os.path.join(root, "metadata.json")
+
+            # Generate new metadata if file doesn't exist, or update if it does
+            if not os.path.exists(metadata_path):
+                metadata = generate_metadata(
+                    asset_name=asset_name,
+                    asset_type=asset_type,
+                    author=author,
+                    version="1.0.0",
+                    dependencies=[]
+                )
+                save_metadata(metadata, metadata_path)
+            else:
+                update_metadata_file(metadata_path, {"last_updated": datetime.now().isoformat()})
+
+@traced("metadata.incremental")
+def generate_metadata_incremental(directory, author, asset_type, journal_path=None, snapshot=None):
+    """
+    Generates metadata.json files only for directories whose assets changed.
+
+    A journal of (path, size, mtime, digest) for every asset file is kept between
+    runs. Files whose size and mtime match the journal are not read at all; files
+    that were touched but still have the same digest don't count as changed.
+    Every directory with an added, removed or changed asset gets its
+    metadata.json written exactly once: created if missing, otherwise its
+    ``last_updated`` timestamp is refreshed.
+
+    Args:
+        directory (str): Directory containing assets.
+        author (str): Name of the author to include in new metadata.
+        asset_type (str): Type of the assets (e.g., "texture", "3d_model").
+        journal_path (str, optional): Journal file (defaults to JOURNAL_FILENAME inside ``directory``).
+        snapshot (Snapshot, optional): Scan of ``directory`` to reuse instead of scanning it again.
+
+    Returns:
+        dict: Lists of ``added``, ``changed`` and ``removed`` asset paths and of the ``written`` metadata files.
+    """
+    journal = DigestCache(journal_path or os.path.join(directory, JOURNAL_FILENAME))
+    root_prefix = os.path.join(os.path.abspath(directory), "")
+    previous = {path: entry for path, entry in journal.entries.items() if path.startswith(root_prefix)}
+    summary = {"added": [], "changed": [], "removed": [], "written": []}
+    assets_by_directory = {}
+    affected_directories = set()
+
+    if snapshot is None:
+        snapshot = scan_directory(directory, include=ASSET_PATTERNS, exclude=EXCLUDE_PATTERNS)
+    for file_entry in snapshot:
+        asset_path = file_entry.path
+        if not os.path.basename(asset_path).endswith(ASSET_EXTENSIONS):
+            continue
+        key = os.path.abspath(asset_path)
+        assets_by_directory.setdefault(os.path.dirname(key), []).append(os.path.basename(asset_path))
+        entry = previous.pop(key, None)
+        # The scan already has size and mtime, so unchanged files cost no further stat call.
+        digest = journal.digest(asset_path, stat_result=file_entry)
+        if entry is None:
+            summary["added"].append(asset_path)
+        elif entry["digest"] != digest:
+            summary["changed"].append(asset_path)
+        else:
+            continue
+        affected_directories.add(os.path.dirname(key))
+
+    for key in previous:
+        journal.forget(key)
+        summary["removed"].append(key)
+        affected_directories.add(os.path.dirname(key))
+
+    for root in sorted(affected_directories):
+        asset_files = sorted(assets_by_directory.get(root, []))
+        if not asset_files:
+            continue
+        metadata_path = os.path.join(root, "metadata.json")
+        if not os.path.exists(metadata_path):
+            metadata = generate_metadata(
+                asset_name=Path(asset_files[0]).stem,
+                asset_type=asset_type,
+                author=author,
+                version="1.0.0",
+                dependencies=[]
+            )
+            save_metadata(metadata, metadata_path)
+        else:
+            update_metadata_file(metadata_path, {"last_updated": datetime.now().isoformat()})
+        summary["written"].append(metadata_path)
+
+    journal.save()
+    log(f"Incremental metadata run: {len(summary['added'])} added, {len(summary['changed'])} changed, "
+        f"{len(summary['removed'])} removed, {len(summary['written'])} metadata files written", "metadata.incremental",
+        **{key: len(paths) for key, paths in summary.items()})
+    return summary
 
 def list_existing_metadata(directory):
     """
@@ -98,18 +233,15 @@ def list_existing_metadata(directory):
     Args:
         directory (str): Directory to search for metadata files.
     """
-    metadata_files = []
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file == "metadata.json":
-                metadata_files.append(os.path.join(root, file))
+    metadata_files = daemon_call("metadata", directory, "metadata.list",
+                                 lambda: scan_directory(directory, include=["metadata.json"], exclude=EXCLUDE_PATTERNS).paths(), directory=directory)
     
     if metadata_files:
-        print("Found metadata files:")
+        log("Found metadata files:", "metadata.list", count=len(metadata_files))
         for metadata_file in metadata_files:
-            print(metadata_file)
+            log(metadata_file, "metadata.found", path=metadata_file)
     else:
-        print("No metadata files found in the specified directory.")
+        log("No metadata files found in the specified directory.", "metadata.none_found", level="warning", directory=directory)
         
 def parse_arguments():
     parser = argparse.ArgumentParser(description="Generate metadata files for assets.")
@@ -117,12 +249,18 @@ def parse_arguments():
     parser.add_argument("author", type=str, help="Author of the assets.")
     parser.add_argument("asset_type", type=str, help="Type of the assets (e.g., 'texture', '3d_model').")
     parser.add_argument("--list", action="store_true", help="List all existing metadata files.")
+    parser.add_argument("--incremental", action="store_true", help="Only update metadata of directories whose assets changed since the last run.")
+    parser.add_argument("--journal", type=str, help=f"Journal file for --incremental (default: <directory>/{JOURNAL_FILENAME}).")
+    add_profiling_arguments(parser)
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_arguments()
 
-    if args.list:
-        list_existing_metadata(args.directory)
-    else:
-        generate_metadata_for_directory(args.directory, args.author, args.asset_type)
\ No newline at end of file
+    with profiling_from_arguments(args):
+        if args.list:
+            list_existing_metadata(args.directory)
+        elif args.incremental:
+            generate_metadata_incremental(args.directory, args.author, args.asset_type, journal_path=args.journal)
+        else:
+            generate_metadata_for_directory(args.directory, args.author, args.asset_type)
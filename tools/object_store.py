@@ -0,0 +1,332 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import errno
+import os
+import shutil
+import stat
+import sys
+import tempfile
+from utils.digest_cache import DigestCache
+from utils.json_utils import read_json, write_json_atomic
+from utils.scanner import scan_directory
+from utils.instrumentation import add_profiling_arguments, profiling_from_arguments
+
+OBJECT_STORE_DIR = ".object_store"
+DEFAULT_ALGORITHM = "sha256"
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+# Files ``dedupe_tree`` links by default: assets that tools replace but never edit in place.
+# Metadata and other JSON files are rewritten by tools and stay separate copies.
+DEDUPE_PATTERNS = ["*.png", "*.jpg", "*.jpeg", "*.blend", "*.fbx", "*.obj"]
+# ioctl request number of FICLONE on Linux (btrfs, XFS, bcachefs, ...).
+FICLONE = 0x40049409
+
+def _reflink(src, dest):
+    """
+    Creates ``dest`` as a copy-on-write clone of ``src``.
+
+    Raises:
+        OSError: If the platform or filesystem doesn't support reflinks.
+    """
+    if not sys.platform.startswith("linux"):
+        raise OSError(errno.EOPNOTSUPP, "Reflinks are only supported on Linux")
+    import fcntl
+    with open(src, "rb") as source, open(dest, "wb") as target:
+        try:
+            fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+        except OSError:
+            target.close()
+            os.remove(dest)
+            raise
+
+class ObjectStore:
+    """
+    Content-addressed store deduplicating identical files across asset versions.
+
+    Every distinct content is kept once, as a read-only file at
+    ``<root>/objects/<first two hex digits>/<remaining digits>`` of its digest.
+    Files in version directories are replaced by reflinks (copy-on-write clones)
+    or hard links to their object, falling back to a copy where the filesystem
+    supports neither. Hard-linked files share the object's inode and read-only
+    mode, so tools must replace them rather than write into them.
+
+    The store records which library paths refer to which object (``refs.json``),
+    so ``gc`` can delete objects no path uses any more.
+
+    Args:
+        root (str): Directory of the store (defaults to OBJECT_STORE_DIR).
+        link_mode (str): One of LINK_MODES; 'auto' tries reflink, then hard link, then copy.
+        algorithm (str): ``hashlib`` algorithm naming the objects.
+    """
+
+    def __init__(self, root=None, link_mode="auto", algorithm=DEFAULT_ALGORITHM):
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode: {link_mode}. Supported modes: {', '.join(LINK_MODES)}.")
+        self.root = root or OBJECT_STORE_DIR
+        self.link_mode = link_mode
+        self.algorithm = algorithm
+        self.objects_dir = os.path.join(self.root, "objects")
+        self.refs_path = os.path.join(self.root, "refs.json")
+        self.refs = (read_json(self.refs_path) or {}).get("refs", {}) if os.path.exists(self.refs_path) else {}
+        self.digests = DigestCache(os.path.join(self.root, "digests.json"))
+        self.bytes_copied = 0
+        self.bytes_skipped = 0
+
+    def object_path(self, digest):
+        """
+        Returns:
+            str: Path of the object holding the content with ``digest``.
+        """
+        hex_digest = digest.split(":", 1)[-1]
+        return os.path.join(self.objects_dir, hex_digest[:2], hex_digest[2:])
+
+    def add(self, file_path):
+        """
+        Stores the content of a file, unless an object with the same content exists.
+
+        The file is hashed in chunks (and only if its size or mtime changed since
+        it was last hashed), so large files are never loaded into memory.
+
+        Args:
+            file_path (str): File to store.
+
+        Returns:
+            str: Digest of the content.
+        """
+        digest = self.digests.digest(file_path, algorithm=self.algorithm)
+        object_path = self.object_path(digest)
+        if os.path.exists(object_path):
+            self.bytes_skipped += os.path.getsize(file_path)
+            return digest
+        os.makedirs(os.path.dirname(object_path), exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(object_path), prefix=".tmp-")
+        os.close(fd)
+        try:
+            shutil.copyfile(file_path, temp_path)
+            os.chmod(temp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            os.replace(temp_path, object_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        self.bytes_copied += os.path.getsize(object_path)
+        return digest
+
+    def checkout(self, digest, dest):
+        """
+        Makes ``dest`` a reflink, hard link or copy of an object.
+
+        ``dest`` is replaced atomically, so readers never see a partial file.
+
+        Args:
+            digest (str): Digest of the object.
+            dest (str): Path to create or replace.
+
+        Returns:
+            str: The link mode used ('reflink', 'hardlink' or 'copy').
+
+        Raises:
+            FileNotFoundError: If the store has no such object.
+        """
+        object_path = self.object_path(digest)
+        if not os.path.exists(object_path):
+            raise FileNotFoundError(f"No object {digest} in {self.root}")
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        temp_path = os.path.join(os.path.dirname(dest) or ".", f".{os.path.basename(dest)}.tmp-{os.getpid()}")
+        if os.path.lexists(temp_path):
+            os.remove(temp_path)
+        modes = ("reflink", "hardlink", "copy") if self.link_mode == "auto" else (self.link_mode,)
+        for mode in modes:
+            try:
+                if mode == "reflink":
+                    _reflink(object_path, temp_path)
+                elif mode == "hardlink":
+                    os.link(object_path, temp_path)
+                else:
+                    shutil.copyfile(object_path, temp_path)
+                break
+            except OSError:
+                if mode == modes[-1]:
+                    raise
+        os.replace(temp_path, dest)
+        self.refs[os.path.abspath(dest)] = digest
+        return mode
+
+    def copy(self, src, dest):
+        """
+        Copies a file through the store: the bytes are only copied if the content isn't stored yet.
+
+        Args:
+            src (str): Source file.
+            dest (str): Destination file.
+
+        Returns:
+            str: Digest of the content.
+        """
+        digest = self.add(src)
+        self.checkout(digest, dest)
+        return digest
+
+    def dedupe_file(self, file_path):
+        """
+        Moves a library file's content into the store and replaces the file by a link to it.
+
+        Args:
+            file_path (str): File to deduplicate.
+
+        Returns:
+            tuple: ``(digest, linked)``; ``linked`` is False if the file already was linked to its object.
+        """
+        digest = self.add(file_path)
+        key = os.path.abspath(file_path)
+        # Files checked out earlier (as reflinks or copies) or hard-linked to the object are left alone.
+        if self.refs.get(key) == digest or os.path.samefile(file_path, self.object_path(digest)):
+            self.refs[key] = digest
+            return digest, False
+        self.checkout(digest, file_path)
+        return digest, True
+
+    def dedupe_tree(self, directory, include=None, exclude=None):
+        """
+        Deduplicates every file under a directory.
+
+        Args:
+            directory (str): Directory to deduplicate (e.g. the asset library).
+            include (list, optional): Glob patterns of files to deduplicate (defaults to DEDUPE_PATTERNS).
+            exclude (list, optional): Glob patterns of files and directories to leave alone.
+
+        Returns:
+            dict: ``files``, ``linked`` (files newly replaced by links) and ``bytes_copied`` into the store.
+        """
+        store = os.path.abspath(self.root)
+        summary = {"files": 0, "linked": 0, "bytes_copied": 0}
+        copied_before = self.bytes_copied
+        for entry in scan_directory(directory, include=include or DEDUPE_PATTERNS, exclude=exclude):
+            if os.path.abspath(entry.path).startswith(os.path.join(store, "")):
+                continue
+            _, linked = self.dedupe_file(entry.path)
+            summary["files"] += 1
+            summary["linked"] += int(linked)
+        summary["bytes_copied"] = self.bytes_copied - copied_before
+        return summary
+
+    def _ref_is_live(self, path, digest):
+        if not os.path.exists(path):
+            return False
+        object_path = self.object_path(digest)
+        if os.path.exists(object_path) and os.path.samefile(path, object_path):
+            return True
+        # Reflinks and copies have their own inode: the path still counts if its content is unchanged.
+        return self.digests.digest(path, algorithm=self.algorithm) == digest
+
+    def gc(self, dry_run=False):
+        """
+        Deletes objects that no library path refers to any more.
+
+        References whose path was deleted or now holds other content are dropped first.
+
+        Args:
+            dry_run (bool): Only report what would be deleted.
+
+        Returns:
+            dict: ``stale_refs`` dropped, ``removed`` object digests and ``freed_bytes``.
+        """
+        stale = [path for path, digest in self.refs.items() if not self._ref_is_live(path, digest)]
+        if not dry_run:
+            for path in stale:
+                del self.refs[path]
+                self.digests.forget(path)
+        live = {digest for path, digest in self.refs.items() if path not in stale}
+        summary = {"stale_refs": len(stale), "removed": [], "freed_bytes": 0}
+        for digest, object_path in self.iter_objects():
+            if digest in live:
+                continue
+            summary["removed"].append(digest)
+            summary["freed_bytes"] += os.path.getsize(object_path)
+            if not dry_run:
+                os.chmod(object_path, stat.S_IWUSR | stat.S_IRUSR)
+                os.remove(object_path)
+        return summary
+
+    def iter_objects(self):
+        """
+        Yields:
+            tuple: ``(digest, object path)`` of every stored object.
+        """
+        if not os.path.isdir(self.objects_dir):
+            return
+        for entry in scan_directory(self.objects_dir, exclude=[".tmp-*"]):
+            prefix, rest = os.path.split(os.path.relpath(entry.path, self.objects_dir))
+            yield f"{self.algorithm}:{prefix}{rest}", entry.path
+
+    def report(self):
+        """
+        Summarizes how much space deduplication saves.
+
+        Returns:
+            dict: Number of ``objects`` and ``refs``, ``stored_bytes`` (one copy per content),
+                ``logical_bytes`` (what full copies at every path would take), ``saved_bytes``
+                and the ``dedup_ratio`` of logical to stored bytes.
+        """
+        sizes = {digest: os.path.getsize(path) for digest, path in self.iter_objects()}
+        stored = sum(sizes.values())
+        logical = sum(sizes.get(digest, 0) for digest in self.refs.values())
+        return {
+            "objects": len(sizes),
+            "refs": len(self.refs),
+            "stored_bytes": stored,
+            "logical_bytes": logical,
+            "saved_bytes": max(0, logical - stored),
+            "dedup_ratio": round(logical / stored, 3) if stored else 1.0,
+        }
+
+    def save(self):
+        """
+        Persists the references and the digest cache.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        write_json_atomic({"refs": dict(sorted(self.refs.items()))}, self.refs_path, indent=None)
+        self.digests.save()
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Deduplicate asset versions through a content-addressed object store.")
+    parser.add_argument("--store", type=str, default=OBJECT_STORE_DIR, help=f"Object store directory (default: {OBJECT_STORE_DIR}).")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    dedupe = subparsers.add_parser("dedupe", help="Move file contents into the store and replace the files by links.")
+    dedupe.add_argument("directory", type=str, help="Directory to deduplicate.")
+    dedupe.add_argument("--link-mode", choices=LINK_MODES, default="auto", help="How files are linked to their objects (default: auto).")
+    dedupe.add_argument("--include", nargs="*", help=f"Only deduplicate files matching these globs (default: {' '.join(DEDUPE_PATTERNS)}).")
+    dedupe.add_argument("--exclude", nargs="*", help="Skip files and directories matching these globs.")
+
+    copy = subparsers.add_parser("copy", help="Copy a file through the store.")
+    copy.add_argument("src", type=str, help="Source file.")
+    copy.add_argument("dest", type=str, help="Destination file.")
+    copy.add_argument("--link-mode", choices=LINK_MODES, default="auto", help="How the copy is linked to its object (default: auto).")
+
+    gc = subparsers.add_parser("gc", help="Delete objects no library file refers to.")
+    gc.add_argument("--dry-run", action="store_true", help="Only list what would be deleted.")
+
+    subparsers.add_parser("report", help="Show deduplication savings.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        store = ObjectStore(args.store, link_mode=getattr(args, "link_mode", "auto"))
+        if args.command == "dedupe":
+            summary = store.dedupe_tree(args.directory, include=args.include, exclude=args.exclude)
+            print(f"Deduplicated {summary['files']} files ({summary['linked']} newly linked, {summary['bytes_copied']} bytes stored).")
+        elif args.command == "copy":
+            print(f"Copied {args.src} to {args.dest} ({store.copy(args.src, args.dest)}).")
+        elif args.command == "gc":
+            summary = store.gc(dry_run=args.dry_run)
+            action = "Would remove" if args.dry_run else "Removed"
+            print(f"{action} {len(summary['removed'])} objects ({summary['freed_bytes']} bytes), dropped {summary['stale_refs']} stale references.")
+        else:
+            for key, value in store.report().items():
+                print(f"{key}: {value}")
+        if not (args.command == "gc" and args.dry_run):
+            store.save()
@@ -0,0 +1,5 @@
+# Copyright 2024 chevp. All rights reserved.
+
+from scdf.bvh import BVH, scene_bvh
+from scdf.loader import load_scene_graph, read_scdf
+from scdf.scene_graph import SceneGraph
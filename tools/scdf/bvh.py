@@ -0,0 +1,495 @@
+# Copyright 2024 chevp. All rights reserved.
+
+# Bounding volume hierarchy over the nodes of a scene, for region, ray and
+# proximity queries without scanning every node.
+
+import weakref
+import numpy as np
+from scdf.scene_graph import compose_matrices
+
+DEFAULT_HALF_EXTENT = 0.5
+DEFAULT_LEAF_SIZE = 8
+SAH_BINS = 32
+# Nodes with fewer boxes are split at the median: SAH gains little there and costs most of the build time.
+SAH_MIN_BOXES = 64
+METHODS = ("sah", "median")
+
+def transformed_bounds(matrices, half_extents=DEFAULT_HALF_EXTENT):
+    """
+    Computes the axis-aligned bounds of boxes ``[-h, h]`` placed by transform matrices.
+
+    The bounds of a rotated and scaled box are its center plus/minus the
+    absolute values of the matrix' rotation-scale part applied to the half
+    extents, which is exact for boxes and needs no corner enumeration.
+
+    Args:
+        matrices (np.ndarray): ``(N, 4, 4)`` transform matrices.
+        half_extents (float or array-like): Half size of the boxes in local space,
+            one value, one ``(3,)`` vector or ``(N, 3)`` per box.
+
+    Returns:
+        tuple: ``(mins, maxs)``, two ``(N, 3)`` arrays.
+    """
+    matrices = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+    half = np.broadcast_to(np.asarray(half_extents, dtype=np.float64), (len(matrices), 3))
+    centers = matrices[:, :3, 3]
+    radius = np.einsum("nij,nj->ni", np.abs(matrices[:, :3, :3]), half)
+    return centers - radius, centers + radius
+
+def objects_bounds(objects, half_extents=DEFAULT_HALF_EXTENT):
+    """
+    Computes the bounds of objects in the exporters' format.
+
+    Args:
+        objects (list): Dicts with ``location``, ``rotation`` (Euler angles in
+            radians, as Blender stores them) and ``scale``.
+        half_extents (float or array-like): Half size of the objects in local space.
+
+    Returns:
+        tuple: ``(mins, maxs)``, two ``(N, 3)`` arrays.
+    """
+    positions = np.array([obj.get("location") or (0.0, 0.0, 0.0) for obj in objects], dtype=np.float64).reshape(-1, 3)
+    rotations = np.array([obj.get("rotation") or (0.0, 0.0, 0.0) for obj in objects], dtype=np.float64).reshape(-1, 3)
+    scales = np.array([obj.get("scale") or (1.0, 1.0, 1.0) for obj in objects], dtype=np.float64).reshape(-1, 3)
+    return transformed_bounds(compose_matrices(positions, np.degrees(rotations), scales), half_extents)
+
+def _surface_area(mins, maxs):
+    size = maxs - mins
+    return size[..., 0] * size[..., 1] + size[..., 1] * size[..., 2] + size[..., 2] * size[..., 0]
+
+def _overlaps(mins_a, maxs_a, mins_b, maxs_b):
+    return np.all((mins_a <= maxs_b) & (maxs_a >= mins_b), axis=1)
+
+def _box_distances(points, mins, maxs):
+    gap = np.maximum(np.maximum(mins - points, points - maxs), 0.0)
+    return np.sqrt(np.einsum("ij,ij->i", gap, gap))
+
+def _ray_box(origins, directions, inverse, mins, maxs):
+    with np.errstate(invalid="ignore"):
+        t1 = (mins - origins) * inverse
+        t2 = (maxs - origins) * inverse
+    # Rays parallel to a slab either run inside it (no constraint) or miss the box.
+    parallel = directions == 0
+    if parallel.any():
+        inside = (origins >= mins) & (origins <= maxs)
+        t1 = np.where(parallel, np.where(inside, -np.inf, np.inf), t1)
+        t2 = np.where(parallel, np.inf, t2)
+    near = np.max(np.minimum(t1, t2), axis=1)
+    far = np.min(np.maximum(t1, t2), axis=1)
+    return np.maximum(near, 0.0), (near <= far) & (far >= 0)
+
+def _first_per_group(groups, count):
+    # Index of the first element of every group in a group-sorted array, and each group's size.
+    sizes = np.bincount(groups, minlength=count)
+    return np.cumsum(sizes) - sizes, sizes
+
+class BVH:
+    """
+    Bounding volume hierarchy over axis-aligned boxes.
+
+    The tree is stored in flat NumPy arrays: every node covers a contiguous
+    range ``order[start:start + count]`` of the boxes and has the indices of
+    its two children (-1 for leaves). Queries are batched: all queries descend
+    the tree together, one vectorized step per tree level, so the Python
+    overhead depends on the tree depth rather than on the number of queries
+    or boxes.
+
+    The hierarchy is built by splitting nodes with the surface area heuristic
+    (evaluated at up to ``SAH_BINS`` candidate positions per axis; nodes smaller
+    than ``SAH_MIN_BOXES`` are split at the median), or at the median of the
+    longest axis throughout, which builds faster but answers queries slower.
+    When boxes move, ``refit`` updates the node bounds without rebuilding the
+    tree; queries stay correct, but get slower once boxes moved far from where
+    they were at build time.
+
+    Query results are ``ids``, the indices of the boxes unless other ids were given.
+
+    Args:
+        mins (array-like): ``(N, 3)`` minimum corners.
+        maxs (array-like): ``(N, 3)`` maximum corners.
+        ids (array-like, optional): Id reported for every box (defaults to its index).
+        method (str): 'sah' or 'median'.
+        leaf_size (int): Maximum number of boxes per leaf.
+    """
+
+    def __init__(self, mins, maxs, ids=None, method="sah", leaf_size=DEFAULT_LEAF_SIZE):
+        if method not in METHODS:
+            raise ValueError(f"Unknown BVH build method: {method}. Supported methods: {', '.join(METHODS)}.")
+        if leaf_size < 1:
+            raise ValueError("leaf_size must be at least 1")
+        self.mins = np.array(mins, dtype=np.float64).reshape(-1, 3)
+        self.maxs = np.array(maxs, dtype=np.float64).reshape(-1, 3)
+        if self.mins.shape != self.maxs.shape:
+            raise ValueError("mins and maxs must have the same shape")
+        self.ids = np.arange(len(self.mins)) if ids is None else np.asarray(ids, dtype=np.int64)
+        if len(self.ids) != len(self.mins):
+            raise ValueError("ids must have one entry per box")
+        self.method = method
+        self.leaf_size = leaf_size
+        self._build()
+
+    @classmethod
+    def from_scene_graph(cls, graph, half_extents=DEFAULT_HALF_EXTENT, names=None, **options):
+        """
+        Builds a BVH over the world-space bounds of scene graph nodes.
+
+        SCDF nodes carry no mesh extents, so every node is treated as a box of
+        ``2 * half_extents`` in its local space, scaled, rotated and placed by
+        its world matrix.
+
+        Args:
+            graph (SceneGraph): The scene.
+            half_extents (float or array-like): Local half size, one value or ``(N, 3)`` per node.
+            names (list, optional): Only index these nodes (e.g. the lights); ids stay graph indices.
+            **options: ``method`` and ``leaf_size``.
+
+        Returns:
+            BVH: The hierarchy; ids are node indices into ``graph.names``.
+        """
+        mins, maxs = transformed_bounds(graph.world_matrices(), half_extents)
+        if names is None:
+            return cls(mins, maxs, **options)
+        ids = np.array([graph.index[name] for name in names], dtype=np.int64)
+        return cls(mins[ids], maxs[ids], ids=ids, **options)
+
+    @classmethod
+    def from_objects(cls, objects, half_extents=DEFAULT_HALF_EXTENT, **options):
+        """
+        Builds a BVH over objects in the exporters' format (see ``objects_bounds``).
+
+        Returns:
+            BVH: The hierarchy; ids are indices into ``objects``.
+        """
+        mins, maxs = objects_bounds(objects, half_extents)
+        return cls(mins, maxs, **options)
+
+    def __len__(self):
+        return len(self.mins)
+
+    # -- Building ----------------------------------------------------------
+
+    def _build(self):
+        count = len(self.mins)
+        self.order = np.arange(count)
+        centroids = (self.mins + self.maxs) * 0.5
+        start, size, left, right, depth = [0], [count], [-1], [-1], [0]
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if size[node] <= self.leaf_size:
+                continue
+            items = self.order[start[node]:start[node] + size[node]]
+            items, middle = self._split(items, centroids[items])
+            self.order[start[node]:start[node] + size[node]] = items
+            for child_start, child_size in ((start[node], middle), (start[node] + middle, size[node] - middle)):
+                start.append(child_start)
+                size.append(child_size)
+                left.append(-1)
+                right.append(-1)
+                depth.append(depth[node] + 1)
+            left[node], right[node] = len(start) - 2, len(start) - 1
+            stack.extend((right[node], left[node]))
+
+        self.start = np.array(start, dtype=np.int64)
+        self.count = np.array(size, dtype=np.int64)
+        self.left = np.array(left, dtype=np.int64)
+        self.right = np.array(right, dtype=np.int64)
+        depth = np.array(depth, dtype=np.int64)
+        inner = np.flatnonzero(self.left >= 0)
+        # Inner nodes grouped by depth, deepest first, for bottom-up refits.
+        self._levels = [inner[depth[inner] == level] for level in range(depth.max(), -1, -1)]
+        self._leaves = np.flatnonzero(self.left < 0)
+        self._leaves = self._leaves[np.argsort(self.start[self._leaves], kind="stable")]
+        self.node_mins = np.empty((len(start), 3))
+        self.node_maxs = np.empty((len(start), 3))
+        self._refit_nodes()
+
+    def _split(self, items, centroids):
+        extent = centroids.max(axis=0) - centroids.min(axis=0)
+        middle = len(items) // 2
+        if not extent.any():
+            # All centers coincide: no split separates them, so just halve the node.
+            return items, middle
+        if self.method == "median" or len(items) < SAH_MIN_BOXES:
+            axis = int(np.argmax(extent))
+            partition = np.argpartition(centroids[:, axis], middle)
+            return items[partition], middle
+
+        # All three axes at once: sorted[:, a] orders the items along axis a, and the
+        # gathered bounds are (items, axis, xyz).
+        count = len(items)
+        bins = min(count, SAH_BINS)
+        boundaries = (np.arange(bins) * count) // bins
+        sorted_items = items[np.argsort(centroids, axis=0, kind="stable")]
+        bin_mins = np.minimum.reduceat(self.mins[sorted_items], boundaries)
+        bin_maxs = np.maximum.reduceat(self.maxs[sorted_items], boundaries)
+        left_area = _surface_area(np.minimum.accumulate(bin_mins)[:-1], np.maximum.accumulate(bin_maxs)[:-1])
+        right_area = _surface_area(np.minimum.accumulate(bin_mins[::-1])[::-1][1:],
+                                   np.maximum.accumulate(bin_maxs[::-1])[::-1][1:])
+        left_count = boundaries[1:, np.newaxis]
+        cost = left_area * left_count + right_area * (count - left_count)
+        cost[:, extent == 0] = np.inf
+        split, axis = np.unravel_index(np.argmin(cost), cost.shape)
+        return sorted_items[:, axis], int(left_count[split, 0])
+
+    def _refit_nodes(self):
+        if not len(self.mins):
+            self.node_mins[:] = np.inf
+            self.node_maxs[:] = -np.inf
+            return
+        # Leaves tile ``order`` in start order, so one reduceat bounds all of them.
+        leaf_starts = self.start[self._leaves]
+        self.node_mins[self._leaves] = np.minimum.reduceat(self.mins[self.order], leaf_starts)
+        self.node_maxs[self._leaves] = np.maximum.reduceat(self.maxs[self.order], leaf_starts)
+        for nodes in self._levels:
+            self.node_mins[nodes] = np.minimum(self.node_mins[self.left[nodes]], self.node_mins[self.right[nodes]])
+            self.node_maxs[nodes] = np.maximum(self.node_maxs[self.left[nodes]], self.node_maxs[self.right[nodes]])
+
+    def refit(self, mins, maxs):
+        """
+        Replaces the box bounds and updates the node bounds, keeping the tree structure.
+
+        Args:
+            mins (array-like): ``(N, 3)`` new minimum corners, in the original order.
+            maxs (array-like): ``(N, 3)`` new maximum corners.
+        """
+        mins = np.array(mins, dtype=np.float64).reshape(-1, 3)
+        maxs = np.array(maxs, dtype=np.float64).reshape(-1, 3)
+        if mins.shape != self.mins.shape or maxs.shape != self.maxs.shape:
+            raise ValueError(f"refit needs bounds for exactly {len(self.mins)} boxes")
+        self.mins, self.maxs = mins, maxs
+        self._refit_nodes()
+
+    # -- Queries -----------------------------------------------------------
+
+    def _expand(self, nodes):
+        # The boxes of every node as (position in ``nodes``, box index) pairs.
+        sizes = self.count[nodes]
+        owner = np.repeat(np.arange(len(nodes)), sizes)
+        offsets = np.arange(len(owner)) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        return owner, self.order[np.repeat(self.start[nodes], sizes) + offsets]
+
+    def _traverse(self, queries, visit_node, visit_boxes):
+        # Walks all queries down the tree together. ``visit_node(queries, nodes)`` tells which
+        # (query, node) pairs to descend into; ``visit_boxes(queries, boxes)`` gets the boxes of
+        # the leaves that were reached.
+        nodes = np.zeros(len(queries), dtype=np.int64)
+        while len(queries):
+            keep = visit_node(queries, nodes)
+            queries, nodes = queries[keep], nodes[keep]
+            leaf = self.left[nodes] < 0
+            if leaf.any():
+                owner, boxes = self._expand(nodes[leaf])
+                visit_boxes(queries[leaf][owner], boxes)
+            inner = nodes[~leaf]
+            queries = np.concatenate([queries[~leaf], queries[~leaf]])
+            nodes = np.concatenate([self.left[inner], self.right[inner]])
+
+    def _box_pairs(self, mins, maxs):
+        found_queries, found_boxes = [], []
+
+        def visit_boxes(queries, boxes):
+            hit = _overlaps(mins[queries], maxs[queries], self.mins[boxes], self.maxs[boxes])
+            found_queries.append(queries[hit])
+            found_boxes.append(boxes[hit])
+
+        self._traverse(np.arange(len(mins)),
+                       lambda queries, nodes: _overlaps(mins[queries], maxs[queries],
+                                                        self.node_mins[nodes], self.node_maxs[nodes]),
+                       visit_boxes)
+        if not found_queries:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        return np.concatenate(found_queries), np.concatenate(found_boxes)
+
+    def query_boxes(self, mins, maxs):
+        """
+        Finds the boxes overlapping each of many query boxes (touching counts as overlapping).
+
+        Args:
+            mins (array-like): ``(M, 3)`` minimum corners of the query boxes.
+            maxs (array-like): ``(M, 3)`` maximum corners.
+
+        Returns:
+            list: One sorted array of ids per query box.
+        """
+        mins = np.asarray(mins, dtype=np.float64).reshape(-1, 3)
+        maxs = np.asarray(maxs, dtype=np.float64).reshape(-1, 3)
+        queries, boxes = self._box_pairs(mins, maxs)
+        ids = self.ids[boxes]
+        order = np.lexsort((ids, queries))
+        return np.split(ids[order], np.searchsorted(queries[order], np.arange(1, len(mins))))
+
+    def query_box(self, box_min, box_max):
+        """
+        Finds the boxes overlapping one query box, e.g. the props inside a volume.
+
+        Returns:
+            np.ndarray: Sorted ids.
+        """
+        return self.query_boxes([box_min], [box_max])[0]
+
+    def overlapping_pairs(self, other=None):
+        """
+        Finds overlapping boxes, within this BVH or between this BVH and another one.
+
+        Args:
+            other (BVH, optional): Second hierarchy, e.g. the environment being merged in.
+
+        Returns:
+            np.ndarray: ``(P, 2)`` id pairs, sorted. Without ``other`` every pair is
+                reported once, with the smaller id first; with ``other`` the first
+                column holds ids of this BVH and the second ids of ``other``.
+        """
+        target = self if other is None else other
+        queries, boxes = target._box_pairs(self.mins, self.maxs)
+        pairs = np.stack([self.ids[queries], target.ids[boxes]], axis=1)
+        if other is None:
+            pairs = pairs[pairs[:, 0] < pairs[:, 1]]
+        return pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def ray_cast(self, origins, directions, max_distance=np.inf):
+        """
+        Finds the first box hit by each of many rays.
+
+        Args:
+            origins (array-like): ``(M, 3)`` ray origins.
+            directions (array-like): ``(M, 3)`` ray directions (need not be normalized).
+            max_distance (float): Ignore hits farther away than this.
+
+        Returns:
+            tuple: ``(ids, distances)``: the id of the nearest box hit per ray (-1 for
+                misses) and the distance along the ray to where it enters the box
+                (0 if the ray starts inside; inf for misses).
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.asarray(directions, dtype=np.float64).reshape(-1, 3)
+        lengths = np.linalg.norm(directions, axis=1, keepdims=True)
+        if not lengths.all():
+            raise ValueError("Ray directions must not be zero")
+        directions = directions / lengths
+        with np.errstate(divide="ignore"):
+            inverse = 1.0 / directions
+        best_distance = np.full(len(origins), float(max_distance))
+        best_box = np.full(len(origins), -1, dtype=np.int64)
+
+        def visit_node(queries, nodes):
+            distance, hit = _ray_box(origins[queries], directions[queries], inverse[queries],
+                                     self.node_mins[nodes], self.node_maxs[nodes])
+            return hit & (distance <= best_distance[queries])
+
+        def visit_boxes(queries, boxes):
+            distance, hit = _ray_box(origins[queries], directions[queries], inverse[queries],
+                                     self.mins[boxes], self.maxs[boxes])
+            hit &= distance <= best_distance[queries]
+            queries, boxes, distance = queries[hit], boxes[hit], distance[hit]
+            # Keep the nearest hit per ray (ties go to the lower box index).
+            order = np.lexsort((boxes, distance, queries))
+            first = order[np.unique(queries[order], return_index=True)[1]]
+            closer = (distance[first] < best_distance[queries[first]]) | (best_box[queries[first]] < 0)
+            best_distance[queries[first[closer]]] = distance[first[closer]]
+            best_box[queries[first[closer]]] = boxes[first[closer]]
+
+        self._traverse(np.arange(len(origins)), visit_node, visit_boxes)
+        missed = best_box < 0
+        best_distance[missed] = np.inf
+        ids = np.full(len(origins), -1, dtype=np.int64)
+        ids[~missed] = self.ids[best_box[~missed]]
+        return ids, best_distance
+
+    def nearest(self, points, k=1):
+        """
+        Finds the k nearest boxes to each of many points.
+
+        Distances are measured to the boxes, so a point inside a box is at
+        distance 0 from it. To find the nearest other node of a node, query its
+        position with ``k=2`` and drop the node itself.
+
+        Args:
+            points (array-like): ``(M, 3)`` query points.
+            k (int): Number of neighbours (at most the number of boxes).
+
+        Returns:
+            tuple: ``(ids, distances)``, two ``(M, k)`` arrays sorted by distance.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        k = min(k, len(self.mins))
+        if k < 1:
+            return np.empty((len(points), 0), dtype=np.int64), np.empty((len(points), 0))
+
+        # An upper bound for the k-th distance: descend towards the nearer child while it still
+        # holds k boxes, and take the k-th distance among that node's boxes.
+        start = np.zeros(len(points), dtype=np.int64)
+        active = np.arange(len(points))
+        while len(active):
+            active = active[self.left[start[active]] >= 0]
+            nodes = start[active]
+            left, right = self.left[nodes], self.right[nodes]
+            near_left = (_box_distances(points[active], self.node_mins[left], self.node_maxs[left])
+                         <= _box_distances(points[active], self.node_mins[right], self.node_maxs[right]))
+            child = np.where(near_left, left, right)
+            descend = self.count[child] >= k
+            start[active[descend]] = child[descend]
+            active = active[descend]
+        owner, boxes = self._expand(start)
+        distance = _box_distances(points[owner], self.mins[boxes], self.maxs[boxes])
+        order = np.lexsort((distance, owner))
+        first, _ = _first_per_group(owner, len(points))
+        bound = distance[order][first + k - 1]
+
+        # Every box within the bound is a candidate; the k nearest are among them.
+        found_queries, found_boxes, found_distances = [], [], []
+
+        def visit_boxes(queries, boxes):
+            distance = _box_distances(points[queries], self.mins[boxes], self.maxs[boxes])
+            keep = distance <= bound[queries]
+            found_queries.append(queries[keep])
+            found_boxes.append(boxes[keep])
+            found_distances.append(distance[keep])
+
+        self._traverse(np.arange(len(points)),
+                       lambda queries, nodes: _box_distances(points[queries], self.node_mins[nodes],
+                                                             self.node_maxs[nodes]) <= bound[queries],
+                       visit_boxes)
+        queries = np.concatenate(found_queries)
+        boxes = np.concatenate(found_boxes)
+        distances = np.concatenate(found_distances)
+        order = np.lexsort((boxes, distances, queries))
+        first, _ = _first_per_group(queries, len(points))
+        selected = order[(first[:, np.newaxis] + np.arange(k)).ravel()]
+        return self.ids[boxes[selected]].reshape(-1, k), distances[selected].reshape(-1, k)
+
+# Scene graph -> (version, options, half extents, BVH); entries go away with their scene.
+_SCENE_BVHS = weakref.WeakKeyDictionary()
+
+def scene_bvh(graph, half_extents=DEFAULT_HALF_EXTENT, method="sah", leaf_size=DEFAULT_LEAF_SIZE, rebuild=False):
+    """
+    Returns a BVH over all nodes of a scene graph, cached per scene version.
+
+    While ``graph.version`` is unchanged the cached hierarchy is returned as is.
+    After transforms were edited (``set_transform``/``set_transforms``) the
+    cached hierarchy is refitted to the new world bounds instead of rebuilt;
+    pass ``rebuild=True`` to rebuild it, e.g. after large moves made queries slow.
+
+    Args:
+        graph (SceneGraph): The scene.
+        half_extents (float or array-like): Local half size of the nodes (see ``BVH.from_scene_graph``).
+        method (str): 'sah' or 'median'.
+        leaf_size (int): Maximum number of nodes per leaf.
+        rebuild (bool): Build a new hierarchy even if a cached one could be refitted.
+
+    Returns:
+        BVH: The hierarchy; ids are node indices into ``graph.names``.
+    """
+    options = (method, leaf_size)
+    half = np.array(half_extents, dtype=np.float64)
+    cached = _SCENE_BVHS.get(graph)
+    if cached is not None and not rebuild:
+        version, cached_options, cached_half, bvh = cached
+        if cached_options == options and cached_half.shape == half.shape and np.array_equal(cached_half, half):
+            if version != graph.version:
+                bvh.refit(*transformed_bounds(graph.world_matrices(), half))
+                _SCENE_BVHS[graph] = (graph.version, options, half, bvh)
+            return bvh
+    bvh = BVH.from_scene_graph(graph, half, method=method, leaf_size=leaf_size)
+    _SCENE_BVHS[graph] = (graph.version, options, half, bvh)
+    return bvh
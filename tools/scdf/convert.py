@@ -0,0 +1,554 @@
+# Copyright 2024 chevp. All rights reserved.
+#
+# Conversion between the scene formats of the library.
+#
+# Every reader produces the same intermediate representation (IR): a dict in the
+# shape of an SCDF document (``scene``, ``nodes``, ``materials``, ``cameras``,
+# ``lights``, ``metadata`` and optionally ``linkedScenes``). Data a format can
+# hold but SCDF can't (the ``uuid``, ``name`` and non-scene components of a
+# ``*.scene.yml`` file) is kept under ``extras`` and only written back by the
+# formats that support it. Every writer takes that IR, so converting between any
+# two formats is one read and one write.
+
+import argparse
+import os
+import uuid
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import yaml
+from utils import json_codec
+from utils.file_utils import compute_file_digest
+from utils.instrumentation import add_profiling_arguments, profiling_from_arguments
+from utils.scanner import scan_directory
+
+FORMAT_SUFFIXES = OrderedDict([
+    ("scdf.json", (".scdf.json",)),
+    ("scdf.yaml", (".scdf.yaml", ".scdf.yml")),
+    ("scdf.xml", (".scdf.xml",)),
+    ("scoe.xml", (".scoe.xml",)),
+    ("scene.yml", (".scene.yml", ".scene.yaml")),
+])
+# Glob patterns of all scene files, for ``scan_directory``.
+SCENE_PATTERNS = ["*" + suffix for suffixes in FORMAT_SUFFIXES.values() for suffix in suffixes]
+
+SCDF_SECTIONS = ("scene", "nodes", "linkedScenes", "materials", "cameras", "lights", "metadata")
+
+# Singular element names of the list sections in the XML formats.
+XML_ITEM_TAGS = {"nodes": "node", "linkedScenes": "linkedScene", "materials": "material", "cameras": "camera", "lights": "light"}
+XML_VECTOR_AXES = (("x", "y", "z"), ("r", "g", "b"))
+# Keys written as child elements rather than attributes in the scdf.xml format.
+XML_TEXT_KEYS = ("texture",)
+
+COMP_LIGHT_TYPES = {"pointLight": "point", "directionalLight": "directional", "spotLight": "spot"}
+COMP_CAMERA_KEYS = {"near": "nearPlane", "far": "farPlane"}
+
+IR_CACHE_SIZE = 64
+# Raised by the readers and writers on files that can't be read or don't hold a valid scene.
+SCENE_ERRORS = (OSError, ValueError, KeyError, TypeError, ET.ParseError, yaml.YAMLError)
+# Prefix of the messages ``convert_directory`` returns for files it leaves out on purpose.
+SKIPPED_PREFIX = "Skipped: "
+
+_ir_cache = OrderedDict()
+
+def detect_format(file_path):
+    """
+    Determines the scene format of a file from its suffix.
+
+    Args:
+        file_path (str): Path to a scene file.
+
+    Returns:
+        str: Format name (one of FORMAT_SUFFIXES).
+
+    Raises:
+        ValueError: If the suffix belongs to no known format.
+    """
+    name = os.path.basename(file_path).lower()
+    for format, suffixes in FORMAT_SUFFIXES.items():
+        if name.endswith(suffixes):
+            return format
+    raise ValueError(f"Unknown scene format: {file_path}")
+
+def scene_basename(file_path):
+    """
+    Returns the file name of a scene without its format suffix ('scene_1.scdf.json' -> 'scene_1').
+    """
+    name = os.path.basename(file_path)
+    for suffixes in FORMAT_SUFFIXES.values():
+        for suffix in suffixes:
+            if name.lower().endswith(suffix):
+                return name[:-len(suffix)]
+    return os.path.splitext(name)[0]
+
+def _empty_ir():
+    return {"scene": {}, "nodes": [], "materials": [], "cameras": [], "lights": [], "metadata": {}}
+
+def _parse_scalar(text):
+    text = text.strip()
+    if text.startswith("[") and text.endswith("]"):
+        return [_parse_scalar(part) for part in text[1:-1].split(",") if part.strip()]
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+def _format_scalar(value):
+    if isinstance(value, list):
+        return "[" + ", ".join(_format_scalar(item) for item in value) + "]"
+    return str(value)
+
+# -- Readers -----------------------------------------------------------------
+
+def read_scdf_json(file_path):
+    return json_codec.load(file_path)
+
+def read_scdf_yaml(file_path):
+    with open(file_path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+def _xml_item(elem):
+    item = {name: _parse_scalar(value) for name, value in elem.attrib.items()}
+    for child in elem:
+        if child.tag == "children":
+            item["children"] = [(grandchild.text or "").strip() for grandchild in child]
+            continue
+        for axes in XML_VECTOR_AXES:
+            if child.attrib and set(child.attrib) <= set(axes):
+                item[child.tag] = [_parse_scalar(child.attrib.get(axis, "0")) for axis in axes]
+                break
+        else:
+            if child.attrib:
+                item[child.tag] = {name: _parse_scalar(value) for name, value in child.attrib.items()}
+            else:
+                text = (child.text or "").strip()
+                item[child.tag] = _parse_scalar(text) if text.startswith("[") else text
+    return item
+
+def read_scene_xml(file_path):
+    """
+    Reads a scene in either XML format (``*.scdf.xml`` or ``*.scoe.xml``).
+
+    The file is parsed incrementally with ``iterparse`` and every node, material,
+    camera and light element is discarded as soon as it has been converted, so
+    memory stays flat however large the scene is. Attribute values and bracketed
+    lists (``"[0, 5, 10]"``) become numbers; ``<position x=".." y=".." z=".."/>``
+    and ``<color r=".." g=".." b=".."/>`` elements become 3-item lists.
+
+    Args:
+        file_path (str): Path to the XML file.
+
+    Returns:
+        dict: The scene IR.
+    """
+    ir = _empty_ir()
+    depth = 0
+    section = None
+    for event, elem in ET.iterparse(file_path, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if depth == 2:
+                section = elem.tag
+            continue
+        if depth == 3 and section not in ("scene", "metadata"):
+            ir.setdefault(section, []).append(_xml_item(elem))
+            elem.clear()
+        elif depth == 2:
+            if section in ("scene", "metadata"):
+                ir[section] = {child.tag: (child.text or "").strip() for child in elem}
+            elem.clear()
+        depth -= 1
+    return ir
+
+def _hex_to_rgb(value):
+    if isinstance(value, str) and value.startswith("#") and len(value) == 7:
+        return [round(int(value[i:i + 2], 16) / 255, 4) for i in (1, 3, 5)]
+    return value
+
+def _rgb_to_hex(value):
+    if isinstance(value, list) and len(value) == 3:
+        return "#" + "".join(f"{max(0, min(255, round(channel * 255))):02x}" for channel in value)
+    return value
+
+def _unique_name(name, used):
+    # Blender-style copy suffix: 'Mesh', 'Mesh.001', 'Mesh.002', ...
+    unique = name
+    copy = 0
+    while unique in used:
+        copy += 1
+        unique = f"{name}.{copy:03d}"
+    used.add(unique)
+    return unique
+
+def read_scene_yml(file_path):
+    """
+    Reads a component-list scene (``*.scene.yml``).
+
+    Light comps become lights (plus a node carrying their position), camera comps
+    become cameras and object comps become nodes. Other comps (shaders, physics,
+    helpers) and the file's ``uuid``/``name`` are kept under ``extras``.
+
+    Names are taken from the comp each light, camera or node is built from. When comps
+    of different types share a name, only a comp whose type the name mentions keeps
+    it (a camera called 'PerspectiveCamera'); the others are named after their type.
+    Repeated names get Blender's copy suffix ('Mesh', 'Mesh.001').
+
+    Args:
+        file_path (str): Path to the YAML file.
+
+    Returns:
+        dict: The scene IR.
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        document = yaml.safe_load(f) or {}
+    ir = _empty_ir()
+    extras = {key: value for key, value in document.items() if key != "comps"}
+    extras["comps"] = []
+    comps = document.get("comps") or []
+    types_by_name = {}
+    for comp in comps:
+        types_by_name.setdefault(comp.get("name"), set()).add(comp.get("type"))
+    used = {"nodes": set(), "lights": set(), "cameras": set()}
+    for original in comps:
+        comp = dict(original)
+        comp_type = comp.pop("type", None)
+        name = comp.pop("name", None)
+        if name is None or len(types_by_name[name]) > 1 and str(comp_type).lower() not in name.lower():
+            name = comp_type
+        position = comp.pop("pos", None)
+        if comp_type in COMP_LIGHT_TYPES:
+            name = _unique_name(name, used["lights"])
+            light = {"name": name, "type": COMP_LIGHT_TYPES[comp_type], "intensity": comp.pop("intensity", 1),
+                     "color": _hex_to_rgb(comp.pop("color", "#ffffff"))}
+            light.update(comp)
+            ir["lights"].append(light)
+            if position is not None:
+                ir["nodes"].append({"name": _unique_name(name, used["nodes"]), "light": name, "position": position})
+        elif comp_type == "camera":
+            camera = {"name": _unique_name(name, used["cameras"]), "position": position or [0, 0, 0],
+                      "rotation": comp.pop("rotation", [0, 0, 0])}
+            camera.update({COMP_CAMERA_KEYS.get(key, key): value for key, value in comp.items()})
+            ir["cameras"].append(camera)
+        elif comp_type == "object":
+            node = {"name": _unique_name(name, used["nodes"]), "type": "object"}
+            node.update(comp)
+            node["position"] = position or [0, 0, 0]
+            ir["nodes"].append(node)
+        else:
+            extras["comps"].append(original)
+    if ir["cameras"]:
+        ir["scene"]["activeCamera"] = ir["cameras"][0]["name"]
+    ir["extras"] = extras
+    return ir
+
+# -- Writers -----------------------------------------------------------------
+
+def _scdf_document(ir):
+    return {section: ir[section] for section in SCDF_SECTIONS if section in ir}
+
+def write_scdf_json(ir, file_path):
+    with open(file_path, "wb") as f:
+        f.write(json_codec.encode(_scdf_document(ir), pretty=2) + b"\n")
+
+def write_scdf_yaml(ir, file_path):
+    with open(file_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(_scdf_document(ir), f, sort_keys=False, default_flow_style=None, allow_unicode=True)
+
+def _xml_element(tag, item, vectors_as_attributes, vectors_as_text):
+    elem = ET.Element(tag)
+    for key, value in item.items():
+        if key == "children":
+            children = ET.SubElement(elem, "children")
+            for child in value:
+                ET.SubElement(children, "child").text = child
+        elif isinstance(value, list) and len(value) == 3 and not vectors_as_attributes:
+            if vectors_as_text:
+                ET.SubElement(elem, key).text = _format_scalar(value)
+            else:
+                axes = XML_VECTOR_AXES[1] if key == "color" else XML_VECTOR_AXES[0]
+                ET.SubElement(elem, key, {axis: _format_scalar(component) for axis, component in zip(axes, value)})
+        elif isinstance(value, dict):
+            ET.SubElement(elem, key, {name: _format_scalar(entry) for name, entry in value.items()})
+        elif key in XML_TEXT_KEYS:
+            ET.SubElement(elem, key).text = _format_scalar(value)
+        else:
+            elem.set(key, _format_scalar(value))
+    return elem
+
+def _write_scene_xml(ir, file_path, scoe):
+    root = ET.Element("scoe")
+    for section in SCDF_SECTIONS:
+        if section not in ir:
+            continue
+        section_elem = ET.SubElement(root, section)
+        if section in ("scene", "metadata"):
+            for key, value in ir[section].items():
+                ET.SubElement(section_elem, key).text = _format_scalar(value)
+            continue
+        for item in ir[section]:
+            # scoe.xml keeps node vectors in attributes and all other vectors as bracketed text.
+            section_elem.append(_xml_element(XML_ITEM_TAGS.get(section, section.rstrip("s")), item,
+                                             vectors_as_attributes=scoe and section == "nodes", vectors_as_text=scoe))
+    ET.indent(root, space="  " if scoe else "    ")
+    ET.ElementTree(root).write(file_path, encoding="utf-8", xml_declaration=False)
+
+def write_scdf_xml(ir, file_path):
+    _write_scene_xml(ir, file_path, scoe=False)
+
+def write_scoe_xml(ir, file_path):
+    _write_scene_xml(ir, file_path, scoe=True)
+
+def write_scene_yml(ir, file_path):
+    """
+    Writes a component-list scene (``*.scene.yml``).
+
+    Lights, cameras and nodes become comps; a node that only places a light is
+    folded into that light's ``pos``. Materials and the node hierarchy have no
+    counterpart in this format and are dropped.
+    """
+    extras = ir.get("extras") or {}
+    light_positions = {}
+    comps = []
+    for node in ir.get("nodes", []):
+        if "light" in node and set(node) <= {"name", "light", "position", "rotation", "scale"}:
+            light_positions.setdefault(node["light"], node.get("position"))
+    for light in ir.get("lights", []):
+        comp = {"type": f"{light.get('type', 'point')}Light", "name": light["name"]}
+        comp.update({key: value for key, value in light.items() if key not in ("name", "type")})
+        comp["color"] = _rgb_to_hex(comp.get("color"))
+        if light_positions.get(light["name"]) is not None:
+            comp["pos"] = light_positions[light["name"]]
+        comps.append(comp)
+    reverse_camera_keys = {value: key for key, value in COMP_CAMERA_KEYS.items()}
+    for camera in ir.get("cameras", []):
+        comp = {"type": "camera", "name": camera["name"]}
+        comp.update({reverse_camera_keys.get(key, key): value for key, value in camera.items() if key not in ("name", "position")})
+        comp["pos"] = camera.get("position", [0, 0, 0])
+        comps.append(comp)
+    for node in ir.get("nodes", []):
+        if node.get("light") in light_positions and set(node) <= {"name", "light", "position", "rotation", "scale"}:
+            continue
+        comp = {"type": "object", "name": node["name"]}
+        comp.update({key: value for key, value in node.items() if key not in ("name", "type", "position")})
+        comp["pos"] = node.get("position", [0, 0, 0])
+        comps.append(comp)
+    comps.extend(extras.get("comps", []))
+
+    name = extras.get("name") or scene_basename(file_path)
+    document = {"uuid": extras.get("uuid") or str(uuid.uuid5(uuid.NAMESPACE_URL, name)), "name": name}
+    document.update({key: value for key, value in extras.items() if key not in ("uuid", "name", "comps")})
+    document["comps"] = comps
+    with open(file_path, "w", encoding="utf-8") as f:
+        yaml.safe_dump(document, f, sort_keys=False, default_flow_style=None, allow_unicode=True)
+
+READERS = {
+    "scdf.json": read_scdf_json,
+    "scdf.yaml": read_scdf_yaml,
+    "scdf.xml": read_scene_xml,
+    "scoe.xml": read_scene_xml,
+    "scene.yml": read_scene_yml,
+}
+
+WRITERS = {
+    "scdf.json": write_scdf_json,
+    "scdf.yaml": write_scdf_yaml,
+    "scdf.xml": write_scdf_xml,
+    "scoe.xml": write_scoe_xml,
+    "scene.yml": write_scene_yml,
+}
+
+# -- Conversion --------------------------------------------------------------
+
+def read_scene(file_path, format=None):
+    """
+    Parses a scene file of any supported format into the IR.
+
+    Parsed IRs are cached by the digest of the file's contents (and its format),
+    so converting one source into several formats parses it only once. The
+    returned IR is shared with the cache; copy it before modifying it.
+
+    Args:
+        file_path (str): Path to the scene file.
+        format (str, optional): Source format (detected from the suffix by default).
+
+    Returns:
+        dict: The scene IR.
+    """
+    format = format or detect_format(file_path)
+    key = (format, compute_file_digest(file_path))
+    ir = _ir_cache.get(key)
+    if ir is None:
+        ir = _ir_cache[key] = READERS[format](file_path)
+        while len(_ir_cache) > IR_CACHE_SIZE:
+            _ir_cache.popitem(last=False)
+    else:
+        _ir_cache.move_to_end(key)
+    return ir
+
+def write_scene(ir, file_path, format=None):
+    """
+    Writes a scene IR in any supported format.
+
+    Args:
+        ir (dict): The scene IR.
+        file_path (str): Path of the output file.
+        format (str, optional): Target format (detected from the suffix by default).
+    """
+    format = format or detect_format(file_path)
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+    WRITERS[format](ir, file_path)
+
+def convert_file(input_path, output_path, target_format=None):
+    """
+    Converts a scene file into another format.
+
+    Args:
+        input_path (str): Path to the source scene.
+        output_path (str): Path of the converted scene.
+        target_format (str, optional): Target format (detected from ``output_path`` by default).
+
+    Returns:
+        str: The output path.
+    """
+    write_scene(read_scene(input_path), output_path, target_format)
+    return output_path
+
+def convert_scene_source(source, output_dir, target_formats):
+    """
+    Converts one scene into several formats, parsing it only once.
+
+    Args:
+        source (str): Path to the source scene.
+        output_dir (str): Directory receiving the converted scenes.
+        target_formats (list): Formats to write (names from FORMAT_SUFFIXES).
+
+    Returns:
+        list: The written files (a target in the source's own format and place is skipped).
+    """
+    written = []
+    ir = read_scene(source)
+    for format in target_formats:
+        output_path = os.path.join(output_dir, scene_basename(source) + FORMAT_SUFFIXES[format][0])
+        if os.path.abspath(output_path) != os.path.abspath(source):
+            write_scene(ir, output_path, format)
+            written.append(output_path)
+    return written
+
+def find_scene_sources(directory):
+    """
+    Finds the scene files under a directory, one per scene.
+
+    Files sharing a base name (scene_1.scdf.json, scene_1.scoe.xml, ...) are one
+    scene in several formats; only the first in FORMAT_SUFFIXES order is returned.
+
+    Args:
+        directory (str): Directory to search for scene files.
+
+    Returns:
+        tuple: ``(sources, skipped)``: the scene files, in directory order, and the
+            other files of the same scenes mapped to a message.
+    """
+    sources = []
+    skipped = {}
+    format_order = list(FORMAT_SUFFIXES)
+    for root, files in scan_directory(directory, include=SCENE_PATTERNS).by_directory().items():
+        scenes = {}
+        for name in files:
+            scenes.setdefault(scene_basename(name), []).append((format_order.index(detect_format(name)), name))
+        for base in sorted(scenes):
+            (_, primary), *duplicates = sorted(scenes[base])
+            sources.append(os.path.join(root, primary))
+            for _, name in duplicates:
+                skipped[os.path.join(root, name)] = f"{SKIPPED_PREFIX}same scene as {primary}"
+    return sources, skipped
+
+def convert_directory(directory, output_dir, target_formats, max_workers=None):
+    """
+    Converts every scene file under a directory into the given formats, in parallel.
+
+    Each source is handled by one worker process, which parses it once and writes
+    all target formats from the same IR. Outputs mirror the directory layout of
+    the sources.
+
+    Args:
+        directory (str): Directory to search for scene files.
+        output_dir (str): Directory receiving the converted scenes.
+        target_formats (list): Formats to write (names from FORMAT_SUFFIXES).
+        max_workers (int, optional): Number of worker processes; 1 converts in-process.
+
+    Returns:
+        dict: Source paths mapped to the list of written files, or to a message if the source was
+            skipped or failed to convert.
+    """
+    unknown = [format for format in target_formats if format not in WRITERS]
+    if unknown:
+        raise ValueError(f"Unknown target formats: {', '.join(unknown)}")
+    sources, results = find_scene_sources(directory)
+    jobs = [(source, os.path.join(output_dir, os.path.relpath(os.path.dirname(source), directory)), list(target_formats))
+            for source in sources]
+
+    if max_workers == 1 or len(jobs) <= 1:
+        for job in jobs:
+            results[job[0]] = _run_job(job)
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for job, result in zip(jobs, executor.map(_run_job, jobs)):
+                results[job[0]] = result
+    return results
+
+def summarize_results(results):
+    """
+    Sorts the results of ``convert_directory`` into converted, skipped and failed files.
+
+    Args:
+        results (dict): As returned by ``convert_directory``.
+
+    Returns:
+        dict: ``converted`` (list of sources), ``skipped`` and ``failed`` (sources mapped to their message).
+    """
+    summary = {"converted": [], "skipped": {}, "failed": {}}
+    for source, result in results.items():
+        if not isinstance(result, str):
+            summary["converted"].append(source)
+        elif result.startswith(SKIPPED_PREFIX):
+            summary["skipped"][source] = result
+        else:
+            summary["failed"][source] = result
+    return summary
+
+def _run_job(job):
+    try:
+        return convert_scene_source(*job)
+    except SCENE_ERRORS as e:
+        return f"{type(e).__name__}: {e}"
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Convert scenes between the SCDF, SCOE and scene.yml formats.")
+    parser.add_argument("source", type=str, help="Scene file or directory of scene files.")
+    parser.add_argument("output", type=str, help="Output file, or output directory when converting a directory.")
+    parser.add_argument("--to", nargs="+", choices=list(WRITERS), help="Target formats (required for directories).")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes for directories.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        if os.path.isdir(args.source):
+            if not args.to:
+                raise SystemExit("--to is required when converting a directory.")
+            results = convert_directory(args.source, args.output, args.to, max_workers=args.workers)
+            summary = summarize_results(results)
+            for source, message in summary["failed"].items():
+                print(f"Failed to convert {source}: {message}")
+            converted, failed = len(summary["converted"]), len(summary["failed"])
+            print(f"Converted {converted} of {converted + failed} scene files "
+                  f"({len(summary['skipped'])} skipped as other formats of the same scenes).")
+        else:
+            convert_file(args.source, args.output, args.to[0] if args.to else None)
+            print(f"Converted {args.source} to {args.output}")
@@ -0,0 +1,37 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import yaml
+from utils import json_codec
+from scdf.scene_graph import SceneGraph
+
+JSON_EXTENSIONS = (".json",)
+YAML_EXTENSIONS = (".yaml", ".yml")
+
+def read_scdf(file_path):
+    """
+    Reads an SCDF scene file (``*.scdf.json`` or ``*.scdf.yaml``/``*.scdf.yml``).
+
+    Args:
+        file_path (str): Path to the SCDF file.
+
+    Returns:
+        dict: The parsed SCDF document.
+    """
+    if file_path.endswith(YAML_EXTENSIONS):
+        with open(file_path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    if file_path.endswith(JSON_EXTENSIONS):
+        return json_codec.load(file_path)
+    raise ValueError(f"Unsupported SCDF file extension: {file_path}")
+
+def load_scene_graph(file_path):
+    """
+    Loads an SCDF file into a ``SceneGraph``.
+
+    Args:
+        file_path (str): Path to the SCDF file.
+
+    Returns:
+        SceneGraph: The node table of the scene.
+    """
+    return SceneGraph.from_scdf(read_scdf(file_path))
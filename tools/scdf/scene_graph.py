@@ -0,0 +1,240 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import numpy as np
+
+DEFAULT_POSITION = (0.0, 0.0, 0.0)
+DEFAULT_ROTATION = (0.0, 0.0, 0.0)
+DEFAULT_SCALE = (1.0, 1.0, 1.0)
+
+def euler_to_matrices(rotations):
+    """
+    Converts Euler angles in degrees to rotation matrices, for many nodes at once.
+
+    Rotations are applied about the X, then Y, then Z axis (``R = Rz @ Ry @ Rx``),
+    matching Blender's default 'XYZ' Euler mode.
+
+    Args:
+        rotations (np.ndarray): ``(N, 3)`` array of X, Y and Z angles in degrees.
+
+    Returns:
+        np.ndarray: ``(N, 3, 3)`` rotation matrices.
+    """
+    radians = np.radians(rotations)
+    cx, cy, cz = np.cos(radians).T
+    sx, sy, sz = np.sin(radians).T
+    matrices = np.empty((len(rotations), 3, 3))
+    matrices[:, 0, 0] = cy * cz
+    matrices[:, 0, 1] = sx * sy * cz - cx * sz
+    matrices[:, 0, 2] = cx * sy * cz + sx * sz
+    matrices[:, 1, 0] = cy * sz
+    matrices[:, 1, 1] = sx * sy * sz + cx * cz
+    matrices[:, 1, 2] = cx * sy * sz - sx * cz
+    matrices[:, 2, 0] = -sy
+    matrices[:, 2, 1] = sx * cy
+    matrices[:, 2, 2] = cx * cy
+    return matrices
+
+def compose_matrices(positions, rotations, scales):
+    """
+    Builds 4x4 transform matrices (translate * rotate * scale) for many nodes at once.
+
+    Args:
+        positions (np.ndarray): ``(N, 3)`` translations.
+        rotations (np.ndarray): ``(N, 3)`` Euler angles in degrees.
+        scales (np.ndarray): ``(N, 3)`` scale factors.
+
+    Returns:
+        np.ndarray: ``(N, 4, 4)`` transform matrices.
+    """
+    matrices = np.zeros((len(positions), 4, 4))
+    matrices[:, :3, :3] = euler_to_matrices(rotations) * scales[:, np.newaxis, :]
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+class SceneGraph:
+    """
+    Flat, array-based table of the nodes of an SCDF scene.
+
+    Nodes are addressed by index; ``index`` maps node names to indices and
+    ``parent`` holds each node's parent index (-1 for roots). Local transforms are
+    kept in ``(N, 3)`` arrays (``position``, ``rotation`` in degrees and ``scale``).
+
+    World matrices are computed level by level in topological order: all nodes
+    at the same depth are multiplied with their parents' world matrices in one
+    batched NumPy operation, so a scene costs one pass per hierarchy level rather
+    than one Python call per node. The result is cached until a transform is
+    edited through ``set_transform``/``set_transforms``.
+
+    Args:
+        names (list): Node names.
+        parent (np.ndarray): Parent index of every node (-1 for roots).
+        position (np.ndarray): ``(N, 3)`` local positions.
+        rotation (np.ndarray): ``(N, 3)`` local Euler rotations in degrees.
+        scale (np.ndarray): ``(N, 3)`` local scales.
+        nodes (list, optional): The original node dicts (mesh, material, light, ...).
+        root (str, optional): Name of the scene's root node.
+    """
+
+    def __init__(self, names, parent, position, rotation, scale, nodes=None, root=None):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        if len(self.index) != len(self.names):
+            raise ValueError("Node names must be unique.")
+        self.parent = np.asarray(parent, dtype=np.int64)
+        self.position = np.asarray(position, dtype=np.float64).reshape(-1, 3)
+        self.rotation = np.asarray(rotation, dtype=np.float64).reshape(-1, 3)
+        self.scale = np.asarray(scale, dtype=np.float64).reshape(-1, 3)
+        self.nodes = nodes if nodes is not None else [{"name": name} for name in self.names]
+        self.root = root
+        self.version = 0
+        self.levels = self._topological_levels()
+        self._world = None
+
+    @classmethod
+    def from_scdf(cls, scdf):
+        """
+        Builds a scene graph from a parsed SCDF document.
+
+        Args:
+            scdf (dict): SCDF document with a ``nodes`` list.
+
+        Returns:
+            SceneGraph: The node table.
+
+        Raises:
+            ValueError: If a child is unknown, has several parents, or names are duplicated.
+        """
+        nodes = scdf.get("nodes") or []
+        names = [node["name"] for node in nodes]
+        index = {name: i for i, name in enumerate(names)}
+        if len(index) != len(names):
+            raise ValueError("Node names must be unique.")
+        parent = np.full(len(nodes), -1, dtype=np.int64)
+        for i, node in enumerate(nodes):
+            for child in node.get("children") or []:
+                if child not in index:
+                    raise ValueError(f"Node '{node['name']}' references unknown child '{child}'.")
+                if parent[index[child]] != -1:
+                    raise ValueError(f"Node '{child}' has more than one parent.")
+                parent[index[child]] = i
+
+        position = [node.get("position") or DEFAULT_POSITION for node in nodes]
+        rotation = [node.get("rotation") or DEFAULT_ROTATION for node in nodes]
+        scale = [node.get("scale") or DEFAULT_SCALE for node in nodes]
+        root = (scdf.get("scene") or {}).get("root")
+        return cls(names, parent, position, rotation, scale, nodes=nodes, root=root)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _topological_levels(self):
+        count = len(self.names)
+        # Depths by pointer jumping: every round doubles the distance each node has
+        # looked up its ancestor chain, so deep hierarchies take O(log depth) rounds.
+        ancestor = self.parent.copy()
+        depth = (ancestor >= 0).astype(np.int64)
+        for _ in range(count.bit_length() + 1):
+            active = np.flatnonzero(ancestor >= 0)
+            if not len(active):
+                break
+            depth[active] += depth[ancestor[active]]
+            ancestor[active] = ancestor[ancestor[active]]
+        cyclic = np.flatnonzero(ancestor >= 0)
+        if len(cyclic):
+            raise ValueError(f"Scene hierarchy contains a cycle: {', '.join(self.names[i] for i in cyclic)}")
+        self.depth = depth
+        order = np.argsort(depth, kind="stable")
+        boundaries = np.flatnonzero(np.diff(depth[order])) + 1
+        return np.split(order, boundaries) if count else []
+
+    def children(self, name):
+        """
+        Returns the names of a node's direct children.
+
+        Args:
+            name (str): Node name.
+
+        Returns:
+            list: Child names.
+        """
+        return [self.names[i] for i in np.flatnonzero(self.parent == self.index[name])]
+
+    def local_matrices(self):
+        """
+        Returns:
+            np.ndarray: ``(N, 4, 4)`` local transform matrices.
+        """
+        return compose_matrices(self.position, self.rotation, self.scale)
+
+    def world_matrices(self):
+        """
+        Returns the world transform of every node, computing it only if a node changed.
+
+        Returns:
+            np.ndarray: ``(N, 4, 4)`` world matrices (read-only; copy before modifying).
+        """
+        if self._world is None:
+            local = self.local_matrices()
+            world = np.empty_like(local)
+            for level, indices in enumerate(self.levels):
+                if level == 0:
+                    world[indices] = local[indices]
+                else:
+                    world[indices] = np.matmul(world[self.parent[indices]], local[indices])
+            world.flags.writeable = False
+            self._world = world
+        return self._world
+
+    def world_positions(self):
+        """
+        Returns:
+            np.ndarray: ``(N, 3)`` world-space positions of all nodes.
+        """
+        return self.world_matrices()[:, :3, 3]
+
+    def world_matrix(self, name):
+        """
+        Returns the world transform of one node.
+
+        Args:
+            name (str): Node name.
+
+        Returns:
+            np.ndarray: ``(4, 4)`` world matrix.
+        """
+        return self.world_matrices()[self.index[name]]
+
+    def set_transform(self, name, position=None, rotation=None, scale=None):
+        """
+        Edits a node's local transform and invalidates the cached world matrices.
+
+        Args:
+            name (str): Node name.
+            position (iterable, optional): New local position.
+            rotation (iterable, optional): New local rotation in degrees.
+            scale (iterable, optional): New local scale.
+        """
+        self.set_transforms([self.index[name]], position=None if position is None else [position],
+                            rotation=None if rotation is None else [rotation],
+                            scale=None if scale is None else [scale])
+
+    def set_transforms(self, indices, position=None, rotation=None, scale=None):
+        """
+        Edits the local transforms of many nodes at once.
+
+        Args:
+            indices (array-like): Node indices.
+            position (array-like, optional): ``(len(indices), 3)`` new positions.
+            rotation (array-like, optional): ``(len(indices), 3)`` new rotations in degrees.
+            scale (array-like, optional): ``(len(indices), 3)`` new scales.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if position is not None:
+            self.position[indices] = position
+        if rotation is not None:
+            self.rotation[indices] = rotation
+        if scale is not None:
+            self.scale[indices] = scale
+        self._world = None
+        self.version += 1
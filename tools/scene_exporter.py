@@ -1,50 +1,185 @@
 import bpy
-import json
 import os
 import argparse
+import functools
 from pathlib import Path
+from export_cache import ExportCache, cached_export, parse_size
+from gltf_exporter import export_scene_to_gltf
+from utils import json_codec
+from utils.json_utils import write_json_stream
+from utils.scene_binary import BinarySceneWriter
+from utils.instrumentation import add_profiling_arguments, log, profiling_from_arguments, span, traced
 
-def export_scene_to_json(blend_file, output_dir):
+def open_blend_file(blend_file):
     """
-    Exports a Blender scene to JSON format.
-    
+    Opens a .blend file in Blender, timed as the 'blender.open' span.
+
     Args:
         blend_file (str): Path to the .blend file.
-        output_dir (str): Directory where the JSON file will be saved.
     """
-    # Open the .blend file
-    bpy.ops.wm.open_mainfile(filepath=blend_file)
+    with span("blender.open", file=blend_file):
+        bpy.ops.wm.open_mainfile(filepath=blend_file)
 
-    # Prepare data structure for JSON export
-    scene_data = {"objects": []}
-    
+def iter_scene_objects():
+    """
+    Yields the objects of the open Blender scene in the JSON export format, one at a time.
+
+    Yields:
+        dict: Object name, type, location, rotation and scale.
+    """
     for obj in bpy.context.scene.objects:
-        # Capture object details
-        obj_data = {
+        yield {
             "name": obj.name,
             "type": obj.type,
             "location": list(obj.location),
             "rotation": list(obj.rotation_euler),
             "scale": list(obj.scale),
         }
-        scene_data["objects"].append(obj_data)
+
+@traced("export.json")
+def export_scene_to_json(blend_file, output_dir, stream=False):
+    """
+    Exports a Blender scene to JSON format.
+    
+    Args:
+        blend_file (str): Path to the .blend file.
+        output_dir (str): Directory where the JSON file will be saved.
+        stream (bool): Write objects to disk one by one instead of building the whole
+            document in memory first (one object per line instead of indented JSON).
+    
+    Returns:
+        str: Path of the written JSON file.
+    """
+    # Open the .blend file
+    open_blend_file(blend_file)
 
     # Define output path and filename
     scene_name = Path(blend_file).stem
     json_file_path = os.path.join(output_dir, f"{scene_name}.json")
     os.makedirs(output_dir, exist_ok=True)
 
+    if stream:
+        count = write_json_stream(iter_scene_objects(), json_file_path, key="objects")
+        log(f"Scene exported to JSON ({count} objects streamed): {json_file_path}", "export.written", path=json_file_path, objects=count)
+        return json_file_path
+
+    # Prepare data structure for JSON export
+    scene_data = {"objects": list(iter_scene_objects())}
+
     # Write scene data to JSON file
-    with open(json_file_path, "w") as json_file:
-        json.dump(scene_data, json_file, indent=4)
-    print(f"Scene exported to JSON: {json_file_path}")
+    json_codec.dump(scene_data, json_file_path)
+    log(f"Scene exported to JSON: {json_file_path}", "export.written", path=json_file_path, objects=len(scene_data["objects"]))
+    return json_file_path
+
+@traced("export.jsonl")
+def export_scene_to_jsonl(blend_file, output_dir):
+    """
+    Exports a Blender scene to JSON Lines, streaming one object per line.
+    
+    Args:
+        blend_file (str): Path to the .blend file.
+        output_dir (str): Directory where the JSON Lines file will be saved.
+    
+    Returns:
+        str: Path of the written JSON Lines file.
+    """
+    # Open the .blend file
+    open_blend_file(blend_file)
+
+    scene_name = Path(blend_file).stem
+    jsonl_file_path = os.path.join(output_dir, f"{scene_name}.jsonl")
+    count = write_json_stream(iter_scene_objects(), jsonl_file_path, json_lines=True)
+    log(f"Scene exported to JSON Lines ({count} objects): {jsonl_file_path}", "export.written", path=jsonl_file_path, objects=count)
+    return jsonl_file_path
+
+@traced("export.binary")
+def export_scene_to_binary(blend_file, output_dir):
+    """
+    Exports a Blender scene to the compact binary scene format.
+    
+    Names and types go into a shared string table and transforms into packed
+    float32 arrays (see ``utils.scene_binary``), which is much smaller and faster
+    to load than the indented JSON export for large scenes.
+    
+    Args:
+        blend_file (str): Path to the .blend file.
+        output_dir (str): Directory where the binary file will be saved.
+    
+    Returns:
+        str: Path of the written binary file.
+    """
+    # Open the .blend file
+    open_blend_file(blend_file)
+
+    writer = BinarySceneWriter()
+    for obj in bpy.context.scene.objects:
+        writer.add(obj.name, obj.type, obj.location, obj.rotation_euler, obj.scale)
+
+    # Define output path and filename
+    scene_name = Path(blend_file).stem
+    binary_file_path = os.path.join(output_dir, f"{scene_name}.bin")
+    writer.write(binary_file_path)
+    log(f"Scene exported to binary: {binary_file_path}", "export.written", path=binary_file_path)
+    return binary_file_path
+
+@traced("export.glb")
+def export_scene_to_glb(blend_file, output_dir, instancing=False):
+    """
+    Exports a Blender scene to a binary glTF (GLB) file.
+    
+    Copies of an object ('Tree', 'Tree.001', ...) share one mesh, and with
+    ``instancing`` massively repeated ones are drawn through EXT_mesh_gpu_instancing.
+    
+    Args:
+        blend_file (str): Path to the .blend file.
+        output_dir (str): Directory where the GLB file will be saved.
+        instancing (bool): Emit EXT_mesh_gpu_instancing for massively repeated meshes.
+    
+    Returns:
+        str: Path of the written GLB file.
+    """
+    # Open the .blend file
+    open_blend_file(blend_file)
+
+    scene_name = Path(blend_file).stem
+    glb_file_path = os.path.join(output_dir, f"{scene_name}.glb")
+    return export_scene_to_gltf({"objects": list(iter_scene_objects())}, glb_file_path, instancing=instancing)
+
+EXPORTERS = {
+    "json": export_scene_to_json,
+    "jsonl": export_scene_to_jsonl,
+    "bin": export_scene_to_binary,
+    "glb": export_scene_to_glb,
+}
 
 def parse_arguments():
-    parser = argparse.ArgumentParser(description="Export Blender scene to JSON.")
+    parser = argparse.ArgumentParser(description="Export Blender scene to JSON, the binary scene format or GLB.")
     parser.add_argument("blend_file", type=str, help="Path to the .blend file to export.")
-    parser.add_argument("output_dir", type=str, help="Directory where the JSON file will be saved.")
+    parser.add_argument("output_dir", type=str, help="Directory where the exported file will be saved.")
+    parser.add_argument("--format", type=str, choices=list(EXPORTERS), default="json", help="Export format (default: json).")
+    parser.add_argument("--stream", action="store_true", help="Stream JSON output object by object instead of building it in memory.")
+    parser.add_argument("--instancing", action="store_true", help="Use EXT_mesh_gpu_instancing for massively repeated meshes in GLB exports.")
+    parser.add_argument("--cache-dir", type=str, help="Reuse the previous output from this export cache if the .blend file is unchanged.")
+    parser.add_argument("--force", action="store_true", help="Export even if the output is cached.")
+    parser.add_argument("--cache-max-size", type=str, help="Size cap for the export cache, e.g. 20G (least recently used entries are evicted).")
+    add_profiling_arguments(parser)
     return parser.parse_args()
 
 if __name__ == "__main__":
     args = parse_arguments()
-    export_scene_to_json(args.blend_file, args.output_dir)
\ No newline at end of file
+
+    with profiling_from_arguments(args):
+        cache = ExportCache(args.cache_dir, max_size=parse_size(args.cache_max_size) if args.cache_max_size else None) if args.cache_dir else None
+        options = {}
+        if args.format == "json" and args.stream:
+            options["stream"] = True
+        if args.format == "glb" and args.instancing:
+            options["instancing"] = True
+        exporter = functools.partial(EXPORTERS[args.format], **options)
+        output_path, cache_hit = cached_export(exporter, args.blend_file, args.output_dir, args.format, cache,
+                                               force=args.force, options=options)
+        if cache is not None:
+            if cache_hit:
+                log(f"Restored from export cache: {output_path}", "export.cache_hit", path=output_path)
+            cache.prune()
+            cache.save()
@@ -0,0 +1,346 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from metadata_generator import CACHE_DIRNAME, GENERATED_DIRNAME, PREVIEW_FILENAME, record_generated_artifacts
+from utils import json_codec
+from utils.digest_cache import DigestCache
+from utils.json_utils import read_json, write_json_atomic
+from version_resolver import version_key
+from utils.instrumentation import add_profiling_arguments, log, profiling_from_arguments
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+# Bump whenever the generated artifacts change, so cached results are regenerated.
+PIPELINE_VERSION = "1"
+
+TEXTURE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+DEFAULT_THUMBNAIL_SIZES = (128, 512)
+PREVIEW_SIZE = 256
+CONTAINER_SUFFIX = ".mips.zip"
+
+def _require_pillow():
+    if Image is None:
+        raise RuntimeError("The texture pipeline requires Pillow (pip install Pillow).")
+
+def _open_scaled(source, max_size=None):
+    """
+    Opens an image, letting the decoder downscale while decoding when only ``max_size`` pixels are needed.
+
+    JPEG decoders can decode straight to 1/2, 1/4 or 1/8 scale (``Image.draft``),
+    so a thumbnail of a huge photo never holds the full-resolution pixels.
+    """
+    image = Image.open(source)
+    if max_size is not None:
+        image.draft("RGB", (max_size, max_size))
+    return image
+
+def _normalized(image):
+    return image if image.mode in ("RGB", "RGBA") else image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+
+def _artifact(path, kind, image):
+    return {"path": path, "kind": kind, "width": image.width, "height": image.height, "bytes": os.path.getsize(path)}
+
+def make_thumbnail(source, dest, size):
+    """
+    Writes a PNG thumbnail whose longer edge is at most ``size`` pixels.
+
+    Args:
+        source (str): Path to the source image.
+        dest (str): Path of the thumbnail.
+        size (int): Maximum width and height.
+
+    Returns:
+        dict: The artifact (``path``, ``kind``, ``width``, ``height``, ``bytes``).
+    """
+    _require_pillow()
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    with _open_scaled(source, size) as image:
+        # reducing_gap lets Pillow shrink by an integer factor with reduce() first,
+        # which is cheap, before the final high-quality resample.
+        image.thumbnail((size, size), reducing_gap=2.0)
+        image = _normalized(image)
+        image.save(dest, "PNG")
+    return _artifact(dest, "thumbnail", image)
+
+def iter_mip_levels(image):
+    """
+    Yields the levels of a mip chain, from the full-size image down to 1x1.
+
+    Each level is computed from the previous one with a 2x2 box filter, so only
+    two levels are held in memory at a time.
+
+    Args:
+        image (PIL.Image.Image): Level 0.
+
+    Yields:
+        PIL.Image.Image: The levels, largest first.
+    """
+    level = _normalized(image)
+    yield level
+    while level.width > 1 or level.height > 1:
+        level = level.resize((max(1, level.width // 2), max(1, level.height // 2)), Image.Resampling.BOX)
+        yield level
+
+def make_mip_chain(source, output_dir, stem, container=False):
+    """
+    Generates the mip chain of a texture.
+
+    Without ``container`` levels 1..N are written as ``<stem>_mip<N>.png`` (level 0
+    is the source itself). With ``container`` all levels are stored as raw RGBA8
+    in one deflate-compressed ``<stem>.mips.zip``, next to a ``levels.json``
+    describing their sizes, ready to be uploaded to the GPU without decoding PNGs.
+
+    Args:
+        source (str): Path to the source image.
+        output_dir (str): Directory receiving the chain.
+        stem (str): Base name of the generated files.
+        container (bool): Write one compressed container instead of PNG files.
+
+    Returns:
+        list: The artifacts.
+    """
+    _require_pillow()
+    os.makedirs(output_dir, exist_ok=True)
+    artifacts = []
+    with Image.open(source) as image:
+        if container:
+            container_path = os.path.join(output_dir, stem + CONTAINER_SUFFIX)
+            levels = []
+            with zipfile.ZipFile(container_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+                for index, level in enumerate(iter_mip_levels(image)):
+                    archive.writestr(f"level_{index}.rgba", level.convert("RGBA").tobytes())
+                    levels.append({"level": index, "width": level.width, "height": level.height, "format": "RGBA8"})
+                archive.writestr("levels.json", json_codec.encode({"levels": levels}))
+            artifacts.append({"path": container_path, "kind": "mip_container", "width": levels[0]["width"],
+                              "height": levels[0]["height"], "bytes": os.path.getsize(container_path), "levels": len(levels)})
+        else:
+            for index, level in enumerate(iter_mip_levels(image)):
+                if index == 0:
+                    continue
+                path = os.path.join(output_dir, f"{stem}_mip{index}.png")
+                level.save(path, "PNG")
+                artifacts.append(_artifact(path, "mip", level))
+    return artifacts
+
+def process_texture(job):
+    """
+    Generates the thumbnails and mip chain of one texture (runs in a worker process).
+
+    Args:
+        job (dict): ``source``, ``output_dir``, ``thumbnail_sizes``, ``mips`` and ``container``.
+
+    Returns:
+        dict: ``source`` and either ``artifacts`` or ``error``.
+    """
+    source = job["source"]
+    stem = Path(source).stem
+    try:
+        artifacts = []
+        for size in job["thumbnail_sizes"]:
+            artifacts.append(make_thumbnail(source, os.path.join(job["output_dir"], f"{stem}_thumb{size}.png"), size))
+        if job["mips"]:
+            artifacts.extend(make_mip_chain(source, job["output_dir"], stem, container=job["container"]))
+        return {"source": source, "artifacts": artifacts}
+    except (OSError, ValueError, RuntimeError) as e:
+        return {"source": source, "error": f"{type(e).__name__}: {e}"}
+
+def make_preview(job):
+    """
+    Writes a version directory's preview.png from one of its textures (runs in a worker process).
+
+    Args:
+        job (dict): ``source`` texture and ``dest`` preview path.
+
+    Returns:
+        dict: ``source`` and either ``artifacts`` or ``error``.
+    """
+    try:
+        artifact = make_thumbnail(job["source"], job["dest"], PREVIEW_SIZE)
+        artifact["kind"] = "preview"
+        return {"source": job["source"], "artifacts": [artifact]}
+    except (OSError, ValueError, RuntimeError) as e:
+        return {"source": job["source"], "error": f"{type(e).__name__}: {e}"}
+
+def find_textures(directory):
+    """
+    Lists the texture files under a directory, skipping generated artifacts.
+
+    Returns:
+        list: Texture paths, sorted.
+    """
+    textures = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in (GENERATED_DIRNAME, CACHE_DIRNAME))
+        for name in sorted(files):
+            if name.lower().endswith(TEXTURE_EXTENSIONS) and name != PREVIEW_FILENAME:
+                textures.append(os.path.join(root, name))
+    return textures
+
+def find_missing_previews(directory):
+    """
+    Finds version directories without a preview.png and picks a texture to build it from.
+
+    Returns:
+        list: ``{"source": texture, "dest": preview path}`` jobs.
+    """
+    jobs = []
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d not in (GENERATED_DIRNAME, CACHE_DIRNAME))
+        if version_key(os.path.basename(root)) is None or PREVIEW_FILENAME in files:
+            continue
+        textures = find_textures(root)
+        if textures:
+            jobs.append({"source": textures[0], "dest": os.path.join(root, PREVIEW_FILENAME)})
+    return jobs
+
+class TextureCache:
+    """
+    Records which artifacts were generated from which texture contents.
+
+    Entries are keyed by source path and hold a key made from the source digest,
+    the pipeline settings and PIPELINE_VERSION; a texture is only processed again
+    when that key changes or one of its artifacts is missing.
+
+    Args:
+        cache_dir (str): Directory holding ``index.json`` and ``digests.json``.
+    """
+
+    def __init__(self, cache_dir):
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.entries = (read_json(self.index_path) or {}).get("entries", {}) if os.path.exists(self.index_path) else {}
+        self.digests = DigestCache(os.path.join(cache_dir, "digests.json"))
+
+    def key(self, source, settings):
+        """
+        Returns:
+            str: Cache key of processing ``source`` with ``settings``.
+        """
+        return hashlib.sha256(f"{self.digests.digest(source)}|{json.dumps(settings, sort_keys=True)}|{PIPELINE_VERSION}".encode()).hexdigest()
+
+    def lookup(self, source, key):
+        """
+        Returns:
+            list: The cached artifacts, or None if they are outdated or missing.
+        """
+        entry = self.entries.get(os.path.abspath(source))
+        if entry is None or entry["key"] != key or not all(os.path.exists(artifact["path"]) for artifact in entry["artifacts"]):
+            return None
+        return entry["artifacts"]
+
+    def store(self, source, key, artifacts):
+        self.entries[os.path.abspath(source)] = {"key": key, "artifacts": artifacts}
+
+    def save(self):
+        write_json_atomic({"entries": self.entries}, self.index_path, indent=None)
+        self.digests.save()
+
+def _run(function, jobs, max_workers):
+    if max_workers == 1 or len(jobs) <= 1:
+        return [function(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(function, jobs))
+
+def run_texture_pipeline(directory, thumbnail_sizes=DEFAULT_THUMBNAIL_SIZES, mips=True, container=False, previews=True,
+                         max_workers=None, cache_dir=None, record_metadata=True, author=None):
+    """
+    Generates thumbnails, mip chains and missing previews for every texture under a directory.
+
+    Textures are processed across a process pool. A texture whose contents and
+    settings are unchanged since the last run is skipped (see TextureCache).
+    Artifacts go to a ``generated/`` directory next to each texture and, with
+    ``record_metadata``, are listed with their sizes in that directory's
+    metadata.json.
+
+    Args:
+        directory (str): Directory containing textures.
+        thumbnail_sizes (iterable): Maximum edge lengths of the thumbnails.
+        mips (bool): Generate mip chains.
+        container (bool): Store mip chains in one compressed container per texture instead of PNG files.
+        previews (bool): Write preview.png into version directories that have none.
+        max_workers (int, optional): Number of worker processes; 1 processes in-process.
+        cache_dir (str, optional): Cache directory (defaults to CACHE_DIRNAME inside ``directory``).
+        record_metadata (bool): Record the artifacts in metadata.json files.
+        author (str, optional): Author of metadata.json files created for directories that have none.
+
+    Returns:
+        dict: ``processed``, ``cached``, ``failed`` (source -> error) and ``previews`` plus all ``artifacts`` by source.
+    """
+    _require_pillow()
+    cache = TextureCache(cache_dir or os.path.join(directory, CACHE_DIRNAME))
+    settings = {"thumbnail_sizes": sorted(thumbnail_sizes), "mips": mips, "container": container}
+    summary = {"processed": [], "cached": [], "failed": {}, "previews": [], "artifacts": {}}
+
+    jobs = []
+    keys = {}
+    for source in find_textures(directory):
+        keys[source] = cache.key(source, settings)
+        cached = cache.lookup(source, keys[source])
+        if cached is not None:
+            summary["cached"].append(source)
+            summary["artifacts"][source] = cached
+            continue
+        jobs.append(dict(settings, source=source, output_dir=os.path.join(os.path.dirname(source), GENERATED_DIRNAME)))
+
+    for result in _run(process_texture, jobs, max_workers):
+        source = result["source"]
+        if "error" in result:
+            summary["failed"][source] = result["error"]
+            continue
+        cache.store(source, keys[source], result["artifacts"])
+        summary["processed"].append(source)
+        summary["artifacts"][source] = result["artifacts"]
+
+    if previews:
+        for result in _run(make_preview, find_missing_previews(directory), max_workers):
+            if "error" in result:
+                summary["failed"].setdefault(result["source"], result["error"])
+            else:
+                summary["previews"].extend(artifact["path"] for artifact in result["artifacts"])
+                summary["artifacts"].setdefault(result["source"], []).extend(result["artifacts"])
+    cache.save()
+
+    if record_metadata:
+        by_directory = {}
+        for source, artifacts in summary["artifacts"].items():
+            by_directory.setdefault(os.path.dirname(source), {})[os.path.basename(source)] = artifacts
+        for texture_dir, artifacts in sorted(by_directory.items()):
+            record_generated_artifacts(texture_dir, artifacts, author=author)
+
+    log(f"Texture pipeline: {len(summary['processed'])} processed, {len(summary['cached'])} cached, "
+        f"{len(summary['failed'])} failed, {len(summary['previews'])} previews written", "texture.summary",
+        **{key: len(summary[key]) for key in ("processed", "cached", "failed", "previews")})
+    return summary
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Generate texture thumbnails, mip chains and previews.")
+    parser.add_argument("directory", type=str, help="Directory containing textures.")
+    parser.add_argument("--thumbnail-sizes", type=int, nargs="*", default=list(DEFAULT_THUMBNAIL_SIZES), help="Thumbnail edge lengths.")
+    parser.add_argument("--no-mips", action="store_true", help="Don't generate mip chains.")
+    parser.add_argument("--container", action="store_true", help=f"Store each mip chain in one compressed {CONTAINER_SUFFIX} file.")
+    parser.add_argument("--no-previews", action="store_true", help=f"Don't write missing {PREVIEW_FILENAME} files.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes.")
+    parser.add_argument("--cache-dir", type=str, help=f"Cache directory (default: <directory>/{CACHE_DIRNAME}).")
+    parser.add_argument("--no-metadata", action="store_true", help="Don't record the artifacts in metadata.json files.")
+    parser.add_argument("--author", type=str, help="Author of metadata.json files created for directories that have none (default: current user).")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        summary = run_texture_pipeline(args.directory, args.thumbnail_sizes, mips=not args.no_mips, container=args.container,
+                                       previews=not args.no_previews, max_workers=args.workers, cache_dir=args.cache_dir,
+                                       record_metadata=not args.no_metadata, author=args.author)
+        for source, error in summary["failed"].items():
+            log(f"Failed: {source}: {error}", "texture.failed", level="error", path=source, error=error)
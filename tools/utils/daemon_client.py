@@ -0,0 +1,208 @@
+# Copyright 2024 chevp. All rights reserved.
+
+# Client side of the asset daemon (see asset_daemon.py).
+#
+# The daemon speaks newline-delimited JSON over a Unix domain socket: every
+# request is one ``{"op": ..., <arguments>}`` line, every response one
+# ``{"ok": true, "result": ...}`` or ``{"ok": false, "type": ..., "error": ...}``
+# line. Tool functions go through ``call``, which answers from the daemon when
+# one is running for the same manifest or asset library and runs the direct
+# (file-reading) fallback otherwise.
+
+import os
+import socket
+import tempfile
+import threading
+import time
+from utils import json_codec
+
+PROTOCOL_VERSION = 1
+DAEMON_ENV_VAR = "SCENE_ASSETS_DAEMON"
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 30.0
+# Seconds before connecting is tried again after no daemon was found.
+RETRY_INTERVAL = 5.0
+
+class DaemonUnavailable(Exception):
+    """
+    Raised when the daemon can't answer a request (not running, gone, or not serving the data asked for).
+    """
+
+def default_socket_path():
+    """
+    Returns:
+        str: Socket path from the SCENE_ASSETS_DAEMON environment variable, or a per-user
+            socket in the temporary directory; None if the variable is set to 'off'.
+    """
+    configured = os.environ.get(DAEMON_ENV_VAR)
+    if configured == "off":
+        return None
+    if configured:
+        return configured
+    user = os.getuid() if hasattr(os, "getuid") else os.environ.get("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"scene_assets_daemon_{user}.sock")
+
+class DaemonClient:
+    """
+    A connection to a running asset daemon.
+
+    The connection is kept open, so a lookup costs one round trip on the socket.
+    It is safe to share between threads; requests are serialized.
+
+    Args:
+        socket_path (str): Path of the daemon's socket.
+        timeout (float): Seconds to wait for a response.
+
+    Raises:
+        DaemonUnavailable: If no daemon is listening on the socket.
+    """
+
+    def __init__(self, socket_path, timeout=REQUEST_TIMEOUT):
+        self.socket_path = socket_path
+        self._lock = threading.Lock()
+        if not hasattr(socket, "AF_UNIX"):
+            raise DaemonUnavailable("Unix domain sockets are not supported on this platform")
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self._socket.settimeout(CONNECT_TIMEOUT)
+            self._socket.connect(socket_path)
+            self._socket.settimeout(timeout)
+        except OSError as e:
+            self._socket.close()
+            raise DaemonUnavailable(f"No asset daemon at {socket_path}: {e}") from e
+        self._reader = self._socket.makefile("rb")
+        self.info = self.request("ping")
+        if self.info.get("protocol") != PROTOCOL_VERSION:
+            self.close()
+            raise DaemonUnavailable(f"Asset daemon at {socket_path} speaks protocol {self.info.get('protocol')}, expected {PROTOCOL_VERSION}")
+
+    def request(self, op, **args):
+        """
+        Sends one request and waits for its response.
+
+        Args:
+            op (str): Operation, e.g. 'manifest.get'.
+            **args: Arguments of the operation.
+
+        Returns:
+            The operation's result.
+
+        Raises:
+            KeyError, ValueError: Raised by the operation in the daemon, as the direct call would.
+            DaemonUnavailable: If the connection failed or the daemon couldn't run the operation.
+        """
+        line = json_codec.encode({"op": op, **args}) + b"\n"
+        with self._lock:
+            try:
+                self._socket.sendall(line)
+                response = self._reader.readline()
+            except OSError as e:
+                self.close()
+                raise DaemonUnavailable(f"Lost the asset daemon at {self.socket_path}: {e}") from e
+        if not response:
+            self.close()
+            raise DaemonUnavailable(f"The asset daemon at {self.socket_path} closed the connection")
+        response = json_codec.decode(response)
+        if response["ok"]:
+            return response["result"]
+        if response["type"] == "KeyError":
+            raise KeyError(response["error"])
+        if response["type"] == "ValueError":
+            raise ValueError(response["error"])
+        raise DaemonUnavailable(f"The asset daemon failed to run {op}: {response['type']}: {response['error']}")
+
+    def serves(self, kind, path):
+        """
+        Checks whether the daemon holds the data a lookup needs.
+
+        Args:
+            kind (str): 'manifest' (manifest file), 'versions' (asset root of the version
+                index) or 'metadata' (a directory at or below the asset root).
+            path (str): Manifest file or directory of the lookup.
+
+        Returns:
+            bool: True if the daemon can answer for that path.
+        """
+        served = self.info.get(kind)
+        if served is None:
+            return False
+        path = os.path.abspath(path)
+        return path == served or (kind == "metadata" and path.startswith(served.rstrip(os.sep) + os.sep))
+
+    @property
+    def closed(self):
+        return self._socket.fileno() == -1
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        self._reader.close()
+        self._socket.close()
+
+_client = None
+_client_lock = threading.Lock()
+_retry_at = 0.0
+
+def get_client():
+    """
+    Returns the shared connection to the asset daemon, connecting on first use.
+
+    When no daemon is running the attempt is not repeated for RETRY_INTERVAL
+    seconds, so falling back to direct file access stays cheap.
+
+    Returns:
+        DaemonClient: The connection, or None if no daemon is running.
+    """
+    global _client, _retry_at
+    client = _client
+    if client is not None and not client.closed:
+        return client
+    if time.monotonic() < _retry_at:
+        return None
+    with _client_lock:
+        if _client is not None and not _client.closed:
+            return _client
+        socket_path = default_socket_path()
+        _client = None
+        if socket_path is not None and os.path.exists(socket_path):
+            try:
+                _client = DaemonClient(socket_path)
+            except DaemonUnavailable:
+                pass
+        if _client is None:
+            _retry_at = time.monotonic() + RETRY_INTERVAL
+        return _client
+
+def reset_client():
+    """
+    Closes the shared connection and forgets that no daemon was found, so the next lookup connects again.
+    """
+    global _client, _retry_at
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+        _client = None
+        _retry_at = 0.0
+
+def call(kind, path, op, fallback, **args):
+    """
+    Runs a lookup in the asset daemon if it serves ``path``, otherwise directly.
+
+    Args:
+        kind (str): 'manifest', 'versions' or 'metadata', see ``DaemonClient.serves``.
+        path (str): Manifest file or directory of the lookup.
+        op (str): Daemon operation.
+        fallback (callable): Called without arguments to answer the lookup directly.
+        **args: Arguments of the operation.
+
+    Returns:
+        The result of the operation or of ``fallback``.
+    """
+    client = get_client()
+    if client is not None and client.serves(kind, path):
+        try:
+            return client.request(op, **args)
+        except DaemonUnavailable:
+            pass
+    return fallback()
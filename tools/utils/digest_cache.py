@@ -0,0 +1,82 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import os
+import threading
+from utils.file_utils import compute_file_digest
+from utils.json_utils import read_json, write_json_atomic
+
+class DigestCache:
+    """
+    Persistent cache of file digests keyed by path and validated by size and mtime.
+
+    A file is only hashed again when its size or modification time differs from
+    the recorded entry, so re-verifying an unchanged tree costs one ``os.stat``
+    per file. The cache can be shared by the threads of a pool.
+
+    Args:
+        cache_path (str, optional): JSON file the cache is loaded from and saved to.
+            Without it the cache only lives in memory.
+    """
+
+    def __init__(self, cache_path=None):
+        self.cache_path = cache_path
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        if cache_path and os.path.exists(cache_path):
+            self.entries = (read_json(cache_path) or {}).get("files", {})
+
+    def digest(self, file_path, algorithm="blake2b", stat_result=None):
+        """
+        Returns the digest of a file, hashing it only if it changed since it was cached.
+
+        Args:
+            file_path (str): Path to the file.
+            algorithm (str): ``hashlib`` algorithm name.
+            stat_result (os.stat_result, optional): Stat of the file if the caller already has it.
+
+        Returns:
+            str: The digest as ``"<algorithm>:<hex digest>"``.
+
+        Raises:
+            OSError: If the file doesn't exist or can't be read.
+        """
+        stat_result = stat_result or os.stat(file_path)
+        key = os.path.abspath(file_path)
+        entry = self.entries.get(key)
+        if (entry is not None
+                and entry["size"] == stat_result.st_size
+                and entry["mtime_ns"] == stat_result.st_mtime_ns
+                and entry["digest"].startswith(f"{algorithm}:")):
+            self.hits += 1
+            return entry["digest"]
+
+        digest = compute_file_digest(file_path, algorithm=algorithm)
+        with self._lock:
+            self.misses += 1
+            self.entries[key] = {"size": stat_result.st_size, "mtime_ns": stat_result.st_mtime_ns, "digest": digest}
+            self._dirty = True
+        return digest
+
+    def forget(self, file_path):
+        """
+        Drops the cached entry of a file.
+
+        Args:
+            file_path (str): Path to the file.
+        """
+        with self._lock:
+            if self.entries.pop(os.path.abspath(file_path), None) is not None:
+                self._dirty = True
+
+    def save(self):
+        """
+        Writes the cache to ``cache_path`` if it changed since it was loaded.
+        """
+        if not self.cache_path or not self._dirty:
+            return
+        with self._lock:
+            write_json_atomic({"files": self.entries}, self.cache_path, indent=None)
+            self._dirty = False
@@ -1,41 +1,13 @@
 # Copyright 2024 chevp. All rights reserved.
 
 import os
-import json
-
-def read_json(file_path):
-    """
-    Reads a JSON file and returns its contents.
-    
-    Args:
-        file_path (str): Path to the JSON file.
-    
-    Returns:
-        dict: Parsed JSON content as a dictionary.
-    """
-    try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error reading JSON file at {file_path}: {e}")
-        return None
-
-def write_json(data, file_path):
-    """
-    Writes a dictionary as JSON to a file.
-    
-    Args:
-        data (dict): Data to write to the file.
-        file_path (str): Path where JSON file will be saved.
-    """
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
-    try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
-        print(f"Successfully wrote JSON to {file_path}")
-    except IOError as e:
-        print(f"Error writing JSON to {file_path}: {e}")
+import hashlib
+import mmap
+import shutil
+# read_json and write_json live in json_utils; they are re-exported here for existing callers.
+from utils.instrumentation import count, log
+from utils.json_utils import read_json, write_json
+from utils.scanner import scan_directory
 
 def create_directory(path):
     """
@@ -46,9 +18,9 @@ def create_directory(path):
     """
     try:
         os.makedirs(path, exist_ok=True)
-        print(f"Directory created or already exists at {path}")
+        log(f"Directory created or already exists at {path}", event="directory.created", path=path)
     except Exception as e:
-        print(f"Error creating directory at {path}: {e}")
+        log(f"Error creating directory at {path}: {e}", event="directory.error", level="error", path=path)
 
 def list_files_in_directory(directory, extension=None):
     """
@@ -62,14 +34,9 @@ def list_files_in_directory(directory, extension=None):
         list: List of file paths in the directory with the specified extension.
     """
     try:
-        files = []
-        for root, _, filenames in os.walk(directory):
-            for filename in filenames:
-                if not extension or filename.endswith(extension):
-                    files.append(os.path.join(root, filename))
-        return files
+        return scan_directory(directory, include=[f"*{extension}"] if extension else None).paths()
     except Exception as e:
-        print(f"Error listing files in {directory}: {e}")
+        log(f"Error listing files in {directory}: {e}", event="directory.error", level="error", path=directory)
         return []
 
 def file_exists(file_path):
@@ -84,6 +51,33 @@ def file_exists(file_path):
     """
     return os.path.isfile(file_path)
 
+def compute_file_digest(file_path, algorithm="blake2b", chunk_size=1 << 20, use_mmap=False):
+    """
+    Computes a content digest of a file without loading it into memory at once.
+
+    ``hashlib`` releases the GIL while hashing, so this can be run across a
+    thread pool to hash many files in parallel.
+
+    Args:
+        file_path (str): Path to the file.
+        algorithm (str): Any ``hashlib`` algorithm name (e.g. 'blake2b', 'sha256').
+        chunk_size (int): Number of bytes read per chunk.
+        use_mmap (bool): Hash a memory map of the file instead of reading it in chunks.
+
+    Returns:
+        str: The digest as ``"<algorithm>:<hex digest>"``.
+    """
+    hasher = hashlib.new(algorithm)
+    with open(file_path, 'rb') as f:
+        if use_mmap and os.fstat(f.fileno()).st_size > 0:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                hasher.update(mapped)
+        else:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                hasher.update(chunk)
+    count("bytes.hashed", os.path.getsize(file_path))
+    return f"{algorithm}:{hasher.hexdigest()}"
+
 def get_file_extension(file_path):
     """
     Gets the file extension from a file path.
@@ -108,20 +102,27 @@ def get_filename_without_extension(file_path):
     """
     return os.path.splitext(os.path.basename(file_path))[0]
 
-def copy_file(src, dest):
+def copy_file(src, dest, store=None):
     """
     Copies a file from source to destination.
     
     Args:
         src (str): Source file path.
         dest (str): Destination file path.
+        store (ObjectStore, optional): Content-addressed store to copy through; the
+            destination becomes a link to the stored content and the bytes are only
+            copied if the store doesn't have them yet.
     """
     try:
-        os.makedirs(os.path.dirname(dest), exist_ok=True)
-        shutil.copy(src, dest)
-        print(f"File copied from {src} to {dest}")
+        os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+        if store is not None:
+            store.copy(src, dest)
+        else:
+            shutil.copy(src, dest)
+            count("bytes.copied", os.path.getsize(dest))
+        log(f"File copied from {src} to {dest}", event="file.copied", source=src, path=dest)
     except IOError as e:
-        print(f"Error copying file from {src} to {dest}: {e}")
+        log(f"Error copying file from {src} to {dest}: {e}", event="file.error", level="error", source=src, path=dest)
 
 def delete_file(file_path):
     """
@@ -133,6 +134,6 @@ def delete_file(file_path):
     try:
         if file_exists(file_path):
             os.remove(file_path)
-            print(f"File deleted at {file_path}")
+            log(f"File deleted at {file_path}", event="file.deleted", path=file_path)
     except Exception as e:
-        print(f"Error deleting file at {file_path}: {e}")
\ No newline at end of file
+        log(f"Error deleting file at {file_path}: {e}", event="file.error", level="error", path=file_path)
\ No newline at end of file
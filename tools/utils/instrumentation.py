@@ -0,0 +1,334 @@
+# Copyright 2024 chevp. All rights reserved.
+
+# Timing spans, counters and structured logging for the tools.
+#
+# Instrumentation is off by default. While it is off, ``span`` returns a shared
+# do-nothing context manager and ``count`` returns after one check, so the calls
+# can stay in the code paths they measure. Turn it on with ``enable`` or, in the
+# command line tools, with --profile, --trace or --cprofile.
+
+import contextlib
+import cProfile
+import os
+import sys
+import threading
+import time
+from utils import json_codec
+
+LOG_FORMAT_ENV_VAR = "SCENE_ASSETS_LOG_FORMAT"
+LOG_FORMATS = ("text", "json", "quiet")
+MAX_TRACE_EVENTS = 1_000_000
+
+ENABLED = False
+TRACING = False
+LOG_FORMAT = os.environ.get(LOG_FORMAT_ENV_VAR) if os.environ.get(LOG_FORMAT_ENV_VAR) in LOG_FORMATS else "text"
+# Where JSON log records go; None means sys.stderr at the time of the call.
+LOG_STREAM = None
+
+_NULL_SPAN = contextlib.nullcontext()
+_lock = threading.Lock()
+_origin_ns = 0
+# Span name -> [calls, total ns, max ns].
+_spans = {}
+_counters = {}
+_trace_events = []
+_dropped_events = 0
+_codec_baseline = {}
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        end = time.perf_counter_ns()
+        duration = end - self.start
+        with _lock:
+            totals = _spans.get(self.name)
+            if totals is None:
+                totals = _spans[self.name] = [0, 0, 0]
+            totals[0] += 1
+            totals[1] += duration
+            if duration > totals[2]:
+                totals[2] = duration
+            if TRACING:
+                _add_trace_event({"name": self.name, "cat": self.name.split(".", 1)[0], "ph": "X",
+                                  "ts": (self.start - _origin_ns) / 1000, "dur": duration / 1000,
+                                  "pid": os.getpid(), "tid": threading.get_ident(), "args": self.args})
+        return False
+
+def _add_trace_event(event):
+    global _dropped_events
+    if len(_trace_events) < MAX_TRACE_EVENTS:
+        _trace_events.append(event)
+    else:
+        _dropped_events += 1
+
+def enable(trace=False):
+    """
+    Starts recording spans and counters, discarding what was recorded before.
+
+    Only the calling process is instrumented; work done in worker processes
+    (process pools, Blender workers) shows up as the span around the wait for it.
+
+    Args:
+        trace (bool): Also keep every span as a trace event for ``write_chrome_trace``.
+    """
+    global ENABLED, TRACING
+    reset()
+    TRACING = trace
+    ENABLED = True
+
+def disable():
+    """
+    Stops recording. What was recorded stays available to ``summary`` and ``write_chrome_trace``.
+    """
+    global ENABLED
+    ENABLED = False
+
+def reset():
+    """
+    Discards all recorded spans, counters and trace events.
+    """
+    global _origin_ns, _dropped_events
+    with _lock:
+        _spans.clear()
+        _counters.clear()
+        _trace_events.clear()
+        _dropped_events = 0
+        _origin_ns = time.perf_counter_ns()
+        _codec_baseline.update({operation: list(counters) for operation, counters in json_codec.stats.items()})
+
+def span(name, **args):
+    """
+    Times a block of code while instrumentation is enabled.
+
+    Usage: ``with span("manifest.load", path=path): ...``. Names are dotted;
+    the part before the first dot is the trace category.
+
+    Args:
+        name (str): Span name, aggregated in the summary.
+        **args: Details shown on the trace event (keep them small).
+
+    Returns:
+        A context manager.
+    """
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+def traced(name=None):
+    """
+    Decorator running every call of a function inside a span.
+
+    Args:
+        name (str, optional): Span name (the function's qualified name by default).
+    """
+    def decorate(function):
+        span_name = name or f"{function.__module__}.{function.__qualname__}"
+
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return function(*args, **kwargs)
+            with _Span(span_name, {}):
+                return function(*args, **kwargs)
+        wrapper.__name__ = function.__name__
+        wrapper.__qualname__ = function.__qualname__
+        wrapper.__doc__ = function.__doc__
+        wrapper.__wrapped__ = function
+        return wrapper
+    return decorate
+
+def count(name, value=1):
+    """
+    Adds to a counter while instrumentation is enabled (e.g. 'files.scanned', 'bytes.written').
+
+    Args:
+        name (str): Counter name.
+        value (int | float): Amount to add.
+    """
+    if not ENABLED:
+        return
+    with _lock:
+        total = _counters[name] = _counters.get(name, 0) + value
+        if TRACING:
+            _add_trace_event({"name": name, "ph": "C", "ts": (time.perf_counter_ns() - _origin_ns) / 1000,
+                              "pid": os.getpid(), "args": {"value": total}})
+
+def counters():
+    """
+    Returns the counters, including the JSON codec's encode/decode calls, bytes and seconds.
+
+    Returns:
+        dict: Counter name -> value, sorted by name.
+    """
+    with _lock:
+        values = dict(_counters)
+    for operation, (calls, size, seconds) in json_codec.stats.items():
+        base_calls, base_size, base_seconds = _codec_baseline.get(operation, (0, 0, 0.0))
+        if calls - base_calls:
+            values[f"json.{operation}.calls"] = calls - base_calls
+            values[f"json.{operation}.bytes"] = size - base_size
+            values[f"json.{operation}.seconds"] = round(seconds - base_seconds, 6)
+    return dict(sorted(values.items()))
+
+def set_log_format(log_format):
+    """
+    Chooses how ``log`` reports messages.
+
+    Args:
+        log_format (str): 'text' prints messages as before, 'json' writes one JSON
+            record per message to ``LOG_STREAM`` (stderr by default), 'quiet' drops
+            informational messages and prints only warnings and errors.
+    """
+    global LOG_FORMAT
+    if log_format not in LOG_FORMATS:
+        raise ValueError(f"Unknown log format: {log_format}. Supported formats: {', '.join(LOG_FORMATS)}.")
+    LOG_FORMAT = log_format
+
+def log(message, event=None, level="info", **fields):
+    """
+    Reports a progress or error message of the tools.
+
+    Per-item messages (one per file, asset or object) go through here rather
+    than ``print``, so large runs can switch them to structured records or turn
+    them off. While instrumentation is enabled every event is also counted as
+    'log.<event>'.
+
+    Args:
+        message (str): Human-readable message.
+        event (str, optional): Machine-readable event name, e.g. 'metadata.saved'.
+        level (str): 'info', 'warning' or 'error'.
+        **fields: Structured details for JSON records, e.g. ``path=...``.
+    """
+    if ENABLED and event is not None:
+        count(f"log.{event}")
+    if LOG_FORMAT == "text" or (LOG_FORMAT == "quiet" and level != "info"):
+        print(message)
+    elif LOG_FORMAT == "json":
+        record = {"time": time.time(), "level": level, "event": event, "message": message}
+        record.update(fields)
+        (LOG_STREAM or sys.stderr).write(json_codec.dumps(record, default=str) + "\n")
+
+def summary():
+    """
+    Aggregates the recorded spans.
+
+    Returns:
+        list: One dict per span name with ``name``, ``calls``, ``total``, ``mean``
+            and ``max`` (seconds), sorted by total time, longest first.
+    """
+    with _lock:
+        spans = {name: list(totals) for name, totals in _spans.items()}
+    rows = [{"name": name, "calls": calls, "total": total / 1e9, "mean": total / calls / 1e9, "max": longest / 1e9}
+            for name, (calls, total, longest) in spans.items()]
+    return sorted(rows, key=lambda row: row["total"], reverse=True)
+
+def format_summary():
+    """
+    Formats the spans and counters as text tables.
+
+    Returns:
+        str: The tables.
+    """
+    lines = [f"{'span':<40} {'calls':>8} {'total':>11} {'mean':>11} {'max':>11}"]
+    for row in summary():
+        lines.append(f"{row['name']:<40} {row['calls']:>8} {row['total'] * 1000:>9.2f}ms "
+                     f"{row['mean'] * 1000:>9.3f}ms {row['max'] * 1000:>9.2f}ms")
+    values = counters()
+    if values:
+        lines.append("")
+        lines.append(f"{'counter':<40} {'value':>14}")
+        for name, value in values.items():
+            lines.append(f"{name:<40} {value:>14,}" if isinstance(value, int) else f"{name:<40} {value:>14.6f}")
+    return "\n".join(lines)
+
+def write_chrome_trace(file_path):
+    """
+    Writes the recorded trace events in the Chrome trace event format.
+
+    Open the file in chrome://tracing or https://ui.perfetto.dev. Spans are
+    complete ('X') events per thread, counters are counter ('C') tracks.
+
+    Args:
+        file_path (str): Path of the JSON file.
+    """
+    with _lock:
+        events = list(_trace_events)
+        dropped = _dropped_events
+    threads = {(event["pid"], event["tid"]) for event in events if "tid" in event}
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    metadata = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": names.get(tid, str(tid))}}
+                for pid, tid in sorted(threads)]
+    json_codec.dump({
+        "traceEvents": metadata + events,
+        "displayTimeUnit": "ms",
+        "otherData": {"command": " ".join(sys.argv), "counters": counters(), "dropped_events": dropped},
+    }, file_path, default=str)
+
+def add_profiling_arguments(parser):
+    """
+    Adds --profile, --trace, --cprofile and --log-format to a command line parser.
+
+    Args:
+        parser (argparse.ArgumentParser): The tool's parser.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    group = parser.add_argument_group("profiling")
+    group.add_argument("--profile", action="store_true", help="Print where the run spent its time (spans and counters).")
+    group.add_argument("--trace", type=str, help="Write a Chrome trace of the run to this JSON file.")
+    group.add_argument("--cprofile", type=str, help="Also run under cProfile and write its stats to this file.")
+    group.add_argument("--log-format", choices=LOG_FORMATS, help="Print messages as text (default), as JSON records, or quiet.")
+    return parser
+
+@contextlib.contextmanager
+def profiling(profile=False, trace_path=None, cprofile_path=None, log_format=None):
+    """
+    Instruments the code run inside the ``with`` block.
+
+    Args:
+        profile (bool): Print the summary tables at the end.
+        trace_path (str, optional): Write a Chrome trace to this file.
+        cprofile_path (str, optional): Run under cProfile and dump its stats here
+            (read them with ``python -m pstats`` or snakeviz).
+        log_format (str, optional): Log format for the block (see ``set_log_format``).
+    """
+    if log_format:
+        set_log_format(log_format)
+    if not (profile or trace_path or cprofile_path):
+        yield
+        return
+    enable(trace=bool(trace_path))
+    profiler = cProfile.Profile() if cprofile_path else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        with span("run", command=" ".join(sys.argv)):
+            yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(cprofile_path)
+        disable()
+        if trace_path:
+            write_chrome_trace(trace_path)
+            print(f"Trace written to {trace_path}", file=sys.stderr)
+        if cprofile_path:
+            print(f"cProfile stats written to {cprofile_path}", file=sys.stderr)
+        if profile:
+            print(format_summary(), file=sys.stderr)
+
+def profiling_from_arguments(args):
+    """
+    Returns:
+        The ``profiling`` context manager configured from ``add_profiling_arguments`` flags.
+    """
+    return profiling(args.profile, args.trace, args.cprofile, args.log_format)
@@ -0,0 +1,210 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import json
+import mmap
+import os
+import stat
+import tempfile
+import time
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Set to 'json' to force the standard library backend, e.g. to compare speeds.
+BACKEND_ENV_VAR = "SCENE_ASSETS_JSON_BACKEND"
+PRETTY_INDENT = 4
+# Files above this size are decoded from a memory map instead of being read into a bytes object first.
+MMAP_THRESHOLD = 1 << 24
+
+# Raised by every backend on malformed input (orjson's error subclasses it too).
+JSONDecodeError = json.JSONDecodeError
+
+def available_backends():
+    """
+    Returns:
+        list: Names of the installed backends, fastest first.
+    """
+    return (["orjson"] if orjson is not None else []) + ["json"]
+
+def _select_backend(name=None):
+    name = name or os.environ.get(BACKEND_ENV_VAR) or available_backends()[0]
+    if name not in available_backends():
+        raise ValueError(f"JSON backend {name!r} is not available. Available backends: {', '.join(available_backends())}.")
+    return name
+
+BACKEND = _select_backend()
+
+# Calls, bytes and seconds spent encoding and decoding, to measure serialization cost per run.
+stats = {"encode": [0, 0, 0.0], "decode": [0, 0, 0.0]}
+
+def set_backend(name=None):
+    """
+    Switches the backend used by ``encode`` and ``decode``.
+
+    Args:
+        name (str, optional): 'orjson' or 'json'; None picks the fastest installed one.
+
+    Returns:
+        str: The selected backend.
+
+    Raises:
+        ValueError: If the backend isn't installed.
+    """
+    global BACKEND
+    BACKEND = _select_backend(name)
+    return BACKEND
+
+def reset_stats():
+    """
+    Zeroes the encode/decode counters in ``stats``.
+    """
+    for counters in stats.values():
+        counters[:] = [0, 0, 0.0]
+
+def _count(operation, size, start):
+    counters = stats[operation]
+    counters[0] += 1
+    counters[1] += size
+    counters[2] += time.perf_counter() - start
+
+def encode(data, pretty=False, sort_keys=False, default=None):
+    """
+    Serializes data to UTF-8 encoded JSON.
+
+    Compact mode is meant for machine-consumed files and uses the fastest
+    backend. Pretty mode is meant for human-edited files (metadata, manifests,
+    summaries) and always goes through the standard library, so those files
+    look the same whichever backend is installed.
+
+    Args:
+        data: JSON-serializable data.
+        pretty (bool | int): Indent the output by PRETTY_INDENT, or by the given number of spaces.
+        sort_keys (bool): Sort object keys.
+        default (callable, optional): Converts objects the backend can't serialize.
+
+    Returns:
+        bytes: The JSON document.
+    """
+    start = time.perf_counter()
+    if BACKEND == "orjson" and not pretty:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        encoded = orjson.dumps(data, default=default, option=options)
+    elif pretty:
+        indent = PRETTY_INDENT if pretty is True else pretty
+        encoded = json.dumps(data, indent=indent, sort_keys=sort_keys, default=default, ensure_ascii=False).encode("utf-8")
+    else:
+        encoded = json.dumps(data, separators=(",", ":"), sort_keys=sort_keys, default=default, ensure_ascii=False).encode("utf-8")
+    _count("encode", len(encoded), start)
+    return encoded
+
+def decode(data):
+    """
+    Parses a JSON document.
+
+    Args:
+        data (bytes | bytearray | memoryview | mmap.mmap | str): The document; binary input
+            is parsed directly, without decoding it to a str first where the backend allows.
+
+    Returns:
+        The parsed data.
+
+    Raises:
+        JSONDecodeError: If the document is malformed.
+    """
+    start = time.perf_counter()
+    if BACKEND == "orjson":
+        parsed = orjson.loads(memoryview(data) if isinstance(data, mmap.mmap) else data)
+    else:
+        parsed = json.loads(bytes(data) if isinstance(data, (memoryview, mmap.mmap)) else data)
+    _count("decode", len(data), start)
+    return parsed
+
+def dumps(data, pretty=False, sort_keys=False, default=None):
+    """
+    Like ``encode``, but returns a str (e.g. for database columns or protocol lines).
+    """
+    return encode(data, pretty=pretty, sort_keys=sort_keys, default=default).decode("utf-8")
+
+loads = decode
+
+def load(file_path):
+    """
+    Reads and parses a JSON file.
+
+    The file is read as bytes; files of MMAP_THRESHOLD bytes or more are parsed
+    from a memory map so the raw text isn't copied into Python first.
+
+    Args:
+        file_path (str): Path to the JSON file.
+
+    Returns:
+        The parsed data.
+
+    Raises:
+        OSError: If the file can't be read.
+        JSONDecodeError: If the file isn't valid JSON.
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return decode(mapped)
+        return decode(f.read())
+
+def _process_umask():
+    # os.umask can only be read by setting it, which races with other threads
+    # creating files; Linux reports it in /proc instead.
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("Umask:"):
+                    return int(line.split()[1], 8)
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def replacement_mode(file_path):
+    """
+    Returns:
+        int | None: Permission bits for a file replacing ``file_path``: those of the
+            existing file, or what ``open`` would give a new file. None when there is
+            no file and the umask can't be read; the temporary file's mode is kept then.
+    """
+    try:
+        return stat.S_IMODE(os.stat(file_path).st_mode)
+    except OSError:
+        umask = _process_umask()
+        return None if umask is None else 0o666 & ~umask
+
+def dump(data, file_path, pretty=False, sort_keys=False, default=None):
+    """
+    Serializes data to a JSON file.
+
+    The data is written to a temporary file next to ``file_path`` which then
+    replaces it, so the file gets a new inode: other paths hard-linked to the old
+    one (e.g. deduplicated asset versions sharing an object store object) keep
+    their content. The new file keeps the permissions of the one it replaces.
+
+    Args:
+        data: JSON-serializable data.
+        file_path (str): Path of the file to write.
+        pretty (bool | int): Indent the output (for human-edited files), as for ``encode``.
+        sort_keys (bool): Sort object keys.
+        default (callable, optional): Converts objects the backend can't serialize.
+    """
+    encoded = encode(data, pretty=pretty, sort_keys=sort_keys, default=default)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".tmp",
+                                     dir=os.path.dirname(file_path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            mode = replacement_mode(file_path)
+            if mode is not None and hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), mode)
+            f.write(encoded)
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
@@ -0,0 +1,237 @@
+# Copyright 2024 chevp. All rights reserved.
+
+from utils import json_codec
+
+def escape_token(token):
+    """
+    Returns:
+        str: A key or array index escaped for use in a JSON pointer (RFC 6901).
+    """
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+def unescape_token(token):
+    """
+    Returns:
+        str: A JSON pointer token with its escapes resolved.
+    """
+    return token.replace("~1", "/").replace("~0", "~")
+
+def _children(pointer, value):
+    if isinstance(value, dict):
+        return [(f"{pointer}/{escape_token(name)}", child, name) for name, child in value.items()]
+    if isinstance(value, list):
+        return [(f"{pointer}/{index}", child, None) for index, child in enumerate(value)]
+    return []
+
+class JsonIndex:
+    """
+    Path index over a parsed JSON document for repeated queries.
+
+    Building the index walks the document once (iteratively, so deep
+    hierarchies don't hit the recursion limit) and records every value under its
+    JSON pointer, plus, for every object key, the pointers where it occurs.
+    Afterwards ``find`` is a dictionary lookup and ``query`` resolves path
+    patterns such as ``nodes/*/material`` without scanning unrelated branches.
+
+    The index references the document's own objects. Change the document
+    through ``set`` and ``delete`` so only the affected subtree is re-indexed;
+    after modifying a subtree in place, call ``refresh`` on it.
+
+    Args:
+        data: The parsed JSON document.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.values = {}
+        self.keys = {}
+        self._index("", data, None)
+
+    @classmethod
+    def from_file(cls, file_path):
+        """
+        Loads a JSON file and indexes it.
+
+        Args:
+            file_path (str): Path to the JSON file.
+
+        Returns:
+            JsonIndex: The index.
+        """
+        return cls(json_codec.load(file_path))
+
+    def _index(self, pointer, value, name):
+        stack = [(pointer, value, name)]
+        while stack:
+            pointer, value, name = stack.pop()
+            self.values[pointer] = value
+            if name is not None:
+                self.keys.setdefault(name, {})[pointer] = None
+            # Reversed, so children are indexed (and found) in document order.
+            stack.extend(reversed(_children(pointer, value)))
+
+    def _unindex(self, pointer, value, name):
+        stack = [(pointer, value, name)]
+        while stack:
+            pointer, value, name = stack.pop()
+            self.values.pop(pointer, None)
+            if name is not None:
+                pointers = self.keys.get(name)
+                if pointers is not None:
+                    pointers.pop(pointer, None)
+                    if not pointers:
+                        del self.keys[name]
+            stack.extend(_children(pointer, value))
+
+    def get(self, pointer, default=None):
+        """
+        Returns:
+            The value at a JSON pointer, or ``default`` if there is none.
+        """
+        return self.values.get(pointer, default)
+
+    def find(self, key):
+        """
+        Finds every occurrence of an object key, at any depth.
+
+        Args:
+            key (str): Key to look up.
+
+        Returns:
+            list: ``(pointer, value)`` pairs.
+        """
+        return [(pointer, self.values[pointer]) for pointer in self.keys.get(key, ())]
+
+    def query(self, pattern):
+        """
+        Resolves a path pattern.
+
+        The pattern is a '/'-separated path of keys and array indexes. '*' matches
+        any single key or index, and '**' matches any number of levels (including
+        none). For example 'nodes/*/material', 'materials/0/name' or '**/texture'.
+
+        Args:
+            pattern (str): The path pattern.
+
+        Returns:
+            list: ``(pointer, value)`` pairs of the matching values.
+        """
+        tokens = [token for token in pattern.strip("/").split("/") if token]
+        if len(tokens) == 2 and tokens[0] == "**" and tokens[1] not in ("*", "**"):
+            return self.find(unescape_token(tokens[1]))
+
+        frontier = [""]
+        for token in tokens:
+            matches = {}
+            for pointer in frontier:
+                value = self.values[pointer]
+                if token == "**":
+                    stack = [pointer]
+                    while stack:
+                        current = stack.pop()
+                        matches[current] = None
+                        stack.extend(reversed([child for child, _, _ in _children(current, self.values[current])]))
+                elif token == "*":
+                    matches.update((child, None) for child, _, _ in _children(pointer, value))
+                else:
+                    # Tokens are pointer-escaped, so '~1' matches a key containing '/'.
+                    child = f"{pointer}/{token}"
+                    if child in self.values:
+                        matches[child] = None
+            frontier = list(matches)
+        return [(pointer, self.values[pointer]) for pointer in frontier]
+
+    def _parent(self, pointer):
+        if pointer == "":
+            raise ValueError("The document root has no parent")
+        parent_pointer, token = pointer.rsplit("/", 1)
+        if parent_pointer not in self.values:
+            raise KeyError(f"No value at {parent_pointer!r}")
+        return parent_pointer, self.values[parent_pointer], unescape_token(token)
+
+    def set(self, pointer, value):
+        """
+        Sets the value at a JSON pointer and re-indexes just that subtree.
+
+        The parent must exist. For an array parent the token must be an existing
+        index, or the array's length to append.
+
+        Args:
+            pointer (str): JSON pointer of the value; '' replaces the whole document.
+            value: The new value.
+
+        Raises:
+            KeyError: If the parent doesn't exist.
+            IndexError: If an array index is out of range.
+        """
+        if pointer == "":
+            self.__init__(value)
+            return
+        _, parent, token = self._parent(pointer)
+        if isinstance(parent, dict):
+            if token in parent:
+                self._unindex(pointer, parent[token], token)
+            parent[token] = value
+            self._index(pointer, value, token)
+        elif isinstance(parent, list):
+            index = int(token)
+            if index == len(parent):
+                parent.append(value)
+            else:
+                self._unindex(pointer, parent[index], None)
+                parent[index] = value
+            self._index(pointer, value, None)
+        else:
+            raise KeyError(f"Cannot set {pointer!r}: its parent is not an object or array")
+
+    def delete(self, pointer):
+        """
+        Deletes the value at a JSON pointer.
+
+        Deleting an array item shifts the following items, so those are re-indexed too.
+
+        Args:
+            pointer (str): JSON pointer of the value.
+
+        Raises:
+            KeyError: If there is no value at ``pointer``.
+        """
+        if pointer not in self.values:
+            raise KeyError(f"No value at {pointer!r}")
+        parent_pointer, parent, token = self._parent(pointer)
+        if isinstance(parent, dict):
+            self._unindex(pointer, parent.pop(token), token)
+            return
+        index = int(token)
+        for position in range(index, len(parent)):
+            self._unindex(f"{parent_pointer}/{position}", parent[position], None)
+        del parent[index]
+        for position in range(index, len(parent)):
+            self._index(f"{parent_pointer}/{position}", parent[position], None)
+
+    def refresh(self, pointer=""):
+        """
+        Re-indexes a subtree that was modified in place.
+
+        This scans the pointers of the whole index to find the stale entries
+        below ``pointer``; prefer ``set`` where possible.
+
+        Args:
+            pointer (str): JSON pointer of the modified subtree.
+        """
+        value = self.values[pointer]
+        prefix = pointer + "/"
+        for stale in [path for path in self.values if path == pointer or path.startswith(prefix)]:
+            del self.values[stale]
+        for name in list(self.keys):
+            pointers = self.keys[name]
+            for stale in [path for path in pointers if path == pointer or path.startswith(prefix)]:
+                del pointers[stale]
+            if not pointers:
+                del self.keys[name]
+        name = None
+        if pointer:
+            parent_pointer, token = pointer.rsplit("/", 1)
+            if isinstance(self.values.get(parent_pointer), dict):
+                name = unescape_token(token)
+        self._index(pointer, value, name)
@@ -2,6 +2,13 @@
 
 import json
 import os
+import tempfile
+from utils import json_codec
+from utils.instrumentation import log
+from utils.json_index import escape_token
+
+# Placeholder name of values that aren't object members (the root and array items).
+_NO_KEY = object()
 
 def read_json(file_path):
     """
@@ -14,28 +21,65 @@ def read_json(file_path):
         dict: Parsed JSON content as a dictionary, or None if there was an error.
     """
     try:
-        with open(file_path, 'r') as f:
-            data = json.load(f)
-        return data
-    except (FileNotFoundError, json.JSONDecodeError) as e:
-        print(f"Error reading JSON file at {file_path}: {e}")
+        return json_codec.load(file_path)
+    except (FileNotFoundError, json_codec.JSONDecodeError) as e:
+        log(f"Error reading JSON file at {file_path}: {e}", event="json.error", level="error", path=file_path)
         return None
 
-def write_json(data, file_path):
+def write_json(data, file_path, pretty=True):
     """
     Writes a dictionary to a file as JSON.
     
     Args:
         data (dict): Data to write to the JSON file.
         file_path (str): Path where the JSON file will be saved.
+        pretty (bool): Indent the file for humans; False writes compact JSON for machine-consumed files.
     """
-    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
     try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=4)
-        print(f"Successfully wrote JSON to {file_path}")
+        json_codec.dump(data, file_path, pretty=pretty)
+        log(f"Successfully wrote JSON to {file_path}", event="json.written", path=file_path)
     except IOError as e:
-        print(f"Error writing JSON to {file_path}: {e}")
+        log(f"Error writing JSON to {file_path}: {e}", event="json.error", level="error", path=file_path)
+
+def write_json_atomic(data, file_path, fsync=False, indent=4):
+    """
+    Writes a dictionary to a file as JSON, replacing the file atomically.
+
+    The data is written to a temporary file in the same directory which is then
+    moved over the target with ``os.replace``, so readers never observe a
+    partially written file. The new file keeps the permissions of the one it
+    replaces (``mkstemp`` would make it readable by the owner only).
+
+    Args:
+        data (dict): Data to write to the JSON file.
+        file_path (str): Path where the JSON file will be saved.
+        fsync (bool): Flush the file (and its directory) to stable storage before returning.
+        indent (int, optional): Indentation level, or None for compact output (written by the fastest JSON backend).
+    """
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            mode = json_codec.replacement_mode(file_path)
+            if mode is not None and hasattr(os, "fchmod"):
+                os.fchmod(f.fileno(), mode)
+            f.write(json_codec.encode(data, pretty=indent if indent is not None else False))
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
 def update_json(file_path, new_data):
     """
@@ -62,7 +106,7 @@ def validate_json_schema(data, schema):
     """
     for key, expected_type in schema.items():
         if key not in data or not isinstance(data[key], expected_type):
-            print(f"Validation failed: '{key}' is missing or not of type {expected_type.__name__}")
+            log(f"Validation failed: '{key}' is missing or not of type {expected_type.__name__}", event="schema.invalid", level="warning", key=key)
             return False
     return True
 
@@ -88,31 +132,347 @@ def pretty_print_json(data):
     Args:
         data (dict): JSON data to print.
     """
-    print(json.dumps(data, indent=4))
+    print(json_codec.dumps(data, pretty=True))
 
 def search_key_in_json(data, key):
     """
     Searches for a key in a nested JSON structure.
+
+    The structure is walked with an explicit stack, so deep hierarchies don't hit
+    the recursion limit. Values of a matching key are not searched further. To
+    run many queries over the same document, build a ``json_index.JsonIndex`` once
+    instead.
     
     Args:
         data (dict): JSON data to search within.
         key (str): Key to search for.
     
     Returns:
-        list: List of values found for the specified key.
+        list: List of values found for the specified key, in document order.
     """
     results = []
-    
-    def search(data, key):
-        if isinstance(data, dict):
-            for k, v in data.items():
-                if k == key:
-                    results.append(v)
-                elif isinstance(v, (dict, list)):
-                    search(v, key)
-        elif isinstance(data, list):
-            for item in data:
-                search(item, key)
-    
-    search(data, key)
-    return results
\ No newline at end of file
+    stack = [iter(((_NO_KEY, data),))]
+    while stack:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+        name, value = item
+        if name == key:
+            results.append(value)
+        elif isinstance(value, dict):
+            stack.append(iter(value.items()))
+        elif isinstance(value, list):
+            stack.append((_NO_KEY, element) for element in value)
+    return results
+
+class JsonStreamWriter:
+    """
+    Writes a JSON document with one large array item by item.
+
+    The output is ``{"<key>": [item, item, ...]}`` (plus any ``header`` fields),
+    or one item per line in JSON Lines mode. Items are serialized as they are
+    added and go through a fixed-size write buffer, so memory use doesn't grow
+    with the number of items. Use it as a context manager to close the document.
+
+    Args:
+        file_path (str): Path of the file to write.
+        key (str): Name of the array in the JSON document.
+        json_lines (bool): Write JSON Lines (no enclosing document) instead.
+        header (dict, optional): Extra top-level fields written before the array.
+        buffer_size (int): Size of the write buffer in bytes.
+    """
+
+    def __init__(self, file_path, key="objects", json_lines=False, header=None, buffer_size=1 << 20):
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        self.file_path = file_path
+        self.json_lines = json_lines
+        self.count = 0
+        self._file = open(file_path, "wb", buffering=buffer_size)
+        if not json_lines:
+            fields = [json_codec.encode(name) + b": " + json_codec.encode(value) for name, value in (header or {}).items() if name != key]
+            fields.append(json_codec.encode(key) + b": [")
+            self._file.write(b"{" + b", ".join(fields))
+
+    def write(self, item):
+        """
+        Appends one item to the array.
+
+        Args:
+            item: JSON-serializable item.
+        """
+        if self.json_lines:
+            self._file.write(json_codec.encode(item) + b"\n")
+        else:
+            self._file.write((b"\n" if self.count == 0 else b",\n") + json_codec.encode(item))
+        self.count += 1
+
+    def close(self):
+        """
+        Closes the array and the document and flushes the file.
+        """
+        if self._file.closed:
+            return
+        if not self.json_lines:
+            self._file.write(b"\n]}\n" if self.count else b"]}\n")
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def write_json_stream(items, file_path, key="objects", json_lines=False, header=None):
+    """
+    Writes items from an iterable to a JSON (or JSON Lines) file as they are produced.
+
+    Args:
+        items (iterable): JSON-serializable items; may be a generator.
+        file_path (str): Path of the file to write.
+        key (str): Name of the array in the JSON document.
+        json_lines (bool): Write JSON Lines instead of a JSON document.
+        header (dict, optional): Extra top-level fields written before the array.
+
+    Returns:
+        int: Number of items written.
+    """
+    with JsonStreamWriter(file_path, key=key, json_lines=json_lines, header=header) as writer:
+        for item in items:
+            writer.write(item)
+    return writer.count
+
+# Characters a JSON number can continue with.
+_NUMBER_CHARACTERS = frozenset("0123456789+-.eE")
+
+class _ChunkReader:
+    """
+    Sliding text buffer over a file for incremental decoding.
+    """
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.position = 0
+        self.eof = False
+
+    def fill(self, size=None):
+        if self.eof:
+            return False
+        chunk = self.f.read(size or self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        if self.position > len(self.buffer) // 2:
+            self.buffer = self.buffer[self.position:]
+            self.position = 0
+        self.buffer += chunk
+        return True
+
+    def skip_whitespace(self):
+        while True:
+            while self.position < len(self.buffer) and self.buffer[self.position] in " \t\r\n":
+                self.position += 1
+            if self.position < len(self.buffer) or not self.fill():
+                return
+
+    def peek(self):
+        self.skip_whitespace()
+        return self.buffer[self.position] if self.position < len(self.buffer) else ""
+
+    def expect(self, character):
+        if self.peek() != character:
+            found = self.peek() or "end of file"
+            raise json.JSONDecodeError(f"Expected '{character}', found {found!r}", self.buffer, self.position)
+        self.position += 1
+
+    def decode(self, decoder):
+        self.skip_whitespace()
+        # A value that doesn't fit is decoded again after every read, so the reads double
+        # in size: a value of n characters is then decoded O(log n) times, not O(n / chunk_size).
+        read_size = self.chunk_size
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if self.fill(read_size):
+                    read_size *= 2
+                    continue
+                raise
+            # A number at the end of the buffer might continue in the next chunk: raw_decode
+            # reads '1.' or '1e-' as 1, so a number counts as cut off while only characters
+            # that could continue it follow.
+            if self._at_buffer_end(value, end) and self.fill(read_size):
+                read_size *= 2
+                continue
+            self.position = end
+            return value
+
+    def skip(self, decoder):
+        """
+        Skips one value without building it; only one string or number of it is decoded at a time.
+        """
+        closing = []
+        while True:
+            character = self.peek()
+            if character in ("{", "["):
+                self.position += 1
+                closing.append("}" if character == "{" else "]")
+            elif closing and character in ("}", "]"):
+                self.expect(closing.pop())
+            elif closing and character in (",", ":"):
+                self.position += 1
+            else:
+                self.decode(decoder)
+            if not closing:
+                return
+
+    def _at_buffer_end(self, value, end):
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            while end < len(self.buffer) and self.buffer[end] in _NUMBER_CHARACTERS:
+                end += 1
+        return end == len(self.buffer)
+
+def iter_json_array(file_path, key="objects", chunk_size=1 << 16):
+    """
+    Lazily yields the items of a large array in a JSON file.
+
+    Only the current item (and one read chunk) is held in memory, so arbitrarily
+    large scene exports can be processed in constant memory. Top-level fields
+    before the array are skipped without being decoded as a whole.
+
+    Args:
+        file_path (str): Path of the JSON file.
+        key (str, optional): Top-level key holding the array, or None if the document itself is an array.
+        chunk_size (int): Number of characters read at a time.
+
+    Yields:
+        The array items, in file order.
+
+    Raises:
+        KeyError: If the document has no ``key`` array.
+        json.JSONDecodeError: If the file is not valid JSON.
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, "r", encoding="utf-8") as f:
+        reader = _ChunkReader(f, chunk_size)
+        if key is not None:
+            reader.expect("{")
+            while True:
+                if reader.peek() == "}":
+                    raise KeyError(key)
+                name = reader.decode(decoder)
+                reader.expect(":")
+                if name == key and reader.peek() == "[":
+                    break
+                reader.skip(decoder)
+                if reader.peek() == ",":
+                    reader.position += 1
+        reader.expect("[")
+        if reader.peek() == "]":
+            return
+        while True:
+            yield reader.decode(decoder)
+            if reader.peek() == ",":
+                reader.position += 1
+                continue
+            reader.expect("]")
+            return
+
+def _read_member_name(reader, decoder):
+    name = reader.decode(decoder)
+    reader.expect(":")
+    return name
+
+def iter_json_key(file_path, key, chunk_size=1 << 16):
+    """
+    Lazily yields every value of a key in a JSON file, without loading the whole document.
+
+    The file is tokenized in chunks; only the values of matching keys are
+    decoded (and not searched further, as in ``search_key_in_json``), everything
+    else is skipped, so memory use is bounded by the largest match.
+
+    Args:
+        file_path (str): Path of the JSON file.
+        key (str): Key to search for.
+        chunk_size (int): Number of characters read at a time.
+
+    Yields:
+        tuple: ``(pointer, value)`` with the JSON pointer (RFC 6901) of each match, in file order.
+
+    Raises:
+        json.JSONDecodeError: If the file is not valid JSON.
+    """
+    decoder = json.JSONDecoder()
+    with open(file_path, "r", encoding="utf-8") as f:
+        reader = _ChunkReader(f, chunk_size)
+        containers = []
+        path = []
+        while True:
+            # Read the value at ``path``: descend into containers, skip scalars.
+            character = reader.peek()
+            if character in ("{", "["):
+                reader.position += 1
+                closing = "}" if character == "{" else "]"
+                if reader.peek() == closing:
+                    reader.position += 1
+                else:
+                    containers.append(character)
+                    if character == "[":
+                        path.append(0)
+                        continue
+                    path.append(_read_member_name(reader, decoder))
+                    if path[-1] != key:
+                        continue
+                    yield "/" + "/".join(escape_token(token) for token in path), reader.decode(decoder)
+            else:
+                reader.decode(decoder)
+
+            # The value is complete: move on to the next sibling, closing finished containers.
+            while containers:
+                if reader.peek() != ",":
+                    reader.expect("}" if containers[-1] == "{" else "]")
+                    containers.pop()
+                    path.pop()
+                    continue
+                reader.position += 1
+                if containers[-1] == "[":
+                    path[-1] += 1
+                    break
+                path[-1] = _read_member_name(reader, decoder)
+                if path[-1] != key:
+                    break
+                yield "/" + "/".join(escape_token(token) for token in path), reader.decode(decoder)
+            if not containers:
+                return
+
+def iter_json_lines(file_path):
+    """
+    Lazily yields the records of a JSON Lines file.
+
+    Args:
+        file_path (str): Path of the JSON Lines file.
+
+    Yields:
+        One decoded value per non-empty line.
+    """
+    with open(file_path, "rb") as f:
+        for line in f:
+            if line.strip():
+                yield json_codec.decode(line)
+
+def iter_scene_objects(file_path):
+    """
+    Lazily yields the objects of a scene export, in either JSON or JSON Lines format.
+
+    Args:
+        file_path (str): Path of a ``.json`` or ``.jsonl`` scene export.
+
+    Yields:
+        dict: One scene object at a time.
+    """
+    if file_path.endswith(".jsonl"):
+        return iter_json_lines(file_path)
+    return iter_json_array(file_path, key="objects")
@@ -0,0 +1,234 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import fnmatch
+import os
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from utils.instrumentation import count, log, traced
+from utils.json_utils import read_json, write_json_atomic
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+class FileEntry(namedtuple("FileEntry", ["path", "size", "mtime_ns", "inode"])):
+    """
+    One scanned file.
+
+    ``st_size`` and ``st_mtime_ns`` alias ``size`` and ``mtime_ns``, so an entry can
+    be passed wherever a stat result is accepted (e.g. ``DigestCache.digest``).
+    """
+
+    __slots__ = ()
+
+    @property
+    def st_size(self):
+        return self.size
+
+    @property
+    def st_mtime_ns(self):
+        return self.mtime_ns
+
+def _matches(relative_path, name, patterns):
+    # Patterns with a slash match the path relative to the scanned root, others just the name.
+    return any(fnmatch.fnmatch(relative_path if "/" in pattern else name, pattern) for pattern in patterns)
+
+def _scan_one(path, relative, include, exclude, follow_symlinks):
+    """
+    Reads one directory with ``os.scandir``.
+
+    Returns:
+        tuple: ``(files, subdirectories)``; files as ``(relative path, FileEntry)``,
+            subdirectories as ``(path, relative path)``.
+    """
+    files = []
+    subdirectories = []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                entry_relative = f"{relative}/{entry.name}" if relative else entry.name
+                if exclude and _matches(entry_relative, entry.name, exclude):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=follow_symlinks):
+                        subdirectories.append((entry.path, entry_relative))
+                    elif entry.is_file() and (not include or _matches(entry_relative, entry.name, include)):
+                        # DirEntry caches its stat result, so each file costs at most one stat call.
+                        stat = entry.stat()
+                        files.append((entry_relative, FileEntry(entry.path, stat.st_size, stat.st_mtime_ns, stat.st_ino)))
+                except OSError:
+                    continue
+    except OSError as e:
+        log(f"Error scanning {path}: {e}", event="scan.error", level="error", path=path)
+    count("directories.scanned")
+    count("files.scanned", len(files))
+    return files, subdirectories
+
+class Snapshot:
+    """
+    The files found by one scan of a directory tree.
+
+    Entries are keyed by their path relative to ``root`` (with forward slashes)
+    and record the size, mtime and inode seen during the scan. A snapshot can be
+    saved and loaded again, so the next run can ``diff`` a fresh scan against it
+    instead of re-reading unchanged files.
+
+    Args:
+        root (str): Scanned directory.
+        entries (dict): Relative path -> FileEntry.
+    """
+
+    def __init__(self, root, entries=None):
+        self.root = root
+        self.entries = entries or {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries[relative] for relative in sorted(self.entries))
+
+    def paths(self, include=None):
+        """
+        Lists the scanned file paths, optionally narrowed down by glob patterns.
+
+        Args:
+            include (list, optional): Glob patterns, as for ``scan_directory``.
+
+        Returns:
+            list: File paths, sorted by relative path.
+        """
+        return [self.entries[relative].path for relative in sorted(self.entries)
+                if not include or _matches(relative, relative.rsplit("/", 1)[-1], include)]
+
+    def by_directory(self, include=None):
+        """
+        Groups the scanned files by their directory.
+
+        Args:
+            include (list, optional): Glob patterns, as for ``scan_directory``.
+
+        Returns:
+            dict: Directory path -> list of file names, both sorted.
+        """
+        directories = {}
+        for path in self.paths(include):
+            directory, name = os.path.split(path)
+            directories.setdefault(directory, []).append(name)
+        return dict(sorted(directories.items()))
+
+    def diff(self, previous):
+        """
+        Compares this snapshot with an earlier one of the same tree.
+
+        A file counts as changed when its size, mtime or inode differs (a file
+        replaced by a rename keeps size and mtime but gets a new inode).
+
+        Args:
+            previous (Snapshot): The earlier snapshot; None counts as empty.
+
+        Returns:
+            dict: Sorted lists of ``added``, ``removed`` and ``changed`` file paths.
+        """
+        old = previous.entries if previous is not None else {}
+        root = previous.root if previous is not None else self.root
+        return {
+            "added": sorted(entry.path for relative, entry in self.entries.items() if relative not in old),
+            "removed": sorted(os.path.join(root, *relative.split("/")) for relative in old if relative not in self.entries),
+            "changed": sorted(entry.path for relative, entry in self.entries.items()
+                              if relative in old and tuple(old[relative][1:]) != tuple(entry[1:])),
+        }
+
+    def save(self, snapshot_path):
+        """
+        Persists the snapshot as JSON.
+
+        Args:
+            snapshot_path (str): File to write.
+        """
+        write_json_atomic({
+            "version": SNAPSHOT_FORMAT_VERSION,
+            "root": self.root,
+            "entries": {relative: list(entry[1:]) for relative, entry in sorted(self.entries.items())},
+        }, snapshot_path, indent=None)
+
+    @classmethod
+    def load(cls, snapshot_path):
+        """
+        Loads a snapshot written by ``save``.
+
+        Args:
+            snapshot_path (str): Snapshot file.
+
+        Returns:
+            Snapshot: The snapshot, or None if the file is missing or not a snapshot.
+        """
+        data = read_json(snapshot_path) if os.path.exists(snapshot_path) else None
+        if not isinstance(data, dict) or data.get("version") != SNAPSHOT_FORMAT_VERSION:
+            return None
+        root = data["root"]
+        return cls(root, {relative: FileEntry(os.path.join(root, *relative.split("/")), *values)
+                          for relative, values in data["entries"].items()})
+
+@traced("scan")
+def scan_directory(directory, include=None, exclude=None, max_workers=1, follow_symlinks=False):
+    """
+    Scans a directory tree with ``os.scandir``.
+
+    Patterns are ``fnmatch`` globs; a pattern containing '/' is matched against
+    the path relative to ``directory``, any other against the file or directory
+    name. Excluded directories are not descended into. With ``max_workers`` > 1
+    subdirectories are scanned across a thread pool, which pays off on network
+    filesystems where every directory listing is a round trip.
+
+    Args:
+        directory (str): Directory to scan.
+        include (list, optional): Only record files matching one of these patterns (e.g. ['*.blend']).
+        exclude (list, optional): Skip files and directories matching one of these patterns.
+        max_workers (int): Number of threads listing directories.
+        follow_symlinks (bool): Descend into symlinked directories.
+
+    Returns:
+        Snapshot: The files found.
+    """
+    include = list(include) if include else None
+    exclude = list(exclude) if exclude else None
+    entries = {}
+
+    if max_workers <= 1:
+        pending = [(directory, "")]
+        while pending:
+            path, relative = pending.pop()
+            files, subdirectories = _scan_one(path, relative, include, exclude, follow_symlinks)
+            entries.update(files)
+            pending.extend(subdirectories)
+        return Snapshot(directory, entries)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {executor.submit(_scan_one, directory, "", include, exclude, follow_symlinks)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                files, subdirectories = future.result()
+                entries.update(files)
+                for path, relative in subdirectories:
+                    pending.add(executor.submit(_scan_one, path, relative, include, exclude, follow_symlinks))
+    return Snapshot(directory, entries)
+
+def rescan(directory, snapshot_path, **scan_options):
+    """
+    Scans a directory and diffs it against the snapshot saved by the previous run.
+
+    The new snapshot replaces the saved one.
+
+    Args:
+        directory (str): Directory to scan.
+        snapshot_path (str): Snapshot file of the previous run.
+        **scan_options: Options passed on to ``scan_directory``.
+
+    Returns:
+        tuple: ``(snapshot, changes)`` with changes as returned by ``Snapshot.diff``.
+    """
+    previous = Snapshot.load(snapshot_path)
+    snapshot = scan_directory(directory, **scan_options)
+    changes = snapshot.diff(previous)
+    snapshot.save(snapshot_path)
+    return snapshot, changes
@@ -0,0 +1,258 @@
+# Copyright 2024 chevp. All rights reserved.
+#
+# Compact binary scene format (".bin" exports).
+#
+# All values are little-endian. The file starts with a fixed 64-byte header:
+#
+#     offset  type       field
+#     0       char[4]    magic "SCNB"
+#     4       uint32     format version
+#     8       uint32     object count (N)
+#     12      uint32     string count (S)
+#     16      uint64     offset of the string table
+#     24      uint64     offset of the name indices      (uint32[N])
+#     32      uint64     offset of the type indices      (uint32[N])
+#     40      uint64     offset of the locations         (float32[N * 3])
+#     48      uint64     offset of the rotations         (float32[N * 3])
+#     56      uint64     offset of the scales            (float32[N * 3])
+#
+# The string table holds uint32[S + 1] byte offsets followed by the UTF-8 bytes of
+# every distinct name and type. Every section starts on a 16-byte boundary, so the
+# arrays can be mapped straight into NumPy without copying.
+
+import mmap
+import os
+import struct
+import sys
+from array import array
+import numpy as np
+
+MAGIC = b"SCNB"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sIIIQQQQQQ")
+ALIGNMENT = 16
+
+class StringTable:
+    """
+    Deduplicating table of the strings (names and types) of a scene.
+    """
+
+    def __init__(self):
+        self.strings = []
+        self._indices = {}
+
+    def index(self, value):
+        """
+        Returns the index of a string, adding it to the table if needed.
+
+        Args:
+            value (str): String to look up.
+
+        Returns:
+            int: Index into the table.
+        """
+        index = self._indices.get(value)
+        if index is None:
+            index = self._indices[value] = len(self.strings)
+            self.strings.append(value)
+        return index
+
+    def to_bytes(self):
+        """
+        Returns:
+            bytes: The encoded table (offsets followed by the UTF-8 blob).
+        """
+        encoded = [string.encode("utf-8") for string in self.strings]
+        offsets = array("I", [0])
+        for value in encoded:
+            offsets.append(offsets[-1] + len(value))
+        return _little_endian(offsets) + b"".join(encoded)
+
+class BinarySceneWriter:
+    """
+    Collects scene objects column by column and writes them as a binary scene.
+
+    Objects are appended one at a time, so exporters never have to build a list
+    of per-object dictionaries.
+    """
+
+    def __init__(self):
+        self.strings = StringTable()
+        self.names = array("I")
+        self.types = array("I")
+        self.location = array("f")
+        self.rotation = array("f")
+        self.scale = array("f")
+
+    def __len__(self):
+        return len(self.names)
+
+    def add(self, name, type, location, rotation, scale):
+        """
+        Appends one object.
+
+        Args:
+            name (str): Object name.
+            type (str): Object type (e.g. "MESH", "LIGHT").
+            location (iterable): X, Y and Z location.
+            rotation (iterable): X, Y and Z Euler rotation.
+            scale (iterable): X, Y and Z scale.
+        """
+        self.names.append(self.strings.index(name))
+        self.types.append(self.strings.index(type))
+        self.location.extend(_vector3(location))
+        self.rotation.extend(_vector3(rotation))
+        self.scale.extend(_vector3(scale))
+
+    def write(self, file_path):
+        """
+        Writes the collected objects to a file.
+
+        Args:
+            file_path (str): Path of the binary scene file.
+        """
+        sections = [self.strings.to_bytes()] + [
+            _little_endian(column) for column in (self.names, self.types, self.location, self.rotation, self.scale)
+        ]
+        offsets = []
+        position = HEADER.size
+        for section in sections:
+            position = _align(position)
+            offsets.append(position)
+            position += len(section)
+
+        os.makedirs(os.path.dirname(file_path) or ".", exist_ok=True)
+        with open(file_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(self.names), len(self.strings.strings), *offsets))
+            for offset, section in zip(offsets, sections):
+                f.write(b"\0" * (offset - f.tell()))
+                f.write(section)
+
+def write_binary_scene(objects, file_path):
+    """
+    Writes scene objects in the binary scene format.
+
+    Args:
+        objects (iterable): Object dicts with ``name``, ``type``, ``location``, ``rotation`` and ``scale``
+            (the same shape as the JSON exports).
+        file_path (str): Path of the binary scene file.
+    """
+    writer = BinarySceneWriter()
+    for obj in objects:
+        writer.add(obj["name"], obj["type"], obj["location"], obj["rotation"], obj["scale"])
+    writer.write(file_path)
+
+class ColumnarScene:
+    """
+    Read-only, column-oriented view of a binary scene file.
+
+    ``location``, ``rotation`` and ``scale`` are ``(N, 3)`` float32 NumPy arrays
+    and ``name_indices``/``type_indices`` are uint32 arrays into ``strings``.
+    When the file is memory-mapped these arrays are views of the mapping, so
+    nothing is copied until they are used; keep the scene open (or use it as a
+    context manager) while working with them.
+
+    Args:
+        buffer: Buffer holding the file contents (bytes or mmap).
+        mapping (mmap.mmap, optional): Memory map to close with the scene.
+    """
+
+    def __init__(self, buffer, mapping=None):
+        self._mapping = mapping
+        magic, version, count, string_count, *offsets = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a binary scene file (bad magic).")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported binary scene version {version}.")
+        strings_offset, names_offset, types_offset, location_offset, rotation_offset, scale_offset = offsets
+
+        string_offsets = np.frombuffer(buffer, dtype="<u4", count=string_count + 1, offset=strings_offset)
+        blob_start = strings_offset + 4 * (string_count + 1)
+        blob = bytes(buffer[blob_start:blob_start + int(string_offsets[-1])])
+        self.strings = [blob[start:end].decode("utf-8") for start, end in zip(string_offsets[:-1].tolist(), string_offsets[1:].tolist())]
+
+        self.name_indices = np.frombuffer(buffer, dtype="<u4", count=count, offset=names_offset)
+        self.type_indices = np.frombuffer(buffer, dtype="<u4", count=count, offset=types_offset)
+        self.location = np.frombuffer(buffer, dtype="<f4", count=count * 3, offset=location_offset).reshape(count, 3)
+        self.rotation = np.frombuffer(buffer, dtype="<f4", count=count * 3, offset=rotation_offset).reshape(count, 3)
+        self.scale = np.frombuffer(buffer, dtype="<f4", count=count * 3, offset=scale_offset).reshape(count, 3)
+
+    def __len__(self):
+        return len(self.name_indices)
+
+    @property
+    def names(self):
+        """
+        list: Object names, in file order.
+        """
+        return [self.strings[index] for index in self.name_indices.tolist()]
+
+    @property
+    def types(self):
+        """
+        list: Object types, in file order.
+        """
+        return [self.strings[index] for index in self.type_indices.tolist()]
+
+    def objects(self):
+        """
+        Yields the objects as dicts in the same shape as the JSON exports.
+        """
+        for name, type, location, rotation, scale in zip(self.names, self.types, self.location.tolist(), self.rotation.tolist(), self.scale.tolist()):
+            yield {"name": name, "type": type, "location": location, "rotation": rotation, "scale": scale}
+
+    def close(self):
+        """
+        Releases the memory map.
+
+        Views of the columns taken before (e.g. ``scene.location[:, 0]``) stay
+        valid: while any of them exists the mapping can't be closed, and it is
+        closed when the last of them is garbage collected instead.
+        """
+        if self._mapping is not None:
+            for column in ("name_indices", "type_indices", "location", "rotation", "scale"):
+                setattr(self, column, None)
+            try:
+                self._mapping.close()
+            except BufferError:
+                pass
+            self._mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+def read_binary_scene(file_path, use_mmap=True):
+    """
+    Opens a binary scene file as a columnar scene.
+
+    Args:
+        file_path (str): Path of the binary scene file.
+        use_mmap (bool): Memory-map the file (zero-copy) instead of reading it into memory.
+
+    Returns:
+        ColumnarScene: The scene.
+    """
+    with open(file_path, "rb") as f:
+        if not use_mmap:
+            return ColumnarScene(f.read())
+        mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return ColumnarScene(mapping, mapping=mapping)
+
+def _vector3(values):
+    values = tuple(values)
+    if len(values) != 3:
+        raise ValueError(f"Expected 3 components, got {len(values)}.")
+    return values
+
+def _align(position):
+    return (position + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
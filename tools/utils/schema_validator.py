@@ -0,0 +1,513 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import fnmatch
+import functools
+import json
+import math
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+import yaml
+from utils import json_codec
+from utils.instrumentation import add_profiling_arguments, log, profiling_from_arguments
+from utils.scanner import scan_directory
+
+SCHEMA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "specifications", "schemas")
+
+# File name patterns of the asset library and the schema each of them must follow.
+DEFAULT_SCHEMA_MAP = {
+    "*.scdf.json": os.path.join(SCHEMA_DIR, "scdf.json.schema.json"),
+    "*.scdf.yaml": os.path.join(SCHEMA_DIR, "scdf.yml.schema.json"),
+    "*.scdf.yml": os.path.join(SCHEMA_DIR, "scdf.yml.schema.json"),
+}
+
+JSON_TYPES = {
+    "object": lambda value: isinstance(value, dict),
+    "array": lambda value: isinstance(value, list),
+    "string": lambda value: isinstance(value, str),
+    "boolean": lambda value: isinstance(value, bool),
+    "null": lambda value: value is None,
+    "number": lambda value: isinstance(value, (int, float)) and not isinstance(value, bool),
+    "integer": lambda value: (isinstance(value, int) and not isinstance(value, bool))
+                             or (isinstance(value, float) and value.is_integer()),
+}
+
+def _pointer(parent, key):
+    return f"{parent}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+def _describe(value):
+    text = json.dumps(value, default=str)
+    return text if len(text) <= 40 else text[:37] + "..."
+
+class CompiledSchema:
+    """
+    A JSON Schema (draft-07 subset) compiled into a tree of checker closures.
+
+    Compiling walks the schema once; validating then only runs the checks that
+    apply, without re-interpreting schema keywords for every value. All errors
+    are collected, each with the JSON pointer of the offending value.
+
+    Supported keywords: ``type``, ``enum``, ``const``, ``properties``,
+    ``required``, ``additionalProperties``, ``patternProperties``,
+    ``minProperties``/``maxProperties``, ``items`` (single schema or tuple),
+    ``additionalItems``, ``minItems``/``maxItems``, ``uniqueItems``,
+    ``minLength``/``maxLength``, ``pattern``, ``minimum``/``maximum`` and their
+    exclusive variants, ``multipleOf``, ``allOf``/``anyOf``/``oneOf``/``not`` and
+    local ``$ref`` (``#/definitions/...``). Unknown keywords are ignored.
+
+    Args:
+        schema (dict): The JSON Schema.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._refs = {}
+        self._check = self._compile(schema)
+
+    def validate(self, data):
+        """
+        Validates data against the schema.
+
+        Args:
+            data: Parsed JSON data.
+
+        Returns:
+            list: Errors as dicts with ``pointer`` and ``message`` (empty if the data is valid).
+        """
+        errors = []
+        self._check(data, "", errors)
+        return errors
+
+    def is_valid(self, data):
+        """
+        Returns:
+            bool: True if ``data`` matches the schema.
+        """
+        return not self.validate(data)
+
+    __call__ = validate
+
+    def _resolve(self, ref):
+        if not ref.startswith("#"):
+            raise ValueError(f"Only local $ref values are supported, got '{ref}'.")
+        node = self.schema
+        for part in ref.lstrip("#").split("/"):
+            if part:
+                node = node[part.replace("~1", "/").replace("~0", "~")]
+        return node
+
+    def _compile_ref(self, ref):
+        # Compiled lazily through a cell so recursive schemas don't recurse forever.
+        if ref not in self._refs:
+            cell = []
+            self._refs[ref] = cell
+            cell.append(self._compile(self._resolve(ref)))
+        cell = self._refs[ref]
+        return lambda value, pointer, errors: cell[0](value, pointer, errors)
+
+    def _compile(self, schema):
+        if schema is True or schema == {}:
+            return lambda value, pointer, errors: None
+        if schema is False:
+            return lambda value, pointer, errors: errors.append({"pointer": pointer, "message": "No value is allowed here."})
+        if "$ref" in schema:
+            return self._compile_ref(schema["$ref"])
+
+        checks = []
+        if "type" in schema:
+            checks.append(self._compile_type(schema["type"]))
+        if "enum" in schema:
+            allowed = schema["enum"]
+
+            def check_enum(value, pointer, errors):
+                if not any(_json_equal(value, option) for option in allowed):
+                    errors.append({"pointer": pointer, "message": f"{_describe(value)} is not one of {_describe(allowed)}."})
+            checks.append(check_enum)
+        if "const" in schema:
+            expected = schema["const"]
+
+            def check_const(value, pointer, errors):
+                if not _json_equal(value, expected):
+                    errors.append({"pointer": pointer, "message": f"Expected {_describe(expected)}, got {_describe(value)}."})
+            checks.append(check_const)
+
+        object_checks = self._compile_object(schema)
+        array_checks = self._compile_array(schema)
+        string_checks = self._compile_string(schema)
+        number_checks = self._compile_number(schema)
+        if object_checks:
+            checks.append(_only_for(dict, object_checks))
+        if array_checks:
+            checks.append(_only_for(list, array_checks))
+        if string_checks:
+            checks.append(_only_for(str, string_checks))
+        if number_checks:
+            checks.append(_only_for_numbers(number_checks))
+        checks.extend(self._compile_combinators(schema))
+
+        if len(checks) == 1:
+            return checks[0]
+
+        def check_all(value, pointer, errors):
+            for check in checks:
+                check(value, pointer, errors)
+        return check_all
+
+    def _compile_type(self, expected):
+        names = [expected] if isinstance(expected, str) else list(expected)
+        predicates = [JSON_TYPES[name] for name in names]
+        label = " or ".join(names)
+
+        def check_type(value, pointer, errors):
+            for predicate in predicates:
+                if predicate(value):
+                    return
+            errors.append({"pointer": pointer, "message": f"Expected {label}, got {_describe(value)}."})
+        return check_type
+
+    def _compile_object(self, schema):
+        checks = []
+        properties = {name: self._compile(subschema) for name, subschema in schema.get("properties", {}).items()}
+        patterns = [(re.compile(pattern), self._compile(subschema)) for pattern, subschema in schema.get("patternProperties", {}).items()]
+        additional = schema.get("additionalProperties", True)
+        additional_check = None if additional is True else self._compile(additional)
+        required = schema.get("required", [])
+
+        if required:
+            def check_required(value, pointer, errors):
+                for name in required:
+                    if name not in value:
+                        errors.append({"pointer": pointer, "message": f"Missing required property '{name}'."})
+            checks.append(check_required)
+
+        if properties or patterns or additional_check is not None:
+            def check_properties(value, pointer, errors):
+                for name, item in value.items():
+                    matched = False
+                    check = properties.get(name)
+                    if check is not None:
+                        check(item, _pointer(pointer, name), errors)
+                        matched = True
+                    for regex, pattern_check in patterns:
+                        if regex.search(name):
+                            pattern_check(item, _pointer(pointer, name), errors)
+                            matched = True
+                    if not matched and additional_check is not None:
+                        if additional is False:
+                            errors.append({"pointer": _pointer(pointer, name), "message": f"Additional property '{name}' is not allowed."})
+                        else:
+                            additional_check(item, _pointer(pointer, name), errors)
+            checks.append(check_properties)
+
+        min_properties = schema.get("minProperties")
+        max_properties = schema.get("maxProperties")
+        if min_properties is not None or max_properties is not None:
+            def check_property_count(value, pointer, errors):
+                if min_properties is not None and len(value) < min_properties:
+                    errors.append({"pointer": pointer, "message": f"Expected at least {min_properties} properties, got {len(value)}."})
+                if max_properties is not None and len(value) > max_properties:
+                    errors.append({"pointer": pointer, "message": f"Expected at most {max_properties} properties, got {len(value)}."})
+            checks.append(check_property_count)
+        return checks
+
+    def _compile_array(self, schema):
+        checks = []
+        items = schema.get("items")
+        if isinstance(items, list):
+            item_checks = [self._compile(subschema) for subschema in items]
+            additional = schema.get("additionalItems", True)
+            additional_check = None if additional is True else self._compile(additional)
+
+            def check_tuple(value, pointer, errors):
+                for index, item in enumerate(value):
+                    if index < len(item_checks):
+                        item_checks[index](item, _pointer(pointer, index), errors)
+                    elif additional_check is not None:
+                        additional_check(item, _pointer(pointer, index), errors)
+            checks.append(check_tuple)
+        elif items is not None and items is not True and items != {}:
+            item_check = self._compile(items)
+
+            def check_items(value, pointer, errors):
+                for index, item in enumerate(value):
+                    item_check(item, _pointer(pointer, index), errors)
+            checks.append(check_items)
+
+        min_items = schema.get("minItems")
+        max_items = schema.get("maxItems")
+        if min_items is not None or max_items is not None:
+            def check_length(value, pointer, errors):
+                if min_items is not None and len(value) < min_items:
+                    errors.append({"pointer": pointer, "message": f"Expected at least {min_items} items, got {len(value)}."})
+                if max_items is not None and len(value) > max_items:
+                    errors.append({"pointer": pointer, "message": f"Expected at most {max_items} items, got {len(value)}."})
+            checks.append(check_length)
+
+        if schema.get("uniqueItems"):
+            def check_unique(value, pointer, errors):
+                seen = set()
+                for item in value:
+                    key = json.dumps(item, sort_keys=True)
+                    if key in seen:
+                        errors.append({"pointer": pointer, "message": f"Duplicate item {_describe(item)}."})
+                        return
+                    seen.add(key)
+            checks.append(check_unique)
+        return checks
+
+    def _compile_string(self, schema):
+        checks = []
+        min_length = schema.get("minLength")
+        max_length = schema.get("maxLength")
+        if min_length is not None or max_length is not None:
+            def check_length(value, pointer, errors):
+                if min_length is not None and len(value) < min_length:
+                    errors.append({"pointer": pointer, "message": f"Expected at least {min_length} characters."})
+                if max_length is not None and len(value) > max_length:
+                    errors.append({"pointer": pointer, "message": f"Expected at most {max_length} characters."})
+            checks.append(check_length)
+        if "pattern" in schema:
+            regex = re.compile(schema["pattern"])
+
+            def check_pattern(value, pointer, errors):
+                if not regex.search(value):
+                    errors.append({"pointer": pointer, "message": f"{_describe(value)} does not match '{regex.pattern}'."})
+            checks.append(check_pattern)
+        return checks
+
+    def _compile_number(self, schema):
+        bounds = []
+        if "minimum" in schema:
+            bounds.append((lambda value, limit: value >= limit, schema["minimum"], ">="))
+        if "maximum" in schema:
+            bounds.append((lambda value, limit: value <= limit, schema["maximum"], "<="))
+        if "exclusiveMinimum" in schema:
+            bounds.append((lambda value, limit: value > limit, schema["exclusiveMinimum"], ">"))
+        if "exclusiveMaximum" in schema:
+            bounds.append((lambda value, limit: value < limit, schema["exclusiveMaximum"], "<"))
+        multiple_of = schema.get("multipleOf")
+        if not bounds and multiple_of is None:
+            return []
+
+        def check_number(value, pointer, errors):
+            for test, limit, symbol in bounds:
+                if not test(value, limit):
+                    errors.append({"pointer": pointer, "message": f"Expected a value {symbol} {limit}, got {value}."})
+            if multiple_of is not None and not _is_multiple(value, multiple_of):
+                errors.append({"pointer": pointer, "message": f"Expected a multiple of {multiple_of}, got {value}."})
+        return [check_number]
+
+    def _compile_combinators(self, schema):
+        checks = []
+        for subschema in schema.get("allOf", []):
+            checks.append(self._compile(subschema))
+        if "anyOf" in schema or "oneOf" in schema:
+            keyword = "anyOf" if "anyOf" in schema else "oneOf"
+            options = [self._compile(subschema) for subschema in schema[keyword]]
+
+            def check_options(value, pointer, errors):
+                matches = sum(1 for option in options if _passes(option, value, pointer))
+                if keyword == "anyOf" and matches == 0:
+                    errors.append({"pointer": pointer, "message": "Value does not match any of the allowed schemas."})
+                elif keyword == "oneOf" and matches != 1:
+                    errors.append({"pointer": pointer, "message": f"Value matches {matches} schemas, expected exactly one."})
+            checks.append(check_options)
+        if "not" in schema:
+            negated = self._compile(schema["not"])
+
+            def check_not(value, pointer, errors):
+                if _passes(negated, value, pointer):
+                    errors.append({"pointer": pointer, "message": "Value matches a schema it must not match."})
+            checks.append(check_not)
+        return checks
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+def _is_multiple(value, divisor):
+    # Decimal from the shortest repr: 0.3 is a multiple of 0.1, although 0.3 / 0.1 is 2.9999999999999996.
+    if not math.isfinite(value):
+        return False
+    return Decimal(repr(value)) % Decimal(repr(divisor)) == 0
+
+def _json_equal(a, b):
+    # JSON has no bool/number coercion: true != 1, but 1 == 1.0.
+    if isinstance(a, bool) or isinstance(b, bool):
+        return a is b
+    if _is_number(a) and _is_number(b):
+        return a == b
+    return type(a) is type(b) and a == b
+
+def _passes(check, value, pointer):
+    errors = []
+    check(value, pointer, errors)
+    return not errors
+
+def _only_for(python_type, checks):
+    def check(value, pointer, errors):
+        if isinstance(value, python_type):
+            for inner in checks:
+                inner(value, pointer, errors)
+    return check
+
+def _only_for_numbers(checks):
+    def check(value, pointer, errors):
+        if _is_number(value):
+            for inner in checks:
+                inner(value, pointer, errors)
+    return check
+
+COMPILED_CACHE_SIZE = 64
+
+_compiled_schemas = {}
+
+@functools.lru_cache(maxsize=COMPILED_CACHE_SIZE)
+def _compile_serialized(serialized):
+    # Compiled from a copy, so changing the caller's dict afterwards doesn't change the cached schema.
+    return CompiledSchema(json_codec.decode(serialized))
+
+def compile_schema(schema):
+    """
+    Compiles a JSON Schema dict, reusing the compiled schema for equal dicts.
+
+    Args:
+        schema (dict): The JSON Schema.
+
+    Returns:
+        CompiledSchema: Reusable validator.
+    """
+    return _compile_serialized(json_codec.dumps(schema, sort_keys=True))
+
+def load_schema(schema_path):
+    """
+    Loads and compiles a JSON Schema file, reusing the compiled schema while the file is unchanged.
+
+    Args:
+        schema_path (str): Path to the schema file.
+
+    Returns:
+        CompiledSchema: Reusable validator.
+    """
+    key = os.path.abspath(schema_path)
+    stat = os.stat(key)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    cached = _compiled_schemas.get(key)
+    if cached is None or cached[0] != signature:
+        cached = _compiled_schemas[key] = (signature, CompiledSchema(json_codec.load(key)))
+    return cached[1]
+
+def read_data_file(file_path):
+    """
+    Reads a JSON or YAML data file.
+
+    Args:
+        file_path (str): Path to a ``.json``, ``.yaml`` or ``.yml`` file.
+
+    Returns:
+        The parsed data.
+    """
+    if file_path.endswith((".yaml", ".yml")):
+        with open(file_path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    return json_codec.load(file_path)
+
+def validate_file(file_path, schema_path):
+    """
+    Validates one data file against a schema file.
+
+    Args:
+        file_path (str): Path to the JSON or YAML data file.
+        schema_path (str): Path to the JSON Schema file.
+
+    Returns:
+        list: Errors as dicts with ``pointer`` and ``message``; a file that can't be
+            parsed yields a single error with an empty pointer.
+    """
+    try:
+        data = read_data_file(file_path)
+    except (OSError, ValueError, yaml.YAMLError) as e:
+        return [{"pointer": "", "message": f"Could not parse file: {e}"}]
+    return load_schema(schema_path).validate(data)
+
+def schema_for_file(file_path, schema_map=None):
+    """
+    Returns the schema a file has to follow according to a pattern map.
+
+    Args:
+        file_path (str): Path of the data file.
+        schema_map (dict, optional): File name patterns mapped to schema paths (defaults to DEFAULT_SCHEMA_MAP).
+
+    Returns:
+        str: Path of the schema, or None if no pattern matches.
+    """
+    name = os.path.basename(file_path)
+    for pattern, schema_path in (schema_map or DEFAULT_SCHEMA_MAP).items():
+        if fnmatch.fnmatch(name, pattern):
+            return schema_path
+    return None
+
+def _validate_batch(batch):
+    return [(file_path, validate_file(file_path, schema_path)) for file_path, schema_path in batch]
+
+def validate_tree(directory, schema_map=None, max_workers=None, batch_size=64):
+    """
+    Validates every file under a directory that matches a schema pattern, in parallel.
+
+    Files are validated in batches across a process pool; every worker process
+    compiles each schema once and reuses it for all of its files.
+
+    Args:
+        directory (str): Root of the tree to validate (e.g. ``assets/``).
+        schema_map (dict, optional): File name patterns mapped to schema paths (defaults to DEFAULT_SCHEMA_MAP).
+        max_workers (int, optional): Number of worker processes (defaults to the CPU count); 1 validates in-process.
+        batch_size (int): Number of files handed to a worker at a time.
+
+    Returns:
+        dict: Validated file paths mapped to their lists of errors.
+    """
+    schema_map = schema_map or DEFAULT_SCHEMA_MAP
+    jobs = [(file_path, schema_for_file(file_path, schema_map))
+            for file_path in scan_directory(directory, include=list(schema_map)).paths()]
+
+    batches = [jobs[start:start + batch_size] for start in range(0, len(jobs), batch_size)]
+    results = {}
+    if max_workers == 1 or len(batches) <= 1:
+        for batch in batches:
+            results.update(_validate_batch(batch))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            for batch_results in executor.map(_validate_batch, batches):
+                results.update(batch_results)
+    return results
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Validate the scene files of an asset library against their JSON Schemas.")
+    parser.add_argument("paths", nargs="+", help="Files or directories to validate.")
+    parser.add_argument("--schema", type=str, help="Validate every file against this schema instead of the one its name maps to.")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes for directories.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        results = {}
+        for path in args.paths:
+            if os.path.isdir(path):
+                schema_map = {pattern: args.schema for pattern in DEFAULT_SCHEMA_MAP} if args.schema else None
+                results.update(validate_tree(path, schema_map, max_workers=args.workers))
+            else:
+                schema_path = args.schema or schema_for_file(path)
+                if schema_path is None:
+                    raise SystemExit(f"No schema for {path}; pass one with --schema.")
+                results[path] = validate_file(path, schema_path)
+        invalid = {file_path: errors for file_path, errors in results.items() if errors}
+        for file_path, errors in invalid.items():
+            for error in errors:
+                log(f"{file_path}: {error['pointer'] or '/'}: {error['message']}", "schema.error", level="error",
+                    path=file_path, pointer=error["pointer"], error=error["message"])
+        log(f"Validated {len(results)} files, {len(invalid)} invalid.", "schema.summary", files=len(results), invalid=len(invalid))
+    raise SystemExit(1 if invalid else 0)
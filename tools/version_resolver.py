@@ -0,0 +1,424 @@
+# Copyright 2024 chevp. All rights reserved.
+
+import argparse
+import os
+import re
+import time
+from utils import json_codec
+from utils.daemon_client import call as daemon_call
+from utils.json_utils import write_json_atomic
+from utils.instrumentation import add_profiling_arguments, profiling_from_arguments
+
+ASSET_ROOT = "assets"
+VERSION_INDEX_FILENAME = ".version_index.json"
+INDEX_FORMAT_VERSION = 1
+DEFAULT_TTL = 1.0
+MAX_LINK_DEPTH = 32
+
+# 'version_3', 'version-3', 'v3', '3', '1.2.10' (optionally with a file extension, e.g. 'version_1.png').
+VERSION_PATTERN = re.compile(r"^(?:version[_-]?|v)?(\d+(?:[._]\d+)*)$", re.IGNORECASE)
+LINK_KEYS = ("target", "path", "ref", "link")
+LATEST_NAME = "latest"
+REFERENCES_NAME = "references"
+
+def version_key(name):
+    """
+    Returns the sort key of a version name, or None if the name is not a version.
+
+    Versions compare numerically, component by component: 'version_2' < 'version_10'
+    and '1.2.9' < '1.2.10'.
+
+    Args:
+        name (str): Directory or file name (a file extension is ignored).
+
+    Returns:
+        tuple: Integer components of the version, or None.
+    """
+    stem = name if VERSION_PATTERN.match(name) else os.path.splitext(name)[0]
+    match = VERSION_PATTERN.match(stem)
+    if match is None:
+        return None
+    return tuple(int(part) for part in re.split(r"[._]", match.group(1)))
+
+def read_link_file(link_path):
+    """
+    Reads the target of a link or reference JSON file.
+
+    The file holds either a JSON string or an object with a ``target``, ``path``,
+    ``ref`` or ``link`` entry; relative targets are relative to the link file's
+    directory. An object with a ``version`` entry names a sibling version of the
+    asset the link belongs to.
+
+    Args:
+        link_path (str): Path to the JSON file.
+
+    Returns:
+        str: Absolute target path, or None if the file is empty or holds no target.
+    """
+    try:
+        data = json_codec.load(link_path)
+    except (OSError, ValueError):
+        return None
+    base = os.path.dirname(link_path)
+    if isinstance(data, dict):
+        target = next((data[key] for key in LINK_KEYS if isinstance(data.get(key), str)), None)
+        if target is None and data.get("version") is not None:
+            version = str(data["version"])
+            asset_dir = os.path.dirname(base) if os.path.basename(base) in (LATEST_NAME, REFERENCES_NAME) else base
+            return os.path.normpath(os.path.join(asset_dir, f"version_{version}" if version.isdigit() else version))
+        data = target
+    if not isinstance(data, str) or not data:
+        return None
+    return os.path.normpath(os.path.join(base, data))
+
+def resolve_link(path, max_depth=MAX_LINK_DEPTH, visited=None):
+    """
+    Follows symlinks and link/reference JSON files until a real asset is reached.
+
+    Args:
+        path (str): Path to start from.
+        max_depth (int): Maximum number of links to follow.
+        visited (list, optional): Receives every link (symlink or link file) that was followed.
+
+    Returns:
+        str: Absolute path of the final target, or None if a link file holds no target.
+
+    Raises:
+        ValueError: If the links form a cycle or the chain is too long.
+    """
+    seen = []
+    current = os.path.abspath(path)
+    while True:
+        if current in seen:
+            raise ValueError(f"Link cycle: {' -> '.join(seen + [current])}")
+        if len(seen) > max_depth:
+            raise ValueError(f"Link chain longer than {max_depth}: {path}")
+        seen.append(current)
+        if visited is not None and (os.path.islink(current) or current.endswith(".json")):
+            visited.append(current)
+        if os.path.islink(current):
+            current = os.path.normpath(os.path.join(os.path.dirname(current), os.readlink(current)))
+        elif current.endswith(".json") and os.path.isfile(current) and _is_link_file(current):
+            current = read_link_file(current)
+            if current is None:
+                return None
+        else:
+            return current
+
+def _is_link_file(path):
+    name = os.path.basename(path)
+    parent = os.path.basename(os.path.dirname(path))
+    return parent in (LATEST_NAME, REFERENCES_NAME) or name.startswith(("link_to_", "ref_to_")) or name == f"{LATEST_NAME}.json"
+
+def _mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def _list_dir(path):
+    try:
+        return sorted(os.scandir(path), key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+class VersionResolver:
+    """
+    Resolves asset versions ('latest', or a specific one) from a persisted index.
+
+    The index records, for every ``<root>/<type>/<name>`` asset, its versions in
+    numeric order (``version_1/``, ``version_2.png``, ...), its latest version
+    (from a ``latest`` symlink or ``latest/link_to_*.json`` file if present,
+    otherwise the highest version) and its ``references/ref_to_*.json`` targets,
+    plus the mtimes of the directories and link files that were read to build it.
+
+    Lookups are answered from memory. At most once every ``ttl`` seconds a lookup
+    first refreshes the index: one ``os.stat`` per tracked directory or link file,
+    and only assets whose tracked mtimes changed are scanned again. Pass
+    ``ttl=None`` to refresh only when ``refresh`` is called.
+
+    Args:
+        root (str): Root of the asset library (defaults to ASSET_ROOT).
+        index_path (str, optional): Index file (defaults to VERSION_INDEX_FILENAME inside ``root``).
+        ttl (float, optional): Seconds between automatic refreshes.
+    """
+
+    def __init__(self, root=ASSET_ROOT, index_path=None, ttl=DEFAULT_TTL):
+        self.root = os.path.abspath(root)
+        self.index_path = index_path or os.path.join(self.root, VERSION_INDEX_FILENAME)
+        self.ttl = ttl
+        self.assets = {}
+        self.tracked = {}
+        self._last_refresh = None
+        self._dirty = False
+        self._load()
+
+    def _load(self):
+        try:
+            data = json_codec.load(self.index_path)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_FORMAT_VERSION and data.get("root") == self.root:
+            self.assets = data.get("assets", {})
+            self.tracked = data.get("tracked", {})
+        if self.tracked and not isinstance(self.tracked.get("types"), dict):
+            self.tracked = {}
+
+    def save(self):
+        """
+        Persists the index if it changed since it was loaded.
+        """
+        if self._dirty:
+            write_json_atomic({"version": INDEX_FORMAT_VERSION, "root": self.root, "tracked": self.tracked, "assets": self.assets},
+                              self.index_path, indent=None)
+            self._dirty = False
+
+    def _abs(self, relative):
+        return os.path.join(self.root, relative) if relative is not None else None
+
+    def _rel(self, path):
+        return os.path.relpath(path, self.root) if path is not None else None
+
+    def _track(self, tracked, path):
+        tracked[self._rel(path)] = _mtime(path)
+
+    def _is_stale(self, tracked):
+        return any(_mtime(self._abs(path)) != mtime for path, mtime in tracked.items())
+
+    def _version_entries(self, directory):
+        versions = []
+        for entry in _list_dir(directory):
+            key = version_key(entry.name)
+            if key is not None:
+                versions.append((key, entry.path))
+        return [path for key, path in sorted(versions)]
+
+    def _scan_asset(self, asset_dir):
+        tracked = {}
+        self._track(tracked, asset_dir)
+        container = asset_dir
+        versions = self._version_entries(asset_dir)
+        if not versions:
+            # Some assets keep their versions one level down (environments/<name>/scenes/version_1).
+            for entry in _list_dir(asset_dir):
+                if entry.is_dir() and entry.name not in (LATEST_NAME, REFERENCES_NAME):
+                    self._track(tracked, entry.path)
+                    versions = self._version_entries(entry.path)
+                    if versions:
+                        container = entry.path
+                        break
+
+        pointer, error = None, None
+        for directory in dict.fromkeys((container, asset_dir)):
+            for entry in _list_dir(directory):
+                if os.path.splitext(entry.name)[0] != LATEST_NAME:
+                    continue
+                candidates = [entry.path]
+                if entry.is_dir() and not entry.is_symlink():
+                    self._track(tracked, entry.path)
+                    candidates = [child.path for child in _list_dir(entry.path) if child.name.endswith(".json")]
+                elif not entry.is_symlink() and not entry.name.endswith(".json"):
+                    continue
+                for candidate in candidates:
+                    visited = []
+                    try:
+                        target = resolve_link(candidate, visited=visited)
+                    except ValueError as e:
+                        error = str(e)
+                        continue
+                    finally:
+                        for link in visited:
+                            self._track(tracked, link)
+                    if target is not None and target != os.path.abspath(candidate) and os.path.exists(target):
+                        pointer = target
+                        break
+            if pointer is not None:
+                break
+
+        references = {}
+        for directory in dict.fromkeys((container, asset_dir)):
+            references_dir = os.path.join(directory, REFERENCES_NAME)
+            if not os.path.isdir(references_dir):
+                continue
+            self._track(tracked, references_dir)
+            for entry in _list_dir(references_dir):
+                visited = []
+                try:
+                    references[entry.name] = self._rel(resolve_link(entry.path, visited=visited))
+                except ValueError:
+                    references[entry.name] = None
+                for link in visited:
+                    self._track(tracked, link)
+
+        return tracked, {
+            "versions": [self._rel(path) for path in versions],
+            "latest": self._rel(pointer or (versions[-1] if versions else None)),
+            "error": None if pointer or not error else error,
+            "references": references,
+        }
+
+    def refresh(self, force=False):
+        """
+        Updates the index from the filesystem, scanning only what changed.
+
+        Type directories are only listed again when their mtime changed (an asset
+        was added or removed), and assets are only scanned again when one of their
+        tracked directories or link files changed.
+
+        Args:
+            force (bool): Rescan everything regardless of mtimes.
+
+        Returns:
+            set: Keys (``"<type>/<name>"``) of the assets that changed or were removed.
+        """
+        self._last_refresh = time.monotonic()
+        root_mtime = _mtime(self.root)
+        if force or root_mtime != self.tracked.get("."):
+            types = {entry.name: self.tracked.get("types", {}).get(entry.name) for entry in _list_dir(self.root) if entry.is_dir()}
+            self.tracked = {".": root_mtime, "types": types}
+            self._dirty = True
+        types = self.tracked["types"]
+        for type_dir, listing in types.items():
+            mtime = _mtime(self._abs(type_dir))
+            if force or listing is None or listing["mtime"] != mtime:
+                names = [entry.name for entry in _list_dir(self._abs(type_dir)) if entry.is_dir()]
+                types[type_dir] = {"mtime": mtime, "names": names}
+                self._dirty = True
+
+        expected = {f"{type_dir}/{name}" for type_dir, listing in types.items() for name in listing["names"]}
+        changed = {key for key in self.assets if key not in expected}
+        for key in changed:
+            del self.assets[key]
+        for key in sorted(expected):
+            entry = self.assets.get(key)
+            if force or entry is None or self._is_stale(entry["tracked"]):
+                tracked, data = self._scan_asset(self._abs(key))
+                if entry is None or any(entry[field] != data[field] for field in data):
+                    changed.add(key)
+                data["tracked"] = tracked
+                self.assets[key] = data
+                self._dirty = True
+        return changed
+
+    def _entry(self, asset_type, name):
+        if self._last_refresh is None or (self.ttl is not None and time.monotonic() - self._last_refresh >= self.ttl):
+            self.refresh()
+        for type_dir in (asset_type, f"{asset_type}s"):
+            entry = self.assets.get(f"{type_dir}/{name}")
+            if entry is not None:
+                return entry
+        raise KeyError(f"Unknown asset: {asset_type}/{name}")
+
+    def versions(self, asset_type, name):
+        """
+        Returns:
+            list: Paths of all versions of an asset, oldest first.
+        """
+        return [self._abs(path) for path in self._entry(asset_type, name)["versions"]]
+
+    def latest(self, asset_type, name):
+        """
+        Returns the path of the newest version of an asset.
+
+        Args:
+            asset_type (str): Asset type directory, e.g. "scenes" (a singular "scene" also works).
+            name (str): Asset name.
+
+        Returns:
+            str: Absolute path of the latest version, or None if the asset has no versions.
+
+        Raises:
+            KeyError: If the asset is unknown.
+            ValueError: If the asset's latest link is part of a cycle.
+        """
+        entry = self._entry(asset_type, name)
+        if entry["error"]:
+            raise ValueError(entry["error"])
+        return self._abs(entry["latest"])
+
+    def resolve(self, asset_type, name, version=None):
+        """
+        Returns the path of a given version of an asset.
+
+        Args:
+            asset_type (str): Asset type directory.
+            name (str): Asset name.
+            version (int | str, optional): Version number or name ('version_2', '2'); None or 'latest' for the latest.
+
+        Returns:
+            str: Absolute path of the version.
+
+        Raises:
+            KeyError: If the asset or the version is unknown.
+        """
+        if version is None or version == LATEST_NAME:
+            return self.latest(asset_type, name)
+        wanted = version_key(str(version))
+        for path in self._entry(asset_type, name)["versions"]:
+            if version_key(os.path.basename(path)) == wanted:
+                return self._abs(path)
+        raise KeyError(f"Unknown version {version} of {asset_type}/{name}")
+
+    def references(self, asset_type, name):
+        """
+        Returns:
+            dict: Reference file names of an asset mapped to the paths they resolve to (None if broken).
+        """
+        return {ref: self._abs(path) for ref, path in self._entry(asset_type, name)["references"].items()}
+
+_resolvers = {}
+
+def get_version_resolver(root=ASSET_ROOT):
+    """
+    Returns the shared resolver of an asset root, creating it on first use.
+
+    Args:
+        root (str): Root of the asset library.
+
+    Returns:
+        VersionResolver: The resolver.
+    """
+    key = os.path.abspath(root)
+    if key not in _resolvers:
+        _resolvers[key] = VersionResolver(root)
+    return _resolvers[key]
+
+def resolve_latest(asset_type, name, root=ASSET_ROOT):
+    """
+    Returns the path of the newest version of an asset.
+
+    Args:
+        asset_type (str): Asset type directory, e.g. "scenes".
+        name (str): Asset name.
+        root (str): Root of the asset library.
+
+    Returns:
+        str: Absolute path of the latest version.
+    """
+    return daemon_call("versions", root, "versions.latest", lambda: get_version_resolver(root).latest(asset_type, name),
+                       asset_type=asset_type, name=name)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Resolve asset versions from the version index.")
+    parser.add_argument("asset_type", type=str, nargs="?", help="Asset type, e.g. 'scenes' or 'textures'.")
+    parser.add_argument("name", type=str, nargs="?", help="Asset name.")
+    parser.add_argument("--version", type=str, help="Version to resolve (default: latest).")
+    parser.add_argument("--root", type=str, default=ASSET_ROOT, help=f"Asset library root (default: {ASSET_ROOT}).")
+    parser.add_argument("--list", action="store_true", help="List all versions instead of resolving one.")
+    add_profiling_arguments(parser)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+
+    with profiling_from_arguments(args):
+        resolver = VersionResolver(args.root)
+        changed = resolver.refresh()
+        if not args.asset_type:
+            print(f"Version index of {resolver.root}: {len(resolver.assets)} assets, {len(changed)} rescanned.")
+        elif args.list:
+            for path in resolver.versions(args.asset_type, args.name):
+                print(path)
+        else:
+            print(resolver.resolve(args.asset_type, args.name, args.version))
+        resolver.save()